@@ -1,5 +1,5 @@
-import json
 import logger
+from utils.codec import dumps
 
 
 async def set_group_todo(websocket, group_id, message_id):
@@ -12,7 +12,7 @@ async def set_group_todo(websocket, group_id, message_id):
             "params": {"group_id": group_id, "message_id": message_id},
             "echo": "set_group_todo",
         }
-        await websocket.send(json.dumps(payload))
+        await websocket.send(dumps(payload))
         logger.info(f"[API]已执行设置群待办")
         return True
     except Exception as e:
@@ -50,7 +50,7 @@ async def set_group_kick_members(
             },
             "echo": f"set_group_kick_members-{note}",
         }
-        await websocket.send(json.dumps(payload))
+        await websocket.send(dumps(payload))
         logger.info(f"[API]已执行批量踢出群成员")
         return True
     except Exception as e:
@@ -87,7 +87,7 @@ async def set_group_kick(
             },
             "echo": "set_group_kick",
         }
-        await websocket.send(json.dumps(payload))
+        await websocket.send(dumps(payload))
         logger.info(f"[API]已执行设置群踢人")
         return True
     except Exception as e:
@@ -95,17 +95,20 @@ async def set_group_kick(
         return False
 
 
-async def set_group_ban(websocket, group_id, user_id, duration):
+async def set_group_ban(websocket, group_id, user_id, duration, note=""):
     """
     群禁言
+
+    Args:
+        note (str, optional): 附加说明，用于在响应处理中获取结果
     """
     try:
         payload = {
             "action": "set_group_ban",
             "params": {"group_id": group_id, "user_id": user_id, "duration": duration},
-            "echo": "set_group_ban",
+            "echo": f"set_group_ban-{note}" if note else "set_group_ban",
         }
-        await websocket.send(json.dumps(payload))
+        await websocket.send(dumps(payload))
         logger.info(f"[API]已执行群禁言")
         return True
     except Exception as e:
@@ -122,37 +125,26 @@ async def set_group_ban_multiple(websocket, group_id, user_ids, duration, note="
         group_id (str): 群号
         user_ids (list): 要禁言的用户ID列表
         duration (int): 禁言时长，单位秒，0表示取消禁言，30天=2592000秒
-        note (str, optional): 附加说明，用于在响应处理中获取结果
+        note (str, optional): 附加说明，仅用于日志
 
     Returns:
-        bool: 操作是否成功，True表示成功，False表示失败
+        bool: 是否至少有一个用户禁言成功
 
     Note:
-        此函数为占位符，需要您根据实际需求实现批量禁言逻辑
-        可以选择：
-        1. 使用现有的set_group_ban函数循环调用
-        2. 实现新的批量禁言API（如果上游支持）
-        3. 添加适当的延时避免频率限制
-    """
-    try:
-        # TODO: 请在此处实现批量禁言逻辑
-        # 示例实现：循环调用单个禁言API
-        success_count = 0
-        for user_id in user_ids:
-            try:
-                await set_group_ban(websocket, group_id, user_id, duration)
-                success_count += 1
-                # 添加小延时避免频率限制
-                import asyncio
-
-                await asyncio.sleep(0.1)
-            except Exception as e:
-                logger.error(f"[API]禁言用户 {user_id} 失败: {e}")
+        交由 core.moderation 的批量群管执行器限流发送，并通过echo确认每个请求的结果
+    """
+    try:
+        from core.moderation import moderation_executor, ban_action
 
+        summary = await moderation_executor.execute(
+            websocket,
+            [ban_action(group_id, user_id, duration) for user_id in user_ids],
+        )
         logger.info(
-            f"[API]批量禁言完成，成功禁言 {success_count}/{len(user_ids)} 个用户"
+            f"[API]批量禁言完成{f'（{note}）' if note else ''}，"
+            f"成功禁言 {summary['ok']}/{len(user_ids)} 个用户"
         )
-        return success_count > 0
+        return summary["ok"] > 0
     except Exception as e:
         logger.error(f"[API]批量群禁言失败: {e}")
         return False
@@ -168,7 +160,7 @@ async def get_group_system_msg(websocket, group_id):
             "params": {"group_id": group_id},
             "echo": "get_group_system_msg",
         }
-        await websocket.send(json.dumps(payload))
+        await websocket.send(dumps(payload))
         logger.info(f"[API]已执行获取群系统消息")
         return True
     except Exception as e:
@@ -186,7 +178,7 @@ async def get_essence_msg_list(websocket, group_id):
             "params": {"group_id": group_id},
             "echo": "get_essence_msg_list",
         }
-        await websocket.send(json.dumps(payload))
+        await websocket.send(dumps(payload))
         logger.info(f"[API]已执行获取精华消息")
         return True
     except Exception as e:
@@ -204,7 +196,7 @@ async def set_group_whole_ban(websocket, group_id, enable):
             "params": {"group_id": group_id, "enable": enable},
             "echo": "set_group_whole_ban",
         }
-        await websocket.send(json.dumps(payload))
+        await websocket.send(dumps(payload))
         logger.info(f"[API]已执行全体禁言")
         return True
     except Exception as e:
@@ -222,7 +214,7 @@ async def set_group_portrait(websocket, group_id, file_path):
             "params": {"group_id": group_id, "file_path": file_path},
             "echo": "set_group_portrait",
         }
-        await websocket.send(json.dumps(payload))
+        await websocket.send(dumps(payload))
         logger.info(f"[API]已执行设置群头像")
         return True
     except Exception as e:
@@ -240,7 +232,7 @@ async def set_group_admin(websocket, group_id, user_id, enable):
             "params": {"group_id": group_id, "user_id": user_id, "enable": enable},
             "echo": "set_group_admin",
         }
-        await websocket.send(json.dumps(payload))
+        await websocket.send(dumps(payload))
         logger.info(f"[API]已执行设置群管理")
         return True
     except Exception as e:
@@ -258,7 +250,7 @@ async def set_group_essence_msg(websocket, group_id, message_id):
             "params": {"group_id": group_id, "message_id": message_id},
             "echo": "set_group_essence_msg",
         }
-        await websocket.send(json.dumps(payload))
+        await websocket.send(dumps(payload))
         logger.info(f"[API]已执行设置群精华消息")
         return True
     except Exception as e:
@@ -266,17 +258,20 @@ async def set_group_essence_msg(websocket, group_id, message_id):
         return False
 
 
-async def set_group_card(websocket, group_id, user_id, card):
+async def set_group_card(websocket, group_id, user_id, card, note=""):
     """
     设置群成员名片
+
+    Args:
+        note (str, optional): 附加说明，用于在响应处理中获取结果
     """
     try:
         payload = {
             "action": "set_group_card",
             "params": {"group_id": group_id, "user_id": user_id, "card": card},
-            "echo": "set_group_card",
+            "echo": f"set_group_card-{note}" if note else "set_group_card",
         }
-        await websocket.send(json.dumps(payload))
+        await websocket.send(dumps(payload))
         logger.info(f"[API]已执行设置群成员名片")
         return True
     except Exception as e:
@@ -294,7 +289,7 @@ async def delete_group_essence_msg(websocket, group_id, message_id):
             "params": {"group_id": group_id, "message_id": message_id},
             "echo": "delete_group_essence_msg",
         }
-        await websocket.send(json.dumps(payload))
+        await websocket.send(dumps(payload))
         logger.info(f"[API]已执行删除群精华消息")
         return True
     except Exception as e:
@@ -312,7 +307,7 @@ async def set_group_name(websocket, group_id, group_name):
             "params": {"group_id": group_id, "group_name": group_name},
             "echo": "set_group_name",
         }
-        await websocket.send(json.dumps(payload))
+        await websocket.send(dumps(payload))
         logger.info(f"[API]已执行设置群名")
         return True
     except Exception as e:
@@ -330,7 +325,7 @@ async def set_group_leave(websocket, group_id):
             "params": {"group_id": group_id},
             "echo": "set_group_leave",
         }
-        await websocket.send(json.dumps(payload))
+        await websocket.send(dumps(payload))
         logger.info(f"[API]已执行退群")
         return True
     except Exception as e:
@@ -352,7 +347,7 @@ async def _send_group_notice(websocket, group_id, content, image_path):
             },
             "echo": "_send_group_notice",
         }
-        await websocket.send(json.dumps(payload))
+        await websocket.send(dumps(payload))
         logger.info(f"[API]已执行发送群公告")
         return True
     except Exception as e:
@@ -370,7 +365,7 @@ async def _get_group_notice(websocket, group_id):
             "params": {"group_id": group_id},
             "echo": "_get_group_notice",
         }
-        await websocket.send(json.dumps(payload))
+        await websocket.send(dumps(payload))
         logger.info(f"[API]已执行获取群公告")
         return True
     except Exception as e:
@@ -392,7 +387,7 @@ async def set_group_special_title(websocket, group_id, user_id, special_title):
             },
             "echo": "set_group_special_title",
         }
-        await websocket.send(json.dumps(payload))
+        await websocket.send(dumps(payload))
         logger.info(f"[API]已执行设置群头衔")
         return True
     except Exception as e:
@@ -415,7 +410,7 @@ async def upload_group_file(websocket, group_id, file, name, folder_id):
             },
             "echo": "upload_group_file",
         }
-        await websocket.send(json.dumps(payload))
+        await websocket.send(dumps(payload))
         logger.info(f"[API]已执行上传群文件")
         return True
     except Exception as e:
@@ -442,7 +437,7 @@ async def set_group_add_request(websocket, flag, approve, reason=""):
             "params": {"flag": flag, "approve": approve, "reason": reason},
             "echo": "set_group_add_request",
         }
-        await websocket.send(json.dumps(payload))
+        await websocket.send(dumps(payload))
         logger.info(f"[API]已执行处理加群请求")
         return True
     except Exception as e:
@@ -469,7 +464,7 @@ async def get_group_info(websocket, group_id):
             "echo": "get_group_info",
         }
         # 发送请求到上游WebSocket
-        await websocket.send(json.dumps(payload))
+        await websocket.send(dumps(payload))
         logger.info(f"[API]已执行获取群信息")
         return True
     except Exception as e:
@@ -488,7 +483,7 @@ async def get_group_info_ex(websocket, group_id):
             "params": {"group_id": group_id},
             "echo": "get_group_info_ex",
         }
-        await websocket.send(json.dumps(payload))
+        await websocket.send(dumps(payload))
         logger.info(f"[API]已执行获取群信息")
         return True
     except Exception as e:
@@ -506,7 +501,7 @@ async def create_group_file_folder(websocket, group_id, folder_name):
             "params": {"group_id": group_id, "folder_name": folder_name},
             "echo": "create_group_file_folder",
         }
-        await websocket.send(json.dumps(payload))
+        await websocket.send(dumps(payload))
         logger.info(f"[API]已执行创建群文件夹")
         return True
     except Exception as e:
@@ -524,7 +519,7 @@ async def delete_group_file(websocket, group_id, file_id):
             "params": {"group_id": group_id, "file_id": file_id},
             "echo": "delete_group_file",
         }
-        await websocket.send(json.dumps(payload))
+        await websocket.send(dumps(payload))
         logger.info(f"[API]已执行删除群文件")
         return True
     except Exception as e:
@@ -542,7 +537,7 @@ async def delete_group_folder(websocket, group_id, folder_id):
             "params": {"group_id": group_id, "folder_id": folder_id},
             "echo": "delete_group_folder",
         }
-        await websocket.send(json.dumps(payload))
+        await websocket.send(dumps(payload))
         logger.info(f"[API]已执行删除群文件夹")
         return True
     except Exception as e:
@@ -560,7 +555,7 @@ async def get_group_file_system_info(websocket, group_id):
             "params": {"group_id": group_id},
             "echo": "get_group_file_system_info",
         }
-        await websocket.send(json.dumps(payload))
+        await websocket.send(dumps(payload))
         logger.info(f"[API]已执行获取群文件系统信息")
         return True
     except Exception as e:
@@ -578,7 +573,7 @@ async def get_group_root_files(websocket, group_id):
             "params": {"group_id": group_id},
             "echo": "get_group_root_files",
         }
-        await websocket.send(json.dumps(payload))
+        await websocket.send(dumps(payload))
         logger.info(f"[API]已执行获取群根目录文件列表")
         return True
     except Exception as e:
@@ -600,7 +595,7 @@ async def get_group_files_by_folder(websocket, group_id, folder_id, file_count):
             },
             "echo": "get_group_files_by_folder",
         }
-        await websocket.send(json.dumps(payload))
+        await websocket.send(dumps(payload))
         logger.info(f"[API]已执行获取群子目录文件列表")
         return True
     except Exception as e:
@@ -618,7 +613,7 @@ async def get_group_file_url(websocket, group_id, file_id):
             "params": {"group_id": group_id, "file_id": file_id},
             "echo": "get_group_file_url",
         }
-        await websocket.send(json.dumps(payload))
+        await websocket.send(dumps(payload))
         logger.info(f"[API]已执行获取群文件资源链接")
         return True
     except Exception as e:
@@ -636,7 +631,7 @@ async def get_group_list(websocket, no_cache):
             "params": {"no_cache": no_cache},
             "echo": "get_group_list",
         }
-        await websocket.send(json.dumps(payload))
+        await websocket.send(dumps(payload))
         logger.info(f"[API]已执行获取群列表")
         return True
     except Exception as e:
@@ -654,7 +649,7 @@ async def get_group_member_info(websocket, group_id, user_id, no_cache):
             "params": {"group_id": group_id, "user_id": user_id, "no_cache": no_cache},
             "echo": "get_group_member_info",
         }
-        await websocket.send(json.dumps(payload))
+        await websocket.send(dumps(payload))
         logger.info(f"[API]已执行获取群成员信息")
         return True
     except Exception as e:
@@ -680,7 +675,7 @@ async def get_group_member_list(websocket, group_id, no_cache=False, note=""):
             "params": {"group_id": group_id, "no_cache": no_cache},
             "echo": f"get_group_member_list-group_id={group_id}-{note}",
         }
-        await websocket.send(json.dumps(payload))
+        await websocket.send(dumps(payload))
         logger.info(f"[API]已执行获取群 {group_id} 成员列表，note={note}")
         return True
     except Exception as e:
@@ -698,7 +693,7 @@ async def get_group_honor_info(websocket, group_id):
             "params": {"group_id": group_id},
             "echo": "get_group_honor_info",
         }
-        await websocket.send(json.dumps(payload))
+        await websocket.send(dumps(payload))
         logger.info(f"[API]已执行获取群荣誉信息")
         return True
     except Exception as e:
@@ -716,7 +711,7 @@ async def get_group_at_all_remain(websocket, group_id):
             "params": {"group_id": group_id},
             "echo": "get_group_at_all_remain",
         }
-        await websocket.send(json.dumps(payload))
+        await websocket.send(dumps(payload))
         logger.info(f"[API]已执行获取群at剩余次数")
         return True
     except Exception as e:
@@ -734,7 +729,7 @@ async def get_group_ignored_notifies(websocket, group_id):
             "params": {"group_id": group_id},
             "echo": "get_group_ignored_notifies",
         }
-        await websocket.send(json.dumps(payload))
+        await websocket.send(dumps(payload))
         logger.info(f"[API]已执行获取群过滤系统消息")
         return True
     except Exception as e:
@@ -752,7 +747,7 @@ async def set_group_sign(websocket, group_id):
             "params": {"group_id": group_id},
             "echo": "set_group_sign",
         }
-        await websocket.send(json.dumps(payload))
+        await websocket.send(dumps(payload))
         logger.info(f"[API]已执行设置群打卡")
         return True
     except Exception as e:
@@ -770,7 +765,7 @@ async def send_group_sign(websocket, group_id):
             "params": {"group_id": group_id},
             "echo": "send_group_sign",
         }
-        await websocket.send(json.dumps(payload))
+        await websocket.send(dumps(payload))
         logger.info(f"[API]已执行发送群打卡")
         return True
     except Exception as e:
@@ -788,7 +783,7 @@ async def get_ai_characters(websocket, group_id, chat_type):
             "params": {"group_id": group_id, "chat_type": chat_type},
             "echo": "get_ai_characters",
         }
-        await websocket.send(json.dumps(payload))
+        await websocket.send(dumps(payload))
         logger.info(f"[API]已执行获取ai语音人物")
         return True
     except Exception as e:
@@ -810,7 +805,7 @@ async def send_group_ai_record(websocket, group_id, character_id, text):
             },
             "echo": "send_group_ai_record",
         }
-        await websocket.send(json.dumps(payload))
+        await websocket.send(dumps(payload))
         logger.info(f"[API]已执行发送群ai语音")
         return True
     except Exception as e:
@@ -828,7 +823,7 @@ async def get_ai_record(websocket, group_id, character, text):
             "params": {"group_id": group_id, "character": character, "text": text},
             "echo": "get_ai_record",
         }
-        await websocket.send(json.dumps(payload))
+        await websocket.send(dumps(payload))
         logger.info(f"[API]已执行获取ai语音")
         return True
     except Exception as e:
@@ -1,5 +1,5 @@
-import json
 import logger
+from utils.codec import dumps
 
 
 async def nc_get_rkey(websocket):
@@ -8,7 +8,7 @@ async def nc_get_rkey(websocket):
     """
     try:
         payload = {"action": "nc_get_rkey", "params": {}, "echo": "nc_get_rkey"}
-        await websocket.send(json.dumps(payload))
+        await websocket.send(dumps(payload))
         logger.info(f"[API]已执行nc获取rkey")
         return True
     except Exception as e:
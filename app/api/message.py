@@ -1,6 +1,7 @@
 import asyncio
-import json
 import logger
+from utils.codec import dumps
+from core.send_queue import send_queue, PRIORITY_NORMAL
 
 
 # 使用cq码发送群消息
@@ -22,7 +23,7 @@ async def send_group_msg_with_cq(websocket, group_id, content, note=""):
             "params": {"group_id": group_id, "message": content},
             "echo": f"send_group_msg-{note}",
         }
-        await websocket.send(json.dumps(payload))
+        send_queue.enqueue(websocket, ("group", str(group_id)), payload)
         logger.info(f"[API]已执行发送群消息到群 {group_id}")
     except Exception as e:
         logger.error(f"[API]执行发送群消息失败: {e}")
@@ -47,13 +48,15 @@ async def send_private_msg_with_cq(websocket, user_id, content, note=""):
             "params": {"user_id": user_id, "message": content},
             "echo": f"send_private_msg-{note}",
         }
-        await websocket.send(json.dumps(payload))
+        send_queue.enqueue(websocket, ("private", str(user_id)), payload)
         logger.info(f"[API]已执行发送消息到用户 {user_id}")
     except Exception as e:
         logger.error(f"[API]执行发送消息失败: {e}")
 
 
-async def send_group_msg(websocket, group_id, message, note=""):
+async def send_group_msg(
+    websocket, group_id, message, note="", priority=PRIORITY_NORMAL, wait=False
+):
     """
     发送群聊消息，使用新的消息格式（消息段）
 
@@ -66,9 +69,11 @@ async def send_group_msg(websocket, group_id, message, note=""):
             - list: 消息段列表，包含多个消息段对象
         note (str, optional): 附加说明，支持以下功能：
             - "del_msg=秒数": 自动撤回消息，如 "del_msg=10" 表示10秒后撤回
+        priority (int, optional): 发送优先级，群管通知使用 PRIORITY_HIGH 优先发送
+        wait (bool, optional): 是否等待消息从队列发出，先通知再踢人/禁言时使用
 
     Returns:
-        None
+        bool|None: wait为True时返回消息是否已发送到协议端（断线缓存待补发时为False），否则返回None
 
     Raises:
         Exception: 发送消息失败时抛出异常
@@ -86,6 +91,8 @@ async def send_group_msg(websocket, group_id, message, note=""):
     Note:
         消息段可使用generate模块的函数生成，如generate_text_message()、generate_at_message()等
         函数会自动处理消息格式转换和换行符清理
+        消息经 core.send_queue 按会话和全局速率限流后发送，函数入队后立即返回，
+        wait为True时等到消息从队列发出后再返回
         参考文档：https://napcat.apifox.cn/226799128e0
     """
     try:
@@ -107,11 +114,20 @@ async def send_group_msg(websocket, group_id, message, note=""):
             ):
                 text_content = last_msg["data"]["text"]
                 # 如果最后一条消息的文本内容纯换行，则删掉整条消息
+                # 生成新的列表和消息段，不修改调用方传入的消息
                 if text_content.strip() == "":
-                    message.pop()
+                    message = message[:-1]
                 else:
                     # 如果不是纯换行，则删掉末尾的换行符
-                    last_msg["data"]["text"] = text_content.rstrip("\n\r")
+                    message = message[:-1] + [
+                        {
+                            **last_msg,
+                            "data": {
+                                **last_msg["data"],
+                                "text": text_content.rstrip("\n\r"),
+                            },
+                        }
+                    ]
 
         message_data = {
             "action": "send_group_msg",
@@ -121,14 +137,20 @@ async def send_group_msg(websocket, group_id, message, note=""):
             },
             "echo": f"send_group_msg-{note}",
         }
-        await websocket.send(json.dumps(message_data))
+        delivery = send_queue.enqueue(
+            websocket, ("group", str(group_id)), message_data, priority
+        )
         logger.info(f"[API]已执行发送群聊消息到群 {group_id}")
+        if wait:
+            return await delivery
     except Exception as e:
         logger.warning(f"[API]执行发送群聊消息失败: {e}")
-        return
+        return False if wait else None
 
 
-async def send_private_msg(websocket, user_id, message, note=""):
+async def send_private_msg(
+    websocket, user_id, message, note="", priority=PRIORITY_NORMAL, wait=False
+):
     """
     发送私聊消息，使用新的消息格式（消息段）
     {
@@ -139,6 +161,8 @@ async def send_private_msg(websocket, user_id, message, note=""):
     如需自动撤回，请在note参数中添加"del_msg=秒数"
     如：del_msg=10
     则note参数为：del_msg=10
+    priority为发送优先级，群管通知使用 PRIORITY_HIGH 优先发送
+    wait为True时等到消息从队列发出后再返回，返回值为是否已发送到协议端
     https://napcat.apifox.cn/226799128e0
     """
     try:
@@ -160,22 +184,35 @@ async def send_private_msg(websocket, user_id, message, note=""):
             ):
                 text_content = last_msg["data"]["text"]
                 # 如果最后一条消息的文本内容纯换行，则删掉整条消息
+                # 生成新的列表和消息段，不修改调用方传入的消息
                 if text_content.strip() == "":
-                    message.pop()
+                    message = message[:-1]
                 else:
                     # 如果不是纯换行，则删掉末尾的换行符
-                    last_msg["data"]["text"] = text_content.rstrip("\n\r")
+                    message = message[:-1] + [
+                        {
+                            **last_msg,
+                            "data": {
+                                **last_msg["data"],
+                                "text": text_content.rstrip("\n\r"),
+                            },
+                        }
+                    ]
 
         message_data = {
             "action": "send_private_msg",
             "params": {"user_id": user_id, "message": message},
             "echo": f"send_private_msg-{note}",
         }
-        await websocket.send(json.dumps(message_data))
+        delivery = send_queue.enqueue(
+            websocket, ("private", str(user_id)), message_data, priority
+        )
         logger.info(f"[API]已执行发送私聊消息到用户 {user_id}")
+        if wait:
+            return await delivery
     except Exception as e:
         logger.warning(f"[API]执行发送私聊消息失败: {e}")
-        return
+        return False if wait else None
 
 
 async def mark_group_msg_as_read(websocket, group_id):
@@ -188,7 +225,7 @@ async def mark_group_msg_as_read(websocket, group_id):
             "params": {"group_id": group_id},
             "echo": "mark_group_msg_as_read",
         }
-        await websocket.send(json.dumps(payload))
+        await websocket.send(dumps(payload))
         logger.info(f"[API]已执行设置群聊消息已读")
     except Exception as e:
         logger.error(f"[API]执行设置群聊消息已读失败: {e}")
@@ -204,7 +241,7 @@ async def mark_private_msg_as_read(websocket, user_id):
             "params": {"user_id": user_id},
             "echo": "mark_private_msg_as_read",
         }
-        await websocket.send(json.dumps(payload))
+        await websocket.send(dumps(payload))
         logger.info(f"[API]已执行设置私聊消息已读")
     except Exception as e:
         logger.error(f"[API]执行设置私聊消息已读失败: {e}")
@@ -216,26 +253,33 @@ async def _mark_all_as_read(websocket):
     """
     try:
         payload = {"action": "_mark_all_as_read", "echo": "_mark_all_as_read"}
-        await websocket.send(json.dumps(payload))
+        await websocket.send(dumps(payload))
         logger.info(f"[API]已执行设置所有消息已读")
     except Exception as e:
         logger.error(f"[API]执行设置所有消息已读失败: {e}")
 
 
-async def delete_msg(websocket, message_id):
+async def delete_msg(websocket, message_id, note=""):
     """
     撤回消息
+
+    参数:
+        note: str 备注，可选，用于在响应中标识请求的字段
+    返回:
+        bool 请求是否发送成功
     """
     try:
         payload = {
             "action": "delete_msg",
             "params": {"message_id": message_id},
-            "echo": "delete_msg",
+            "echo": f"delete_msg-{note}" if note else "delete_msg",
         }
-        await websocket.send(json.dumps(payload))
+        await websocket.send(dumps(payload))
         logger.info(f"[API]已执行撤回消息：{message_id}")
+        return True
     except Exception as e:
         logger.error(f"[API]执行撤回消息失败: {e}")
+        return False
 
 
 async def get_msg(websocket, message_id, note=""):
@@ -260,7 +304,7 @@ async def get_msg(websocket, message_id, note=""):
             "params": {"message_id": message_id},
             "echo": f"get_msg-{note}",
         }
-        await websocket.send(json.dumps(payload))
+        await websocket.send(dumps(payload))
         logger.info(f"[API]已执行获取消息详情")
     except Exception as e:
         logger.error(f"[API]执行获取消息详情失败: {e}")
@@ -276,7 +320,7 @@ async def get_image(websocket, file_id):
             "params": {"file_id": file_id},
             "echo": "get_image",
         }
-        await websocket.send(json.dumps(payload))
+        await websocket.send(dumps(payload))
         logger.info(f"[API]已执行获取图片消息详情")
     except Exception as e:
         logger.error(f"[API]执行获取图片消息详情失败: {e}")
@@ -292,7 +336,7 @@ async def get_record(websocket, file, out_format):
             "params": {"file": file, "out_format": out_format},
             "echo": "get_record",
         }
-        await websocket.send(json.dumps(payload))
+        await websocket.send(dumps(payload))
         logger.info(f"[API]已执行获取语音消息详情")
     except Exception as e:
         logger.error(f"[API]执行获取语音消息详情失败: {e}")
@@ -308,7 +352,7 @@ async def get_file(websocket, file_id):
             "params": {"file_id": file_id},
             "echo": "get_file",
         }
-        await websocket.send(json.dumps(payload))
+        await websocket.send(dumps(payload))
         logger.info(f"[API]已执行获取文件消息")
     except Exception as e:
         logger.error(f"[API]执行获取文件消息失败: {e}")
@@ -340,7 +384,7 @@ async def get_group_msg_history(websocket, group_id, count=20, message_seq=0, no
             },
             "echo": f"get_group_msg_history-{group_id}-{note}",
         }
-        await websocket.send(json.dumps(payload))
+        await websocket.send(dumps(payload))
         logger.info(f"[API]已执行获取群历史消息")
     except Exception as e:
         logger.error(f"[API]执行获取群历史消息失败: {e}")
@@ -356,7 +400,7 @@ async def set_msg_emoji_like(websocket, message_id, emoji_id, set):
             "params": {"message_id": message_id, "emoji_id": emoji_id, "set": set},
             "echo": "set_msg_emoji_like",
         }
-        await websocket.send(json.dumps(payload))
+        await websocket.send(dumps(payload))
         logger.info(f"[API]已执行设置消息表情点赞")
     except Exception as e:
         logger.error(f"[API]执行设置消息表情点赞失败: {e}")
@@ -379,7 +423,7 @@ async def get_friend_msg_history(
             },
             "echo": "get_friend_msg_history",
         }
-        await websocket.send(json.dumps(payload))
+        await websocket.send(dumps(payload))
         logger.info(f"[API]已执行获取好友历史消息")
     except Exception as e:
         logger.error(f"[API]执行获取好友历史消息失败: {e}")
@@ -395,7 +439,7 @@ async def get_recent_contact(websocket, count):
             "params": {"count": count},
             "echo": "get_recent_contact",
         }
-        await websocket.send(json.dumps(payload))
+        await websocket.send(dumps(payload))
         logger.info(f"[API]已执行获取最近消息列表")
     except Exception as e:
         logger.error(f"[API]执行获取最近消息列表失败: {e}")
@@ -418,7 +462,7 @@ async def fetch_emoji_like(websocket, message_id, emoji_id, emoji_type):
             },
             "echo": "fetch_emoji_like",
         }
-        await websocket.send(json.dumps(payload))
+        await websocket.send(dumps(payload))
         logger.info(f"[API]已执行获取消息表情点赞详情")
     except Exception as e:
         logger.error(f"[API]执行获取消息表情点赞详情失败: {e}")
@@ -434,7 +478,7 @@ async def get_forward_msg(websocket, message_id, note=""):
             "params": {"message_id": message_id},
             "echo": f"get_forward_msg-{note}",
         }
-        await websocket.send(json.dumps(payload))
+        await websocket.send(dumps(payload))
         logger.info(f"[API]已执行获取合并转发消息")
     except Exception as e:
         logger.error(f"[API]执行获取合并转发消息失败: {e}")
@@ -506,7 +550,7 @@ async def send_forward_msg(
         }
 
         # 发送请求
-        await websocket.send(json.dumps(payload))
+        await websocket.send(dumps(payload))
         logger.info(f"[API]已执行发送合并转发消息")
 
     except Exception as e:
@@ -573,7 +617,7 @@ async def send_private_forward_msg(websocket, user_id, messages, note=""):
         }
 
         # 发送请求
-        await websocket.send(json.dumps(payload))
+        await websocket.send(dumps(payload))
         logger.info(f"[API]已执行发送私聊合并转发消息到用户 {user_id}")
 
     except Exception as e:
@@ -671,7 +715,7 @@ async def send_group_forward_msg(
         }
 
         # 发送请求
-        await websocket.send(json.dumps(payload))
+        await websocket.send(dumps(payload))
         logger.info(f"[API]已执行发送群聊合并转发消息到群 {group_id}")
 
     except Exception as e:
@@ -699,7 +743,7 @@ async def group_poke(websocket, group_id, user_id):
             "params": {"group_id": group_id, "user_id": user_id},
             "echo": "group_poke",
         }
-        await websocket.send(json.dumps(payload))
+        await websocket.send(dumps(payload))
         logger.info(f"[API]已执行发送戳一戳")
     except Exception as e:
         logger.error(f"[API]执行发送戳一戳失败: {e}")
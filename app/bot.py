@@ -2,11 +2,30 @@ import websockets
 from config import WS_URL, TOKEN
 from logger import logger
 from handle_events import EventHandler
+from core.connection import bot_connection
 import asyncio
 
+# 事件处理器在整个进程中只创建一次，重连时复用已加载的模块
+_handler = None
+
+
+def get_event_handler():
+    """获取全局事件处理器，首次调用时创建"""
+    global _handler
+    if _handler is None:
+        # 将连接对象实例化到logger
+        logger.websocket = bot_connection
+        _handler = EventHandler(bot_connection)
+    return _handler
+
 
 async def connect_to_bot():
-    """连接到机器人并开始接收消息"""
+    """
+    连接到机器人并开始接收消息
+
+    返回:
+        True 表示连接成功建立后断开，None 表示连接失败
+    """
 
     if WS_URL is None:
         logger.error("WS_URL未设置，请在环境变量中设置")
@@ -19,25 +38,32 @@ async def connect_to_bot():
 
     logger.info(f"正在连接到机器人,连接地址: {connection_url}")
 
+    established = False
     try:
         # 连接到 WebSocket
         async with websockets.connect(connection_url) as websocket:
             try:
-                # 将websocket实例化到logger
-                logger.websocket = websocket
-
-                handler = EventHandler(websocket)  # 为每个连接创建一个独立实例
+                # 替换底层连接，并补发断线期间缓存的请求
+                await bot_connection.attach(websocket)
+                established = True
+                handler = get_event_handler()
                 async for message in websocket:
                     try:
                         # 异步处理消息，不阻塞当前循环
                         # 使用create_task确保即使处理消息耗时，也不会阻塞后续消息接收
-                        asyncio.create_task(handler.handle_message(websocket, message))
+                        asyncio.create_task(
+                            handler.handle_message(bot_connection, message)
+                        )
                     except Exception as e:
                         logger.error(f"处理消息时出错: {e}")
                         logger.error(f"消息内容: {message}")
             except Exception as e:
                 logger.error(f"WebSocket连接出错: {e}")
                 raise
+            finally:
+                bot_connection.detach(websocket)
+        logger.warning("WebSocket连接已断开")
+        return True
     except Exception as e:
         logger.error(f"WebSocket连接失败: {e}")
-        return None
+        return True if established else None
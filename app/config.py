@@ -21,4 +21,7 @@ FEISHU_BOT_URL = os.getenv("FEISHU_BOT_URL")
 # 飞书机器人Secret，选填，掉线时使用
 FEISHU_BOT_SECRET = os.getenv("FEISHU_BOT_SECRET")
 
+# 运行指标HTTP端口，选填，设置后在本机该端口提供Prometheus格式的 /metrics
+METRICS_PORT = os.getenv("METRICS_PORT")
+
 # ==================== 配置项结束 ====================
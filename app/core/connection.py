@@ -0,0 +1,115 @@
+"""
+机器人连接
+
+整个进程只有一个 BotConnection，EventHandler、各模块和发送队列持有的都是它，
+断线重连时只替换其中的底层 websocket：
+- 断线期间的发送请求缓存在内存中，重连后按原顺序补发，群管操作不会丢失
+- 缓存超过容量时丢弃最早的请求，补发时跳过等待过久的请求
+"""
+
+import time
+from collections import deque
+from websockets.exceptions import ConnectionClosed
+import logger
+
+# 断线期间最多缓存的发送请求数
+OUTBOUND_BUFFER_SIZE = 1000
+# 缓存的发送请求超过该时长后不再补发，单位：秒
+OUTBOUND_BUFFER_TTL = 300
+
+
+class BotConnection:
+    """
+    可在重连间复用的连接对象，对外提供与 websocket 相同的 send 方法
+    """
+
+    def __init__(self):
+        self._websocket = None
+        self._replaying = False
+        # 断线期间缓存的发送请求，格式: (缓存时间, 数据)
+        self._buffer = deque()
+        self.connects = 0
+        self.disconnected_at = None
+        self.buffered = 0
+        self.replayed = 0
+        self.dropped = 0
+
+    @property
+    def connected(self):
+        return self._websocket is not None and not self._replaying
+
+    async def attach(self, websocket):
+        """接入新建立的 websocket，并补发断线期间缓存的请求"""
+        self.connects += 1
+        if self.disconnected_at is not None:
+            logger.success(
+                f"[Core]已重新连接，断线 {time.monotonic() - self.disconnected_at:.2f} 秒，"
+                f"待补发 {len(self._buffer)} 条请求"
+            )
+        self.disconnected_at = None
+        self._websocket = websocket
+        self._replaying = True
+        try:
+            # 补发期间新的发送请求继续进入缓存，保证按原顺序发出
+            while self._buffer and self._websocket is websocket:
+                buffered_at, data = self._buffer[0]
+                if time.monotonic() - buffered_at > OUTBOUND_BUFFER_TTL:
+                    self._buffer.popleft()
+                    self.dropped += 1
+                    continue
+                await websocket.send(data)
+                self._buffer.popleft()
+                self.replayed += 1
+        except ConnectionClosed:
+            self.detach(websocket)
+        finally:
+            if self._websocket is websocket:
+                self._replaying = False
+
+    def detach(self, websocket=None):
+        """底层连接断开，之后的发送请求进入缓存；传入websocket时只在其仍是当前连接时断开"""
+        if websocket is not None and self._websocket is not websocket:
+            return
+        if self._websocket is not None:
+            self.disconnected_at = time.monotonic()
+        self._websocket = None
+        self._replaying = False
+
+    def _buffer_data(self, data):
+        if len(self._buffer) >= OUTBOUND_BUFFER_SIZE:
+            self._buffer.popleft()
+            self.dropped += 1
+        self._buffer.append((time.monotonic(), data))
+        self.buffered += 1
+
+    async def send(self, data):
+        """
+        发送数据，未连接时缓存到重连后补发
+
+        返回:
+            bool 已发送到协议端为 True，缓存待补发为 False
+        """
+        websocket = self._websocket
+        if websocket is None or self._replaying:
+            self._buffer_data(data)
+            return False
+        try:
+            await websocket.send(data)
+            return True
+        except ConnectionClosed:
+            self.detach(websocket)
+            self._buffer_data(data)
+            return False
+
+    def format_metrics(self):
+        """生成连接状态文本"""
+        status = "已连接" if self.connected else "未连接"
+        return (
+            f"连接状态：{status}，累计连接 {self.connects} 次\n"
+            f"断线缓存：当前 {len(self._buffer)} 条，累计缓存 {self.buffered}，"
+            f"补发 {self.replayed}，丢弃 {self.dropped}"
+        )
+
+
+# 全局连接对象
+bot_connection = BotConnection()
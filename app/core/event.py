@@ -0,0 +1,71 @@
+"""
+事件对象
+
+每个websocket帧在 EventHandler 中只解析一次为 Event，再交给所有模块。
+Event 继承自 dict，原有的 msg.get(...) 写法保持可用；常用字段在构造时
+统一提取并规范化（ID 均为字符串），格式化时间在首次访问时计算并缓存。
+"""
+
+from datetime import datetime
+
+
+class Event(dict):
+    """解析后的 OneBot 事件"""
+
+    __slots__ = (
+        "post_type",
+        "time",
+        "sub_type",
+        "group_id",
+        "user_id",
+        "message_id",
+        "message",
+        "raw_message",
+        "sender",
+        "nickname",
+        "card",
+        "role",
+        "_formatted_time",
+    )
+
+    def __init__(self, data):
+        super().__init__(data)
+        sender = data.get("sender") or {}
+        set_field = object.__setattr__
+        set_field(self, "post_type", data.get("post_type", ""))
+        set_field(self, "time", data.get("time", ""))
+        set_field(self, "sub_type", data.get("sub_type", ""))
+        set_field(self, "group_id", str(data.get("group_id", "")))  # 群号
+        set_field(self, "user_id", str(data.get("user_id", "")))  # QQ号
+        set_field(self, "message_id", str(data.get("message_id", "")))  # 消息ID
+        set_field(self, "message", data.get("message", {}))  # 消息段数组
+        set_field(self, "raw_message", data.get("raw_message", ""))  # 原始消息
+        set_field(self, "sender", sender)  # 发送者信息
+        set_field(self, "nickname", sender.get("nickname", ""))  # 昵称
+        set_field(self, "card", sender.get("card", ""))  # 群名片
+        set_field(self, "role", sender.get("role", ""))  # 群身份
+        set_field(self, "_formatted_time", None)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Event 的字段只读，如需修改请操作字典内容")
+
+    def __reduce__(self):
+        # 复制和序列化时按字典内容重新解析
+        return (Event, (dict(self),))
+
+    @property
+    def formatted_time(self):
+        """格式化时间，首次访问时计算"""
+        if self._formatted_time is None:
+            formatted = (
+                datetime.fromtimestamp(self.time).strftime("%Y-%m-%d %H:%M:%S")
+                if self.time
+                else ""
+            )
+            object.__setattr__(self, "_formatted_time", formatted)
+        return self._formatted_time
+
+
+def as_event(msg):
+    """将消息字典转换为 Event，已经是 Event 时原样返回"""
+    return msg if isinstance(msg, Event) else Event(msg)
@@ -6,6 +6,7 @@ import os
 import json
 import time
 from . import switchs
+from .member_feed import member_feed
 
 DATA_DIR = os.path.join("data", "Core", "get_group_list.json")
 MEMBER_DATA_DIR = os.path.join("data", "Core", "group_member_list")
@@ -200,6 +201,7 @@ def clean_old_group_member_data():
                 file_path = os.path.join(MEMBER_DATA_DIR, f"{group_id}.json")
                 if os.path.exists(file_path):
                     os.remove(file_path)
+                    member_feed.forget(group_id)
                     cleaned_count += 1
                     logger.info(f"[Core]已清理群 {group_id} 的成员数据文件")
                 else:
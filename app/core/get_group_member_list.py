@@ -8,8 +8,9 @@ import os
 import json
 import time
 from .get_group_list import get_all_group_ids
+from .member_feed import member_feed, MEMBER_LIST_DIR
 
-DATA_DIR = os.path.join("data", "Core", "group_member_list")
+DATA_DIR = MEMBER_LIST_DIR
 
 # 全局变量，记录上次请求时间
 last_request_time = 0
@@ -18,15 +19,12 @@ REQUEST_INTERVAL = 300  # 5分钟，单位：秒
 
 def save_group_member_list_to_file(group_id, data):
     """
-    保存群成员列表信息到文件，确保文件夹存在
+    保存群成员列表信息到文件，内容变化时原子替换文件
+
+    Returns:
+        dict: 成员列表变更，内容没有变化时返回None
     """
-    # 文件路径
-    file_path = os.path.join(DATA_DIR, f"{group_id}.json")
-    # 确保文件夹存在
-    os.makedirs(DATA_DIR, exist_ok=True)
-    # 保存数据
-    with open(file_path, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    return member_feed.save(group_id, data)
 
 
 def get_group_member_user_ids(group_id):
@@ -72,6 +70,28 @@ def get_group_member_user_ids(group_id):
         return []
 
 
+def get_group_members(group_id):
+    """
+    根据群号获取本地缓存的完整群成员信息列表
+
+    Args:
+        group_id (str或int): 群号
+
+    Returns:
+        list: 群成员信息字典列表，如果找不到则返回空列表
+    """
+    try:
+        file_path = os.path.join(DATA_DIR, f"{str(group_id)}.json")
+        if not os.path.exists(file_path):
+            logger.warning(f"[Core]群成员列表文件不存在: {file_path}")
+            return []
+        with open(file_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception as e:
+        logger.error(f"[Core]获取群成员列表失败: {e}")
+        return []
+
+
 def get_group_name_by_id(group_id):
     """
     根据群号获取群名
@@ -180,15 +200,21 @@ async def handle_events(websocket, msg):
                 group_id = re.search(r"group_id=(\d+)", echo)
                 if group_id:
                     if msg.get("data", []):
-                        # 保存data
-                        save_group_member_list_to_file(
+                        # 保存data，内容变化时通知订阅者
+                        change = save_group_member_list_to_file(
                             group_id.group(1), msg.get("data", [])
                         )
-                        logger.success(f"[Core]已保存群 {group_id.group(1)} 的成员列表")
+                        if change is not None:
+                            logger.success(
+                                f"[Core]已保存群 {group_id.group(1)} 的成员列表"
+                                f"（进群 {len(change['joined'])}，退群 {len(change['left'])}）"
+                            )
+                            await member_feed.publish(change)
                     else:
                         logger.warning(
                             f"[Core]群 {group_id.group(1)} 的成员列表为空，跳过保存，可能是机器人非管理员"
                         )
+                        member_feed.report_empty(group_id.group(1))
                 else:
                     logger.error(f"[Core]无法提取群号: {echo}")
     except Exception as e:
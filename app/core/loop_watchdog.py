@@ -0,0 +1,223 @@
+"""
+事件循环卡顿检测
+
+事件循环中定时更新心跳，心跳实际间隔与预期的差值记为事件循环延迟；
+独立的监视线程检查心跳是否按时更新；
+心跳超时说明有同步阻塞操作（同步数据库读写、requests请求、分词、读大文件等）
+占住了事件循环，此时对事件循环线程的调用栈采样，把卡顿时间归到
+调用栈中最内层的项目代码位置上。
+
+- 累计卡顿时间最多的位置定时上报给系统管理员
+- 系统管理员私聊“运行状态”时一并展示
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+import logger
+from config import OWNER_ID
+from api.message import send_private_msg
+from utils.generate import generate_text_message
+
+# 事件循环心跳间隔，单位：秒
+TICK_INTERVAL = 0.1
+# 监视线程采样间隔，单位：秒
+SAMPLE_INTERVAL = 0.05
+# 心跳超过该时间未更新视为卡顿，单位：秒
+STALL_THRESHOLD = 0.3
+# 上报卡顿热点的间隔，单位：秒
+REPORT_INTERVAL = 6 * 3600
+# 上报和展示的热点数量
+REPORT_TOP_N = 5
+# 保留最近多少次心跳的事件循环延迟用于计算分位数，约为最近5分钟
+LAG_SAMPLE_SIZE = 3000
+
+# 项目代码根目录，用于在调用栈中识别项目代码
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class StallHotspot:
+    """一个卡顿位置的统计"""
+
+    __slots__ = ("stall_time", "samples", "stalls", "blocking_call", "last_seen")
+
+    def __init__(self):
+        self.stall_time = 0.0
+        self.samples = 0
+        self.stalls = 0
+        self.blocking_call = ""
+        self.last_seen = 0.0
+
+
+class LoopWatchdog:
+    """事件循环卡顿检测器"""
+
+    def __init__(self):
+        self._last_tick = time.monotonic()
+        self._loop_thread_id = None
+        self._tick_task = None
+        self._thread = None
+        self._lock = threading.Lock()
+        # 项目代码位置 -> StallHotspot
+        self.hotspots = {}
+        self.total_stalls = 0
+        self.total_stall_time = 0.0
+        self.longest_stall = 0.0
+        self.last_report_time = time.time()
+        # 每次心跳测得的事件循环延迟，单位：秒
+        self.lag_samples = deque(maxlen=LAG_SAMPLE_SIZE)
+        self.lag_max = 0.0
+
+    def start(self):
+        """在当前事件循环中启动心跳和监视线程，重复调用无副作用"""
+        if self._tick_task is None or self._tick_task.done():
+            self._loop_thread_id = threading.get_ident()
+            self._last_tick = time.monotonic()
+            self._tick_task = asyncio.create_task(self._tick())
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(
+                target=self._watch, name="loop-watchdog", daemon=True
+            )
+            self._thread.start()
+
+    async def _tick(self):
+        """定时更新心跳，实际醒来时间与预期的差值即为事件循环延迟"""
+        self._last_tick = time.monotonic()
+        while True:
+            expected = self._last_tick + TICK_INTERVAL
+            await asyncio.sleep(TICK_INTERVAL)
+            self._last_tick = time.monotonic()
+            lag = max(0.0, self._last_tick - expected)
+            self.lag_samples.append(lag)
+            if lag > self.lag_max:
+                self.lag_max = lag
+
+    def lag_stats(self):
+        """
+        获取事件循环延迟统计
+
+        返回:
+            (p50, p99, 最大值, 最近一次)，单位：秒
+        """
+        ordered = sorted(self.lag_samples)
+        if not ordered:
+            return 0.0, 0.0, self.lag_max, 0.0
+        p50 = ordered[min(len(ordered) - 1, len(ordered) * 50 // 100)]
+        p99 = ordered[min(len(ordered) - 1, len(ordered) * 99 // 100)]
+        return p50, p99, self.lag_max, self.lag_samples[-1]
+
+    @staticmethod
+    def _locate(frame):
+        """
+        从调用栈中找出卡顿位置
+
+        返回:
+            (最内层项目代码位置, 栈顶的阻塞调用)
+        """
+        stack = traceback.extract_stack(frame)
+        blocking_call = ""
+        if stack:
+            top = stack[-1]
+            blocking_call = f"{os.path.basename(top.filename)}:{top.name}"
+        for entry in reversed(stack):
+            filename = os.path.abspath(entry.filename)
+            if filename.startswith(APP_DIR) and filename != os.path.abspath(__file__):
+                location = os.path.relpath(filename, APP_DIR).replace(os.sep, "/")
+                return f"{location}:{entry.name}:{entry.lineno}", blocking_call
+        return blocking_call or "unknown", blocking_call
+
+    def _watch(self):
+        """监视线程：心跳超时时对事件循环线程采样"""
+        stalled_tick = None
+        current_stall = 0.0
+        while True:
+            time.sleep(SAMPLE_INTERVAL)
+            last_tick = self._last_tick
+            lag = time.monotonic() - last_tick - TICK_INTERVAL
+            if lag < STALL_THRESHOLD:
+                if stalled_tick is not None:
+                    with self._lock:
+                        self.longest_stall = max(self.longest_stall, current_stall)
+                stalled_tick = None
+                continue
+
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            location, blocking_call = self._locate(frame)
+            del frame
+
+            with self._lock:
+                hotspot = self.hotspots.get(location)
+                if hotspot is None:
+                    hotspot = StallHotspot()
+                    self.hotspots[location] = hotspot
+                # 同一次卡顿的首次采样计入卡顿开始前已经过去的时间
+                if stalled_tick != last_tick:
+                    stalled_tick = last_tick
+                    current_stall = lag
+                    hotspot.stalls += 1
+                    self.total_stalls += 1
+                    elapsed = lag
+                else:
+                    current_stall += SAMPLE_INTERVAL
+                    elapsed = SAMPLE_INTERVAL
+                hotspot.stall_time += elapsed
+                hotspot.samples += 1
+                hotspot.blocking_call = blocking_call
+                hotspot.last_seen = time.time()
+                self.total_stall_time += elapsed
+
+    def format_report(self):
+        """生成卡顿热点文本"""
+        with self._lock:
+            top = sorted(
+                self.hotspots.items(),
+                key=lambda item: item[1].stall_time,
+                reverse=True,
+            )[:REPORT_TOP_N]
+            text = (
+                f"事件循环卡顿：{self.total_stalls}次，累计{self.total_stall_time:.1f}秒，"
+                f"最长{self.longest_stall:.2f}秒"
+            )
+            for location, hotspot in top:
+                text += (
+                    f"\n{location}\n  累计{hotspot.stall_time:.2f}秒，{hotspot.stalls}次，"
+                    f"阻塞于 {hotspot.blocking_call}"
+                )
+        return text
+
+    def reset(self):
+        with self._lock:
+            self.hotspots = {}
+            self.total_stalls = 0
+            self.total_stall_time = 0.0
+            self.longest_stall = 0.0
+
+
+# 全局事件循环卡顿检测器
+loop_watchdog = LoopWatchdog()
+
+
+async def handle_events(websocket, msg):
+    """随首个事件启动检测，并在心跳事件中定时向系统管理员上报卡顿热点"""
+    try:
+        loop_watchdog.start()
+        if msg.get("meta_event_type") != "heartbeat":
+            return
+        now = time.time()
+        if now - loop_watchdog.last_report_time < REPORT_INTERVAL:
+            return
+        loop_watchdog.last_report_time = now
+        if not loop_watchdog.hotspots:
+            return
+        report = f"[定时上报]{loop_watchdog.format_report()}"
+        loop_watchdog.reset()
+        await send_private_msg(websocket, OWNER_ID, [generate_text_message(report)])
+        logger.info("[Core]已上报事件循环卡顿热点")
+    except Exception as e:
+        logger.error(f"[Core]事件循环卡顿检测失败: {e}")
@@ -0,0 +1,315 @@
+"""
+群成员列表变更通知
+
+core.get_group_member_list 收到成员列表后交给 member_feed 保存并发布变更：
+- 与上一次保存的内容比较，内容没有变化时不写文件也不发布
+- 变更中带有进群、退群的成员，其他模块订阅变更，不再等待后读取或复制成员列表文件
+- 成员列表文件通过临时文件+改名原子替换，读取方不会读到写了一半的文件
+- SnapshotExporter 把成员列表原子写入外部目录，只在内容变化时写入
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+import time
+import logger
+
+# 群成员列表文件目录
+MEMBER_LIST_DIR = os.path.join("data", "Core", "group_member_list")
+
+# 变更类型
+CHANGE_REFRESH = "refresh"  # 首次保存该群成员列表，没有可比较的旧数据
+CHANGE_MEMBERS = "members"  # 有成员进群或退群
+CHANGE_UPDATE = "update"  # 成员未变，成员资料（群名片、角色、发言时间等）变化
+
+# 请求刷新成员列表后等待保存的默认超时时间，单位：秒
+REFRESH_TIMEOUT = 10
+
+
+def dump_members(members):
+    """把成员列表序列化为保存到文件的文本，格式与原有成员列表文件一致"""
+    return json.dumps(members, ensure_ascii=False, indent=2)
+
+
+def content_fingerprint(content):
+    """计算文件内容指纹，用于判断内容是否变化"""
+    return hashlib.blake2b(content.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def write_text_atomic(file_path, content):
+    """先写入同目录的临时文件再改名替换，替换前读取方看到的始终是完整的旧文件"""
+    directory = os.path.dirname(file_path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(temp_path, file_path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+class MemberListFeed:
+    """
+    群成员列表存储与变更发布
+
+    内存中只保存每个群成员列表的内容指纹和成员QQ号集合，首次用到某个群时从文件加载。
+    订阅者是接收变更字典的异步函数，变更字典格式：
+        {
+            "group_id": 群号,
+            "type": CHANGE_REFRESH / CHANGE_MEMBERS / CHANGE_UPDATE,
+            "joined": [新进群的QQ号],
+            "left": [已退群的QQ号],
+            "members": 完整的新成员列表,
+            "content": 已保存的文件内容,
+            "fingerprint": 内容指纹,
+            "time": 保存时间戳,
+        }
+    """
+
+    def __init__(self, data_dir):
+        self.data_dir = data_dir
+        # group_id -> (内容指纹, 成员QQ号集合)
+        self._snapshots = {}
+        # [(回调函数, 关注的变更类型集合，None表示全部)]
+        self._subscribers = []
+        # group_id -> [等待下一次刷新的Future]
+        self._waiters = {}
+        self.saved = 0
+        self.skipped = 0
+
+    def get_path(self, group_id):
+        return os.path.join(self.data_dir, f"{group_id}.json")
+
+    def _get_snapshot(self, group_id):
+        """获取上一次保存的指纹和成员集合，首次调用时从文件加载，文件不存在时返回None"""
+        if group_id in self._snapshots:
+            return self._snapshots[group_id]
+        file_path = self.get_path(group_id)
+        if not os.path.exists(file_path):
+            return None
+        try:
+            with open(file_path, "r", encoding="utf-8") as f:
+                content = f.read()
+            snapshot = (content_fingerprint(content), _member_ids(json.loads(content)))
+        except Exception as e:
+            logger.warning(f"[Core]读取群 {group_id} 的成员列表文件失败，按首次保存处理: {e}")
+            return None
+        self._snapshots[group_id] = snapshot
+        return snapshot
+
+    def get_fingerprint(self, group_id):
+        """获取群成员列表文件的内容指纹，没有数据时返回None"""
+        snapshot = self._get_snapshot(str(group_id))
+        return snapshot[0] if snapshot else None
+
+    def get_member_ids(self, group_id):
+        """获取群成员QQ号集合，没有数据时返回空集合"""
+        snapshot = self._get_snapshot(str(group_id))
+        return snapshot[1] if snapshot else frozenset()
+
+    def _resolve_waiters(self, group_id):
+        for future in self._waiters.pop(group_id, []):
+            if not future.done():
+                future.set_result(True)
+
+    def report_empty(self, group_id):
+        """协议端返回了空的成员列表（如机器人不是管理员），结束对该群的等待"""
+        self._resolve_waiters(str(group_id))
+
+    async def refresh(self, group_ids, request, timeout=REFRESH_TIMEOUT):
+        """
+        请求刷新多个群的成员列表，等待核心模块保存后返回成员集合，
+        不再固定等待一段时间后读取文件
+
+        参数:
+            group_ids: 群号列表
+            request: 异步函数，参数为群号，发送获取群成员列表的请求
+            timeout: 等待超时时间，超时的群使用已有数据
+        返回:
+            dict: {group_id: 成员QQ号集合}
+        """
+        group_ids = list(dict.fromkeys(str(group_id) for group_id in group_ids))
+        loop = asyncio.get_running_loop()
+        futures = []
+        # 先登记再发请求，避免响应先于登记到达
+        for group_id in group_ids:
+            future = loop.create_future()
+            self._waiters.setdefault(group_id, []).append(future)
+            futures.append(future)
+        try:
+            for group_id in group_ids:
+                await request(group_id)
+            await asyncio.wait(futures, timeout=timeout)
+        finally:
+            for group_id, future in zip(group_ids, futures):
+                if not future.done():
+                    future.cancel()
+                    waiters = self._waiters.get(group_id, [])
+                    if future in waiters:
+                        waiters.remove(future)
+                    if not waiters:
+                        self._waiters.pop(group_id, None)
+        return {group_id: self.get_member_ids(group_id) for group_id in group_ids}
+
+    def save(self, group_id, members):
+        """
+        保存群成员列表，内容变化时原子替换文件
+
+        参数:
+            group_id: 群号
+            members: 成员信息字典列表
+        返回:
+            变更字典，内容没有变化时返回None
+        """
+        group_id = str(group_id)
+        content = dump_members(members)
+        fingerprint = content_fingerprint(content)
+        previous = self._get_snapshot(group_id)
+        if previous is not None and previous[0] == fingerprint:
+            self.skipped += 1
+            self._resolve_waiters(group_id)
+            return None
+
+        write_text_atomic(self.get_path(group_id), content)
+        user_ids = _member_ids(members)
+        self._snapshots[group_id] = (fingerprint, user_ids)
+        self.saved += 1
+        self._resolve_waiters(group_id)
+
+        if previous is None:
+            change_type, joined, left = CHANGE_REFRESH, [], []
+        else:
+            joined = sorted(user_ids - previous[1])
+            left = sorted(previous[1] - user_ids)
+            change_type = CHANGE_MEMBERS if joined or left else CHANGE_UPDATE
+        return {
+            "group_id": group_id,
+            "type": change_type,
+            "joined": joined,
+            "left": left,
+            "members": members,
+            "content": content,
+            "fingerprint": fingerprint,
+            "time": int(time.time()),
+        }
+
+    def forget(self, group_id):
+        """群成员列表文件被删除后清除内存中的记录"""
+        self._snapshots.pop(str(group_id), None)
+
+    def subscribe(self, callback, change_types=None):
+        """
+        订阅成员列表变更
+
+        参数:
+            callback: 异步函数，参数为变更字典
+            change_types: 关注的变更类型，None表示全部
+        """
+        self.unsubscribe(callback)
+        self._subscribers.append(
+            (callback, frozenset(change_types) if change_types else None)
+        )
+
+    def unsubscribe(self, callback):
+        self._subscribers = [
+            (subscriber, change_types)
+            for subscriber, change_types in self._subscribers
+            if subscriber != callback
+        ]
+
+    async def publish(self, change):
+        """按订阅顺序通知订阅者，单个订阅者出错不影响其他订阅者"""
+        for callback, change_types in list(self._subscribers):
+            if change_types is not None and change["type"] not in change_types:
+                continue
+            try:
+                await callback(change)
+            except Exception as e:
+                logger.error(
+                    f"[Core]群 {change['group_id']} 成员列表变更通知失败({getattr(callback, '__qualname__', callback)}): {e}"
+                )
+
+
+def _member_ids(members):
+    return frozenset(
+        str(member.get("user_id")) for member in members if member.get("user_id")
+    )
+
+
+class SnapshotExporter:
+    """
+    成员列表快照导出器
+
+    订阅成员列表变更，把指定群的成员列表原子写入外部目录，
+    只在内容指纹与上次导出不同时写入，外部程序不会读到写了一半的文件。
+    """
+
+    def __init__(self, feed, target_dir, group_filter=None):
+        """
+        参数:
+            feed: MemberListFeed
+            target_dir: 导出目录，每个群一个 <群号>.json
+            group_filter: 判断群是否需要导出的函数，参数为群号字符串，None表示全部导出
+        """
+        self.feed = feed
+        self.target_dir = str(target_dir)
+        self.group_filter = group_filter
+        # group_id -> 已导出内容的指纹
+        self._exported = {}
+
+    def get_path(self, group_id):
+        return os.path.join(self.target_dir, f"{group_id}.json")
+
+    def export(self, group_id, content, fingerprint):
+        """内容与上次导出不同时原子写入，返回是否写入"""
+        group_id = str(group_id)
+        if self._exported.get(group_id) == fingerprint:
+            return False
+        write_text_atomic(self.get_path(group_id), content)
+        self._exported[group_id] = fingerprint
+        return True
+
+    async def handle_change(self, change):
+        """成员列表变更回调"""
+        group_id = change["group_id"]
+        if self.group_filter is not None and not self.group_filter(group_id):
+            return
+        if self.export(group_id, change["content"], change["fingerprint"]):
+            logger.info(f"[Core]已导出群 {group_id} 的成员列表到 {self.target_dir}")
+
+    def sync(self, group_ids):
+        """
+        补齐尚未导出的群，每个群只在进程内首次调用时比较一次导出文件
+
+        返回:
+            本次写入的群号列表
+        """
+        exported = []
+        for group_id in map(str, group_ids):
+            if group_id in self._exported:
+                continue
+            fingerprint = self.feed.get_fingerprint(group_id)
+            if fingerprint is None:
+                continue
+            target_path = self.get_path(group_id)
+            if os.path.exists(target_path):
+                with open(target_path, "r", encoding="utf-8") as f:
+                    if content_fingerprint(f.read()) == fingerprint:
+                        self._exported[group_id] = fingerprint
+                        continue
+            with open(self.feed.get_path(group_id), "r", encoding="utf-8") as f:
+                content = f.read()
+            self.export(group_id, content, content_fingerprint(content))
+            exported.append(group_id)
+        return exported
+
+
+# 全局群成员列表存储
+member_feed = MemberListFeed(MEMBER_LIST_DIR)
@@ -0,0 +1,229 @@
+"""
+事件处理运行指标
+
+记录每个模块处理事件的调用次数、耗时分布和异常次数；事件循环延迟由 core.loop_watchdog 的心跳测量。
+- 系统管理员私聊发送“运行状态”查看各模块耗时排行、事件循环卡顿热点和消息发送队列状态
+- 配置 METRICS_PORT 后在本机提供 Prometheus 文本格式的 /metrics
+"""
+
+import asyncio
+import time
+from collections import deque
+import logger
+from config import OWNER_ID, METRICS_PORT
+from api.message import send_private_msg
+from core.send_queue import send_queue
+from core.loop_watchdog import loop_watchdog
+from core.connection import bot_connection
+from utils.generate import generate_text_message
+
+# 查看运行状态的私聊命令，仅系统管理员可用
+METRICS_COMMAND = "运行状态"
+
+# Prometheus 直方图的耗时分桶上界，单位：秒
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+# 每个模块保留最近多少次耗时用于计算分位数
+SAMPLE_SIZE = 1000
+# 运行状态中展示耗时最高的模块数量
+REPORT_TOP_N = 10
+
+
+def _percentile(ordered, percent):
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+
+class HandlerStats:
+    """单个模块的处理统计"""
+
+    __slots__ = ("calls", "errors", "total_time", "bucket_counts", "samples")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.total_time = 0.0
+        self.bucket_counts = [0] * len(LATENCY_BUCKETS)
+        self.samples = deque(maxlen=SAMPLE_SIZE)
+
+    def record(self, elapsed, error):
+        self.calls += 1
+        self.total_time += elapsed
+        if error:
+            self.errors += 1
+        self.samples.append(elapsed)
+        for index, upper in enumerate(LATENCY_BUCKETS):
+            if elapsed <= upper:
+                self.bucket_counts[index] += 1
+                break
+
+    def percentiles(self):
+        """返回最近样本的 (p50, p95, p99)"""
+        ordered = sorted(self.samples)
+        return (
+            _percentile(ordered, 50),
+            _percentile(ordered, 95),
+            _percentile(ordered, 99),
+        )
+
+
+class EventMetrics:
+    """全部模块的事件处理指标"""
+
+    def __init__(self):
+        # 模块名 -> HandlerStats
+        self.handlers = {}
+        self.started_at = time.time()
+        self.events = 0
+        self._server = None
+
+    def record(self, name, elapsed, error=False):
+        """记录一次模块处理耗时"""
+        stats = self.handlers.get(name)
+        if stats is None:
+            stats = HandlerStats()
+            self.handlers[name] = stats
+        stats.record(elapsed, error)
+
+    def start(self):
+        """在当前事件循环中启动事件循环卡顿检测和可选的HTTP服务，重复调用无副作用"""
+        # 事件循环延迟直接读取卡顿检测心跳的测量结果，不再单独计时
+        loop_watchdog.start()
+        if METRICS_PORT and self._server is None:
+            self._server = asyncio.create_task(self._serve(int(METRICS_PORT)))
+
+    def format_report(self):
+        """生成运行状态文本，按p95耗时从高到低排列"""
+        rows = []
+        for name, stats in self.handlers.items():
+            p50, p95, p99 = stats.percentiles()
+            rows.append((p95, name, stats, p50, p99))
+        rows.sort(key=lambda row: row[0], reverse=True)
+
+        lag_p50, lag_p99, lag_max, _ = loop_watchdog.lag_stats()
+        uptime = int(time.time() - self.started_at)
+        text = (
+            f"运行状态（已运行 {uptime // 3600}小时{uptime % 3600 // 60}分）\n"
+            f"已处理事件：{self.events}\n"
+            f"事件循环延迟 p50/p99/最大：{lag_p50 * 1000:.0f}/"
+            f"{lag_p99 * 1000:.0f}/{lag_max * 1000:.0f}ms\n"
+            f"\n模块耗时 p50/p95/p99（调用次数，异常次数）："
+        )
+        for p95, name, stats, p50, p99 in rows[:REPORT_TOP_N]:
+            text += (
+                f"\n{name}：{p50 * 1000:.0f}/{p95 * 1000:.0f}/{p99 * 1000:.0f}ms"
+                f"（{stats.calls}，{stats.errors}）"
+            )
+        return text
+
+    def prometheus_text(self):
+        """生成Prometheus文本格式的指标"""
+        lines = [
+            "# HELP bot_events_total Websocket frames dispatched to handlers",
+            "# TYPE bot_events_total counter",
+            f"bot_events_total {self.events}",
+            "# HELP bot_handler_duration_seconds Handler processing time",
+            "# TYPE bot_handler_duration_seconds histogram",
+        ]
+        for name, stats in self.handlers.items():
+            cumulative = 0
+            for upper, count in zip(LATENCY_BUCKETS, stats.bucket_counts):
+                cumulative += count
+                lines.append(
+                    f'bot_handler_duration_seconds_bucket{{handler="{name}",le="{upper}"}} {cumulative}'
+                )
+            lines.append(
+                f'bot_handler_duration_seconds_bucket{{handler="{name}",le="+Inf"}} {stats.calls}'
+            )
+            lines.append(
+                f'bot_handler_duration_seconds_sum{{handler="{name}"}} {stats.total_time:.6f}'
+            )
+            lines.append(
+                f'bot_handler_duration_seconds_count{{handler="{name}"}} {stats.calls}'
+            )
+        lines.append("# HELP bot_handler_errors_total Exceptions raised by handlers")
+        lines.append("# TYPE bot_handler_errors_total counter")
+        for name, stats in self.handlers.items():
+            lines.append(f'bot_handler_errors_total{{handler="{name}"}} {stats.errors}')
+        _, _, lag_max, lag = loop_watchdog.lag_stats()
+        lines += [
+            "# HELP bot_event_loop_lag_seconds Latest measured event loop lag",
+            "# TYPE bot_event_loop_lag_seconds gauge",
+            f"bot_event_loop_lag_seconds {lag:.6f}",
+            "# HELP bot_event_loop_lag_max_seconds Max event loop lag since start",
+            "# TYPE bot_event_loop_lag_max_seconds gauge",
+            f"bot_event_loop_lag_max_seconds {lag_max:.6f}",
+        ]
+        return "\n".join(lines) + "\n"
+
+    async def _handle_http(self, reader, writer):
+        try:
+            request_line = await reader.readline()
+            # 读完请求头
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+            parts = request_line.decode("latin-1").split()
+            if len(parts) >= 2 and parts[0] == "GET" and parts[1] == "/metrics":
+                body = self.prometheus_text().encode("utf-8")
+                status = "200 OK"
+            else:
+                body = b"not found\n"
+                status = "404 Not Found"
+            writer.write(
+                f"HTTP/1.1 {status}\r\n"
+                f"Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: close\r\n\r\n".encode("latin-1")
+                + body
+            )
+            await writer.drain()
+        except Exception as e:
+            logger.error(f"[Core]处理指标请求失败: {e}")
+        finally:
+            writer.close()
+
+    async def _serve(self, port):
+        """仅监听本机地址，避免指标暴露到外网"""
+        try:
+            server = await asyncio.start_server(self._handle_http, "127.0.0.1", port)
+            logger.success(f"[Core]运行指标已在 http://127.0.0.1:{port}/metrics 提供")
+            async with server:
+                await server.serve_forever()
+        except Exception as e:
+            logger.error(f"[Core]启动运行指标HTTP服务失败: {e}")
+
+
+# 全局运行指标
+event_metrics = EventMetrics()
+
+
+def handler_name(handler):
+    """由处理函数得到模块名，如 modules.BlackList.main -> BlackList"""
+    # 延迟加载的模块处理器直接记录了模块名
+    module_name = getattr(handler, "module_name", None)
+    if module_name:
+        return module_name
+    name = getattr(handler, "__module__", None) or repr(handler)
+    if name.startswith("modules.") and name.endswith(".main"):
+        return name[len("modules.") : -len(".main")]
+    return name
+
+
+async def handle_events(websocket, msg):
+    """处理系统管理员查看运行状态的私聊命令"""
+    try:
+        if msg.get("post_type") != "message" or msg.get("message_type") != "private":
+            return
+        if msg.get("raw_message", "").strip() != METRICS_COMMAND:
+            return
+        if str(msg.get("user_id", "")) != str(OWNER_ID):
+            return
+        report = (
+            f"{event_metrics.format_report()}\n\n"
+            f"{loop_watchdog.format_report()}\n\n"
+            f"{send_queue.format_metrics()}\n\n"
+            f"{bot_connection.format_metrics()}"
+        )
+        await send_private_msg(websocket, OWNER_ID, [generate_text_message(report)])
+    except Exception as e:
+        logger.error(f"[Core]处理运行状态命令失败: {e}")
@@ -0,0 +1,269 @@
+"""
+批量群管操作执行器
+
+接收跨群的踢人、禁言、撤回、修改群名片操作：
+- 同一群的踢人合并为 set_group_kick_members 批量请求
+- 所有请求经令牌桶限流后发送，避免触发协议端风控
+- 每个请求带唯一 echo，通过响应事件确认执行结果
+- 执行结束后返回汇总统计
+"""
+
+import asyncio
+import re
+import time
+import logger
+from api.group import set_group_kick_members, set_group_ban, set_group_card
+from api.message import delete_msg
+from utils.rate_limit import TokenBucket
+
+# 操作类型
+ACTION_KICK = "kick"
+ACTION_BAN = "ban"
+ACTION_RECALL = "recall"
+ACTION_CARD = "card"
+
+ACTION_NAMES = {
+    ACTION_KICK: "踢出",
+    ACTION_BAN: "禁言",
+    ACTION_RECALL: "撤回",
+    ACTION_CARD: "改群名片",
+}
+
+# 令牌桶速率，每秒最多发送的请求数
+MODERATION_RATE = 5
+# 令牌桶容量，允许的最大突发请求数
+MODERATION_BURST = 10
+# 单次 set_group_kick_members 请求最多踢出的人数
+KICK_BATCH_SIZE = 20
+# 等待协议端响应的超时时间，单位：秒
+RESPONSE_TIMEOUT = 15
+
+# echo 中的请求标识，格式：moderation=请求序号
+ECHO_PATTERN = re.compile(r"moderation=(\d+)")
+
+
+def kick_action(group_id, user_id, reject_add_request=False):
+    """生成踢人操作"""
+    return {
+        "type": ACTION_KICK,
+        "group_id": str(group_id),
+        "user_id": str(user_id),
+        "reject_add_request": reject_add_request,
+    }
+
+
+def ban_action(group_id, user_id, duration):
+    """生成禁言操作，duration为0表示解除禁言"""
+    return {
+        "type": ACTION_BAN,
+        "group_id": str(group_id),
+        "user_id": str(user_id),
+        "duration": duration,
+    }
+
+
+def recall_action(message_id):
+    """生成撤回操作"""
+    return {"type": ACTION_RECALL, "message_id": message_id}
+
+
+def card_action(group_id, user_id, card):
+    """生成修改群名片操作"""
+    return {
+        "type": ACTION_CARD,
+        "group_id": str(group_id),
+        "user_id": str(user_id),
+        "card": card,
+    }
+
+
+class ModerationExecutor:
+    """批量群管操作执行器"""
+
+    def __init__(self, rate, burst, kick_batch_size, response_timeout):
+        self.bucket = TokenBucket(rate, burst)
+        self.kick_batch_size = kick_batch_size
+        self.response_timeout = response_timeout
+        self._seq = 0
+        # 请求序号 -> 等待响应的Future
+        self._waiting = {}
+
+    def _plan(self, actions):
+        """
+        将操作列表合并为请求列表，同一群、相同拒绝加群设置的踢人合并为批量请求
+
+        返回:
+            list: [(操作类型, 参数, 涉及的操作列表), ...]
+        """
+        requests = []
+        kick_batches = {}
+        for action in actions:
+            if action["type"] != ACTION_KICK:
+                requests.append((action["type"], action, [action]))
+                continue
+            key = (action["group_id"], action["reject_add_request"])
+            batch = kick_batches.get(key)
+            if batch is None or len(batch) >= self.kick_batch_size:
+                batch = []
+                kick_batches[key] = batch
+                requests.append((ACTION_KICK, action, batch))
+            batch.append(action)
+        return requests
+
+    async def _send(self, websocket, action_type, params, targets, note):
+        if action_type == ACTION_KICK:
+            return await set_group_kick_members(
+                websocket,
+                params["group_id"],
+                [target["user_id"] for target in targets],
+                params["reject_add_request"],
+                note=note,
+            )
+        if action_type == ACTION_BAN:
+            return await set_group_ban(
+                websocket,
+                params["group_id"],
+                params["user_id"],
+                params["duration"],
+                note=note,
+            )
+        if action_type == ACTION_RECALL:
+            return await delete_msg(websocket, params["message_id"], note=note)
+        if action_type == ACTION_CARD:
+            return await set_group_card(
+                websocket,
+                params["group_id"],
+                params["user_id"],
+                params["card"],
+                note=note,
+            )
+        logger.error(f"[Core]未知的群管操作类型: {action_type}")
+        return False
+
+    async def execute(self, websocket, actions):
+        """
+        执行一批群管操作并等待协议端响应
+
+        参数:
+            websocket: WebSocket连接对象
+            actions: list 由 kick_action/ban_action/recall_action/card_action 生成的操作列表
+        返回:
+            dict 执行汇总，见 _summarize
+        """
+        started_at = time.monotonic()
+        pending = []
+        loop = asyncio.get_running_loop()
+        for action_type, params, targets in self._plan(actions):
+            await self.bucket.acquire()
+            self._seq += 1
+            seq = self._seq
+            future = loop.create_future()
+            self._waiting[seq] = future
+            sent = await self._send(
+                websocket, action_type, params, targets, f"moderation={seq}"
+            )
+            if sent is False:
+                self._waiting.pop(seq, None)
+                future.set_result(False)
+            pending.append((seq, action_type, targets, future))
+
+        futures = [future for _, _, _, future in pending]
+        if futures:
+            await asyncio.wait(futures, timeout=self.response_timeout)
+
+        results = []
+        for seq, action_type, targets, future in pending:
+            self._waiting.pop(seq, None)
+            if future.done():
+                status = "ok" if future.result() else "failed"
+            else:
+                future.cancel()
+                status = "timeout"
+            results.append((action_type, targets, status))
+
+        summary = self._summarize(results, time.monotonic() - started_at)
+        logger.info(f"[Core]批量群管操作完成: {self.format_summary(summary)}")
+        return summary
+
+    @staticmethod
+    def _summarize(results, elapsed):
+        """
+        汇总执行结果
+
+        返回:
+            dict: {
+                "total": 操作总数,
+                "ok": 成功数, "failed": 失败数, "timeout": 超时未响应数,
+                "by_type": {操作类型: {"ok", "failed", "timeout"}},
+                "succeeded_targets": 成功的操作列表,
+                "failed_targets": 未成功的操作列表,
+                "requests": 实际发送的请求数,
+                "elapsed": 耗时秒数,
+            }
+        """
+        summary = {
+            "total": 0,
+            "ok": 0,
+            "failed": 0,
+            "timeout": 0,
+            "by_type": {},
+            "succeeded_targets": [],
+            "failed_targets": [],
+            "requests": len(results),
+            "elapsed": elapsed,
+        }
+        for action_type, targets, status in results:
+            counts = summary["by_type"].setdefault(
+                action_type, {"ok": 0, "failed": 0, "timeout": 0}
+            )
+            counts[status] += len(targets)
+            summary[status] += len(targets)
+            summary["total"] += len(targets)
+            if status == "ok":
+                summary["succeeded_targets"].extend(targets)
+            else:
+                summary["failed_targets"].extend(targets)
+        return summary
+
+    @staticmethod
+    def format_summary(summary):
+        """生成执行汇总文本"""
+        parts = []
+        for action_type, counts in summary["by_type"].items():
+            text = f"{ACTION_NAMES.get(action_type, action_type)}成功{counts['ok']}"
+            if counts["failed"]:
+                text += f"，失败{counts['failed']}"
+            if counts["timeout"]:
+                text += f"，未响应{counts['timeout']}"
+            parts.append(text)
+        return (
+            f"{'；'.join(parts) or '无操作'}"
+            f"（{summary['requests']}个请求，耗时{summary['elapsed']:.1f}秒）"
+        )
+
+    def handle_response(self, msg):
+        """根据echo将协议端响应交给对应的等待者"""
+        echo = msg.get("echo")
+        if not echo or not isinstance(echo, str):
+            return
+        match = ECHO_PATTERN.search(echo)
+        if not match:
+            return
+        future = self._waiting.pop(int(match.group(1)), None)
+        if future is not None and not future.done():
+            future.set_result(msg.get("status") == "ok" and msg.get("retcode") == 0)
+
+
+# 全局群管操作执行器
+moderation_executor = ModerationExecutor(
+    MODERATION_RATE, MODERATION_BURST, KICK_BATCH_SIZE, RESPONSE_TIMEOUT
+)
+
+
+async def handle_events(websocket, msg):
+    """处理群管操作的响应事件"""
+    try:
+        if "echo" in msg and "status" in msg:
+            moderation_executor.handle_response(msg)
+    except Exception as e:
+        logger.error(f"[Core]处理群管操作响应失败: {e}")
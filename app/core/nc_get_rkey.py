@@ -11,45 +11,79 @@ DATA_DIR = os.path.join("data", "Core", "nc_get_rkey.json")
 
 # 全局变量，记录上次请求时间
 last_request_time = 0
-REQUEST_INTERVAL = 600  # 10分钟，单位：秒
+REQUEST_INTERVAL = 600  # 未获取到过期时间时的刷新间隔，10分钟，单位：秒
+REFRESH_AHEAD = 300  # 在rkey过期前多久主动刷新，5分钟，单位：秒
+MIN_REQUEST_INTERVAL = 60  # 两次请求的最小间隔，避免未收到响应时反复请求，单位：秒
 
+# 只使用type=20的rkey
+RKEY_TYPE = 20
 
-# 如果字符串中有图片（包含rkey），则替换为本地缓存的rkey
-def replace_rkey_match(match):
+# 匹配包含rkey参数的CQ图片码，分组1为rkey值之前的部分
+CQ_IMAGE_RKEY_PATTERN = re.compile(r"(\[CQ:image,[^\]]*?rkey=)[^,\]]*")
+
+# 内存中的rkey缓存，首次使用时从本地文件加载
+_rkey_cache = {"rkey": None, "expires_at": 0, "loaded": False}
+
+
+def _parse_rkey_data(data_list):
     """
-    替换匹配对象中的rkey参数
+    从nc_get_rkey响应数据中提取type=20的rkey及其过期时间
+
+    返回:
+        (rkey, expires_at)，找不到时rkey为None
+    """
+    for rkey_item in data_list or []:
+        if rkey_item.get("type") != RKEY_TYPE:
+            continue
+        rkey = rkey_item.get("rkey") or None
+        # 去掉rkey值开头的&rkey=前缀，只保留实际的rkey值
+        if rkey and rkey.startswith("&rkey="):
+            rkey = rkey[6:]
+        try:
+            expires_at = int(rkey_item.get("time", 0)) + int(rkey_item.get("ttl", 0))
+        except (TypeError, ValueError):
+            expires_at = 0
+        return rkey, expires_at
+    return None, 0
+
+
+def _update_rkey_cache(data_list):
+    """
+    用响应数据更新内存中的rkey缓存，数据中没有type=20的rkey时保留原有缓存
+
+    返回:
+        bool 是否解析到新的rkey
     """
+    _rkey_cache["loaded"] = True
+    rkey, expires_at = _parse_rkey_data(data_list)
+    if not rkey:
+        return False
+    _rkey_cache["rkey"] = rkey
+    _rkey_cache["expires_at"] = expires_at
+    return True
+
+
+def _ensure_rkey_loaded():
+    """进程启动后首次使用时从本地文件加载rkey"""
+    if _rkey_cache["loaded"]:
+        return
+    _rkey_cache["loaded"] = True
     try:
-        cq_img = match.group(0)
-        # 查找rkey参数
-        rkey_pattern = r"rkey=([^,^\]]+)"
-        rkey_search = re.search(rkey_pattern, cq_img)
-        if rkey_search:
-            # 读取本地rkey
+        if os.path.exists(DATA_DIR):
             with open(DATA_DIR, "r", encoding="utf-8") as f:
-                rkey_json = json.load(f)
-
-            # 只使用type=20的rkey
-            new_rkey = None
-            for rkey_item in rkey_json:
-                if rkey_item.get("type") == 20:
-                    new_rkey = rkey_item.get("rkey")
-                    break
-
-            if new_rkey:
-                # 去掉rkey值开头的&rkey=前缀，只保留实际的rkey值
-                if new_rkey.startswith("&rkey="):
-                    new_rkey = new_rkey[6:]  # 去掉"&rkey="前缀
-
-                # 替换rkey参数
-                new_cq_img = re.sub(rkey_pattern, f"rkey={new_rkey}", cq_img)
-                logger.info(f"替换rkey成功: {new_cq_img}")
-                return new_cq_img
-            else:
-                logger.warning("未找到type=20的rkey，跳过替换")
+                _update_rkey_cache(json.load(f))
     except Exception as e:
-        logger.error(f"本地rkey替换失败: {e}")
-    return match.group(0)
+        logger.error(f"加载本地rkey失败: {e}")
+
+
+def get_cached_rkey():
+    """
+    获取内存中缓存的rkey
+    返回:
+        str 或 None
+    """
+    _ensure_rkey_loaded()
+    return _rkey_cache["rkey"]
 
 
 def replace_rkey(text):
@@ -61,15 +95,18 @@ def replace_rkey(text):
         str 替换后的文本
     """
     try:
-        if not text or not isinstance(text, str):
+        if not text or not isinstance(text, str) or "rkey=" not in text:
             return text
 
-        # 查找所有CQ图片码模式，包含rkey参数的
-        cq_img_pattern = r"\[CQ:image,[^\]]*rkey=[^\]]*\]"
+        new_rkey = get_cached_rkey()
+        if not new_rkey:
+            logger.warning("未找到type=20的rkey，跳过替换")
+            return text
 
-        # 使用re.sub替换所有匹配的图片码
-        result = re.sub(cq_img_pattern, replace_rkey_match, text)
-        return result
+        # 一次扫描替换所有图片码中的rkey
+        return CQ_IMAGE_RKEY_PATTERN.sub(
+            lambda match: f"{match.group(1)}{new_rkey}", text
+        )
     except Exception as e:
         logger.error(f"替换rkey失败: {e}")
         return text
@@ -86,6 +123,17 @@ def save_rkey_to_file(data_list):
         json.dump(data_list, f, ensure_ascii=False, indent=2)
 
 
+def _should_refresh(current_time):
+    """判断是否需要请求新的rkey：临近过期时主动刷新，未知过期时间时按固定间隔刷新"""
+    if current_time - last_request_time < MIN_REQUEST_INTERVAL:
+        return False
+    _ensure_rkey_loaded()
+    expires_at = _rkey_cache["expires_at"]
+    if _rkey_cache["rkey"] and expires_at:
+        return current_time >= expires_at - REFRESH_AHEAD
+    return current_time - last_request_time >= REQUEST_INTERVAL
+
+
 async def handle_events(websocket, msg):
     """
     处理回应事件
@@ -109,8 +157,8 @@ async def handle_events(websocket, msg):
     global last_request_time
     try:
         current_time = int(time.time())
-        # 检查距离上次请求是否已超过10分钟
-        if current_time - last_request_time >= REQUEST_INTERVAL:
+        # 在rkey过期前主动刷新
+        if _should_refresh(current_time):
             # 发送nc_get_rkey请求
             await nc_get_rkey(websocket)
             last_request_time = current_time
@@ -121,9 +169,14 @@ async def handle_events(websocket, msg):
             match = re.search(r"nc_get_rkey", echo)
             if match:
                 data_list = msg.get("data", [])
-                # 保存到文件
+                # 更新内存缓存，并保存到文件供重启后使用
+                if not _update_rkey_cache(data_list):
+                    logger.warning("nc_get_rkey响应中没有type=20的rkey，继续使用原有rkey")
+                    return
                 save_rkey_to_file(data_list)
-                logger.success(f"获取到nc_get_rkey，已保存到文件")
+                logger.success(
+                    f"获取到nc_get_rkey，已保存到文件，过期时间: {_rkey_cache['expires_at']}"
+                )
     except Exception as e:
         logger.error(f"自动刷新rkey失败: {e}")
         await send_private_msg(websocket, OWNER_ID, f"自动刷新rkey失败: {e}")
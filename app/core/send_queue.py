@@ -0,0 +1,311 @@
+"""
+消息发送队列
+
+所有群聊/私聊消息经由此队列发送到协议端：
+- 全局和每个会话各有一个令牌桶，避免多个模块同时回复或全群广播时触发发送频率限制
+- 同一会话中尚未发出的连续纯文本消息在短时间窗口内合并为一条
+- 群管通知优先于普通消息发送
+- 入队返回发送结果的Future，先通知再执行群管操作的调用方可等待通知发出
+- 记录队列深度等统计信息
+"""
+
+import asyncio
+import time
+from collections import deque
+from utils.rate_limit import TokenBucket
+from utils.codec import dumps
+
+# logger 依赖 api.message，而 api.message 依赖本模块，因此只在需要输出日志时导入 logger，
+# 保证本模块可以先于 logger 单独导入
+
+# 消息优先级，数值越小越先发送
+PRIORITY_HIGH = 0  # 群管通知，如踢人、禁言提醒
+PRIORITY_NORMAL = 1  # 普通消息
+
+# 全局发送速率，每秒最多发送的消息数
+GLOBAL_SEND_RATE = 5
+# 全局突发容量
+GLOBAL_SEND_BURST = 10
+# 单个会话（群或私聊）的发送速率
+TARGET_SEND_RATE = 1
+# 单个会话的突发容量
+TARGET_SEND_BURST = 3
+# 纯文本消息合并窗口，单位：秒，0表示不合并
+COALESCE_WINDOW = 1.0
+# 合并后单条消息的最大长度
+COALESCE_MAX_LENGTH = 2000
+# 队列深度超过该值时输出警告
+QUEUE_WARNING_DEPTH = 100
+# 会话空闲多久后回收其令牌桶，单位：秒
+TARGET_IDLE_TTL = 600
+
+
+class OutboundMessage:
+    """队列中的一条待发送消息"""
+
+    __slots__ = (
+        "websocket",
+        "target",
+        "payload",
+        "priority",
+        "seq",
+        "enqueued_at",
+        "coalesced",
+        "future",
+    )
+
+    def __init__(self, websocket, target, payload, priority, seq, future):
+        self.websocket = websocket
+        self.target = target
+        self.payload = payload
+        self.priority = priority
+        self.seq = seq
+        self.enqueued_at = time.monotonic()
+        self.coalesced = 1
+        # 发送完成后设置为 True，发送失败或断线缓存待补发时设置为 False
+        self.future = future
+
+    def text_only(self):
+        """消息是否全部由文本消息段组成，只有纯文本消息可以合并"""
+        message = self.payload["params"].get("message")
+        return (
+            isinstance(message, list)
+            and bool(message)
+            and all(segment.get("type") == "text" for segment in message)
+        )
+
+    def text_length(self):
+        return sum(
+            len(segment["data"].get("text", ""))
+            for segment in self.payload["params"]["message"]
+        )
+
+
+class SendQueue:
+    """消息发送队列"""
+
+    def __init__(self):
+        self.global_bucket = TokenBucket(GLOBAL_SEND_RATE, GLOBAL_SEND_BURST)
+        # target -> TokenBucket
+        self._buckets = {}
+        # (priority, target) -> deque[OutboundMessage]，同一会话不同优先级分开排队
+        self._queues = {}
+        # target -> 最后一次发送时间，用于回收空闲令牌桶
+        self._last_sent = {}
+        self._seq = 0
+        self._depth = 0
+        self._last_cleanup = time.monotonic()
+        self._wakeup = None
+        self._worker = None
+
+        self.sent = 0
+        self.buffered = 0
+        self.failed = 0
+        self.coalesced = 0
+        self.max_depth = 0
+        self.sent_by_priority = {PRIORITY_HIGH: 0, PRIORITY_NORMAL: 0}
+
+    def _ensure_worker(self):
+        """首次入队时在当前事件循环中启动发送协程"""
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+
+    def _try_coalesce(self, queue, message):
+        """
+        尝试把纯文本消息合并到同一会话队尾尚未发出的消息中
+
+        合并时生成新的消息段列表，不修改调用方传入的消息段
+        """
+        if COALESCE_WINDOW <= 0 or not queue:
+            return False
+        last = queue[-1]
+        if (
+            last.payload.get("echo") != message.payload.get("echo")
+            or message.enqueued_at - last.enqueued_at > COALESCE_WINDOW
+            or not last.text_only()
+            or not message.text_only()
+            or last.text_length() + message.text_length() > COALESCE_MAX_LENGTH
+        ):
+            return False
+        segments = list(last.payload["params"]["message"])
+        tail = segments[-1]
+        segments[-1] = {
+            **tail,
+            "data": {**tail["data"], "text": tail["data"]["text"] + "\n"},
+        }
+        segments.extend(message.payload["params"]["message"])
+        last.payload = {
+            **last.payload,
+            "params": {**last.payload["params"], "message": segments},
+        }
+        last.enqueued_at = message.enqueued_at
+        last.coalesced += 1
+        self.coalesced += 1
+        return True
+
+    def enqueue(self, websocket, target, payload, priority=PRIORITY_NORMAL):
+        """
+        将消息放入发送队列，立即返回
+
+        参数:
+            websocket: WebSocket连接对象
+            target: tuple 会话标识，如 ("group", 群号) 或 ("private", QQ号)
+            payload: dict 完整的API请求
+            priority: int 优先级，PRIORITY_HIGH 或 PRIORITY_NORMAL
+        返回:
+            asyncio.Future 消息发送到协议端后结果为 True，发送失败或因断线
+            缓存到重连后补发时为 False；被合并的消息与合并后的消息共用同一个Future
+        """
+        self._ensure_worker()
+        self._seq += 1
+        message = OutboundMessage(
+            websocket,
+            target,
+            payload,
+            priority,
+            self._seq,
+            asyncio.get_running_loop().create_future(),
+        )
+        queue = self._queues.setdefault((priority, target), deque())
+        if self._try_coalesce(queue, message):
+            return queue[-1].future
+        queue.append(message)
+        self._depth += 1
+        if self._depth > self.max_depth:
+            self.max_depth = self._depth
+        if self._depth == QUEUE_WARNING_DEPTH:
+            import logger
+
+            logger.warning(f"[Core]消息发送队列积压 {self._depth} 条")
+        self._wakeup.set()
+        return message.future
+
+    def _bucket(self, target):
+        bucket = self._buckets.get(target)
+        if bucket is None:
+            bucket = TokenBucket(TARGET_SEND_RATE, TARGET_SEND_BURST)
+            self._buckets[target] = bucket
+        return bucket
+
+    def _pick(self):
+        """
+        选出下一条可以发送的消息
+
+        返回:
+            (OutboundMessage 或 None, 需要等待的秒数)
+        """
+        best = None
+        wait = None
+        for (_, target), queue in self._queues.items():
+            head = queue[0]
+            target_wait = self._bucket(target).wait_time()
+            if target_wait > 0:
+                wait = target_wait if wait is None else min(wait, target_wait)
+                continue
+            if best is None or (head.priority, head.seq) < (best.priority, best.seq):
+                best = head
+        return best, wait
+
+    def _cleanup_idle(self, now):
+        """回收长时间未发送消息的会话令牌桶"""
+        for target in [
+            target
+            for target, sent_at in self._last_sent.items()
+            if now - sent_at > TARGET_IDLE_TTL
+            and all(key[1] != target for key in self._queues)
+        ]:
+            self._last_sent.pop(target, None)
+            self._buckets.pop(target, None)
+
+    async def _run(self):
+        while True:
+            if not self._queues:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            message, wait = self._pick()
+            if message is None:
+                # 所有会话都在限流中，等到最早可发送的时刻或有新消息入队
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            await self.global_bucket.acquire()
+            self._bucket(message.target).try_acquire()
+            key = (message.priority, message.target)
+            queue = self._queues[key]
+            queue.popleft()
+            if not queue:
+                del self._queues[key]
+            self._depth -= 1
+
+            try:
+                # BotConnection 断线时缓存消息并返回 False，普通 websocket 返回 None
+                delivered = (
+                    await message.websocket.send(dumps(message.payload)) is not False
+                )
+                if delivered:
+                    self.sent += 1
+                    self.sent_by_priority[message.priority] += 1
+                else:
+                    self.buffered += 1
+            except Exception as e:
+                self.failed += 1
+                delivered = False
+                import logger
+
+                logger.error(f"[Core]发送消息到 {message.target} 失败: {e}")
+            if not message.future.done():
+                message.future.set_result(delivered)
+
+            now = time.monotonic()
+            self._last_sent[message.target] = now
+            if now - self._last_cleanup > TARGET_IDLE_TTL:
+                self._last_cleanup = now
+                self._cleanup_idle(now)
+
+    def get_metrics(self):
+        """获取发送队列统计信息"""
+        depth_by_target = {}
+        for (_, target), queue in self._queues.items():
+            depth_by_target[target] = depth_by_target.get(target, 0) + len(queue)
+        depth_by_target = sorted(
+            ((depth, target) for target, depth in depth_by_target.items()),
+            reverse=True,
+        )
+        return {
+            "depth": self._depth,
+            "max_depth": self.max_depth,
+            "targets": len(depth_by_target),
+            "top_targets": depth_by_target[:5],
+            "sent": self.sent,
+            "sent_high": self.sent_by_priority[PRIORITY_HIGH],
+            "buffered": self.buffered,
+            "failed": self.failed,
+            "coalesced": self.coalesced,
+        }
+
+    def format_metrics(self):
+        """生成发送队列统计信息文本"""
+        metrics = self.get_metrics()
+        text = (
+            f"消息发送队列状态\n"
+            f"排队中：{metrics['depth']}（历史最高 {metrics['max_depth']}）\n"
+            f"积压会话数：{metrics['targets']}\n"
+            f"已发送：{metrics['sent']}（群管通知 {metrics['sent_high']}），"
+            f"断线缓存：{metrics['buffered']}，"
+            f"失败：{metrics['failed']}，合并：{metrics['coalesced']}"
+        )
+        for depth, (target_type, target_id) in metrics["top_targets"]:
+            text += f"\n{target_type} {target_id}：{depth}"
+        return text
+
+
+# 全局消息发送队列
+send_queue = SendQueue()
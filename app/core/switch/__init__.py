@@ -4,6 +4,7 @@
 """
 
 from .switch_manager import SwitchManager
+from .profile_manager import SwitchProfileManager
 from .command_handler import SwitchCommandHandler
 from .migration import SwitchMigration
 from .database import db
@@ -45,6 +46,21 @@ def copy_group_switches(source_group_id, target_group_id):
     return SwitchManager.copy_group_switches(source_group_id, target_group_id)
 
 
+def set_group_switches(group_ids, module_name, status):
+    """批量设置某模块在多个群的开关"""
+    return SwitchManager.set_group_switches(group_ids, module_name, status)
+
+
+def apply_switch_template(template, group_ids):
+    """把一组模块开关配置应用到多个群"""
+    return SwitchManager.apply_switch_template(template, group_ids)
+
+
+def apply_switch_profile(profile_name, group_ids):
+    """让多个群使用某开关方案"""
+    return SwitchProfileManager.apply_profile(profile_name, group_ids)
+
+
 async def handle_module_private_switch(module_name, websocket, user_id, message_id):
     """处理模块私聊开关命令"""
     return await SwitchCommandHandler.handle_module_private_switch(
@@ -77,6 +93,7 @@ except Exception as e:
 
 __all__ = [
     "SwitchManager",
+    "SwitchProfileManager",
     "SwitchCommandHandler",
     "SwitchMigration",
     "is_group_switch_on",
@@ -86,6 +103,9 @@ __all__ = [
     "load_group_all_switch",
     "get_all_enabled_groups",
     "copy_group_switches",
+    "set_group_switches",
+    "apply_switch_template",
+    "apply_switch_profile",
     "handle_module_private_switch",
     "handle_module_group_switch",
     "handle_events",
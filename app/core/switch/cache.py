@@ -0,0 +1,220 @@
+"""
+开关状态缓存模块
+在内存中保存所有开关、开关方案及群与方案的对应关系，开关查询不再访问数据库
+"""
+
+
+class SwitchCache:
+    """
+    开关有效状态缓存
+
+    群的有效开关按以下顺序决定：群单独设置 > 群所用方案 > 父方案 > ... > 默认关闭。
+    每个方案沿继承链展开后的结果、每个群合并后的结果都按需计算并缓存，
+    查询开关只是两次字典查找。首次使用时从数据库加载，此后由 SwitchManager
+    在写库成功后同步更新（写穿）；方案变化时清空展开结果，群设置变化时只清除该群。
+    """
+
+    def __init__(self):
+        self.loaded = False
+        # group_id -> {module_name: status}，群单独设置的开关
+        self._overrides = {}
+        # module_name -> status，私聊开关
+        self._private = {}
+        # profile_name -> parent_name，父方案为None表示没有继承
+        self._profiles = {}
+        # profile_name -> {module_name: status}，方案自身设置的开关
+        self._profile_switches = {}
+        # group_id -> profile_name
+        self._group_profiles = {}
+        # profile_name -> {module_name: status}，沿继承链展开后的开关
+        self._resolved = {}
+        # group_id -> {module_name: status}，合并方案和群设置后的有效开关
+        self._effective = {}
+
+    def load(self, switch_rows, profile_rows, profile_switch_rows, group_profile_rows):
+        """
+        从数据库行加载缓存
+
+        Args:
+            switch_rows: [(module_name, switch_type, group_id, status), ...]
+            profile_rows: [(profile_name, parent_name), ...]
+            profile_switch_rows: [(profile_name, module_name, status), ...]
+            group_profile_rows: [(group_id, profile_name), ...]
+        """
+        self._overrides, self._private = {}, {}
+        self._profiles, self._profile_switches, self._group_profiles = {}, {}, {}
+        self._invalidate_profiles()
+        for module_name, switch_type, group_id, status in switch_rows:
+            if switch_type == "private":
+                self._private[module_name] = bool(status)
+            elif group_id is not None:
+                self._overrides.setdefault(str(group_id), {})[module_name] = bool(
+                    status
+                )
+        for profile_name, parent_name in profile_rows:
+            self._profiles[profile_name] = parent_name
+        for profile_name, module_name, status in profile_switch_rows:
+            self._profile_switches.setdefault(profile_name, {})[module_name] = bool(
+                status
+            )
+        for group_id, profile_name in group_profile_rows:
+            self._group_profiles[str(group_id)] = profile_name
+        self.loaded = True
+
+    # ---------- 查询 ----------
+
+    def _resolve_profile(self, profile_name):
+        """展开方案的继承链，父方案在前、子方案覆盖"""
+        resolved = self._resolved.get(profile_name)
+        if resolved is not None:
+            return resolved
+        chain = []
+        name = profile_name
+        while name in self._profiles and name not in chain:
+            chain.append(name)
+            name = self._profiles[name]
+        resolved = {}
+        for name in reversed(chain):
+            resolved.update(self._profile_switches.get(name, {}))
+        self._resolved[profile_name] = resolved
+        return resolved
+
+    def get_effective(self, group_id):
+        """获取群的有效开关，格式为 {module_name: status}"""
+        group_id = str(group_id)
+        effective = self._effective.get(group_id)
+        if effective is None:
+            profile_name = self._group_profiles.get(group_id)
+            effective = dict(self._resolve_profile(profile_name)) if profile_name else {}
+            effective.update(self._overrides.get(group_id, {}))
+            self._effective[group_id] = effective
+        return effective
+
+    def is_group_on(self, group_id, module_name):
+        return self.get_effective(group_id).get(module_name, False)
+
+    def is_private_on(self, module_name):
+        return self._private.get(module_name, False)
+
+    def get_enabled_groups(self, module_name):
+        """获取某模块有效开启的群号列表"""
+        group_ids = dict.fromkeys(self._overrides)
+        group_ids.update(dict.fromkeys(self._group_profiles))
+        return [
+            group_id
+            for group_id in group_ids
+            if self.get_effective(group_id).get(module_name, False)
+        ]
+
+    def get_group_profile(self, group_id):
+        return self._group_profiles.get(str(group_id))
+
+    def get_group_overrides(self, group_id):
+        return dict(self._overrides.get(str(group_id), {}))
+
+    def has_profile(self, profile_name):
+        return profile_name in self._profiles
+
+    def get_profile_chain(self, profile_name):
+        """获取方案自身及所有祖先方案名，从子到父"""
+        chain = []
+        while profile_name in self._profiles and profile_name not in chain:
+            chain.append(profile_name)
+            profile_name = self._profiles[profile_name]
+        return chain
+
+    def creates_cycle(self, profile_name, parent_name):
+        """让 profile_name 继承 parent_name 是否会形成循环，即父方案的继承链中出现自身"""
+        return parent_name is not None and profile_name in self.get_profile_chain(
+            parent_name
+        )
+
+    def get_profiles(self):
+        """
+        获取所有方案概况
+
+        Returns:
+            list: [(方案名, 父方案名, 方案自身开关, 使用该方案的群数量), ...]
+        """
+        group_counts = {}
+        for profile_name in self._group_profiles.values():
+            group_counts[profile_name] = group_counts.get(profile_name, 0) + 1
+        return [
+            (
+                profile_name,
+                parent_name,
+                dict(self._profile_switches.get(profile_name, {})),
+                group_counts.get(profile_name, 0),
+            )
+            for profile_name, parent_name in sorted(self._profiles.items())
+        ]
+
+    # ---------- 写穿更新 ----------
+
+    def _invalidate_profiles(self):
+        self._resolved.clear()
+        self._effective.clear()
+
+    def set_group_switches(self, group_ids, template):
+        for group_id in group_ids:
+            group_id = str(group_id)
+            self._overrides.setdefault(group_id, {}).update(
+                {module_name: bool(status) for module_name, status in template.items()}
+            )
+            self._effective.pop(group_id, None)
+
+    def remove_groups(self, group_ids):
+        """群被清理，同时移除群设置和方案关联"""
+        for group_id in group_ids:
+            group_id = str(group_id)
+            self._overrides.pop(group_id, None)
+            self._group_profiles.pop(group_id, None)
+            self._effective.pop(group_id, None)
+
+    def clear_group_overrides(self, group_ids):
+        for group_id in group_ids:
+            group_id = str(group_id)
+            self._overrides.pop(group_id, None)
+            self._effective.pop(group_id, None)
+
+    def set_private_switch(self, module_name, status):
+        self._private[module_name] = bool(status)
+
+    def set_profile(self, profile_name, parent_name):
+        self._profiles[profile_name] = parent_name
+        self._invalidate_profiles()
+
+    def remove_profile(self, profile_name):
+        """删除方案，子方案不再继承它，使用它的群解除关联"""
+        self._profiles.pop(profile_name, None)
+        self._profile_switches.pop(profile_name, None)
+        for name, parent_name in self._profiles.items():
+            if parent_name == profile_name:
+                self._profiles[name] = None
+        for group_id in [
+            group_id
+            for group_id, name in self._group_profiles.items()
+            if name == profile_name
+        ]:
+            del self._group_profiles[group_id]
+        self._invalidate_profiles()
+
+    def set_profile_switches(self, profile_name, template):
+        self._profile_switches.setdefault(profile_name, {}).update(
+            {module_name: bool(status) for module_name, status in template.items()}
+        )
+        self._invalidate_profiles()
+
+    def assign_profile(self, group_ids, profile_name):
+        """设置群所用的方案，profile_name为None时解除关联"""
+        for group_id in group_ids:
+            group_id = str(group_id)
+            if profile_name is None:
+                self._group_profiles.pop(group_id, None)
+            else:
+                self._group_profiles[group_id] = profile_name
+            self._effective.pop(group_id, None)
+
+
+# 全局开关状态缓存
+switch_cache = SwitchCache()
@@ -7,8 +7,23 @@ import logger
 from utils.generate import generate_reply_message, generate_text_message
 from api.message import send_private_msg, send_group_msg
 from utils.auth import is_system_admin, is_group_admin
-from .config import SWITCH_COMMAND
+from core.menu_manager import MenuManager
+from .config import (
+    SWITCH_COMMAND,
+    COPY_SWITCH_COMMAND,
+    BATCH_ENABLE_COMMAND,
+    BATCH_DISABLE_COMMAND,
+    PROFILE_COMMAND,
+    PROFILE_CREATE,
+    PROFILE_DELETE,
+    PROFILE_ENABLE,
+    PROFILE_DISABLE,
+    PROFILE_APPLY,
+    PROFILE_CANCEL,
+    PROFILE_RESET,
+)
 from .switch_manager import SwitchManager
+from .profile_manager import SwitchProfileManager
 
 
 class SwitchCommandHandler:
@@ -93,13 +108,16 @@ class SwitchCommandHandler:
 
             reply_message = generate_reply_message(message_id)
 
+            profile_name = SwitchProfileManager.get_group_profile(group_id)
+            profile_text = f"本群使用开关方案：{profile_name}\n" if profile_name else ""
+
             if enabled_modules:
-                switch_text = f"本群（{group_id}）已开启的模块：\n"
+                switch_text = f"{profile_text}本群（{group_id}）已开启的模块：\n"
                 for i, module_name in enumerate(enabled_modules, 1):
                     switch_text += f"{i}. 【{module_name}】\n"
                 switch_text += f"\n共计 {len(enabled_modules)} 个模块"
             else:
-                switch_text = f"本群（{group_id}）暂未开启任何模块"
+                switch_text = f"{profile_text}本群（{group_id}）暂未开启任何模块"
 
             text_message = generate_text_message(switch_text)
             await send_group_msg(
@@ -293,6 +311,196 @@ class SwitchCommandHandler:
         except Exception as e:
             logger.error(f"处理私聊复制开关命令失败: {e}")
 
+    @staticmethod
+    async def handle_private_batch_copy_command(
+        websocket, user_id, message_id, source_group_id, target_group_ids
+    ):
+        """
+        处理私聊批量复制开关命令，把源群的开关配置一次性应用到多个群
+
+        Args:
+            websocket: WebSocket连接
+            user_id: 用户ID
+            message_id: 消息ID
+            source_group_id: 源群ID
+            target_group_ids: 目标群ID列表
+        """
+        try:
+            reply_message = generate_reply_message(message_id)
+            if not source_group_id.isdigit() or not all(
+                group_id.isdigit() for group_id in target_group_ids
+            ):
+                copy_text = "❌ 群号格式错误，请输入纯数字群号"
+            else:
+                success, template, count = (
+                    SwitchManager.copy_group_switches_to_groups(
+                        source_group_id, target_group_ids
+                    )
+                )
+                if success:
+                    enabled = sum(1 for status in template.values() if status)
+                    copy_text = (
+                        f"✅ 已将群 {source_group_id} 的 {len(template)} 个模块开关"
+                        f"（开启 {enabled} 个）复制到 {count} 个群"
+                    )
+                else:
+                    copy_text = f"❌ 复制失败，群 {source_group_id} 可能不存在或没有开关数据"
+
+            await send_private_msg(
+                websocket,
+                user_id,
+                [reply_message, generate_text_message(copy_text)],
+                note="del_msg=60",
+            )
+        except Exception as e:
+            logger.error(f"处理私聊批量复制开关命令失败: {e}")
+
+    @staticmethod
+    async def handle_private_batch_switch_command(
+        websocket, user_id, message_id, raw_message
+    ):
+        """
+        处理私聊批量开关命令，格式：批量开启/批量关闭 模块名 群1 群2 ...
+
+        Args:
+            websocket: WebSocket连接
+            user_id: 用户ID
+            message_id: 消息ID
+            raw_message: 原始消息
+        """
+        try:
+            reply_message = generate_reply_message(message_id)
+            command, *args = raw_message.split()
+            status = command == BATCH_ENABLE_COMMAND
+            if len(args) < 2:
+                result_text = f"❌ 命令格式错误，请使用：{command} 模块名 群1 群2 ..."
+            elif args[0] not in MenuManager.get_all_modules():
+                result_text = f"❌ 模块 {args[0]} 不存在"
+            elif not all(group_id.isdigit() for group_id in args[1:]):
+                result_text = "❌ 群号格式错误，请输入纯数字群号"
+            else:
+                module_name, group_ids = args[0], args[1:]
+                count = SwitchManager.set_group_switches(group_ids, module_name, status)
+                if count < 0:
+                    result_text = "❌ 批量设置失败，已回滚，请查看日志"
+                else:
+                    status_text = "开启" if status else "关闭"
+                    result_text = f"✅ 已在 {count} 个群{status_text}【{module_name}】"
+
+            await send_private_msg(
+                websocket,
+                user_id,
+                [reply_message, generate_text_message(result_text)],
+                note="del_msg=60",
+            )
+        except Exception as e:
+            logger.error(f"处理私聊批量开关命令失败: {e}")
+
+    @staticmethod
+    def _format_profiles():
+        """生成开关方案列表文本"""
+        profiles = SwitchProfileManager.get_profiles()
+        if not profiles:
+            return (
+                "暂无开关方案，使用以下命令管理：\n"
+                f"{PROFILE_COMMAND} {PROFILE_CREATE} 方案名 [父方案名]\n"
+                f"{PROFILE_COMMAND} {PROFILE_ENABLE}/{PROFILE_DISABLE} 方案名 模块名\n"
+                f"{PROFILE_COMMAND} {PROFILE_APPLY} 方案名 群1 群2 ...\n"
+                f"{PROFILE_COMMAND} {PROFILE_CANCEL}/{PROFILE_RESET} 群1 群2 ...\n"
+                f"{PROFILE_COMMAND} {PROFILE_DELETE} 方案名"
+            )
+        lines = ["开关方案列表："]
+        for profile_name, parent_name, switches, group_count in profiles:
+            parent_text = f"（继承 {parent_name}）" if parent_name else ""
+            lines.append(f"【{profile_name}】{parent_text}- {group_count} 个群使用")
+            for module_name, status in sorted(switches.items()):
+                lines.append(f"  {module_name}：{'开启' if status else '关闭'}")
+        return "\n".join(lines)
+
+    @staticmethod
+    def _run_profile_command(args):
+        """
+        执行开关方案子命令
+
+        Args:
+            args: 命令参数，第一个为子命令
+
+        Returns:
+            str: 回复文本
+        """
+        if not args:
+            return SwitchCommandHandler._format_profiles()
+
+        action, params = args[0], args[1:]
+        if action == PROFILE_CREATE and len(params) in (1, 2):
+            success, result_text = SwitchProfileManager.create_profile(*params)
+            return f"{'✅' if success else '❌'} {result_text}"
+
+        if action == PROFILE_DELETE and len(params) == 1:
+            if SwitchProfileManager.delete_profile(params[0]):
+                return f"✅ 已删除方案 {params[0]}"
+            return f"❌ 方案 {params[0]} 不存在或删除失败"
+
+        if action in (PROFILE_ENABLE, PROFILE_DISABLE) and len(params) == 2:
+            profile_name, module_name = params
+            if module_name not in MenuManager.get_all_modules():
+                return f"❌ 模块 {module_name} 不存在"
+            if not SwitchProfileManager.set_profile_switch(
+                profile_name, module_name, action == PROFILE_ENABLE
+            ):
+                return f"❌ 方案 {profile_name} 不存在或设置失败"
+            return f"✅ 方案 {profile_name} 已{action}【{module_name}】"
+
+        group_params = params[1:] if action == PROFILE_APPLY else params
+        if action in (PROFILE_APPLY, PROFILE_CANCEL, PROFILE_RESET) and group_params:
+            if not all(group_id.isdigit() for group_id in group_params):
+                return "❌ 群号格式错误，请输入纯数字群号"
+            if action == PROFILE_APPLY:
+                count = SwitchProfileManager.apply_profile(params[0], group_params)
+                if count < 0:
+                    return f"❌ 方案 {params[0]} 不存在或应用失败"
+                return f"✅ 已有 {count} 个群使用方案 {params[0]}，群单独设置的开关仍然优先"
+            if action == PROFILE_CANCEL:
+                count = SwitchProfileManager.remove_group_profiles(group_params)
+                if count < 0:
+                    return "❌ 取消方案失败，请查看日志"
+                return f"✅ 已取消 {count} 个群的开关方案"
+            count = SwitchProfileManager.reset_group_overrides(group_params)
+            if count < 0:
+                return "❌ 重置失败，请查看日志"
+            return f"✅ 已清除 {count} 条群单独开关设置，这些群将完全按方案生效"
+
+        return f"❌ 命令格式错误，发送【{PROFILE_COMMAND}】查看用法"
+
+    @staticmethod
+    async def handle_private_profile_command(
+        websocket, user_id, message_id, raw_message
+    ):
+        """
+        处理私聊开关方案命令
+
+        Args:
+            websocket: WebSocket连接
+            user_id: 用户ID
+            message_id: 消息ID
+            raw_message: 原始消息
+        """
+        try:
+            result_text = SwitchCommandHandler._run_profile_command(
+                raw_message.split()[1:]
+            )
+            await send_private_msg(
+                websocket,
+                user_id,
+                [
+                    generate_reply_message(message_id),
+                    generate_text_message(result_text),
+                ],
+                note="del_msg=60",
+            )
+        except Exception as e:
+            logger.error(f"处理私聊开关方案命令失败: {e}")
+
     @staticmethod
     async def handle_events(websocket, message):
         """
@@ -303,6 +511,9 @@ class SwitchCommandHandler:
         2. 复制开关 群号 - 复制指定群号的开关配置到本群
         私聊中：
         1. 复制开关 群1 群2 - 复制群1的开关配置到群2
+        2. 复制开关 群1 群2 群3 ... - 复制群1的开关配置到后面所有群
+        3. 批量开启/批量关闭 模块名 群1 群2 ... - 在多个群开启或关闭某模块
+        4. 开关方案 [子命令 参数...] - 管理开关方案，不带参数时列出所有方案
 
         Args:
             websocket: WebSocket连接
@@ -318,7 +529,10 @@ class SwitchCommandHandler:
             # 检查是否是支持的命令
             if not (
                 raw_message.lower() == SWITCH_COMMAND
-                or raw_message.startswith("复制开关 ")
+                or raw_message.startswith(f"{COPY_SWITCH_COMMAND} ")
+                or raw_message.startswith(f"{BATCH_ENABLE_COMMAND} ")
+                or raw_message.startswith(f"{BATCH_DISABLE_COMMAND} ")
+                or raw_message.split(" ", 1)[0] == PROFILE_COMMAND
             ):
                 return
 
@@ -336,7 +550,7 @@ class SwitchCommandHandler:
                     return
 
                 # 处理复制开关命令
-                if raw_message.startswith("复制开关 "):
+                if raw_message.startswith(f"{COPY_SWITCH_COMMAND} "):
                     parts = raw_message.split(" ", 1)
                     if len(parts) != 2:
                         reply_message = generate_reply_message(message_id)
@@ -367,8 +581,31 @@ class SwitchCommandHandler:
                 if not is_system_admin(user_id):
                     return
 
-                # 私聊中只支持复制开关命令
-                if raw_message.startswith("复制开关 "):
+                # 开关方案
+                if raw_message.split(" ", 1)[0] == PROFILE_COMMAND:
+                    await SwitchCommandHandler.handle_private_profile_command(
+                        websocket, user_id, message_id, raw_message
+                    )
+
+                # 批量开启/关闭某模块
+                elif raw_message.startswith(
+                    (f"{BATCH_ENABLE_COMMAND} ", f"{BATCH_DISABLE_COMMAND} ")
+                ):
+                    await SwitchCommandHandler.handle_private_batch_switch_command(
+                        websocket, user_id, message_id, raw_message
+                    )
+
+                # 复制开关到多个群
+                elif (
+                    raw_message.startswith(f"{COPY_SWITCH_COMMAND} ")
+                    and len(raw_message.split()) > 3
+                ):
+                    parts = raw_message.split()
+                    await SwitchCommandHandler.handle_private_batch_copy_command(
+                        websocket, user_id, message_id, parts[1], parts[2:]
+                    )
+
+                elif raw_message.startswith(f"{COPY_SWITCH_COMMAND} "):
                     parts = raw_message.split(" ")
                     if len(parts) != 3:
                         reply_message = generate_reply_message(message_id)
@@ -7,6 +7,23 @@ import os
 # 开关命令
 SWITCH_COMMAND = "switch"
 
+# 复制开关命令
+COPY_SWITCH_COMMAND = "复制开关"
+
+# 批量开关命令，仅系统管理员私聊可用，格式：批量开启 模块名 群1 群2 ...
+BATCH_ENABLE_COMMAND = "批量开启"
+BATCH_DISABLE_COMMAND = "批量关闭"
+
+# 开关方案命令，仅系统管理员私聊可用，格式：开关方案 子命令 参数...
+PROFILE_COMMAND = "开关方案"
+PROFILE_CREATE = "创建"  # 开关方案 创建 方案名 [父方案名]
+PROFILE_DELETE = "删除"  # 开关方案 删除 方案名
+PROFILE_ENABLE = "开启"  # 开关方案 开启 方案名 模块名
+PROFILE_DISABLE = "关闭"  # 开关方案 关闭 方案名 模块名
+PROFILE_APPLY = "应用"  # 开关方案 应用 方案名 群1 群2 ...
+PROFILE_CANCEL = "取消"  # 开关方案 取消 群1 群2 ...
+PROFILE_RESET = "重置"  # 开关方案 重置 群1 群2 ...，清除群单独设置
+
 # 数据根目录
 DATA_ROOT_DIR = "data"
 
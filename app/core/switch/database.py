@@ -46,6 +46,42 @@ class SwitchDatabase:
                 """
                 )
 
+                # 创建开关方案表，parent_name 为继承的父方案
+                cursor.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS switch_profiles (
+                        profile_name TEXT PRIMARY KEY,
+                        parent_name TEXT,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                """
+                )
+
+                # 创建方案开关表
+                cursor.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS profile_switches (
+                        profile_name TEXT NOT NULL,
+                        module_name TEXT NOT NULL,
+                        status INTEGER NOT NULL CHECK (status IN (0, 1)),
+                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        PRIMARY KEY (profile_name, module_name)
+                    )
+                """
+                )
+
+                # 创建群方案关联表，每个群最多使用一个方案
+                cursor.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS group_profiles (
+                        group_id TEXT PRIMARY KEY,
+                        profile_name TEXT NOT NULL,
+                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                """
+                )
+
                 # 创建索引以优化查询性能
                 self._create_indexes(cursor)
 
@@ -61,6 +97,7 @@ class SwitchDatabase:
             ("idx_module_group", "module_switches", "module_name, group_id"),
             ("idx_module_type", "module_switches", "module_name, switch_type"),
             ("idx_group_id", "module_switches", "group_id"),
+            ("idx_group_profile_name", "group_profiles", "profile_name"),
         ]
 
         for index_name, table, columns in indexes:
@@ -145,6 +182,37 @@ class SwitchDatabase:
                 logger.error(f"批量数据库操作失败: {e}")
                 return False
 
+    def execute_many(self, operations):
+        """
+        在同一个事务中批量执行数据库操作，任一操作失败时整体回滚
+        operations: 操作列表，每个操作为 (query, params_list) 元组，
+                    同一条语句的多组参数通过 executemany 一次执行
+
+        Returns:
+            int: 受影响的总行数，失败时返回 -1
+        """
+        with self.db_lock:
+            conn = None
+            try:
+                conn = self.get_connection()
+                cursor = conn.cursor()
+                affected_rows = 0
+                for query, params_list in operations:
+                    if not params_list:
+                        continue
+                    cursor.executemany(query, params_list)
+                    affected_rows += cursor.rowcount
+                conn.commit()
+                return affected_rows
+            except Exception as e:
+                if conn is not None:
+                    conn.rollback()
+                logger.error(f"批量数据库操作失败，已回滚: {e}")
+                return -1
+            finally:
+                if conn is not None:
+                    conn.close()
+
 
 # 全局数据库实例
 db = SwitchDatabase()
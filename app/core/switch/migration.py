@@ -7,6 +7,7 @@ import os
 import json
 import logger
 from .database import db
+from .cache import switch_cache
 from .config import DATA_ROOT_DIR
 
 
@@ -79,6 +80,8 @@ class SwitchMigration:
             if operations:
                 success = db.execute_batch(operations)
                 if success:
+                    # 迁移直接写库，开关缓存需重新加载
+                    switch_cache.loaded = False
                     logger.info(
                         f"数据迁移完成：成功迁移 {migrated_count} 个模块，失败 {error_count} 个"
                     )
@@ -0,0 +1,216 @@
+"""
+开关方案管理模块
+负责开关方案的创建、继承、方案开关设置以及群与方案的关联
+"""
+
+import logger
+from .database import db
+from .switch_manager import get_switch_cache
+
+
+class SwitchProfileManager:
+    """开关方案管理器"""
+
+    @staticmethod
+    def create_profile(profile_name, parent_name=None):
+        """
+        创建开关方案，方案已存在时修改其父方案
+
+        Args:
+            profile_name: 方案名称
+            parent_name: 继承的父方案名称，None表示不继承
+
+        Returns:
+            tuple: (是否成功, 提示信息)
+        """
+        try:
+            cache = get_switch_cache()
+            if parent_name is not None:
+                if not cache.has_profile(parent_name):
+                    return False, f"父方案 {parent_name} 不存在"
+                if cache.creates_cycle(profile_name, parent_name):
+                    return False, f"方案 {parent_name} 已继承自 {profile_name}，不能循环继承"
+
+            if not db.execute_update(
+                "INSERT INTO switch_profiles (profile_name, parent_name) VALUES (?, ?) "
+                "ON CONFLICT (profile_name) DO UPDATE SET "
+                "parent_name = excluded.parent_name, updated_at = CURRENT_TIMESTAMP",
+                (profile_name, parent_name),
+            ):
+                return False, "写入数据库失败"
+
+            existed = cache.has_profile(profile_name)
+            cache.set_profile(profile_name, parent_name)
+            parent_text = f"，继承自 {parent_name}" if parent_name else ""
+            logger.info(f"[Switch]开关方案 {profile_name} 已保存{parent_text}")
+            return True, f"已{'更新' if existed else '创建'}方案 {profile_name}{parent_text}"
+        except Exception as e:
+            logger.error(f"[Switch]创建开关方案 {profile_name} 失败: {e}")
+            return False, str(e)
+
+    @staticmethod
+    def delete_profile(profile_name):
+        """
+        删除开关方案，继承它的方案不再继承，使用它的群解除关联
+
+        Args:
+            profile_name: 方案名称
+
+        Returns:
+            bool: 是否成功
+        """
+        cache = get_switch_cache()
+        if not cache.has_profile(profile_name):
+            return False
+        params = [(profile_name,)]
+        if (
+            db.execute_many(
+                [
+                    ("DELETE FROM switch_profiles WHERE profile_name = ?", params),
+                    ("DELETE FROM profile_switches WHERE profile_name = ?", params),
+                    ("DELETE FROM group_profiles WHERE profile_name = ?", params),
+                    (
+                        "UPDATE switch_profiles SET parent_name = NULL, updated_at = CURRENT_TIMESTAMP WHERE parent_name = ?",
+                        params,
+                    ),
+                ]
+            )
+            < 0
+        ):
+            return False
+        cache.remove_profile(profile_name)
+        logger.info(f"[Switch]开关方案 {profile_name} 已删除")
+        return True
+
+    @staticmethod
+    def set_profile_switch(profile_name, module_name, status):
+        """
+        设置方案中某模块的开关，一次写入即对所有使用该方案（及其子方案）的群生效
+
+        Args:
+            profile_name: 方案名称
+            module_name: 模块名称
+            status: True开启，False关闭
+
+        Returns:
+            bool: 是否成功
+        """
+        cache = get_switch_cache()
+        if not cache.has_profile(profile_name):
+            return False
+        if not db.execute_update(
+            "INSERT INTO profile_switches (profile_name, module_name, status) VALUES (?, ?, ?) "
+            "ON CONFLICT (profile_name, module_name) DO UPDATE SET "
+            "status = excluded.status, updated_at = CURRENT_TIMESTAMP",
+            (profile_name, module_name, int(bool(status))),
+        ):
+            return False
+        cache.set_profile_switches(profile_name, {module_name: status})
+        logger.info(
+            f"[Switch]开关方案 {profile_name} 已{'开启' if status else '关闭'}【{module_name}】"
+        )
+        return True
+
+    @staticmethod
+    def apply_profile(profile_name, group_ids):
+        """
+        让多个群使用某方案，群单独设置的开关仍然优先
+
+        Args:
+            profile_name: 方案名称
+            group_ids: 群号列表
+
+        Returns:
+            int: 关联的群数量，方案不存在或失败时返回 -1
+        """
+        group_ids = list(dict.fromkeys(str(group_id) for group_id in group_ids))
+        cache = get_switch_cache()
+        if not cache.has_profile(profile_name):
+            return -1
+        if (
+            db.execute_many(
+                [
+                    (
+                        "INSERT INTO group_profiles (group_id, profile_name) VALUES (?, ?) "
+                        "ON CONFLICT (group_id) DO UPDATE SET "
+                        "profile_name = excluded.profile_name, updated_at = CURRENT_TIMESTAMP",
+                        [(group_id, profile_name) for group_id in group_ids],
+                    )
+                ]
+            )
+            < 0
+        ):
+            return -1
+        cache.assign_profile(group_ids, profile_name)
+        logger.info(f"[Switch]{len(group_ids)} 个群已使用开关方案 {profile_name}")
+        return len(group_ids)
+
+    @staticmethod
+    def remove_group_profiles(group_ids):
+        """
+        解除多个群与方案的关联
+
+        Args:
+            group_ids: 群号列表
+
+        Returns:
+            int: 写入的群数量，失败时返回 -1
+        """
+        group_ids = list(dict.fromkeys(str(group_id) for group_id in group_ids))
+        if (
+            db.execute_many(
+                [
+                    (
+                        "DELETE FROM group_profiles WHERE group_id = ?",
+                        [(group_id,) for group_id in group_ids],
+                    )
+                ]
+            )
+            < 0
+        ):
+            return -1
+        get_switch_cache().assign_profile(group_ids, None)
+        return len(group_ids)
+
+    @staticmethod
+    def reset_group_overrides(group_ids):
+        """
+        清除多个群单独设置的开关，之后完全按所用方案生效
+
+        Args:
+            group_ids: 群号列表
+
+        Returns:
+            int: 删除的开关记录数，失败时返回 -1
+        """
+        group_ids = list(dict.fromkeys(str(group_id) for group_id in group_ids))
+        deleted = db.execute_many(
+            [
+                (
+                    "DELETE FROM module_switches WHERE switch_type = 'group' AND group_id = ?",
+                    [(group_id,) for group_id in group_ids],
+                )
+            ]
+        )
+        if deleted < 0:
+            return -1
+        get_switch_cache().clear_group_overrides(group_ids)
+        logger.info(
+            f"[Switch]已清除 {len(group_ids)} 个群的 {deleted} 条单独开关设置"
+        )
+        return deleted
+
+    @staticmethod
+    def get_profiles():
+        """
+        获取所有方案概况
+
+        Returns:
+            list: [(方案名, 父方案名, 方案自身开关, 使用该方案的群数量), ...]
+        """
+        return get_switch_cache().get_profiles()
+
+    @staticmethod
+    def get_group_profile(group_id):
+        """获取群所用的方案名称，未使用方案时返回None"""
+        return get_switch_cache().get_group_profile(group_id)
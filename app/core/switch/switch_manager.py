@@ -5,6 +5,35 @@
 
 import logger
 from .database import db
+from .cache import switch_cache
+
+# 群开关写入语句，已存在则更新状态
+UPSERT_GROUP_SWITCH_SQL = (
+    "INSERT INTO module_switches (module_name, switch_type, group_id, status) VALUES (?, 'group', ?, ?) "
+    "ON CONFLICT (module_name, switch_type, group_id) DO UPDATE SET "
+    "status = excluded.status, updated_at = CURRENT_TIMESTAMP"
+)
+
+
+def get_switch_cache():
+    """获取开关状态缓存，未加载时从数据库加载"""
+    if not switch_cache.loaded:
+        results = [
+            db.execute_query(query, fetch_all=True)
+            for query in (
+                "SELECT module_name, switch_type, group_id, status FROM module_switches",
+                "SELECT profile_name, parent_name FROM switch_profiles",
+                "SELECT profile_name, module_name, status FROM profile_switches",
+                "SELECT group_id, profile_name FROM group_profiles",
+            )
+        ]
+        # 任一查询失败时不标记为已加载，下次查询时重试
+        if all(result is not None for result in results):
+            switch_cache.load(*results)
+            logger.info(
+                f"[Switch]开关缓存已加载，共 {len(results[0])} 条开关、{len(results[1])} 个方案"
+            )
+    return switch_cache
 
 
 class SwitchManager:
@@ -13,7 +42,7 @@ class SwitchManager:
     @staticmethod
     def is_group_switch_on(group_id, module_name):
         """
-        判断群聊开关是否开启，默认关闭
+        判断群聊开关是否开启，群单独设置优先，其次是群所用的开关方案，默认关闭
 
         Args:
             group_id: 群号
@@ -23,12 +52,7 @@ class SwitchManager:
             bool: True表示开启，False表示关闭
         """
         try:
-            result = db.execute_query(
-                "SELECT status FROM module_switches WHERE module_name = ? AND switch_type = 'group' AND group_id = ?",
-                (module_name, str(group_id)),
-                fetch_one=True,
-            )
-            return bool(result[0]) if result else False
+            return get_switch_cache().is_group_on(group_id, module_name)
         except Exception as e:
             logger.error(f"[{module_name}]查询群聊开关状态失败: {e}")
             return False
@@ -45,12 +69,7 @@ class SwitchManager:
             bool: True表示开启，False表示关闭
         """
         try:
-            result = db.execute_query(
-                "SELECT status FROM module_switches WHERE module_name = ? AND switch_type = 'private'",
-                (module_name,),
-                fetch_one=True,
-            )
-            return bool(result[0]) if result else False
+            return get_switch_cache().is_private_on(module_name)
         except Exception as e:
             logger.error(f"[{module_name}]查询私聊开关状态失败: {e}")
             return False
@@ -126,30 +145,15 @@ class SwitchManager:
 
     @staticmethod
     def _toggle_group_switch_internal(module_name, group_id):
-        """群聊开关切换内部实现"""
-        # 查询当前状态
-        result = db.execute_query(
-            "SELECT status FROM module_switches WHERE module_name = ? AND switch_type = 'group' AND group_id = ?",
-            (module_name, str(group_id)),
-            fetch_one=True,
-        )
-
-        if result:
-            # 如果记录存在，切换状态
-            new_status = 0 if result[0] else 1
-            db.execute_update(
-                "UPDATE module_switches SET status = ?, updated_at = CURRENT_TIMESTAMP WHERE module_name = ? AND switch_type = 'group' AND group_id = ?",
-                (new_status, module_name, str(group_id)),
-            )
-        else:
-            # 如果记录不存在，创建新记录，默认开启
-            new_status = 1
-            db.execute_update(
-                "INSERT INTO module_switches (module_name, switch_type, group_id, status) VALUES (?, 'group', ?, ?)",
-                (module_name, str(group_id), new_status),
-            )
-
-        return bool(new_status)
+        """群聊开关切换内部实现，按有效状态取反后写入群单独设置"""
+        cache = get_switch_cache()
+        new_status = not cache.is_group_on(group_id, module_name)
+        if db.execute_update(
+            UPSERT_GROUP_SWITCH_SQL, (module_name, str(group_id), int(new_status))
+        ):
+            cache.set_group_switches([group_id], {module_name: new_status})
+            return new_status
+        return cache.is_group_on(group_id, module_name)
 
     @staticmethod
     def _toggle_private_switch_internal(module_name):
@@ -176,12 +180,13 @@ class SwitchManager:
                 (module_name, new_status),
             )
 
+        get_switch_cache().set_private_switch(module_name, new_status)
         return bool(new_status)
 
     @staticmethod
     def get_group_all_switches(group_id):
         """
-        获取某群组所有模块的开关
+        获取某群组所有模块的有效开关，包含开关方案中的设置
 
         Args:
             group_id: 群号
@@ -190,17 +195,7 @@ class SwitchManager:
             dict: 格式为 {group_id: {module_name1: True, module_name2: False}}
         """
         try:
-            results = db.execute_query(
-                "SELECT module_name, status FROM module_switches WHERE switch_type = 'group' AND group_id = ?",
-                (str(group_id),),
-                fetch_all=True,
-            )
-
-            switch = {group_id: {}}
-            for module_name, status in results or []:
-                switch[group_id][module_name] = bool(status)
-
-            return switch
+            return {group_id: dict(get_switch_cache().get_effective(group_id))}
         except Exception as e:
             logger.error(f"获取群组 {group_id} 所有模块开关失败: {e}")
             return {group_id: {}}
@@ -217,13 +212,7 @@ class SwitchManager:
             list: 开启的群号列表
         """
         try:
-            results = db.execute_query(
-                "SELECT group_id FROM module_switches WHERE module_name = ? AND switch_type = 'group' AND status = 1",
-                (module_name,),
-                fetch_all=True,
-            )
-
-            return [row[0] for row in results or []]
+            return get_switch_cache().get_enabled_groups(module_name)
         except Exception as e:
             logger.error(f"[{module_name}]获取已开启群聊列表失败: {e}")
             return []
@@ -240,17 +229,112 @@ class SwitchManager:
             list: 已开启的模块名称列表
         """
         try:
-            results = db.execute_query(
-                "SELECT module_name FROM module_switches WHERE switch_type = 'group' AND group_id = ? AND status = 1",
-                (str(group_id),),
-                fetch_all=True,
-            )
-
-            return [row[0] for row in results or []]
+            return [
+                module_name
+                for module_name, status in get_switch_cache()
+                .get_effective(group_id)
+                .items()
+                if status
+            ]
         except Exception as e:
             logger.error(f"查询群组 {group_id} 已开启模块失败: {e}")
             return []
 
+    @staticmethod
+    def get_group_switch_templates(group_ids):
+        """
+        获取多个群单独设置的开关，不包含开关方案中的设置
+
+        Args:
+            group_ids: 群号列表
+
+        Returns:
+            dict: 格式为 {group_id: {module_name: status}}，没有配置的群不出现在结果中
+        """
+        cache = get_switch_cache()
+        templates = {}
+        for group_id in group_ids:
+            overrides = cache.get_group_overrides(group_id)
+            if overrides:
+                templates[str(group_id)] = overrides
+        return templates
+
+    @staticmethod
+    def set_group_switches(group_ids, module_name, status):
+        """
+        批量设置某模块在多个群的开关，在一个事务中完成
+
+        Args:
+            group_ids: 群号列表
+            module_name: 模块名称
+            status: True开启，False关闭
+
+        Returns:
+            int: 写入的群数量，失败时返回 -1
+        """
+        return SwitchManager.apply_switch_template(
+            {module_name: status}, group_ids
+        )
+
+    @staticmethod
+    def apply_switch_template(template, group_ids):
+        """
+        把一组模块开关配置应用到多个群，在一个事务中完成
+        只覆盖模板中出现的模块，模板没有的模块目标群保持不变
+
+        Args:
+            template: 开关模板，格式为 {module_name: status}
+            group_ids: 目标群号列表
+
+        Returns:
+            int: 写入的群数量，失败时返回 -1
+        """
+        group_ids = list(dict.fromkeys(str(group_id) for group_id in group_ids))
+        if not template or not group_ids:
+            return 0
+        rows = [
+            (module_name, group_id, int(bool(status)))
+            for group_id in group_ids
+            for module_name, status in template.items()
+        ]
+        affected_rows = db.execute_many([(UPSERT_GROUP_SWITCH_SQL, rows)])
+        if affected_rows < 0:
+            return -1
+        get_switch_cache().set_group_switches(group_ids, template)
+        logger.info(
+            f"[Switch]已将 {len(template)} 个模块开关应用到 {len(group_ids)} 个群"
+        )
+        return len(group_ids)
+
+    @staticmethod
+    def copy_group_switches_to_groups(source_group_id, target_group_ids):
+        """
+        复制源群组的开关数据到多个目标群组，在一个事务中完成
+
+        Args:
+            source_group_id: 源群号
+            target_group_ids: 目标群号列表
+
+        Returns:
+            tuple: (是否成功, 源群开关模板, 写入的群数量)
+        """
+        try:
+            template = SwitchManager.get_group_switch_templates([source_group_id]).get(
+                str(source_group_id)
+            )
+            if not template:
+                return False, {}, 0
+            target_group_ids = [
+                group_id
+                for group_id in target_group_ids
+                if str(group_id) != str(source_group_id)
+            ]
+            count = SwitchManager.apply_switch_template(template, target_group_ids)
+            return count >= 0, template, max(count, 0)
+        except Exception as e:
+            logger.error(f"批量复制群开关数据失败: {e}")
+            return False, {}, 0
+
     @staticmethod
     def copy_group_switches(source_group_id, target_group_id):
         """
@@ -265,74 +349,28 @@ class SwitchManager:
             tuple: (是否成功, 复制的模块列表, 保持不变的模块列表)
         """
         try:
-            # 获取源群组的所有开关数据
-            source_switches = db.execute_query(
-                "SELECT module_name, status FROM module_switches WHERE switch_type = 'group' AND group_id = ?",
-                (str(source_group_id),),
-                fetch_all=True,
+            # 读取源群和目标群单独设置的开关
+            templates = SwitchManager.get_group_switch_templates(
+                [source_group_id, target_group_id]
             )
-
+            source_switches = templates.get(str(source_group_id))
             if not source_switches:
                 return False, [], []
+            target_switches = templates.get(str(target_group_id), {})
 
-            # 获取目标群组现有的模块列表和状态
-            target_existing_data = (
-                db.execute_query(
-                    "SELECT module_name, status FROM module_switches WHERE switch_type = 'group' AND group_id = ?",
-                    (str(target_group_id),),
-                    fetch_all=True,
-                )
-                or []
-            )
-
-            target_existing_modules = {row[0] for row in target_existing_data}
-            target_modules_status = {row[0]: row[1] for row in target_existing_data}
-
-            copied_modules = []
-            source_module_names = set()
-
-            # 准备批量操作
-            operations = []
-
-            # 复制每个模块的开关状态
-            for module_name, status in source_switches:
-                source_module_names.add(module_name)
-
-                # 检查目标群是否已有该模块配置
-                if module_name in target_existing_modules:
-                    # 更新现有记录
-                    operations.append(
-                        (
-                            "UPDATE module_switches SET status = ?, updated_at = CURRENT_TIMESTAMP WHERE module_name = ? AND switch_type = 'group' AND group_id = ?",
-                            (status, module_name, str(target_group_id)),
-                        )
-                    )
-                else:
-                    # 插入新记录
-                    operations.append(
-                        (
-                            "INSERT INTO module_switches (module_name, switch_type, group_id, status, created_at, updated_at) VALUES (?, 'group', ?, ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)",
-                            (module_name, str(target_group_id), status),
-                        )
-                    )
-
-                # 记录复制的模块信息
-                status_text = "开启" if status else "关闭"
-                copied_modules.append(f"【{module_name}】- {status_text}")
-
-            # 执行批量操作
-            success = db.execute_batch(operations)
-
-            if not success:
+            if SwitchManager.apply_switch_template(source_switches, [target_group_id]) < 0:
                 return False, [], []
 
+            copied_modules = [
+                f"【{module_name}】- {'开启' if status else '关闭'}"
+                for module_name, status in source_switches.items()
+            ]
             # 计算保持不变的模块
-            unchanged_module_names = target_existing_modules - source_module_names
-            unchanged_modules = []
-            for module_name in unchanged_module_names:
-                status = target_modules_status.get(module_name, 0)
-                status_text = "开启" if status else "关闭"
-                unchanged_modules.append(f"【{module_name}】- {status_text}")
+            unchanged_modules = [
+                f"【{module_name}】- {'开启' if status else '关闭'}"
+                for module_name, status in target_switches.items()
+                if module_name not in source_switches
+            ]
 
             logger.info(
                 f"成功从群 {source_group_id} 复制 {len(copied_modules)} 个模块开关到群 {target_group_id}，"
@@ -347,7 +385,7 @@ class SwitchManager:
     @staticmethod
     def clean_invalid_group_switches(valid_group_ids):
         """
-        清理不在有效群列表中的群开关数据
+        清理不在有效群列表中的群开关数据，所有无效群在一个事务中删除
 
         Args:
             valid_group_ids: 有效的群号列表（字符串格式）
@@ -361,9 +399,12 @@ class SwitchManager:
                 logger.warning("[Switch]有效群列表为空，跳过清理群开关数据")
                 return 0, 0, []
 
-            # 获取所有群开关数据中的群号
+            # 一次查询所有群号及其开关记录数（含方案关联）
             results = db.execute_query(
-                "SELECT DISTINCT group_id FROM module_switches WHERE switch_type = 'group' AND group_id IS NOT NULL",
+                "SELECT group_id, COUNT(*) FROM ("
+                "SELECT group_id FROM module_switches WHERE switch_type = 'group' AND group_id IS NOT NULL "
+                "UNION ALL SELECT group_id FROM group_profiles"
+                ") GROUP BY group_id",
                 fetch_all=True,
             )
 
@@ -371,64 +412,41 @@ class SwitchManager:
                 logger.info("[Switch]数据库中没有群开关数据，无需清理")
                 return 0, 0, []
 
-            stored_group_ids = [row[0] for row in results]
-
             # 找出不在有效群列表中的群号
-            groups_to_clean = []
-            for stored_group_id in stored_group_ids:
-                if stored_group_id not in valid_group_ids:
-                    groups_to_clean.append(stored_group_id)
+            valid_group_ids = {str(group_id) for group_id in valid_group_ids}
+            groups_to_clean = {
+                group_id: count
+                for group_id, count in results
+                if group_id not in valid_group_ids
+            }
 
             if not groups_to_clean:
                 logger.info("[Switch]所有群开关数据都对应有效群，无需清理")
                 return 0, 0, []
 
-            # 删除无效群的开关数据
-            cleaned_count = 0
-            error_count = 0
-            cleaned_groups = []
-
-            for group_id in groups_to_clean:
-                try:
-                    # 先查询该群有多少条开关记录
-                    count_result = db.execute_query(
-                        "SELECT COUNT(*) FROM module_switches WHERE switch_type = 'group' AND group_id = ?",
-                        (group_id,),
-                        fetch_one=True,
-                    )
-                    record_count = count_result[0] if count_result else 0
-
-                    if record_count > 0:
-                        # 删除该群的所有开关记录
-                        affected_rows = db.execute_update(
-                            "DELETE FROM module_switches WHERE switch_type = 'group' AND group_id = ?",
-                            (group_id,),
-                        )
-
-                        if affected_rows > 0:
-                            cleaned_count += affected_rows
-                            cleaned_groups.append(group_id)
-                            logger.info(
-                                f"[Switch]已清理群 {group_id} 的 {affected_rows} 条开关记录"
-                            )
-                        else:
-                            logger.warning(f"[Switch]群 {group_id} 的开关记录删除失败")
-                            error_count += 1
-                    else:
-                        logger.warning(f"[Switch]群 {group_id} 没有开关记录")
-
-                except Exception as e:
-                    error_count += 1
-                    logger.error(f"[Switch]清理群 {group_id} 的开关记录失败: {e}")
-
-            if cleaned_count > 0:
-                logger.success(
-                    f"[Switch]群开关数据清理完成，清理了 {len(cleaned_groups)} 个群的 {cleaned_count} 条记录"
+            # 删除无效群的开关数据和方案关联
+            params = [(group_id,) for group_id in groups_to_clean]
+            cleaned_count = db.execute_many(
+                [
+                    (
+                        "DELETE FROM module_switches WHERE switch_type = 'group' AND group_id = ?",
+                        params,
+                    ),
+                    ("DELETE FROM group_profiles WHERE group_id = ?", params),
+                ]
+            )
+            if cleaned_count < 0:
+                logger.error(
+                    f"[Switch]清理 {len(groups_to_clean)} 个群的开关记录失败，已回滚"
                 )
-            if error_count > 0:
-                logger.error(f"[Switch]群开关数据清理过程中出现 {error_count} 个错误")
+                return 0, len(groups_to_clean), []
 
-            return cleaned_count, error_count, cleaned_groups
+            cleaned_groups = list(groups_to_clean)
+            get_switch_cache().remove_groups(cleaned_groups)
+            logger.success(
+                f"[Switch]群开关数据清理完成，清理了 {len(cleaned_groups)} 个群的 {cleaned_count} 条记录"
+            )
+            return cleaned_count, 0, cleaned_groups
 
         except Exception as e:
             logger.error(f"[Switch]清理群开关数据失败: {e}")
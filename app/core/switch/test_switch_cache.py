@@ -0,0 +1,115 @@
+"""
+开关状态缓存测试程序
+在 app 目录下运行：python -m core.switch.test_switch_cache
+"""
+
+from core.switch.cache import SwitchCache
+
+
+def build_cache():
+    """base <- child <- grandchild 三级方案，群1001使用grandchild并单独关闭了B"""
+    cache = SwitchCache()
+    cache.load(
+        switch_rows=[
+            ("B", "group", "1001", 0),
+            ("P", "private", None, 1),
+        ],
+        profile_rows=[
+            ("base", None),
+            ("child", "base"),
+            ("grandchild", "child"),
+        ],
+        profile_switch_rows=[
+            ("base", "A", 1),
+            ("base", "B", 1),
+            ("base", "C", 1),
+            ("child", "C", 0),
+            ("grandchild", "D", 1),
+        ],
+        group_profile_rows=[("1001", "grandchild"), ("1002", "child")],
+    )
+    return cache
+
+
+def test_profile_inheritance():
+    """子方案继承父方案的开关，并覆盖父方案中的同名开关"""
+    cache = build_cache()
+    assert cache.get_effective("1002") == {"A": True, "B": True, "C": False}
+    assert cache.is_group_on("1002", "A")
+    assert not cache.is_group_on("1002", "C")
+    assert cache.get_profile_chain("grandchild") == ["grandchild", "child", "base"]
+    assert cache.is_private_on("P")
+    assert not cache.is_group_on("1003", "A")
+
+
+def test_override_precedence():
+    """群单独设置优先于方案，清除单独设置后恢复方案的开关"""
+    cache = build_cache()
+    assert cache.get_effective("1001") == {
+        "A": True,
+        "B": False,
+        "C": False,
+        "D": True,
+    }
+    cache.set_group_switches(["1001"], {"C": True})
+    assert cache.is_group_on("1001", "C")
+    cache.clear_group_overrides(["1001"])
+    assert cache.is_group_on("1001", "B")
+    assert not cache.is_group_on("1001", "C")
+
+
+def test_cycle_rejection():
+    """父方案的继承链中出现自身时判定为循环，已存在的循环不会导致死循环"""
+    cache = build_cache()
+    assert cache.creates_cycle("base", "grandchild")
+    assert cache.creates_cycle("child", "child")
+    assert not cache.creates_cycle("grandchild", "base")
+    assert not cache.creates_cycle("new", "grandchild")
+    assert not cache.creates_cycle("base", None)
+
+    # 数据库中已存在的循环继承：展开时每个方案只访问一次
+    cache.set_profile("base", "grandchild")
+    assert cache.get_profile_chain("base") == ["base", "grandchild", "child"]
+    assert cache.get_effective("1002") == {"A": True, "B": True, "C": False, "D": True}
+
+
+def test_cache_invalidation():
+    """方案变化时清空所有展开结果，群设置变化时只清除该群"""
+    cache = build_cache()
+    cache.get_effective("1001")
+    cache.get_effective("1002")
+
+    cache.set_group_switches(["1002"], {"E": True})
+    assert "1001" in cache._effective and "1002" not in cache._effective
+    assert cache.is_group_on("1002", "E")
+
+    cache.set_profile_switches("base", {"A": False})
+    assert not cache._effective and not cache._resolved
+    assert not cache.is_group_on("1001", "A")
+    assert not cache.is_group_on("1002", "A")
+
+    cache.assign_profile(["1002"], None)
+    assert cache.get_effective("1002") == {"E": True}
+
+    cache.remove_profile("child")
+    assert cache.get_profile_chain("grandchild") == ["grandchild"]
+    assert cache.get_effective("1001") == {"B": False, "D": True}
+    assert cache.get_enabled_groups("D") == ["1001"]
+
+
+def main():
+    """开关状态缓存测试程序"""
+    tests = [
+        test_profile_inheritance,
+        test_override_precedence,
+        test_cycle_rejection,
+        test_cache_invalidation,
+    ]
+    for test in tests:
+        test()
+        print(f"{test.__doc__} ✅")
+    print(f"全部 {len(tests)} 项测试通过 🎉")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,8 @@
 - config.py: 配置常量
 - database.py: 数据库操作
 - switch_manager.py: 开关管理核心逻辑
+- cache.py: 开关有效状态缓存
+- profile_manager.py: 开关方案管理
 - migration.py: 数据迁移
 - command_handler.py: 命令处理器
 
@@ -13,6 +15,7 @@
 # 导入新的模块化开关系统
 from .switch import (
     SwitchManager,
+    SwitchProfileManager,
     SwitchCommandHandler,
     SwitchMigration,
 )
@@ -59,6 +62,21 @@ def clean_invalid_group_switches(valid_group_ids):
     return SwitchManager.clean_invalid_group_switches(valid_group_ids)
 
 
+def set_group_switches(group_ids, MODULE_NAME, status):
+    """批量设置某模块在多个群的开关"""
+    return SwitchManager.set_group_switches(group_ids, MODULE_NAME, status)
+
+
+def apply_switch_template(template, group_ids):
+    """把一组模块开关配置应用到多个群"""
+    return SwitchManager.apply_switch_template(template, group_ids)
+
+
+def apply_switch_profile(profile_name, group_ids):
+    """让多个群使用某开关方案"""
+    return SwitchProfileManager.apply_profile(profile_name, group_ids)
+
+
 async def handle_module_private_switch(MODULE_NAME, websocket, user_id, message_id):
     """处理模块私聊开关命令"""
     return await SwitchCommandHandler.handle_module_private_switch(
@@ -88,10 +106,14 @@ __all__ = [
     "get_all_enabled_groups",
     "copy_group_switches",
     "clean_invalid_group_switches",
+    "set_group_switches",
+    "apply_switch_template",
+    "apply_switch_profile",
     "handle_module_private_switch",
     "handle_module_group_switch",
     "handle_events",
     "SwitchManager",
+    "SwitchProfileManager",
     "SwitchCommandHandler",
     "SwitchMigration",
 ]
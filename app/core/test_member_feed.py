@@ -0,0 +1,94 @@
+"""
+群成员列表变更通知测试程序
+在 app 目录下运行：python -m core.test_member_feed
+"""
+
+import asyncio
+import os
+import tempfile
+from core.member_feed import (
+    MemberListFeed,
+    CHANGE_REFRESH,
+    CHANGE_MEMBERS,
+    CHANGE_UPDATE,
+)
+
+
+def member(user_id, card=""):
+    return {"user_id": user_id, "card": card}
+
+
+def test_save_diff():
+    """首次保存为刷新，成员进退群时给出差异，只有资料变化时为更新，内容不变时不写文件"""
+    with tempfile.TemporaryDirectory() as data_dir:
+        feed = MemberListFeed(data_dir)
+
+        change = feed.save(1001, [member(1), member(2)])
+        assert change["type"] == CHANGE_REFRESH
+        assert change["joined"] == [] and change["left"] == []
+        assert feed.get_member_ids(1001) == {"1", "2"}
+
+        change = feed.save("1001", [member(2), member(3)])
+        assert change["type"] == CHANGE_MEMBERS
+        assert change["joined"] == ["3"] and change["left"] == ["1"]
+
+        change = feed.save(1001, [member(2, "新名片"), member(3)])
+        assert change["type"] == CHANGE_UPDATE
+        assert change["joined"] == [] and change["left"] == []
+
+        file_path = feed.get_path("1001")
+        modified_at = os.stat(file_path).st_mtime_ns
+        assert feed.save(1001, [member(2, "新名片"), member(3)]) is None
+        assert os.stat(file_path).st_mtime_ns == modified_at
+        assert feed.saved == 3 and feed.skipped == 1
+
+
+def test_load_from_file():
+    """新实例首次保存时与已有的成员列表文件比较，而不是当作首次保存"""
+    with tempfile.TemporaryDirectory() as data_dir:
+        MemberListFeed(data_dir).save(1001, [member(1), member(2)])
+        feed = MemberListFeed(data_dir)
+        assert feed.save(1001, [member(1), member(2)]) is None
+        change = feed.save(1001, [member(1)])
+        assert change["type"] == CHANGE_MEMBERS and change["left"] == ["2"]
+
+
+def test_refresh_waits_for_save():
+    """refresh 在成员列表保存或协议端返回空列表后返回，不必等到超时"""
+
+    async def run(data_dir):
+        feed = MemberListFeed(data_dir)
+
+        async def request(group_id):
+            loop = asyncio.get_running_loop()
+            if group_id == "1001":
+                loop.call_later(0.01, feed.save, group_id, [member(1)])
+            else:
+                loop.call_later(0.01, feed.report_empty, group_id)
+
+        loop = asyncio.get_running_loop()
+        started_at = loop.time()
+        result = await feed.refresh([1001, 1002], request, timeout=5)
+        return result, loop.time() - started_at, feed._waiters
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        result, elapsed, waiters = asyncio.run(run(data_dir))
+    assert result == {"1001": {"1"}, "1002": frozenset()}
+    assert elapsed < 1 and not waiters
+
+
+def main():
+    """群成员列表变更通知测试程序"""
+    tests = [
+        test_save_diff,
+        test_load_from_file,
+        test_refresh_waits_for_save,
+    ]
+    for test in tests:
+        test()
+        print(f"{test.__doc__} ✅")
+    print(f"全部 {len(tests)} 项测试通过 🎉")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+批量群管操作执行器测试程序
+在 app 目录下运行：python -m core.test_moderation
+"""
+
+from core.moderation import (
+    ModerationExecutor,
+    kick_action,
+    ban_action,
+    recall_action,
+    ACTION_KICK,
+    ACTION_BAN,
+    ACTION_RECALL,
+)
+
+
+def build_executor(kick_batch_size=3):
+    return ModerationExecutor(
+        rate=100, burst=100, kick_batch_size=kick_batch_size, response_timeout=1
+    )
+
+
+def test_plan_merges_kicks():
+    """同一群、相同拒绝加群设置的踢人合并为批量请求，超过批量上限时拆分"""
+    executor = build_executor(kick_batch_size=3)
+    actions = [kick_action(1001, user_id) for user_id in range(5)]
+    actions.append(kick_action(1001, 9, reject_add_request=True))
+    actions.append(kick_action(1002, 10))
+    requests = executor._plan(actions)
+
+    assert [action_type for action_type, _, _ in requests] == [ACTION_KICK] * 4
+    batches = [[target["user_id"] for target in targets] for _, _, targets in requests]
+    assert batches == [["0", "1", "2"], ["3", "4"], ["9"], ["10"]]
+    assert requests[2][1]["reject_add_request"] is True
+    assert requests[3][1]["group_id"] == "1002"
+
+
+def test_plan_keeps_other_actions():
+    """禁言、撤回每个操作单独成为一个请求，并保持原有顺序"""
+    executor = build_executor()
+    ban = ban_action(1001, 1, 60)
+    recall = recall_action(123)
+    requests = executor._plan([ban, kick_action(1001, 2), recall, kick_action(1001, 3)])
+
+    assert [action_type for action_type, _, _ in requests] == [
+        ACTION_BAN,
+        ACTION_KICK,
+        ACTION_RECALL,
+    ]
+    assert requests[0][2] == [ban] and requests[2][2] == [recall]
+    assert [target["user_id"] for target in requests[1][2]] == ["2", "3"]
+
+
+def test_summarize():
+    """按操作目标计数，批量请求中的每个人分别计入成功或失败"""
+    kicks = [kick_action(1001, user_id) for user_id in range(3)]
+    ban = ban_action(1001, 5, 60)
+    recall = recall_action(123)
+    results = [
+        (ACTION_KICK, kicks, "ok"),
+        (ACTION_BAN, [ban], "failed"),
+        (ACTION_RECALL, [recall], "timeout"),
+    ]
+    summary = ModerationExecutor._summarize(results, 1.5)
+
+    assert summary["total"] == 5 and summary["requests"] == 3
+    assert summary["ok"] == 3 and summary["failed"] == 1 and summary["timeout"] == 1
+    assert summary["by_type"][ACTION_KICK] == {"ok": 3, "failed": 0, "timeout": 0}
+    assert summary["by_type"][ACTION_RECALL]["timeout"] == 1
+    assert summary["succeeded_targets"] == kicks
+    assert summary["failed_targets"] == [ban, recall]
+    assert ModerationExecutor.format_summary(summary) == (
+        "踢出成功3；禁言成功0，失败1；撤回成功0，未响应1（3个请求，耗时1.5秒）"
+    )
+
+
+def main():
+    """批量群管操作执行器测试程序"""
+    tests = [
+        test_plan_merges_kicks,
+        test_plan_keeps_other_actions,
+        test_summarize,
+    ]
+    for test in tests:
+        test()
+        print(f"{test.__doc__} ✅")
+    print(f"全部 {len(tests)} 项测试通过 🎉")
+
+
+if __name__ == "__main__":
+    main()
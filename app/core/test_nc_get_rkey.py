@@ -0,0 +1,79 @@
+"""
+rkey自动刷新测试程序
+在 app 目录下运行：python -m core.test_nc_get_rkey
+"""
+
+import core.nc_get_rkey as nc_get_rkey
+from core.nc_get_rkey import (
+    _should_refresh,
+    _update_rkey_cache,
+    REFRESH_AHEAD,
+    REQUEST_INTERVAL,
+    MIN_REQUEST_INTERVAL,
+)
+
+
+def reset(rkey=None, expires_at=0, last_request_time=0):
+    """重置内存缓存，并标记为已加载，避免读取本地文件"""
+    nc_get_rkey._rkey_cache.update(
+        {"rkey": rkey, "expires_at": expires_at, "loaded": True}
+    )
+    nc_get_rkey.last_request_time = last_request_time
+
+
+def test_refresh_ahead_of_expiry():
+    """已知过期时间时，只在过期前REFRESH_AHEAD秒内刷新"""
+    now = 1_000_000
+    reset("key", expires_at=now + REFRESH_AHEAD + 1)
+    assert not _should_refresh(now)
+    assert _should_refresh(now + 1)
+    assert _should_refresh(now + REFRESH_AHEAD + 10)
+
+
+def test_min_request_interval():
+    """距上次请求不足MIN_REQUEST_INTERVAL秒时不重复请求，即使rkey已过期"""
+    now = 1_000_000
+    reset("key", expires_at=now - 10, last_request_time=now - MIN_REQUEST_INTERVAL + 1)
+    assert not _should_refresh(now)
+    assert _should_refresh(now + 1)
+
+
+def test_unknown_expiry_interval():
+    """没有rkey或过期时间未知时，按REQUEST_INTERVAL固定间隔刷新"""
+    now = 1_000_000
+    reset(None, last_request_time=now - REQUEST_INTERVAL + 1)
+    assert not _should_refresh(now)
+    assert _should_refresh(now + 1)
+    reset("key", expires_at=0, last_request_time=now - REQUEST_INTERVAL)
+    assert _should_refresh(now)
+
+
+def test_update_keeps_old_rkey():
+    """响应中没有type=20的rkey时保留原有缓存，有时更新rkey和过期时间"""
+    reset("old", expires_at=100)
+    assert not _update_rkey_cache([{"type": 10, "rkey": "&rkey=other"}])
+    assert nc_get_rkey._rkey_cache["rkey"] == "old"
+
+    assert _update_rkey_cache(
+        [{"type": 20, "rkey": "&rkey=new", "time": 1000, "ttl": "3600"}]
+    )
+    assert nc_get_rkey._rkey_cache["rkey"] == "new"
+    assert nc_get_rkey._rkey_cache["expires_at"] == 4600
+
+
+def main():
+    """rkey自动刷新测试程序"""
+    tests = [
+        test_refresh_ahead_of_expiry,
+        test_min_request_interval,
+        test_unknown_expiry_interval,
+        test_update_keeps_old_rkey,
+    ]
+    for test in tests:
+        test()
+        print(f"{test.__doc__} ✅")
+    print(f"全部 {len(tests)} 项测试通过 🎉")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+消息发送队列测试程序
+在 app 目录下运行：python -m core.test_send_queue
+"""
+
+import asyncio
+import copy
+import json
+from core.send_queue import SendQueue, PRIORITY_HIGH, PRIORITY_NORMAL
+
+
+class RecordingWebSocket:
+    """记录发送内容的连接，fail为True时发送抛出异常"""
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.sent = []
+
+    async def send(self, data):
+        if self.fail:
+            raise ConnectionError("连接已断开")
+        self.sent.append(json.loads(data))
+
+
+class BufferingConnection:
+    """模拟断线中的 BotConnection，消息进入断线缓存，send 返回 False"""
+
+    def __init__(self):
+        self.buffer = []
+
+    async def send(self, data):
+        self.buffer.append(json.loads(data))
+        return False
+
+
+def group_payload(group_id, message, note=""):
+    return {
+        "action": "send_group_msg",
+        "params": {"group_id": group_id, "message": message},
+        "echo": f"send_group_msg-{note}",
+    }
+
+
+def text(content):
+    return {"type": "text", "data": {"text": content}}
+
+
+def test_coalesce_text_messages():
+    """同一会话连续的纯文本消息合并为一条，不修改调用方的消息段，合并的消息共用发送结果"""
+
+    async def run():
+        queue = SendQueue()
+        websocket = RecordingWebSocket()
+        first, second = [text("第一条")], [text("第二条")]
+        first_copy, second_copy = copy.deepcopy(first), copy.deepcopy(second)
+        target = ("group", "1001")
+        delivery_1 = queue.enqueue(websocket, target, group_payload(1001, first))
+        delivery_2 = queue.enqueue(websocket, target, group_payload(1001, second))
+        assert delivery_1 is delivery_2
+        assert await asyncio.wait_for(delivery_1, 1) is True
+        assert first == first_copy and second == second_copy
+        return queue, websocket
+
+    queue, websocket = asyncio.run(run())
+    assert len(websocket.sent) == 1
+    assert websocket.sent[0]["params"]["message"] == [
+        text("第一条\n"),
+        text("第二条"),
+    ]
+    assert queue.coalesced == 1 and queue.sent == 1
+
+
+def test_no_coalesce():
+    """含非文本消息段、自动撤回设置不同或不同会话的消息不合并"""
+
+    async def run():
+        queue = SendQueue()
+        websocket = RecordingWebSocket()
+        image = {"type": "image", "data": {"file": "a.png"}}
+        deliveries = [
+            queue.enqueue(websocket, ("group", "1001"), group_payload(1001, [text("a")])),
+            queue.enqueue(websocket, ("group", "1001"), group_payload(1001, [image])),
+            queue.enqueue(
+                websocket,
+                ("group", "1001"),
+                group_payload(1001, [text("b")], "del_msg=10"),
+            ),
+            queue.enqueue(websocket, ("group", "1002"), group_payload(1002, [text("c")])),
+        ]
+        assert len(set(map(id, deliveries))) == 4
+        await asyncio.wait_for(asyncio.gather(*deliveries), 2)
+        return queue, websocket
+
+    queue, websocket = asyncio.run(run())
+    assert len(websocket.sent) == 4
+    assert queue.coalesced == 0
+
+
+def test_priority_and_failure():
+    """群管通知先于更早入队的普通消息发送，发送失败时结果为False"""
+
+    async def run():
+        queue = SendQueue()
+        websocket = RecordingWebSocket()
+        normal = queue.enqueue(
+            websocket, ("group", "1001"), group_payload(1001, [text("普通消息")])
+        )
+        high = queue.enqueue(
+            websocket,
+            ("group", "1002"),
+            group_payload(1002, [text("群管通知")]),
+            PRIORITY_HIGH,
+        )
+        await asyncio.wait_for(asyncio.gather(normal, high), 1)
+
+        broken = queue.enqueue(
+            RecordingWebSocket(fail=True),
+            ("group", "1003"),
+            group_payload(1003, [text("发送失败")]),
+        )
+        delivered = await asyncio.wait_for(broken, 1)
+        return queue, websocket, delivered
+
+    queue, websocket, delivered = asyncio.run(run())
+    assert [msg["params"]["group_id"] for msg in websocket.sent] == [1002, 1001]
+    assert queue.sent_by_priority[PRIORITY_HIGH] == 1
+    assert queue.sent_by_priority[PRIORITY_NORMAL] == 1
+    assert delivered is False and queue.failed == 1
+
+
+def test_buffered_not_counted_as_sent():
+    """断线缓存待补发的消息结果为False，计入断线缓存而不是已发送"""
+
+    async def run():
+        queue = SendQueue()
+        connection = BufferingConnection()
+        delivered = await asyncio.wait_for(
+            queue.enqueue(
+                connection, ("group", "1001"), group_payload(1001, [text("断线中")])
+            ),
+            1,
+        )
+        return queue, connection, delivered
+
+    queue, connection, delivered = asyncio.run(run())
+    assert delivered is False and len(connection.buffer) == 1
+    assert queue.buffered == 1 and queue.sent == 0 and queue.failed == 0
+    assert queue.sent_by_priority[PRIORITY_NORMAL] == 0
+
+
+def main():
+    """消息发送队列测试程序"""
+    tests = [
+        test_coalesce_text_messages,
+        test_no_coalesce,
+        test_priority_and_failure,
+        test_buffered_not_counted_as_sent,
+    ]
+    for test in tests:
+        test()
+        print(f"{test.__doc__} ✅")
+    print(f"全部 {len(tests)} 项测试通过 🎉")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+中文分词服务测试程序
+在 app 目录下运行：python -m core.test_tokenizer
+
+测试关注群自定义词典和分词缓存，用逐字切分代替 jieba，结果不依赖词典版本
+"""
+
+import os
+import tempfile
+from core.tokenizer import Tokenizer, MEMO_MAX_LENGTH
+
+
+class CharSegmenter:
+    """逐字切分，并记录每次被切分的文本"""
+
+    def __init__(self):
+        self.calls = []
+
+    def lcut(self, text):
+        self.calls.append(text)
+        return list(text)
+
+
+def build_tokenizer():
+    tokenizer = Tokenizer()
+    segmenter = CharSegmenter()
+    tokenizer._jieba = segmenter
+    return tokenizer, segmenter
+
+
+def in_temp_dir(test):
+    """在临时目录中运行，群词典文件不写入真实数据目录"""
+
+    def wrapper():
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as work_dir:
+            os.chdir(work_dir)
+            try:
+                test()
+            finally:
+                os.chdir(cwd)
+
+    wrapper.__doc__ = test.__doc__
+    return wrapper
+
+
+def test_cut_without_group():
+    """不传群号时整段交给分词器，空文本直接返回空列表"""
+    tokenizer, segmenter = build_tokenizer()
+    assert tokenizer.cut("你好") == ["你", "好"]
+    assert tokenizer.cut("") == []
+    assert segmenter.calls == ["你好"]
+
+
+@in_temp_dir
+def test_group_words_kept_whole():
+    """群自定义词不被切开，长词优先于其中包含的短词，其他群不受影响"""
+    tokenizer, segmenter = build_tokenizer()
+    assert tokenizer.add_group_words(1001, ["原神", "原神启动", "原神"]) == [
+        "原神",
+        "原神启动",
+    ]
+    assert tokenizer.cut("我原神启动了原神", 1001) == [
+        "我",
+        "原神启动",
+        "了",
+        "原神",
+    ]
+    assert tokenizer.cut("原神启动", "1002") == ["原", "神", "启", "动"]
+
+    # 新实例从文件加载群词典
+    reloaded, _ = build_tokenizer()
+    assert reloaded.get_group_words("1001") == {"原神", "原神启动"}
+
+
+@in_temp_dir
+def test_memo_cache():
+    """短文本按(群号, 文本)缓存，修改群词典后该群缓存失效，长文本不缓存"""
+    tokenizer, segmenter = build_tokenizer()
+    tokenizer.cut("原神", 1001)
+    tokenizer.cut("原神", "1001")
+    tokenizer.cut("原神")
+    assert tokenizer.memo_hits == 1 and tokenizer.memo_misses == 2
+
+    # 返回的列表是副本，修改后不影响缓存
+    tokenizer.cut("原神", 1001).append("脏数据")
+    assert tokenizer.cut("原神", 1001) == ["原", "神"]
+
+    tokenizer.add_group_words(1001, ["原神"])
+    assert ("1001", "原神") not in tokenizer._memo
+    assert (None, "原神") in tokenizer._memo
+    assert tokenizer.cut("原神", 1001) == ["原神"]
+
+    long_text = "长" * (MEMO_MAX_LENGTH + 1)
+    tokenizer.cut(long_text)
+    tokenizer.cut(long_text)
+    assert segmenter.calls.count(long_text) == 2
+    assert (None, long_text) not in tokenizer._memo
+
+
+@in_temp_dir
+def test_remove_group_words():
+    """删除群自定义词后按普通文本切分，只返回实际删除的词"""
+    tokenizer, _ = build_tokenizer()
+    tokenizer.add_group_words("1001", ["原神"])
+    assert tokenizer.remove_group_words("1001", ["原神", "不存在"]) == ["原神"]
+    assert tokenizer.cut("原神", "1001") == ["原", "神"]
+
+
+def main():
+    """中文分词服务测试程序"""
+    tests = [
+        test_cut_without_group,
+        test_group_words_kept_whole,
+        test_memo_cache,
+        test_remove_group_words,
+    ]
+    for test in tests:
+        test()
+        print(f"{test.__doc__} ✅")
+    print(f"全部 {len(tests)} 项测试通过 🎉")
+
+
+if __name__ == "__main__":
+    main()
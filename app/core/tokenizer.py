@@ -0,0 +1,271 @@
+"""
+中文分词服务
+
+FAQSystem、WordCloud 等模块共用的 jieba 分词：
+- 启动后在后台线程初始化一次词典，词典缓存保存在数据目录中，重启后直接加载
+- 支持全局自定义词典和按群的自定义词典，群词典中的词不会被切开
+- 短消息的分词结果保存在 LRU 缓存中，重复消息不再重新分词
+- 提供在独立分词线程中执行的异步接口，分词不阻塞事件循环
+"""
+
+import asyncio
+import os
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import logger
+from api.message import send_group_msg
+from utils.auth import is_group_admin, is_system_admin
+from utils.generate import generate_reply_message, generate_text_message
+
+# 分词数据目录，保存 jieba 词典缓存和自定义词典
+TOKENIZER_DIR = os.path.join("data", "Core", "tokenizer")
+# jieba 词典缓存文件名
+JIEBA_CACHE_FILE = "jieba.cache"
+# 全局自定义词典，一行一个词，格式同 jieba 用户词典
+USER_DICT_FILE = os.path.join(TOKENIZER_DIR, "user_dict.txt")
+# 群自定义词典目录，每个群一个文件，一行一个词
+GROUP_DICT_DIR = os.path.join(TOKENIZER_DIR, "groups")
+
+# 不超过该长度的文本才缓存分词结果
+MEMO_MAX_LENGTH = 64
+# 分词结果缓存条数
+MEMO_SIZE = 4096
+
+# 群自定义词典命令，仅群管理员可用
+ADD_GROUP_WORD = "添加分词"
+DELETE_GROUP_WORD = "删除分词"
+
+
+class Tokenizer:
+    """jieba 分词服务"""
+
+    def __init__(self):
+        self._jieba = None
+        self._init_lock = threading.Lock()
+        self._memo_lock = threading.Lock()
+        # (group_id, text) -> tuple(tokens)
+        self._memo = OrderedDict()
+        # group_id -> (词集合, 匹配这些词的正则)
+        self._group_words = {}
+        # 所有分词都在同一个线程中执行，不占用默认线程池
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="tokenizer"
+        )
+        self._warm_up_started = False
+        self.memo_hits = 0
+        self.memo_misses = 0
+
+    def initialize(self):
+        """导入 jieba 并加载词典，多次调用只初始化一次"""
+        if self._jieba is not None:
+            return self._jieba
+        with self._init_lock:
+            if self._jieba is None:
+                import jieba
+
+                os.makedirs(TOKENIZER_DIR, exist_ok=True)
+                # 词典缓存放在数据目录，避免系统临时目录被清理后重新构建
+                jieba.dt.tmp_dir = TOKENIZER_DIR
+                jieba.dt.cache_file = JIEBA_CACHE_FILE
+                jieba.initialize()
+                if os.path.exists(USER_DICT_FILE):
+                    jieba.load_userdict(USER_DICT_FILE)
+                self._jieba = jieba
+                logger.success("[Core]jieba分词词典已加载")
+        return self._jieba
+
+    def warm_up(self):
+        """在分词线程中后台初始化词典"""
+        if self._warm_up_started:
+            return
+        self._warm_up_started = True
+        self._executor.submit(self._safe_initialize)
+
+    def _safe_initialize(self):
+        try:
+            self.initialize()
+        except Exception as e:
+            logger.error(f"[Core]初始化jieba分词失败: {e}")
+
+    # ---------- 群自定义词典 ----------
+
+    @staticmethod
+    def _group_dict_path(group_id):
+        return os.path.join(GROUP_DICT_DIR, f"{group_id}.txt")
+
+    def get_group_words(self, group_id):
+        """获取群自定义词集合，首次使用时从文件加载"""
+        group_id = str(group_id)
+        entry = self._group_words.get(group_id)
+        if entry is None:
+            words = set()
+            path = self._group_dict_path(group_id)
+            if os.path.exists(path):
+                with open(path, "r", encoding="utf-8") as f:
+                    words = {line.strip() for line in f if line.strip()}
+            entry = self._set_group_words(group_id, words)
+        return entry[0]
+
+    def _set_group_words(self, group_id, words):
+        pattern = None
+        if words:
+            # 长词优先，避免被其中包含的短词截断
+            pattern = re.compile(
+                "("
+                + "|".join(
+                    re.escape(word) for word in sorted(words, key=len, reverse=True)
+                )
+                + ")"
+            )
+        entry = (frozenset(words), pattern)
+        self._group_words[group_id] = entry
+        # 词典变化后该群的缓存结果失效
+        with self._memo_lock:
+            for key in [key for key in self._memo if key[0] == group_id]:
+                del self._memo[key]
+        return entry
+
+    def _save_group_words(self, group_id, words):
+        os.makedirs(GROUP_DICT_DIR, exist_ok=True)
+        with open(self._group_dict_path(group_id), "w", encoding="utf-8") as f:
+            f.write("\n".join(sorted(words)))
+        self._set_group_words(group_id, words)
+
+    def add_group_words(self, group_id, words):
+        """添加群自定义词，返回新增的词列表"""
+        group_id = str(group_id)
+        current = self.get_group_words(group_id)
+        added = [word for word in dict.fromkeys(words) if word and word not in current]
+        if added:
+            self._save_group_words(group_id, set(current) | set(added))
+        return added
+
+    def remove_group_words(self, group_id, words):
+        """删除群自定义词，返回实际删除的词列表"""
+        group_id = str(group_id)
+        current = self.get_group_words(group_id)
+        removed = [word for word in dict.fromkeys(words) if word in current]
+        if removed:
+            self._save_group_words(group_id, set(current) - set(removed))
+        return removed
+
+    # ---------- 分词 ----------
+
+    def _segment(self, text, group_id):
+        jieba = self.initialize()
+        if group_id is None:
+            return tuple(jieba.lcut(text))
+        self.get_group_words(group_id)
+        words, pattern = self._group_words[str(group_id)]
+        if pattern is None:
+            return tuple(jieba.lcut(text))
+        tokens = []
+        # 以群自定义词为界切分文本，自定义词原样保留，其余部分交给 jieba
+        for part in pattern.split(text):
+            if not part:
+                continue
+            if part in words:
+                tokens.append(part)
+            else:
+                tokens.extend(jieba.lcut(part))
+        return tuple(tokens)
+
+    def cut(self, text, group_id=None):
+        """
+        同步分词，短文本命中缓存时直接返回
+
+        参数:
+            text: str 待分词文本
+            group_id: str 群号，传入时使用该群的自定义词典
+        返回:
+            list 分词结果
+        """
+        if not text:
+            return []
+        if group_id is not None:
+            group_id = str(group_id)
+        if len(text) > MEMO_MAX_LENGTH:
+            return list(self._segment(text, group_id))
+
+        key = (group_id, text)
+        with self._memo_lock:
+            tokens = self._memo.get(key)
+            if tokens is not None:
+                self._memo.move_to_end(key)
+                self.memo_hits += 1
+                return list(tokens)
+        tokens = self._segment(text, group_id)
+        with self._memo_lock:
+            self.memo_misses += 1
+            self._memo[key] = tokens
+            if len(self._memo) > MEMO_SIZE:
+                self._memo.popitem(last=False)
+        return list(tokens)
+
+    async def run(self, func, *args):
+        """在分词线程中执行包含大量分词的函数，如建立检索索引"""
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, func, *args
+        )
+
+    async def cut_async(self, text, group_id=None):
+        """在分词线程中分词"""
+        return await self.run(self.cut, text, group_id)
+
+    async def cut_batch(self, texts, group_id=None):
+        """在分词线程中批量分词，返回与texts一一对应的分词结果列表"""
+        return await self.run(
+            lambda: [self.cut(text, group_id) for text in texts]
+        )
+
+
+# 全局分词服务
+tokenizer = Tokenizer()
+
+
+async def _handle_group_word_command(websocket, msg):
+    """处理群自定义词典命令，格式：添加分词 词1 词2 / 删除分词 词1 词2"""
+    raw_message = msg.get("raw_message", "").strip()
+    if raw_message.startswith(ADD_GROUP_WORD):
+        command = ADD_GROUP_WORD
+    elif raw_message.startswith(DELETE_GROUP_WORD):
+        command = DELETE_GROUP_WORD
+    else:
+        return
+
+    user_id = str(msg.get("user_id", ""))
+    role = msg.get("sender", {}).get("role", "")
+    if not is_group_admin(role) and not is_system_admin(user_id):
+        return
+
+    group_id = str(msg.get("group_id", ""))
+    words = raw_message[len(command) :].split()
+    if not words:
+        reply = f"请提供词语，例如：{command} 词语1 词语2"
+    elif command == ADD_GROUP_WORD:
+        added = tokenizer.add_group_words(group_id, words)
+        reply = f"已添加分词：{'、'.join(added)}" if added else "这些词已在本群词典中"
+    else:
+        removed = tokenizer.remove_group_words(group_id, words)
+        reply = f"已删除分词：{'、'.join(removed)}" if removed else "本群词典中没有这些词"
+
+    await send_group_msg(
+        websocket,
+        group_id,
+        [
+            generate_reply_message(msg.get("message_id", "")),
+            generate_text_message(reply),
+        ],
+    )
+
+
+async def handle_events(websocket, msg):
+    """启动后预热分词词典，并处理群自定义词典命令"""
+    try:
+        tokenizer.warm_up()
+        if msg.get("post_type") == "message" and msg.get("message_type") == "group":
+            await _handle_group_word_command(websocket, msg)
+    except Exception as e:
+        logger.error(f"[Core]处理分词事件失败: {e}")
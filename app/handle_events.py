@@ -1,12 +1,15 @@
-import json
 import asyncio
 import logger
 import os
 import importlib
 import inspect
+import time
 from config import OWNER_ID
 from api.message import send_private_msg
 from utils.generate import generate_text_message
+from utils.codec import decode_frame
+from core.event import Event
+from core.metrics import event_metrics, handler_name
 
 
 # 核心模块列表 - 这些模块将始终被加载
@@ -23,10 +26,70 @@ CORE_MODULES = [
     ("core.switchs", "handle_events"),  # 全局开关命令
     ("core.get_group_list", "handle_events"),  # 获取群列表
     ("core.get_group_member_list", "handle_events"),  # 获取群成员列表
+    ("core.moderation", "handle_events"),  # 批量群管操作响应
+    ("core.metrics", "handle_events"),  # 运行状态命令
+    ("core.loop_watchdog", "handle_events"),  # 事件循环卡顿检测
+    ("core.tokenizer", "handle_events"),  # 分词词典预热与群自定义词典
     # 在这里添加其他必须加载的核心模块
 ]
 
 
+# 延迟加载模块：启动时只登记模块，模块代码在后台预热或首次收到事件时再导入
+LAZY_MODULE_LOADING = True
+
+# 加载耗时报告中展示的模块数量
+LOAD_TIMING_TOP_N = 10
+
+
+class LazyModuleHandler:
+    """
+    延迟加载的模块处理器
+
+    登记时只导入模块包（__init__.py，只有常量），读取可选的：
+        WARMUP_IMPORTS: 预热时额外在后台导入的重量级依赖，如 ["sklearn"]
+    启动后由后台预热任务依次在线程池中导入 main.py 及其依赖，不阻塞事件循环；
+    预热完成前收到的事件等待该模块导入完成后再处理，等待时间不计入模块处理耗时。
+    """
+
+    def __init__(self, module_name):
+        self.module_name = module_name
+        package = importlib.import_module(f"modules.{module_name}")
+        self.warmup_imports = list(getattr(package, "WARMUP_IMPORTS", []))
+        self.handler = None
+        self.error = None
+        self.load_time = 0.0
+        self._loading = None
+
+    async def load(self):
+        """导入模块，多次调用只导入一次；返回handle_events函数，失败时返回None"""
+        if self._loading is None:
+            self._loading = asyncio.ensure_future(self._import())
+        return await asyncio.shield(self._loading)
+
+    async def _import(self):
+        started_at = time.perf_counter()
+        try:
+            module = await asyncio.to_thread(
+                importlib.import_module, f"modules.{self.module_name}.main"
+            )
+            handler = getattr(module, "handle_events", None)
+            if not inspect.iscoroutinefunction(handler):
+                raise ImportError("缺少异步handle_events函数")
+            for import_path in self.warmup_imports:
+                await asyncio.to_thread(importlib.import_module, import_path)
+            self.handler = handler
+        except Exception as e:
+            self.error = str(e)
+            logger.error(f"加载模块失败: {self.module_name}, 错误: {e}")
+        self.load_time = time.perf_counter() - started_at
+        return self.handler
+
+    async def __call__(self, websocket, msg):
+        handler = self.handler or await self.load()
+        if handler is not None:
+            await handler(websocket, msg)
+
+
 class EventHandler:
     def __init__(self, websocket):
         self.websocket = websocket
@@ -35,6 +98,11 @@ class EventHandler:
         self.loaded_modules = []
         # 用于记录加载失败的模块及原因
         self.failed_modules = []
+        # 各模块的加载耗时，格式: [(模块名, 秒数), ...]
+        self.load_timings = []
+        self._lazy_handlers = []
+
+        started_at = time.perf_counter()
 
         # 加载核心模块（固定加载）
         self._load_core_modules()
@@ -42,11 +110,33 @@ class EventHandler:
         # 动态加载modules目录下的所有模块
         self._load_modules_dynamically()
 
+        self.startup_time = time.perf_counter() - started_at
+
         # 记录已加载的模块数量
-        logger.success(f"总共加载了 {len(self.handlers)} 个事件处理器")
+        logger.success(
+            f"总共登记了 {len(self.handlers)} 个事件处理器，耗时 {self.startup_time:.2f} 秒"
+        )
+
+        # 后台预热延迟加载的模块，完成后向管理员上报模块加载状况
+        asyncio.create_task(self._warm_up_and_report())
 
-        # 向管理员上报模块加载状况
-        asyncio.create_task(self._report_loading_status())
+    async def _warm_up_and_report(self):
+        """依次在后台导入延迟加载的模块，全部完成后上报"""
+        for lazy_handler in self._lazy_handlers:
+            await lazy_handler.load()
+            if lazy_handler.handler is not None:
+                self.loaded_modules.append(lazy_handler.module_name)
+                logger.success(
+                    f"已加载模块: {lazy_handler.module_name}，耗时 {lazy_handler.load_time:.2f} 秒"
+                )
+            else:
+                self.failed_modules.append(
+                    (lazy_handler.module_name, lazy_handler.error)
+                )
+            self.load_timings.append(
+                (lazy_handler.module_name, lazy_handler.load_time)
+            )
+        await self._report_loading_status()
 
     async def _report_loading_status(self):
         """向管理员上报模块加载状况"""
@@ -63,8 +153,15 @@ class EventHandler:
         else:
             failed_msg += "无"
 
+        # 生成加载耗时报告（按耗时从高到低排序）
+        timing_msg = f"启动耗时：{self.startup_time:.2f}秒\n加载耗时最长的模块："
+        for module_name, load_time in sorted(
+            self.load_timings, key=lambda x: x[1], reverse=True
+        )[:LOAD_TIMING_TOP_N]:
+            timing_msg += f"\n{module_name}：{load_time:.2f}秒"
+
         # 组合报告信息
-        report_msg = f"{success_msg}\n\n{failed_msg}"
+        report_msg = f"{success_msg}\n\n{failed_msg}\n\n{timing_msg}"
 
         # 发送给管理员
         try:
@@ -77,20 +174,22 @@ class EventHandler:
 
     def _load_core_modules(self):
         """加载核心模块"""
-        for module_path, handler_name in CORE_MODULES:
+        for module_path, func_name in CORE_MODULES:
+            started_at = time.perf_counter()
             try:
                 module = importlib.import_module(module_path)
-                handler = getattr(module, handler_name)
+                handler = getattr(module, func_name)
                 self.handlers.append(handler)
                 # 记录成功加载的模块
-                self.loaded_modules.append(f"{module_path}.{handler_name}")
-                logger.success(f"已加载核心模块: {module_path}.{handler_name}")
+                self.loaded_modules.append(f"{module_path}.{func_name}")
+                logger.success(f"已加载核心模块: {module_path}.{func_name}")
             except Exception as e:
                 # 记录加载失败的模块及原因
-                self.failed_modules.append((f"{module_path}.{handler_name}", str(e)))
+                self.failed_modules.append((f"{module_path}.{func_name}", str(e)))
                 logger.error(
-                    f"加载核心模块失败: {module_path}.{handler_name}, 错误: {e}"
+                    f"加载核心模块失败: {module_path}.{func_name}, 错误: {e}"
                 )
+            self.load_timings.append((module_path, time.perf_counter() - started_at))
 
     def _load_modules_dynamically(self):
         """动态加载modules目录下的所有模块"""
@@ -120,6 +219,18 @@ class EventHandler:
                 logger.warning(f"模块 {module_name} 缺少main.py文件，已跳过")
                 continue
 
+            if LAZY_MODULE_LOADING:
+                # 只登记模块，main.py 在后台预热或首次收到事件时导入
+                try:
+                    lazy_handler = LazyModuleHandler(module_name)
+                    self.handlers.append(lazy_handler)
+                    self._lazy_handlers.append(lazy_handler)
+                except Exception as e:
+                    self.failed_modules.append((module_name, str(e)))
+                    logger.error(f"登记模块失败: {module_name}, 错误: {e}")
+                continue
+
+            started_at = time.perf_counter()
             try:
                 # 动态导入模块
                 module_import_path = f"modules.{module_name}.main"
@@ -145,17 +256,31 @@ class EventHandler:
                 # 记录加载失败的模块及原因
                 self.failed_modules.append((module_name, str(e)))
                 logger.error(f"加载模块失败: {module_name}, 错误: {e}")
+            self.load_timings.append((module_name, time.perf_counter() - started_at))
 
     async def _safe_handle(self, handler, websocket, msg):
+        # 模块尚未预热完成时先等待导入，导入耗时不计入模块处理耗时
+        if isinstance(handler, LazyModuleHandler) and handler.handler is None:
+            if await handler.load() is None:
+                return
+        started_at = time.perf_counter()
+        error = False
         try:
             await handler(websocket, msg)
         except Exception as e:
+            error = True
             logger.error(f"模块 {handler} 处理消息时出错: {e}")
+        finally:
+            event_metrics.record(
+                handler_name(handler), time.perf_counter() - started_at, error
+            )
 
     async def handle_message(self, websocket, message):
         """处理websocket消息"""
         try:
-            msg = json.loads(message)
+            # 大体积响应帧在线程池中解码，不阻塞事件循环
+            # 只解析一次为 Event，所有模块共用同一个对象
+            msg = Event(await decode_frame(message))
 
             # 日志忽略列表，echo字段包含这些字符串时不记录日志
             LOG_IGNORE_ECHO_LIST = [
@@ -174,7 +299,9 @@ class EventHandler:
             ):
                 logger.info(f"接收到websocket消息: {msg}")
 
-            # 每个 handler 独立异步后台处理
+            # 每个 handler 独立异步后台处理，并记录各模块耗时
+            event_metrics.start()
+            event_metrics.events += 1
             for handler in self.handlers:
                 asyncio.create_task(self._safe_handle(handler, websocket, msg))
 
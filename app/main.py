@@ -6,6 +6,9 @@ from logger import logger
 from bot import connect_to_bot
 from config import OWNER_ID, WS_URL, TOKEN, FEISHU_BOT_URL, FEISHU_BOT_SECRET
 
+# 连接断开后的重连间隔，单位：秒
+RECONNECT_DELAY = 0.2
+
 
 def verify_config():
     # 如果.env文件不存在，则提示用户
@@ -50,6 +53,8 @@ class Application:
                 result = await connect_to_bot()
                 if result is None:
                     raise ValueError("连接返回None")
+                # 已建立的连接断开后立即重连，模块和待发送请求都会保留
+                await asyncio.sleep(RECONNECT_DELAY)
             except KeyboardInterrupt:
                 logger.error("检测到用户主动退出程序（Ctrl+C），程序已终止。")
                 break
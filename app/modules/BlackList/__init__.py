@@ -55,3 +55,6 @@ COMMANDS = {
     f"私聊-{PRIVATE_BLACKLIST_CLEAR_COMMAND}": f"私聊中的清黑（等同于全局清黑），命令：{PRIVATE_BLACKLIST_CLEAR_COMMAND}",
     f"私聊-{PRIVATE_BLACKLIST_SCAN_COMMAND}": f"私聊中的扫黑，命令：{PRIVATE_BLACKLIST_SCAN_COMMAND} 或 {PRIVATE_BLACKLIST_SCAN_COMMAND} 群号，扫描开启黑名单功能的群并踢出黑名单用户",
 }
+
+# 扫黑时请求刷新群成员列表后，等待核心成员列表保存的超时时间（秒）
+BLACKLIST_MEMBER_REFRESH_TIMEOUT = 10
@@ -0,0 +1,95 @@
+GLOBAL_GROUP_ID = "global"
+
+
+class BlacklistIndex:
+    """
+    黑名单内存索引
+
+    群黑名单和全局黑名单各保存为一个集合，首次使用时从数据库加载，
+    此后由 BlackListDataManager 在写库成功后同步更新（写穿），
+    每条消息的黑名单判断和扫黑时的成员比对都只做集合运算，不再查询数据库。
+    """
+
+    def __init__(self):
+        self.loaded = False
+        self._global = set()
+        # group_id -> set(user_id)
+        self._groups = {}
+
+    def load(self, rows):
+        """
+        从数据库行加载索引
+
+        Args:
+            rows: [(group_id, user_id), ...]，全局黑名单的 group_id 为 'global'
+        """
+        self._global = set()
+        self._groups = {}
+        for group_id, user_id in rows:
+            self.add(group_id, user_id)
+        self.loaded = True
+
+    def add(self, group_id, user_id):
+        group_id, user_id = str(group_id), str(user_id)
+        if group_id == GLOBAL_GROUP_ID:
+            self._global.add(user_id)
+        else:
+            self._groups.setdefault(group_id, set()).add(user_id)
+
+    def remove(self, group_id, user_id):
+        group_id, user_id = str(group_id), str(user_id)
+        if group_id == GLOBAL_GROUP_ID:
+            self._global.discard(user_id)
+            return
+        users = self._groups.get(group_id)
+        if users is not None:
+            users.discard(user_id)
+            if not users:
+                del self._groups[group_id]
+
+    def is_in_group(self, group_id, user_id):
+        users = self._groups.get(str(group_id))
+        return users is not None and str(user_id) in users
+
+    def is_global(self, user_id):
+        return str(user_id) in self._global
+
+    def is_blacklisted(self, group_id, user_id):
+        """检查用户是否在群黑名单或全局黑名单中"""
+        return self.is_global(user_id) or self.is_in_group(group_id, user_id)
+
+    def find_blacklisted(self, group_id, member_ids):
+        """
+        找出成员中的黑名单用户
+
+        Args:
+            group_id: 群号
+            member_ids: 群成员QQ号集合或列表
+
+        Returns:
+            set: 在群黑名单或全局黑名单中的成员QQ号
+        """
+        members = {str(member_id) for member_id in member_ids}
+        group_users = self._groups.get(str(group_id), set())
+        return (members & self._global) | (members & group_users)
+
+    def scan(self, group_members):
+        """
+        一次性扫描多个群
+
+        Args:
+            group_members (dict): {group_id: 成员QQ号集合}
+
+        Returns:
+            dict: {group_id: 排序后的黑名单成员QQ号列表}，只包含发现黑名单用户的群
+        """
+        results = {}
+        for group_id, member_ids in group_members.items():
+            found = self.find_blacklisted(group_id, member_ids)
+            if found:
+                results[str(group_id)] = sorted(found)
+        return results
+
+
+# 全局黑名单索引
+blacklist_index = BlacklistIndex()
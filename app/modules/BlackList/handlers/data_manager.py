@@ -2,6 +2,7 @@ import sqlite3
 import os
 from datetime import datetime
 from .. import DATA_DIR
+from .blacklist_index import blacklist_index, GLOBAL_GROUP_ID
 
 
 class BlackListDataManager:
@@ -10,6 +11,7 @@ class BlackListDataManager:
         self.conn = sqlite3.connect(self.db_path)
         self.cursor = self.conn.cursor()
         self._create_table()
+        self._ensure_index_loaded()
 
     def __enter__(self):
         return self
@@ -40,6 +42,19 @@ class BlackListDataManager:
         except sqlite3.Error as e:
             raise Exception(f"创建黑名单表失败: {str(e)}")
 
+    def _ensure_index_loaded(self):
+        """
+        进程内首次打开数据库时加载黑名单内存索引
+        :raises: Exception 加载失败时抛出异常
+        """
+        if blacklist_index.loaded:
+            return
+        try:
+            self.cursor.execute("SELECT group_id, user_id FROM blacklist")
+            blacklist_index.load(self.cursor.fetchall())
+        except sqlite3.Error as e:
+            raise Exception(f"加载黑名单索引失败: {str(e)}")
+
     def add_blacklist(self, group_id: str, user_id: str) -> bool:
         """
         添加黑名单
@@ -63,6 +78,7 @@ class BlackListDataManager:
                 (group_id, user_id, created_at),
             )
             self.conn.commit()
+            blacklist_index.add(group_id, user_id)
             return True
         except sqlite3.Error as e:
             raise Exception(f"添加黑名单失败: {str(e)}")
@@ -81,6 +97,7 @@ class BlackListDataManager:
                 (group_id, user_id),
             )
             self.conn.commit()
+            blacklist_index.remove(group_id, user_id)
             return True
         except sqlite3.Error as e:
             raise Exception(f"移除黑名单失败: {str(e)}")
@@ -91,17 +108,8 @@ class BlackListDataManager:
         :param group_id: 群组ID
         :param user_id: 用户ID
         :return: 是否在黑名单中
-        :raises: Exception 查询失败时抛出异常
         """
-        try:
-            self.cursor.execute(
-                "SELECT COUNT(*) FROM blacklist WHERE group_id = ? AND user_id = ?",
-                (group_id, user_id),
-            )
-            count = self.cursor.fetchone()[0]
-            return count > 0
-        except sqlite3.Error as e:
-            raise Exception(f"查询黑名单失败: {str(e)}")
+        return blacklist_index.is_in_group(group_id, user_id)
 
     def get_group_blacklist(self, group_id: str) -> list:
         """
@@ -138,9 +146,10 @@ class BlackListDataManager:
             self.cursor.execute(
                 """INSERT INTO blacklist (group_id, user_id, created_at) 
                 VALUES (?, ?, ?)""",
-                ("global", user_id, created_at),
+                (GLOBAL_GROUP_ID, user_id, created_at),
             )
             self.conn.commit()
+            blacklist_index.add(GLOBAL_GROUP_ID, user_id)
             return True
         except sqlite3.Error as e:
             raise Exception(f"添加全局黑名单失败: {str(e)}")
@@ -155,9 +164,10 @@ class BlackListDataManager:
         try:
             self.cursor.execute(
                 "DELETE FROM blacklist WHERE group_id = ? AND user_id = ?",
-                ("global", user_id),
+                (GLOBAL_GROUP_ID, user_id),
             )
             self.conn.commit()
+            blacklist_index.remove(GLOBAL_GROUP_ID, user_id)
             return True
         except sqlite3.Error as e:
             raise Exception(f"移除全局黑名单失败: {str(e)}")
@@ -167,17 +177,8 @@ class BlackListDataManager:
         检查用户是否在全局黑名单中
         :param user_id: 用户ID
         :return: 是否在全局黑名单中
-        :raises: Exception 查询失败时抛出异常
         """
-        try:
-            self.cursor.execute(
-                "SELECT COUNT(*) FROM blacklist WHERE group_id = ? AND user_id = ?",
-                ("global", user_id),
-            )
-            count = self.cursor.fetchone()[0]
-            return count > 0
-        except sqlite3.Error as e:
-            raise Exception(f"查询全局黑名单失败: {str(e)}")
+        return blacklist_index.is_global(user_id)
 
     def get_global_blacklist(self) -> list:
         """
@@ -188,7 +189,7 @@ class BlackListDataManager:
         try:
             self.cursor.execute(
                 "SELECT user_id, created_at FROM blacklist WHERE group_id = ?",
-                ("global",),
+                (GLOBAL_GROUP_ID,),
             )
             return self.cursor.fetchall()
         except sqlite3.Error as e:
@@ -200,12 +201,18 @@ class BlackListDataManager:
         :param group_id: 群组ID
         :param user_id: 用户ID
         :return: 是否在黑名单中
-        :raises: Exception 查询失败时抛出异常
         """
-        try:
-            # 检查是否在全局黑名单或群黑名单中
-            return self.is_in_global_blacklist(user_id) or self.is_in_blacklist(
-                group_id, user_id
-            )
-        except Exception as e:
-            raise Exception(f"查询用户黑名单状态失败: {str(e)}")
+        # 检查是否在全局黑名单或群黑名单中
+        return blacklist_index.is_blacklisted(group_id, user_id)
+
+
+def get_blacklist_index():
+    """
+    获取已加载的黑名单内存索引，未加载时先从数据库加载一次
+
+    每条消息的黑名单判断应使用此函数，避免为了一次查询打开数据库
+    """
+    if not blacklist_index.loaded:
+        with BlackListDataManager():
+            pass
+    return blacklist_index
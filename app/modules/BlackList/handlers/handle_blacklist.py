@@ -1,6 +1,8 @@
-from .data_manager import BlackListDataManager
+from .data_manager import BlackListDataManager, get_blacklist_index
 from api.message import send_group_msg
 from api.group import set_group_kick, get_group_member_list
+from core.moderation import moderation_executor, kick_action
+from core.member_feed import member_feed
 from utils.generate import generate_text_message, generate_reply_message
 import logger
 import re
@@ -11,9 +13,48 @@ from .. import (
     BLACKLIST_SCAN_COMMAND,
     GLOBAL_BLACKLIST_ADD_COMMAND,
     GLOBAL_BLACKLIST_REMOVE_COMMAND,
+    BLACKLIST_MEMBER_REFRESH_TIMEOUT,
 )
 
 
+async def kick_members_in_batches(websocket, group_id, user_ids):
+    """
+    交由批量群管执行器踢出成员，执行器会合并为 set_group_kick_members 请求并限流
+
+    Returns:
+        tuple: (协议端确认踢出成功的QQ号列表, 失败或超时未确认的QQ号列表)
+    """
+    summary = await moderation_executor.execute(
+        websocket, [kick_action(group_id, user_id) for user_id in user_ids]
+    )
+    return (
+        [action["user_id"] for action in summary["succeeded_targets"]],
+        [action["user_id"] for action in summary["failed_targets"]],
+    )
+
+
+async def load_group_members(websocket, group_ids):
+    """
+    请求刷新多个群的成员列表，等待核心成员列表保存完成后返回
+
+    Returns:
+        dict: {group_id: 成员QQ号集合}，获取失败的群为空集合
+    """
+
+    async def request(group_id):
+        await get_group_member_list(
+            websocket,
+            group_id,
+            True,  # 不使用缓存
+            note=f"{MODULE_NAME}-update-member-list-{group_id}",
+        )
+
+    group_members = await member_feed.refresh(
+        group_ids, request, BLACKLIST_MEMBER_REFRESH_TIMEOUT
+    )
+    return {group_id: set(member_ids) for group_id, member_ids in group_members.items()}
+
+
 class BlackListHandle:
     def __init__(self, websocket, msg):
         self.websocket = websocket
@@ -512,27 +553,11 @@ class BlackListHandle:
     async def scan_blacklist(self):
         """
         扫描群内黑名单用户并踢出
-        使用等待+读文件的方式，逻辑简单直观
+        成员列表与内存黑名单做集合求交，命中的用户分批踢出
         """
         try:
-            # 导入必要模块
-            from core.get_group_member_list import get_group_member_user_ids
-            from api.group import set_group_kick
-            import asyncio
-
-            # 先获取最新的群成员列表
-            await get_group_member_list(
-                self.websocket,
-                self.group_id,
-                True,  # 不使用缓存
-                note=f"{MODULE_NAME}-update-member-list-{self.group_id}",
-            )
-
-            # 等待一下让数据更新
-            await asyncio.sleep(1)
-
-            # 获取群成员QQ号列表
-            member_ids = get_group_member_user_ids(self.group_id)
+            group_members = await load_group_members(self.websocket, [self.group_id])
+            member_ids = group_members[str(self.group_id)]
 
             if not member_ids:
                 await send_group_msg(
@@ -547,12 +572,10 @@ class BlackListHandle:
                 f"[{MODULE_NAME}]开始扫描群 {self.group_id} 的 {len(member_ids)} 个成员"
             )
 
-            # 检查每个成员是否在黑名单中
-            blacklisted_members = []
-            with BlackListDataManager() as data_manager:
-                for member_id in member_ids:
-                    if data_manager.is_user_blacklisted(self.group_id, member_id):
-                        blacklisted_members.append(member_id)
+            # 与群黑名单和全局黑名单求交集
+            blacklisted_members = sorted(
+                get_blacklist_index().find_blacklisted(self.group_id, member_ids)
+            )
 
             if not blacklisted_members:
                 await send_group_msg(
@@ -574,23 +597,19 @@ class BlackListHandle:
                 note="del_msg=10",
             )
 
-            # 踢出黑名单用户
-            kicked_count = 0
-            kick_messages = []
-
-            for member_id in blacklisted_members:
-                try:
-                    # 踢出用户
-                    await set_group_kick(self.websocket, self.group_id, member_id)
-                    kicked_count += 1
-                    kick_messages.append(f"用户 {member_id}")
-                    await asyncio.sleep(0.5)  # 避免频繁操作
-                except Exception as e:
-                    logger.error(f"[{MODULE_NAME}]踢出用户 {member_id} 失败: {e}")
+            # 分批踢出黑名单用户
+            kicked_ids, failed_ids = await kick_members_in_batches(
+                self.websocket, self.group_id, blacklisted_members
+            )
+            kicked_count = len(kicked_ids)
 
             # 发送完成消息
-            if kicked_count > 0:
+            if kicked_count > 0 or failed_ids:
                 completion_message = f"扫黑完成！已踢出 {kicked_count} 个黑名单用户"
+                if failed_ids:
+                    completion_message += (
+                        f"\n{len(failed_ids)} 个用户踢出失败或未确认：{'、'.join(failed_ids)}"
+                    )
                 await send_group_msg(
                     self.websocket,
                     self.group_id,
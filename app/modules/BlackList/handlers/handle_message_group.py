@@ -12,19 +12,20 @@ from .. import (
     SWITCH_NAME,
 )
 import logger
+from core.event import as_event
 from core.menu_manager import MENU_COMMAND
 from utils.auth import is_group_admin, is_system_admin
 from core.switchs import is_group_switch_on, handle_module_group_switch
 from api.message import send_group_msg, delete_msg
+from core.send_queue import PRIORITY_HIGH
 from utils.generate import (
     generate_text_message,
     generate_reply_message,
     generate_at_message,
 )
 from api.group import set_group_kick
-from datetime import datetime
 from .handle_blacklist import BlackListHandle
-from .data_manager import BlackListDataManager
+from .data_manager import get_blacklist_index
 from core.menu_manager import MenuManager
 
 
@@ -34,20 +35,19 @@ class GroupMessageHandler:
     def __init__(self, websocket, msg):
         self.websocket = websocket
         self.msg = msg
-        self.time = msg.get("time", "")
-        self.formatted_time = datetime.fromtimestamp(self.time).strftime(
-            "%Y-%m-%d %H:%M:%S"
-        )  # 格式化时间
-        self.sub_type = msg.get("sub_type", "")  # 子类型，只有normal
-        self.group_id = str(msg.get("group_id", ""))  # 群号
-        self.message_id = str(msg.get("message_id", ""))  # 消息ID
-        self.user_id = str(msg.get("user_id", ""))  # 发送者QQ号
-        self.message = msg.get("message", {})  # 消息段数组
-        self.raw_message = msg.get("raw_message", "")  # 原始消息
-        self.sender = msg.get("sender", {})  # 发送者信息
-        self.nickname = self.sender.get("nickname", "")  # 昵称
-        self.card = self.sender.get("card", "")  # 群名片
-        self.role = self.sender.get("role", "")  # 群身份
+        event = as_event(msg)
+        self.time = event.time
+        self.formatted_time = event.formatted_time  # 格式化时间
+        self.sub_type = event.sub_type  # 子类型，只有normal
+        self.group_id = event.group_id  # 群号
+        self.message_id = event.message_id  # 消息ID
+        self.user_id = event.user_id  # 发送者QQ号
+        self.message = event.message  # 消息段数组
+        self.raw_message = event.raw_message  # 原始消息
+        self.sender = event.sender  # 发送者信息
+        self.nickname = event.nickname  # 昵称
+        self.card = event.card  # 群名片
+        self.role = event.role  # 群身份
 
     async def handle(self):
         """
@@ -132,35 +132,37 @@ class GroupMessageHandler:
         :return: 如果是黑名单用户则返回True，否则返回False
         """
         try:
-            with BlackListDataManager() as data_manager:
-                if data_manager.is_user_blacklisted(self.group_id, self.user_id):
-                    # 如果用户在黑名单中，先撤回消息
-                    await delete_msg(self.websocket, self.message_id)
-
-                    # 判断是全局黑名单还是群黑名单
-                    is_global = data_manager.is_in_global_blacklist(self.user_id)
-                    blacklist_type = "全局黑名单" if is_global else "群黑名单"
-
-                    # 发送警告消息
-                    warning_at = generate_at_message(self.user_id)
-                    warning_msg = generate_text_message(
-                        f"({self.user_id})检测到你是{blacklist_type}用户，将自动撤回消息并将其踢出"
-                    )
-                    await send_group_msg(
-                        self.websocket,
-                        self.group_id,
-                        [warning_at, warning_msg],
-                        note="del_msg=30",
-                    )
-
-                    # 踢出用户并拉黑，拒绝后续加群请求
-                    await set_group_kick(
-                        self.websocket, self.group_id, self.user_id, True
-                    )
-                    logger.info(
-                        f"[{MODULE_NAME}]已踢出{blacklist_type}用户 {self.user_id} 并拒绝后续加群请求"
-                    )
-                    return True
+            index = get_blacklist_index()
+            if index.is_blacklisted(self.group_id, self.user_id):
+                # 如果用户在黑名单中，先撤回消息
+                await delete_msg(self.websocket, self.message_id)
+
+                # 判断是全局黑名单还是群黑名单
+                is_global = index.is_global(self.user_id)
+                blacklist_type = "全局黑名单" if is_global else "群黑名单"
+
+                # 发送警告消息
+                warning_at = generate_at_message(self.user_id)
+                warning_msg = generate_text_message(
+                    f"({self.user_id})检测到你是{blacklist_type}用户，将自动撤回消息并将其踢出"
+                )
+                await send_group_msg(
+                    self.websocket,
+                    self.group_id,
+                    [warning_at, warning_msg],
+                    note="del_msg=30",
+                    priority=PRIORITY_HIGH,
+                    wait=True,
+                )
+
+                # 警告发出后再踢出用户并拉黑，拒绝后续加群请求
+                await set_group_kick(
+                    self.websocket, self.group_id, self.user_id, True
+                )
+                logger.info(
+                    f"[{MODULE_NAME}]已踢出{blacklist_type}用户 {self.user_id} 并拒绝后续加群请求"
+                )
+                return True
             return False
         except Exception as e:
             logger.error(f"[{MODULE_NAME}]检查黑名单用户失败: {e}")
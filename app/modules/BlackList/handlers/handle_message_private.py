@@ -1,6 +1,7 @@
 from .. import MODULE_NAME, SWITCH_NAME
 from core.menu_manager import MENU_COMMAND
 import logger
+from core.event import as_event
 from core.switchs import is_private_switch_on, handle_module_private_switch
 from api.message import send_private_msg, get_msg
 from utils.generate import (
@@ -8,7 +9,6 @@ from utils.generate import (
     generate_reply_message,
     generate_at_message,
 )
-from datetime import datetime
 from core.menu_manager import MenuManager
 from utils.auth import is_system_admin
 from .handle_blacklist import BlackListHandle
@@ -31,17 +31,16 @@ class PrivateMessageHandler:
     def __init__(self, websocket, msg):
         self.websocket = websocket
         self.msg = msg
-        self.time = msg.get("time", "")
-        self.formatted_time = datetime.fromtimestamp(self.time).strftime(
-            "%Y-%m-%d %H:%M:%S"
-        )  # 格式化时间
-        self.sub_type = msg.get("sub_type", "")  # 子类型,friend/group
-        self.user_id = str(msg.get("user_id", ""))  # 发送者QQ号
-        self.message_id = str(msg.get("message_id", ""))  # 消息ID
-        self.message = msg.get("message", {})  # 消息段数组
-        self.raw_message = msg.get("raw_message", "")  # 原始消息
-        self.sender = msg.get("sender", {})  # 发送者信息
-        self.nickname = self.sender.get("nickname", "")  # 昵称
+        event = as_event(msg)
+        self.time = event.time
+        self.formatted_time = event.formatted_time  # 格式化时间
+        self.sub_type = event.sub_type  # 子类型,friend/group
+        self.user_id = event.user_id  # 发送者QQ号
+        self.message_id = event.message_id  # 消息ID
+        self.message = event.message  # 消息段数组
+        self.raw_message = event.raw_message  # 原始消息
+        self.sender = event.sender  # 发送者信息
+        self.nickname = event.nickname  # 昵称
 
     async def handle(self):
         """
@@ -583,7 +582,7 @@ class BlackListHandlePrivate(BlackListHandle):
         支持两种格式：
         - 扫黑：扫描所有开启黑名单功能的群
         - 扫黑 群号：扫描指定群
-        使用等待+读文件的方式，逻辑简单直观
+        所有群的成员列表统一刷新后与内存黑名单求交集，命中的用户分批踢出
         """
         try:
             # 删除命令，获取参数
@@ -593,16 +592,11 @@ class BlackListHandlePrivate(BlackListHandle):
 
             # 导入必要的模块
             from core.switchs import get_all_enabled_groups
-            from api.group import get_group_member_list
-            from core.get_group_member_list import (
-                get_group_member_user_ids,
-                get_group_name_by_id,
-            )
-            from .data_manager import BlackListDataManager
-            from api.group import set_group_kick
+            from core.get_group_member_list import get_group_name_by_id
+            from .data_manager import get_blacklist_index
+            from .handle_blacklist import kick_members_in_batches, load_group_members
             from api.message import send_group_msg
             from utils.generate import generate_text_message
-            import asyncio
 
             if command_content:
                 # 扫描指定群
@@ -650,105 +644,74 @@ class BlackListHandlePrivate(BlackListHandle):
 
             # 扫描统计
             total_kicked = 0
+            total_failed = 0
             scan_results = []
             batch_results = []  # 用于存储批次处理结果
 
+            # 一次性刷新所有目标群的成员列表，再与内存黑名单求交集
+            group_members = await load_group_members(self.websocket, target_groups)
+            blacklisted_by_group = get_blacklist_index().scan(group_members)
+
             for index, group_id in enumerate(target_groups, 1):
                 try:
                     group_name = get_group_name_by_id(group_id) or f"群{group_id}"
+                    blacklisted_members = blacklisted_by_group.get(str(group_id), [])
 
-                    # 先获取最新的群成员列表
-                    await get_group_member_list(
-                        self.websocket,
-                        group_id,
-                        True,  # 不使用缓存
-                        note=f"{MODULE_NAME}-update-member-list-{group_id}",
-                    )
-
-                    # 等待一下让数据更新
-                    await asyncio.sleep(0.5)
-
-                    # 获取群成员QQ号列表
-                    member_ids = get_group_member_user_ids(group_id)
-
-                    if not member_ids:
+                    if not group_members.get(str(group_id)):
                         scan_results.append(
                             f"{group_name}({group_id})：无法获取群成员列表"
                         )
                         batch_results.append(
                             f"{group_name}({group_id})：无法获取群成员列表"
                         )
+                    elif not blacklisted_members:
+                        batch_results.append(
+                            f"{group_name}({group_id})：未发现黑名单用户"
+                        )
                     else:
-                        # 检查每个成员是否在黑名单中
-                        blacklisted_members = []
-                        with BlackListDataManager() as data_manager:
-                            for member_id in member_ids:
-                                if data_manager.is_user_blacklisted(
-                                    group_id, member_id
-                                ):
-                                    blacklisted_members.append(member_id)
-
-                        if not blacklisted_members:
-                            batch_results.append(
-                                f"{group_name}({group_id})：未发现黑名单用户"
-                            )
-                        else:
-                            # 踢出黑名单用户
-                            kicked_count = 0
-                            kick_user_ids = []
-
-                            for member_id in blacklisted_members:
-                                try:
-                                    # 踢出用户
-                                    await set_group_kick(
-                                        self.websocket, group_id, member_id
-                                    )
-                                    kicked_count += 1
-                                    kick_user_ids.append(f"{member_id}")
-                                except Exception as e:
-                                    logger.error(
-                                        f"[{MODULE_NAME}]踢出用户 {member_id} 失败: {e}"
-                                    )
-
-                            # 群内播报
-                            if kicked_count > 0:
-                                # 播报头消息
-                                broadcast_message = [
-                                    generate_text_message(
-                                        f"🚫 扫黑完成：发现并踢出 {kicked_count} 个黑名单用户\n"
-                                    )
-                                ]
-
-                                # 构建被踢成员汇总
-                                for kick_user_id in kick_user_ids:
-                                    broadcast_message += [
-                                        generate_at_message(kick_user_id),
-                                        (generate_text_message(f"({kick_user_id})\n")),
-                                    ]
-
-                                logger.debug(
-                                    f"[{MODULE_NAME}]广播消息: {broadcast_message}"
+                        # 分批踢出黑名单用户
+                        kicked_ids, failed_ids = await kick_members_in_batches(
+                            self.websocket, group_id, blacklisted_members
+                        )
+                        kicked_count = len(kicked_ids)
+
+                        # 群内播报，只列出协议端确认踢出的用户
+                        if kicked_count > 0:
+                            # 播报头消息
+                            broadcast_message = [
+                                generate_text_message(
+                                    f"🚫 扫黑完成：发现并踢出 {kicked_count} 个黑名单用户\n"
                                 )
+                            ]
 
-                                await send_group_msg(
-                                    self.websocket, group_id, broadcast_message
-                                )
+                            # 构建被踢成员汇总
+                            for kick_user_id in kicked_ids:
+                                broadcast_message += [
+                                    generate_at_message(kick_user_id),
+                                    (generate_text_message(f"({kick_user_id})\n")),
+                                ]
 
-                            total_kicked += kicked_count
-                            # 只有成功踢出黑名单用户的群才添加到扫描结果中
-                            if kicked_count > 0:
-                                scan_results.append(
-                                    f"{group_name}({group_id})：踢出 {kicked_count} 个黑名单用户"
-                                )
-                                batch_results.append(
-                                    f"{group_name}({group_id})：踢出 {kicked_count} 个黑名单用户"
-                                )
-                            else:
-                                batch_results.append(
-                                    f"{group_name}({group_id})：未发现黑名单用户"
-                                )
+                            logger.debug(
+                                f"[{MODULE_NAME}]广播消息: {broadcast_message}"
+                            )
+
+                            await send_group_msg(
+                                self.websocket, group_id, broadcast_message
+                            )
 
-                    # await asyncio.sleep(1)  # 群间间隔
+                        total_kicked += kicked_count
+                        total_failed += len(failed_ids)
+                        # 只有发现黑名单用户的群才添加到扫描结果中，踢出失败的单独列出
+                        if kicked_count > 0 or failed_ids:
+                            result_text = f"{group_name}({group_id})：踢出 {kicked_count} 个黑名单用户"
+                            if failed_ids:
+                                result_text += f"，{len(failed_ids)} 个踢出失败或未确认（{'、'.join(failed_ids)}）"
+                            scan_results.append(result_text)
+                            batch_results.append(result_text)
+                        else:
+                            batch_results.append(
+                                f"{group_name}({group_id})：未发现黑名单用户"
+                            )
 
                 except Exception as e:
                     logger.error(f"[{MODULE_NAME}]扫描群 {group_id} 失败: {e}")
@@ -774,7 +737,10 @@ class BlackListHandlePrivate(BlackListHandle):
             result_message = f"🔍 扫黑任务完成！\n\n"
             result_message += f"扫描群数：{len(target_groups)}\n"
             result_message += f"发现黑名单群数：{len(scan_results)}\n"
-            result_message += f"总计踢出：{total_kicked} 人\n\n"
+            result_message += f"总计踢出：{total_kicked} 人\n"
+            if total_failed:
+                result_message += f"踢出失败或未确认：{total_failed} 人\n"
+            result_message += "\n"
 
             if scan_results:
                 result_message += "详细结果：\n" + "\n".join(scan_results)
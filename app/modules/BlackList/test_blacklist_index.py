@@ -0,0 +1,96 @@
+"""
+黑名单内存索引测试程序
+在 app 目录下运行：python -m modules.BlackList.test_blacklist_index
+"""
+
+import os
+import tempfile
+from modules.BlackList import DATA_DIR
+from modules.BlackList.handlers.blacklist_index import (
+    BlacklistIndex,
+    blacklist_index,
+    GLOBAL_GROUP_ID,
+)
+from modules.BlackList.handlers.data_manager import BlackListDataManager
+
+
+def test_load_and_lookup():
+    """加载后区分群黑名单和全局黑名单，群号和QQ号统一按字符串比较"""
+    index = BlacklistIndex()
+    index.load([("1001", "1"), (1001, 2), (GLOBAL_GROUP_ID, "9")])
+    assert index.loaded
+    assert index.is_in_group(1001, "2") and index.is_in_group("1001", 1)
+    assert not index.is_in_group("1002", "1")
+    assert index.is_global(9) and not index.is_global("1")
+    assert index.is_blacklisted("1002", "9")
+    assert not index.is_blacklisted("1002", "1")
+
+
+def test_remove():
+    """移除后不再命中，群黑名单清空时删除该群的集合"""
+    index = BlacklistIndex()
+    index.load([("1001", "1"), (GLOBAL_GROUP_ID, "9")])
+    index.remove("1001", "1")
+    index.remove(GLOBAL_GROUP_ID, "9")
+    index.remove("1003", "1")
+    assert not index.is_blacklisted("1001", "1")
+    assert not index.is_global("9")
+    assert "1001" not in index._groups
+
+
+def test_scan():
+    """扫描多个群时返回每个群命中的成员，未命中的群不出现在结果中"""
+    index = BlacklistIndex()
+    index.load([("1001", "1"), ("1002", "3"), (GLOBAL_GROUP_ID, "9")])
+    results = index.scan(
+        {
+            1001: {1, 2, 9},
+            "1002": ["2", "4"],
+            "1003": {"9", "3"},
+        }
+    )
+    assert results == {"1001": ["1", "9"], "1003": ["9"]}
+
+
+def test_data_manager_write_through():
+    """数据库首次打开时加载索引，写库成功后同步更新索引"""
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as work_dir:
+        os.chdir(work_dir)
+        try:
+            os.makedirs(DATA_DIR, exist_ok=True)
+            blacklist_index.loaded = False
+            with BlackListDataManager() as dm:
+                dm.add_blacklist("1001", "1")
+                dm.add_global_blacklist("9")
+            assert blacklist_index.is_in_group("1001", "1")
+
+            # 重新从数据库加载，索引与数据库一致
+            blacklist_index.loaded = False
+            with BlackListDataManager() as dm:
+                assert blacklist_index.is_blacklisted("1002", "9")
+                assert dm.is_in_blacklist("1001", "1")
+                assert not dm.add_blacklist("1001", "1")
+                dm.remove_global_blacklist("9")
+            assert not blacklist_index.is_global("9")
+        finally:
+            blacklist_index.loaded = False
+            os.chdir(cwd)
+
+
+def main():
+    """黑名单内存索引测试程序"""
+    tests = [
+        test_load_and_lookup,
+        test_remove,
+        test_scan,
+        test_data_manager_write_through,
+    ]
+    for test in tests:
+        test()
+        print(f"{test.__doc__} ✅")
+    print(f"全部 {len(tests)} 项测试通过 🎉")
+
+
+if __name__ == "__main__":
+    main()
@@ -15,6 +15,9 @@ DATA_DIR = os.path.join("data", MODULE_NAME)
 os.makedirs(DATA_DIR, exist_ok=True)
 
 
+# 后台预热时额外导入的重量级依赖，避免首次使用时才开始导入
+WARMUP_IMPORTS = ["modules.FAQSystem.handlers.handle_match_qa"]
+
 # 模块的一些命令可以在这里定义，方便在其他地方调用，提高代码的复用率
 # ------------------------------------------------------------
 ADD_FAQ = "添加问答"
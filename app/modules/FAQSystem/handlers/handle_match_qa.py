@@ -3,10 +3,10 @@ from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 import difflib
 from collections import defaultdict
-import jieba
 from .db_manager import FAQDatabaseManager
 import scipy.sparse
 from typing import Optional
+from core.tokenizer import tokenizer
 
 
 class AdvancedFAQMatcher:
@@ -40,7 +40,7 @@ class AdvancedFAQMatcher:
             list 分词结果
         """
         text = text.lower()
-        tokens = list(jieba.cut(text))
+        tokens = tokenizer.cut(text, self.group_id)
         return [t for t in tokens if t.strip()]
 
     def add_FAQ_pair(self, question, answer):
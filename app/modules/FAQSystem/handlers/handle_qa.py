@@ -12,11 +12,18 @@ from .. import (
 )
 from utils.auth import is_group_admin, is_system_admin
 from .db_manager import FAQDatabaseManager
-from .handle_match_qa import AdvancedFAQMatcher
 from api.message import send_group_msg, send_group_msg_with_cq, get_msg
 from utils.generate import generate_reply_message, generate_text_message
 import re
 from core.nc_get_rkey import replace_rkey
+from core.tokenizer import tokenizer
+
+
+def _create_matcher(group_id):
+    """创建匹配器，numpy/sklearn/jieba 导入较慢，首次匹配时才导入"""
+    from .handle_match_qa import AdvancedFAQMatcher
+
+    return AdvancedFAQMatcher(group_id)
 
 
 class QaHandler:
@@ -147,7 +154,7 @@ class QaHandler:
 
             # 判断是否为批量添加（多行）
             lines = self.raw_message.strip().splitlines()
-            matcher = AdvancedFAQMatcher(self.group_id)
+            matcher = _create_matcher(self.group_id)
             success_list = []
             fail_list = []
 
@@ -347,7 +354,7 @@ class QaHandler:
                 )
                 return
 
-            matcher = AdvancedFAQMatcher(self.group_id)
+            matcher = _create_matcher(self.group_id)
             success_results = []
             fail_results = []
 
@@ -525,12 +532,13 @@ class QaHandler:
             if not self.raw_message or len(self.raw_message.strip()) == 0:
                 return
 
-            matcher = AdvancedFAQMatcher(self.group_id)
-            matcher.build_index()
+            matcher = _create_matcher(self.group_id)
+            # 建立索引和匹配都要大量分词，在分词线程中执行，不阻塞事件循环
+            await tokenizer.run(matcher.build_index)
 
             try:
-                orig_question, answer, score, qa_id = matcher.find_best_match(
-                    self.raw_message
+                orig_question, answer, score, qa_id = await tokenizer.run(
+                    matcher.find_best_match, self.raw_message
                 )
             except ValueError as ve:
                 logger.warning(f"[{MODULE_NAME}]文本分析失败: {ve}")
@@ -579,8 +587,11 @@ class QaHandler:
         """发送相关问题引导"""
         try:
             # 获取所有高于低阈值的相关问题
-            suggestions = matcher.find_multiple_matches(
-                self.raw_message, min_score=LOW_THRESHOLD, max_results=MAX_SUGGESTIONS
+            suggestions = await tokenizer.run(
+                matcher.find_multiple_matches,
+                self.raw_message,
+                LOW_THRESHOLD,
+                MAX_SUGGESTIONS,
             )
 
             if not suggestions:
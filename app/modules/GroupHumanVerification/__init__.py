@@ -26,6 +26,9 @@ WARNING_COUNT = 3
 BAN_TIME = 30 * 24 * 60 * 60
 """禁言时间"""
 
+WARNING_INTERVAL = 4 * 60 * 60
+"""定时提醒间隔，单位：秒"""
+
 # 各种验证状态
 
 STATUS_VERIFIED = "已验证"
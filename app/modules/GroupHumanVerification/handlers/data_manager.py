@@ -1,7 +1,10 @@
 import sqlite3
 import os
-from .. import MODULE_NAME, STATUS_UNVERIFIED, WARNING_COUNT
+import time
+from datetime import datetime
+from .. import MODULE_NAME, STATUS_UNVERIFIED, WARNING_COUNT, WARNING_INTERVAL
 import logger
+from .pending_index import pending_index
 
 
 class DataManager:
@@ -12,6 +15,7 @@ class DataManager:
         self.conn = sqlite3.connect(db_path)
         self.cursor = self.conn.cursor()
         self._create_table()
+        self._ensure_index_loaded()
 
     def _create_table(self):
         """
@@ -21,9 +25,12 @@ class DataManager:
         user_id: 用户ID 字符串
         code: 验证码 字符串
         status: 验证状态 字符串
-        created_at: 创建时间（字符串格式，建议为'YYYY-MM-DD HH:MM:SS'）
+        created_at: 创建时间（旧版字符串格式，仅保留用于老库升级）
         warning_count: 剩余警告次数 整数
         message_id: 入群验证提示消息的消息id
+        joined_at: 入群时间戳 整数
+        last_warning_at: 上次定时提醒的时间戳 整数
+        next_warning_at: 下次定时提醒的时间戳 整数，与status联合索引，定时提醒只需一次范围查询
         要求：群号和QQ号两者无重复（即二者联合唯一）
         """
         self.cursor.execute(
@@ -32,10 +39,13 @@ class DataManager:
             user_id TEXT,
             code TEXT,
             status TEXT,
-            created_at TEXT,  -- 存储为字符串格式的时间，如'2024-06-01 12:00:00'
+            created_at TEXT,  -- 旧版字符串格式的入群时间，已由joined_at取代
             warning_count INTEGER,  -- 剩余警告次数
             message_id TEXT,  -- 入群验证提示消息的消息id
-            last_warning_time TEXT,  -- 上次警告时间，存储为字符串格式
+            last_warning_time TEXT,  -- 旧版字符串格式的上次警告时间，已由last_warning_at取代
+            joined_at INTEGER,  -- 入群时间戳
+            last_warning_at INTEGER,  -- 上次定时提醒的时间戳
+            next_warning_at INTEGER,  -- 下次定时提醒的时间戳
             UNIQUE(group_id, user_id)
             )"""
         )
@@ -56,6 +66,62 @@ class DataManager:
                 "ALTER TABLE data_table ADD COLUMN last_warning_time TEXT"
             )
             self.conn.commit()
+        if "next_warning_at" not in columns:
+            self.cursor.execute("ALTER TABLE data_table ADD COLUMN joined_at INTEGER")
+            self.cursor.execute(
+                "ALTER TABLE data_table ADD COLUMN last_warning_at INTEGER"
+            )
+            self.cursor.execute(
+                "ALTER TABLE data_table ADD COLUMN next_warning_at INTEGER"
+            )
+            self._migrate_timestamps()
+            self.conn.commit()
+        self.cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_status_next_warning ON data_table (status, next_warning_at)"
+        )
+        self.conn.commit()
+
+    @staticmethod
+    def _parse_time(value):
+        """将旧版 'YYYY-MM-DD HH:MM:SS' 字符串时间转换为时间戳，无法解析时返回None"""
+        if not value:
+            return None
+        try:
+            return int(datetime.strptime(value, "%Y-%m-%d %H:%M:%S").timestamp())
+        except ValueError:
+            logger.error(f"[{MODULE_NAME}]解析时间格式失败: {value}")
+            return None
+
+    def _migrate_timestamps(self):
+        """老库升级：把字符串时间转换为整数时间戳，并计算下次提醒时间"""
+        self.cursor.execute(
+            "SELECT group_id, user_id, created_at, last_warning_time FROM data_table"
+        )
+        now = int(time.time())
+        rows = []
+        for group_id, user_id, created_at, last_warning_time in self.cursor.fetchall():
+            joined_at = self._parse_time(created_at) or now
+            last_warning_at = self._parse_time(last_warning_time)
+            next_warning_at = (last_warning_at or joined_at) + WARNING_INTERVAL
+            rows.append(
+                (joined_at, last_warning_at, next_warning_at, group_id, user_id)
+            )
+        self.cursor.executemany(
+            "UPDATE data_table SET joined_at=?, last_warning_at=?, next_warning_at=? WHERE group_id=? AND user_id=?",
+            rows,
+        )
+        logger.info(f"[{MODULE_NAME}]已将{len(rows)}条验证记录的时间转换为时间戳")
+
+    def _ensure_index_loaded(self):
+        """进程内首次打开数据库时加载待验证验证码内存索引"""
+        if pending_index.loaded:
+            return
+        self.cursor.execute(
+            "SELECT group_id, user_id, code FROM data_table WHERE status=?",
+            (STATUS_UNVERIFIED,),
+        )
+        pending_index.load(self.cursor.fetchall())
+        logger.info(f"[{MODULE_NAME}]已加载{len(pending_index)}条待验证记录到内存")
 
     def __enter__(self):
         return self
@@ -64,7 +130,7 @@ class DataManager:
         self.conn.close()
 
     def add_data(
-        self, group_id, user_id, code, status, created_at, warning_count=WARNING_COUNT
+        self, group_id, user_id, code, status, joined_at, warning_count=WARNING_COUNT
     ):
         """
         增加一条数据，如果已存在则更新
@@ -72,24 +138,32 @@ class DataManager:
         :param user_id: QQ号
         :param code: 验证码
         :param status: 验证状态
-        :param created_at: 创建时间（字符串格式）
+        :param joined_at: 入群时间戳
         :param warning_count: 剩余警告次数
         """
+        joined_at = int(joined_at)
+        next_warning_at = joined_at + WARNING_INTERVAL
         self.cursor.execute(
             """
-            INSERT INTO data_table (group_id, user_id, code, status, created_at, warning_count)
-            VALUES (?, ?, ?, ?, ?, ?)
+            INSERT INTO data_table (group_id, user_id, code, status, joined_at, warning_count, last_warning_at, next_warning_at)
+            VALUES (?, ?, ?, ?, ?, ?, NULL, ?)
             ON CONFLICT(group_id, user_id) DO UPDATE SET
                 code=excluded.code,
                 status=excluded.status,
-                created_at=excluded.created_at,
-                warning_count=excluded.warning_count
+                joined_at=excluded.joined_at,
+                warning_count=excluded.warning_count,
+                last_warning_at=NULL,
+                next_warning_at=excluded.next_warning_at
             """,
-            (group_id, user_id, code, status, created_at, warning_count),
+            (group_id, user_id, code, status, joined_at, warning_count, next_warning_at),
         )
         self.conn.commit()
+        if status == STATUS_UNVERIFIED:
+            pending_index.add(group_id, user_id, code)
+        else:
+            pending_index.remove(group_id, user_id)
         logger.info(
-            f"添加数据成功，group_id={group_id}, user_id={user_id}, code={code}, status={status}, created_at={created_at}, warning_count={warning_count}"
+            f"添加数据成功，group_id={group_id}, user_id={user_id}, code={code}, status={status}, joined_at={joined_at}, warning_count={warning_count}"
         )
 
     def get_data(self, group_id, user_id):
@@ -100,23 +174,24 @@ class DataManager:
         :return: 数据字典或None
         """
         self.cursor.execute(
-            "SELECT group_id, user_id, code, status, created_at, warning_count, message_id, last_warning_time FROM data_table WHERE group_id=? AND user_id=?",
+            "SELECT group_id, user_id, code, status, joined_at, warning_count, message_id, last_warning_at, next_warning_at FROM data_table WHERE group_id=? AND user_id=?",
             (group_id, user_id),
         )
         row = self.cursor.fetchone()
         if row:
             logger.info(
-                f"获取数据成功，group_id={row[0]}, user_id={row[1]}, code={row[2]}, status={row[3]}, created_at={row[4]}, warning_count={row[5]}"
+                f"获取数据成功，group_id={row[0]}, user_id={row[1]}, code={row[2]}, status={row[3]}, joined_at={row[4]}, warning_count={row[5]}"
             )
             return {
                 "group_id": row[0],
                 "user_id": row[1],
                 "code": row[2],
                 "status": row[3],
-                "created_at": row[4],
+                "joined_at": row[4],
                 "warning_count": row[5],
                 "message_id": row[6],
-                "last_warning_time": row[7],
+                "last_warning_at": row[7],
+                "next_warning_at": row[8],
             }
         else:
             return None
@@ -128,18 +203,7 @@ class DataManager:
         :param user_id: QQ号
         :return: 验证码字符串或None
         """
-        self.cursor.execute(
-            "SELECT code FROM data_table WHERE group_id=? AND user_id=? AND status=?",
-            (group_id, user_id, STATUS_UNVERIFIED),
-        )
-        row = self.cursor.fetchone()
-        if row:
-            logger.info(
-                f"获取验证码成功，group_id={group_id}, user_id={user_id}, code={row[0]}"
-            )
-            return row[0]
-        else:
-            return None
+        return pending_index.get_code(group_id, user_id)
 
     def get_group_with_code_and_user(self, user_id, code):
         """
@@ -148,18 +212,7 @@ class DataManager:
         :param code: 验证码
         :return: 群号字符串或None
         """
-        self.cursor.execute(
-            "SELECT group_id FROM data_table WHERE user_id=? AND code=? AND status=?",
-            (user_id, code, STATUS_UNVERIFIED),
-        )
-        row = self.cursor.fetchone()
-        if row:
-            logger.info(
-                f"获取群号成功，group_id={row[0]}, user_id={user_id}, code={code}"
-            )
-            return row[0]
-        else:
-            return None
+        return pending_index.find_group(user_id, code)
 
     def update_status(self, group_id, user_id, new_status):
         """
@@ -173,6 +226,16 @@ class DataManager:
             (new_status, group_id, user_id),
         )
         self.conn.commit()
+        if new_status == STATUS_UNVERIFIED:
+            self.cursor.execute(
+                "SELECT code FROM data_table WHERE group_id=? AND user_id=?",
+                (group_id, user_id),
+            )
+            row = self.cursor.fetchone()
+            if row:
+                pending_index.add(group_id, user_id, row[0])
+        else:
+            pending_index.remove(group_id, user_id)
 
     def get_warning_count(self, group_id, user_id):
         """
@@ -262,84 +325,44 @@ class DataManager:
         else:
             return None
 
-    def update_last_warning_time(self, group_id, user_id, warning_time):
+    def claim_users_need_warning(self, now=None):
         """
-        更新指定用户的最后警告时间
-        :param group_id: 群号
-        :param user_id: QQ号
-        :param warning_time: 警告时间（字符串格式）
+        取出到期需要定时提醒的未验证用户，并把他们的下次提醒时间推迟一个提醒间隔
+        查询走 (status, next_warning_at) 索引，同一批用户不会被重复取出
+        :param now: 当前时间戳，默认为当前时间
+        :return: {group_id: [(user_id, warning_count, code, joined_at), ...], ...}
         """
+        now = int(now if now is not None else time.time())
         self.cursor.execute(
-            "UPDATE data_table SET last_warning_time=? WHERE group_id=? AND user_id=?",
-            (warning_time, group_id, user_id),
+            "SELECT group_id, user_id, warning_count, code, joined_at FROM data_table WHERE status=? AND next_warning_at<=? ORDER BY group_id",
+            (STATUS_UNVERIFIED, now),
         )
-        self.conn.commit()
-        logger.info(
-            f"更新最后警告时间成功，group_id={group_id}, user_id={user_id}, warning_time={warning_time}"
-        )
-
-    def get_users_need_warning_by_time(self):
-        """
-        获取需要基于时间间隔进行警告的用户
-        返回所有未验证且距离入群时间为4小时倍数的用户
-        :return: {group_id: [(user_id, warning_count, code, created_at, last_warning_time), ...], ...}
-        """
+        rows = self.cursor.fetchall()
+        if not rows:
+            return {}
         self.cursor.execute(
-            "SELECT group_id, user_id, warning_count, code, created_at, last_warning_time FROM data_table WHERE status=?",
-            (STATUS_UNVERIFIED,),
+            "UPDATE data_table SET last_warning_at=?, next_warning_at=? WHERE status=? AND next_warning_at<=?",
+            (now, now + WARNING_INTERVAL, STATUS_UNVERIFIED, now),
         )
-        rows = self.cursor.fetchall()
+        self.conn.commit()
         result = {}
+        for group_id, user_id, warning_count, code, joined_at in rows:
+            result.setdefault(group_id, []).append(
+                (user_id, warning_count, code, joined_at)
+            )
+        logger.info(
+            f"获取需要定时提醒的用户成功，共{len(rows)}人，涉及{len(result)}个群"
+        )
+        return result
 
-        from datetime import datetime 
-
-        current_time = datetime.now()
-
-        for (
-            group_id,
-            user_id,
-            warning_count,
-            code,
-            created_at,
-            last_warning_time,
-        ) in rows:
-            try:
-                # 解析入群时间
-                join_time = datetime.strptime(created_at, "%Y-%m-%d %H:%M:%S")
-
-                # 计算入群后经过的小时数
-                hours_since_join = int(
-                    (current_time - join_time).total_seconds() / 3600
-                )
-
-                # 检查是否为4小时的倍数且大于0
-                if hours_since_join > 0 and hours_since_join % 4 == 0:
-                    # 检查是否已经在这个时间点警告过
-                    should_warn = True
-                    if last_warning_time:
-                        last_warn_time = datetime.strptime(
-                            last_warning_time, "%Y-%m-%d %H:%M:%S"
-                        )
-                        # 如果距离上次警告不足4小时，则跳过
-                        if (current_time - last_warn_time).total_seconds() < 4 * 3600:
-                            should_warn = False
-
-                    if should_warn:
-                        result.setdefault(group_id, []).append(
-                            (
-                                user_id,
-                                warning_count,
-                                code,
-                                created_at,
-                                last_warning_time,
-                            )
-                        )
 
-            except ValueError as e:
-                logger.error(
-                    f"解析时间格式失败: {e}, created_at={created_at}, last_warning_time={last_warning_time}"
-                )
-                continue
+def get_pending_index():
+    """
+    获取已加载的待验证验证码索引，未加载时先从数据库加载一次
 
-        logger.info(f"获取需要基于时间警告的用户成功，result={result}")
-        return result
+    私聊验证码校验应使用此函数，避免为了一次查询打开数据库
+    """
+    if not pending_index.loaded:
+        with DataManager():
+            pass
+    return pending_index
@@ -11,6 +11,7 @@ from .. import (
 )
 import os
 import uuid
+import time
 import base64
 import logger
 from datetime import datetime
@@ -238,7 +239,7 @@ class GroupNoticeHandler:
                     self.user_id,
                     code,
                     STATUS_UNVERIFIED,
-                    datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                    int(time.time()),
                 )
 
             # 群内通知
@@ -0,0 +1,71 @@
+class PendingVerificationIndex:
+    """
+    待验证验证码内存索引
+
+    保存所有未验证记录的 验证码 -> (群号, QQ号) 和 QQ号 -> {群号: 验证码} 两个映射，
+    首次使用时从数据库加载，此后由 DataManager 在写库成功后同步更新（写穿），
+    私聊验证码校验只查内存，未验证用户刷屏私聊也不会产生数据库查询。
+    """
+
+    def __init__(self):
+        self.loaded = False
+        # code -> (group_id, user_id)
+        self._by_code = {}
+        # user_id -> {group_id: code}
+        self._by_user = {}
+
+    def load(self, rows):
+        """
+        从数据库行加载索引
+
+        Args:
+            rows: [(group_id, user_id, code), ...]，只包含未验证的记录
+        """
+        self._by_code = {}
+        self._by_user = {}
+        for group_id, user_id, code in rows:
+            self.add(group_id, user_id, code)
+        self.loaded = True
+
+    def add(self, group_id, user_id, code):
+        group_id, user_id = str(group_id), str(user_id)
+        # 同一用户在同一群重新入群时验证码会被替换
+        self.remove(group_id, user_id)
+        if not code:
+            return
+        self._by_code[code] = (group_id, user_id)
+        self._by_user.setdefault(user_id, {})[group_id] = code
+
+    def remove(self, group_id, user_id):
+        group_id, user_id = str(group_id), str(user_id)
+        groups = self._by_user.get(user_id)
+        if groups is None:
+            return
+        code = groups.pop(group_id, None)
+        if code is not None and self._by_code.get(code) == (group_id, user_id):
+            del self._by_code[code]
+        if not groups:
+            del self._by_user[user_id]
+
+    def has_user(self, user_id):
+        """用户是否还有未完成的验证"""
+        return str(user_id) in self._by_user
+
+    def get_code(self, group_id, user_id):
+        """获取用户在指定群的待验证验证码，没有时返回None"""
+        groups = self._by_user.get(str(user_id))
+        return groups.get(str(group_id)) if groups else None
+
+    def find_group(self, user_id, code):
+        """根据验证码查找用户待验证的群号，验证码不属于该用户时返回None"""
+        entry = self._by_code.get(code)
+        if entry is None or entry[1] != str(user_id):
+            return None
+        return entry[0]
+
+    def __len__(self):
+        return len(self._by_code)
+
+
+# 全局待验证验证码索引
+pending_index = PendingVerificationIndex()
@@ -0,0 +1,87 @@
+"""
+待验证验证码索引测试程序
+在 app 目录下运行：python -m modules.GroupHumanVerification.test_pending_index
+"""
+
+import os
+import tempfile
+from modules.GroupHumanVerification import STATUS_UNVERIFIED, STATUS_VERIFIED
+from modules.GroupHumanVerification.handlers.pending_index import (
+    PendingVerificationIndex,
+    pending_index,
+)
+from modules.GroupHumanVerification.handlers.data_manager import DataManager
+
+
+def test_lookup():
+    """按群号和QQ号查验证码，按验证码查群号时验证码必须属于该用户"""
+    index = PendingVerificationIndex()
+    index.load([("1001", "1", "AAAA"), (1002, 1, "BBBB"), ("1001", "2", "CCCC")])
+    assert index.loaded and len(index) == 3
+    assert index.get_code(1002, "1") == "BBBB"
+    assert index.find_group(1, "AAAA") == "1001"
+    assert index.find_group("2", "AAAA") is None
+    assert index.find_group("1", "ZZZZ") is None
+    assert index.has_user("2") and not index.has_user("3")
+
+
+def test_replace_and_remove():
+    """重新入群时替换旧验证码，移除最后一个群后用户不再有待验证记录"""
+    index = PendingVerificationIndex()
+    index.add("1001", "1", "AAAA")
+    index.add("1001", "1", "DDDD")
+    assert index.find_group("1", "AAAA") is None
+    assert index.get_code("1001", "1") == "DDDD" and len(index) == 1
+
+    index.add("1001", "1", "")
+    assert not index.has_user("1") and len(index) == 0
+
+    index.add("1001", "1", "EEEE")
+    index.add("1002", "1", "FFFF")
+    index.remove("1001", "1")
+    index.remove("1003", "1")
+    assert index.has_user("1") and index.find_group("1", "FFFF") == "1002"
+    index.remove("1002", "1")
+    assert not index.has_user("1")
+
+
+def test_data_manager_write_through():
+    """首次打开数据库时只加载未验证记录，新增和状态变更后同步更新索引"""
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as work_dir:
+        os.chdir(work_dir)
+        try:
+            pending_index.loaded = False
+            with DataManager() as dm:
+                dm.add_data("1001", "1", "AAAA", STATUS_UNVERIFIED, 1000)
+                dm.add_data("1001", "2", "BBBB", STATUS_VERIFIED, 1000)
+                assert dm.get_group_with_code_and_user("1", "AAAA") == "1001"
+                assert dm.get_code_with_group_and_user("1001", "2") is None
+
+            pending_index.loaded = False
+            with DataManager() as dm:
+                assert len(pending_index) == 1
+                dm.update_status("1001", "1", STATUS_VERIFIED)
+                assert not pending_index.has_user("1")
+                dm.update_status("1001", "2", STATUS_UNVERIFIED)
+                assert pending_index.get_code("1001", "2") == "BBBB"
+        finally:
+            pending_index.loaded = False
+            os.chdir(cwd)
+
+
+def main():
+    """待验证验证码索引测试程序"""
+    tests = [
+        test_lookup,
+        test_replace_and_remove,
+        test_data_manager_write_through,
+    ]
+    for test in tests:
+        test()
+        print(f"{test.__doc__} ✅")
+    print(f"全部 {len(tests)} 项测试通过 🎉")
+
+
+if __name__ == "__main__":
+    main()
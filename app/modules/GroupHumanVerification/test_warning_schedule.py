@@ -0,0 +1,92 @@
+"""
+入群验证定时提醒测试程序
+在 app 目录下运行：python -m modules.GroupHumanVerification.test_warning_schedule
+"""
+
+import os
+import tempfile
+from modules.GroupHumanVerification import (
+    STATUS_UNVERIFIED,
+    STATUS_VERIFIED,
+    WARNING_COUNT,
+    WARNING_INTERVAL,
+)
+from modules.GroupHumanVerification.handlers.pending_index import pending_index
+from modules.GroupHumanVerification.handlers.data_manager import DataManager
+
+
+def in_temp_dir(test):
+    """在临时目录中运行，数据库不写入真实数据目录"""
+
+    def wrapper():
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as work_dir:
+            os.chdir(work_dir)
+            try:
+                pending_index.loaded = False
+                with DataManager() as dm:
+                    test(dm)
+            finally:
+                pending_index.loaded = False
+                os.chdir(cwd)
+
+    wrapper.__doc__ = test.__doc__
+    return wrapper
+
+
+@in_temp_dir
+def test_claim_due_users(dm):
+    """只取出到期的未验证用户，按群分组返回"""
+    dm.add_data("1001", "1", "AAAA", STATUS_UNVERIFIED, 1000)
+    dm.add_data("1001", "2", "BBBB", STATUS_VERIFIED, 1000)
+    dm.add_data("1002", "3", "CCCC", STATUS_UNVERIFIED, 1000)
+    dm.add_data("1002", "4", "DDDD", STATUS_UNVERIFIED, 5000)
+
+    due_at = 1000 + WARNING_INTERVAL
+    assert dm.claim_users_need_warning(now=due_at - 1) == {}
+    assert dm.claim_users_need_warning(now=due_at) == {
+        "1001": [("1", WARNING_COUNT, "AAAA", 1000)],
+        "1002": [("3", WARNING_COUNT, "CCCC", 1000)],
+    }
+
+
+@in_temp_dir
+def test_claim_postpones_next_warning(dm):
+    """取出后记录提醒时间并推迟一个提醒间隔，同一批用户不会被重复取出"""
+    dm.add_data("1001", "1", "AAAA", STATUS_UNVERIFIED, 1000)
+    due_at = 1000 + WARNING_INTERVAL
+    assert "1001" in dm.claim_users_need_warning(now=due_at + 5)
+    assert dm.claim_users_need_warning(now=due_at + 5) == {}
+
+    data = dm.get_data("1001", "1")
+    assert data["last_warning_at"] == due_at + 5
+    assert data["next_warning_at"] == due_at + 5 + WARNING_INTERVAL
+    assert "1001" in dm.claim_users_need_warning(now=due_at + 5 + WARNING_INTERVAL)
+
+
+@in_temp_dir
+def test_rejoin_resets_schedule(dm):
+    """重新入群时清空上次提醒时间，按新的入群时间计算下次提醒"""
+    dm.add_data("1001", "1", "AAAA", STATUS_UNVERIFIED, 1000)
+    dm.claim_users_need_warning(now=1000 + WARNING_INTERVAL)
+    dm.add_data("1001", "1", "BBBB", STATUS_UNVERIFIED, 9000)
+    data = dm.get_data("1001", "1")
+    assert data["last_warning_at"] is None
+    assert data["next_warning_at"] == 9000 + WARNING_INTERVAL
+
+
+def main():
+    """入群验证定时提醒测试程序"""
+    tests = [
+        test_claim_due_users,
+        test_claim_postpones_next_warning,
+        test_rejoin_resets_schedule,
+    ]
+    for test in tests:
+        test()
+        print(f"{test.__doc__} ✅")
+    print(f"全部 {len(tests)} 项测试通过 🎉")
+
+
+if __name__ == "__main__":
+    main()
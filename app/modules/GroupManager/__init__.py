@@ -35,6 +35,9 @@ GROUP_TOGGLE_CURFEW_COMMAND = "切换宵禁"  # 切换宵禁开关命令
 GROUP_QUERY_CURFEW_COMMAND = "查询宵禁"  # 查询宵禁状态命令
 GROUP_TOGGLE_AUTO_APPROVE_COMMAND = "切换同意入群"  # 切换自动同意入群命令
 
+MUTE_RANK_TOP_N = 10  # 禁言排行榜展示人数
+MUTE_RANK_MAX_DAYS = 365  # 禁言排行榜最多统计的天数
+
 
 # ------------------------------------------------------------
 
@@ -47,7 +50,7 @@ COMMANDS = {
     GROUP_RECALL_COMMAND: "撤回消息，回复需要撤回的消息并发送该命令",
     "撤回 N [@或QQ号]": "撤回最近N条消息，可指定用户（支持@和QQ号）。例如：撤回 50 或 撤回 50 @xxx 或 撤回 50 123456",
     GROUP_BAN_ME_COMMAND: "封禁自己一段随机时间",
-    GROUP_BAN_RANK_COMMAND: "查看禁言排行榜，展示个人和群内禁言记录",
+    GROUP_BAN_RANK_COMMAND: f"查看禁言排行榜，展示个人和群内禁言记录；加天数可查看近N天累计禁言排行，例如：{GROUP_BAN_RANK_COMMAND} 7",
     SCAN_INACTIVE_USER_COMMAND: "警告未活跃用户，格式：警告未活跃用户+天数。例如：警告未活跃用户 30",
     GROUP_SET_CURFEW_COMMAND: f"设置宵禁时间，格式：{GROUP_SET_CURFEW_COMMAND} 开始时间 结束时间（24小时制），如 {GROUP_SET_CURFEW_COMMAND} 23:00 06:00，宵禁期间自动禁言全体成员，结束后自动解除。",
     GROUP_CANCEL_CURFEW_COMMAND: "取消当前群的宵禁设置，将删除所有宵禁配置",
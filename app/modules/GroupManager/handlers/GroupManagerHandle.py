@@ -8,6 +8,9 @@ from .. import (
     GROUP_RECALL_COMMAND,
     SCAN_INACTIVE_USER_COMMAND,
     GROUP_TOGGLE_AUTO_APPROVE_COMMAND,
+    GROUP_BAN_RANK_COMMAND,
+    MUTE_RANK_TOP_N,
+    MUTE_RANK_MAX_DAYS,
 )
 from api.group import (
     set_group_ban,
@@ -24,6 +27,7 @@ from utils.generate import (
 import re
 import random
 import asyncio
+import datetime
 from .data_manager import DataManager
 from .handle_response import TEMP_GROUP_HISTORY_CACHE
 
@@ -325,6 +329,12 @@ class GroupManagerHandle:
         处理禁言排行榜查询
         """
         try:
+            # 带天数参数时查询近N天的累计禁言排行，如 banrank 7
+            match = re.match(rf"^{GROUP_BAN_RANK_COMMAND}\s+(\d+)", self.raw_message)
+            if match:
+                await self._send_mute_ranking(int(match.group(1)))
+                return
+
             with DataManager() as dm:
                 # 获取群内今日禁言排行榜
                 top_user = dm.get_group_today_top_mute_user(self.group_id)
@@ -371,6 +381,39 @@ class GroupManagerHandle:
         except Exception as e:
             logger.error(f"[{MODULE_NAME}]查询禁言排行榜失败: {e}")
 
+    async def _send_mute_ranking(self, days):
+        """
+        发送近N天群内累计禁言排行
+
+        参数:
+            days: 天数，包含今天
+        """
+        days = min(max(days, 1), MUTE_RANK_MAX_DAYS)
+        end_day = datetime.date.today()
+        start_day = end_day - datetime.timedelta(days=days - 1)
+        with DataManager() as dm:
+            ranking = dm.get_mute_ranking(
+                self.group_id,
+                start_day.isoformat(),
+                end_day.isoformat(),
+                MUTE_RANK_TOP_N,
+            )
+
+        if not ranking:
+            message = f"本群近{days}天暂无禁言记录"
+        else:
+            message = f"【近{days}天禁言排行榜】\n"
+            for index, (user_id, total, count, longest) in enumerate(ranking, 1):
+                message += f"{index}. {user_id}：累计{total}秒，共{count}次，最长{longest}秒\n"
+            message = message.rstrip("\n")
+
+        await send_group_msg(
+            self.websocket,
+            self.group_id,
+            [generate_text_message(message)],
+            note="del_msg=60",
+        )
+
     async def handle_scan_inactive_user(self):
         """
         处理扫描未活跃用户
@@ -0,0 +1,186 @@
+import asyncio
+import heapq
+import itertools
+from datetime import datetime, timedelta
+import logger
+from .. import MODULE_NAME
+from api.group import set_group_whole_ban
+
+# 宵禁动作
+ACTION_START = "start"  # 宵禁开始，开启全员禁言
+ACTION_END = "end"  # 宵禁结束，解除全员禁言
+
+
+def next_transition(start_time, end_time, now=None):
+    """
+    计算下一次宵禁开关时刻
+
+    参数:
+        start_time: 开始时间 (格式: "HH:MM")
+        end_time: 结束时间 (格式: "HH:MM")
+        now: 当前时间，默认为datetime.now()
+    返回:
+        (datetime, action)，两个时刻相同时返回None
+    """
+    if start_time == end_time:
+        return None
+    now = now or datetime.now()
+    candidates = []
+    for time_str, action in ((start_time, ACTION_START), (end_time, ACTION_END)):
+        hour, minute = map(int, time_str.split(":"))
+        moment = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        if moment <= now:
+            moment += timedelta(days=1)
+        candidates.append((moment, action))
+    return min(candidates)
+
+
+class CurfewScheduler:
+    """
+    宵禁调度器
+
+    所有启用宵禁的群的下一次开关时刻保存在一个最小堆中，由一个后台任务
+    睡眠到最早的时刻执行全员禁言/解禁，执行后再计算该群的下一次时刻入堆。
+    宵禁配置只在设置、切换、删除时由 DataManager 同步更新到调度器，
+    心跳不再轮询数据库。
+    """
+
+    def __init__(self):
+        self.loaded = False
+        # group_id -> (start_time, end_time)，只包含已启用的群
+        self._settings = {}
+        # 堆元素: (触发时间戳, 序号, group_id, action, 版本号)
+        self._heap = []
+        # group_id -> 版本号，配置变化后旧的堆元素按版本号作废
+        self._versions = {}
+        self._seq = itertools.count()
+        self._websocket = None
+        self._task = None
+        self._wakeup = None
+
+    def load(self, rows):
+        """
+        从数据库加载所有启用宵禁的群
+
+        参数:
+            rows: [(group_id, start_time, end_time), ...]
+        """
+        for group_id, start_time, end_time in rows:
+            self.update_group(group_id, start_time, end_time, True)
+        self.loaded = True
+        logger.info(f"[{MODULE_NAME}]已加载{len(self._settings)}个群的宵禁计划")
+
+    def update_group(self, group_id, start_time=None, end_time=None, is_enabled=False):
+        """
+        宵禁配置变化后重新计算该群的下一次开关时刻，未启用或已删除时只移除计划
+        """
+        group_id = str(group_id)
+        version = self._versions.get(group_id, 0) + 1
+        self._versions[group_id] = version
+        self._settings.pop(group_id, None)
+        if is_enabled and start_time and end_time:
+            self._settings[group_id] = (start_time, end_time)
+            self._schedule(group_id, version)
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _schedule(self, group_id, version, now=None):
+        start_time, end_time = self._settings[group_id]
+        transition = next_transition(start_time, end_time, now)
+        if transition is None:
+            return
+        moment, action = transition
+        heapq.heappush(
+            self._heap,
+            (moment.timestamp(), next(self._seq), group_id, action, version),
+        )
+
+    def ensure_started(self, websocket):
+        """首次调用时启动调度任务，之后只更新发送用的连接"""
+        self._websocket = websocket
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    def _pop_due(self, now_ts):
+        """取出所有已到期且未作废的开关动作"""
+        due = []
+        while self._heap and self._heap[0][0] <= now_ts:
+            _, _, group_id, action, version = heapq.heappop(self._heap)
+            if self._versions.get(group_id) == version and group_id in self._settings:
+                due.append((group_id, action, version))
+        return due
+
+    async def _run(self):
+        while True:
+            try:
+                # 丢弃堆顶已作废的元素，避免按作废的时间唤醒
+                while self._heap and (
+                    self._versions.get(self._heap[0][2]) != self._heap[0][4]
+                ):
+                    heapq.heappop(self._heap)
+
+                self._wakeup.clear()
+                timeout = (
+                    max(0.0, self._heap[0][0] - datetime.now().timestamp())
+                    if self._heap
+                    else None
+                )
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+                    continue
+                except asyncio.TimeoutError:
+                    pass
+
+                now = datetime.now()
+                for group_id, action, version in self._pop_due(now.timestamp()):
+                    await self._run_due(group_id, action, version, now)
+            except Exception as e:
+                logger.error(f"[{MODULE_NAME}]宵禁调度失败: {e}")
+                await asyncio.sleep(1)
+
+    async def _run_due(self, group_id, action, version, now):
+        """
+        执行一个到期的开关动作并安排该群的下一次开关
+
+        执行和计算下一次时刻分别捕获异常：执行失败也照常安排下一次，
+        单个群出错不影响同一批到期的其他群，已出堆的计划不会丢失。
+        """
+        settings = self._settings.get(group_id)
+        if settings is None or self._versions.get(group_id) != version:
+            return
+        try:
+            await self._execute(group_id, action, settings)
+        except Exception as e:
+            logger.error(f"[{MODULE_NAME}]群 {group_id} 执行宵禁动作({action})失败: {e}")
+        if self._versions.get(group_id) != version:
+            return
+        try:
+            # 按刚执行的时刻计算下一次，避免同一分钟内重复触发
+            self._schedule(group_id, version, now + timedelta(seconds=1))
+        except Exception as e:
+            logger.error(f"[{MODULE_NAME}]群 {group_id} 计算下一次宵禁时刻失败: {e}")
+
+    async def _execute(self, group_id, action, settings):
+        start_time, end_time = settings
+        if action == ACTION_START:
+            logger.info(
+                f"[{MODULE_NAME}]群 {group_id} 宵禁开始({start_time})，执行全员禁言"
+            )
+            await set_group_whole_ban(self._websocket, group_id, True)
+        else:
+            logger.info(
+                f"[{MODULE_NAME}]群 {group_id} 宵禁结束({end_time})，解除全员禁言"
+            )
+            await set_group_whole_ban(self._websocket, group_id, False)
+
+    def get_next_transition(self, group_id):
+        """获取群下一次宵禁开关时刻，返回 (datetime, action) 或 None"""
+        settings = self._settings.get(str(group_id))
+        if settings is None:
+            return None
+        return next_transition(*settings)
+
+
+# 全局宵禁调度器
+curfew_scheduler = CurfewScheduler()
@@ -2,6 +2,7 @@ import sqlite3
 import os
 from .. import MODULE_NAME
 import datetime
+from .curfew_scheduler import curfew_scheduler
 
 
 class DataManager:
@@ -12,6 +13,7 @@ class DataManager:
         self.conn = sqlite3.connect(db_path)
         self.cursor = self.conn.cursor()
         self._create_table()
+        self._ensure_scheduler_loaded()
 
     def _create_table(self):
         """建表函数，如果表不存在则创建"""
@@ -80,6 +82,50 @@ class DataManager:
         """
         )
 
+        # 创建按天汇总的禁言统计表，每次禁言时增量更新
+        self.cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type='table' AND name='mute_daily_stats'"
+        )
+        need_backfill = self.cursor.fetchone() is None
+        self.cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS mute_daily_stats (
+                group_id TEXT NOT NULL,
+                user_id TEXT NOT NULL,
+                day TEXT NOT NULL,
+                total_seconds INTEGER NOT NULL DEFAULT 0,
+                mute_count INTEGER NOT NULL DEFAULT 0,
+                max_duration INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (group_id, user_id, day)
+            ) WITHOUT ROWID
+        """
+        )
+        if need_backfill:
+            # 老库升级：用已有的每日最长禁言记录初始化汇总表
+            self.cursor.execute(
+                """
+                INSERT OR IGNORE INTO mute_daily_stats (group_id, user_id, day, total_seconds, mute_count, max_duration)
+                SELECT group_id, user_id, date, duration, 1, duration FROM mute_records
+            """
+            )
+
+        # 创建禁言统计表的索引，用于群内单日排行、日期范围查询和全局最高记录
+        self.cursor.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_mute_daily_group_day_max ON mute_daily_stats(group_id, day, max_duration DESC)
+        """
+        )
+        self.cursor.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_mute_daily_user_day ON mute_daily_stats(user_id, day)
+        """
+        )
+        self.cursor.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_mute_daily_max ON mute_daily_stats(max_duration DESC)
+        """
+        )
+
         # 创建宵禁设置表的索引
         self.cursor.execute(
             """
@@ -104,7 +150,7 @@ class DataManager:
 
     def update_mute_record(self, group_id, user_id, duration):
         """
-        更新用户的禁言记录，如果当日时长更长则更新
+        记录一次禁言，累加到当日汇总，并判断是否打破当日最长禁言记录
 
         参数:
             group_id: 群号
@@ -118,51 +164,45 @@ class DataManager:
 
         # 检查今日记录
         self.cursor.execute(
-            "SELECT duration FROM mute_records WHERE group_id=? AND user_id=? AND date=?",
+            "SELECT max_duration FROM mute_daily_stats WHERE group_id=? AND user_id=? AND day=?",
             (group_id, user_id, today),
         )
         result = self.cursor.fetchone()
 
-        is_new_record = False
-        break_personal_record = False
+        is_new_record = result is None
+        old_duration = result[0] if result else 0
+        # 只有当新时长大于旧时长时才算打破个人记录
+        break_personal_record = not is_new_record and duration > old_duration
         break_group_record = False
-        old_duration = 0
 
-        if result:
-            old_duration = result[0]
-            # 只有当新时长大于旧时长时才更新
-            if duration > old_duration:
-                self.cursor.execute(
-                    "UPDATE mute_records SET duration=? WHERE group_id=? AND user_id=? AND date=?",
-                    (duration, group_id, user_id, today),
-                )
-                self.conn.commit()
-                break_personal_record = True
-        else:
-            # 新增记录
-            self.cursor.execute(
-                "INSERT INTO mute_records (group_id, user_id, date, duration) VALUES (?, ?, ?, ?)",
-                (group_id, user_id, today, duration),
-            )
-            self.conn.commit()
-            is_new_record = True
-
-        # 检查是否打破群记录
+        # 检查是否打破群记录，需在写入前比较其他成员的当日最长禁言
         if break_personal_record or is_new_record:
             self.cursor.execute(
-                "SELECT MAX(duration) FROM mute_records WHERE group_id=? AND date=? AND user_id!=?",
+                "SELECT max_duration FROM mute_daily_stats WHERE group_id=? AND day=? AND user_id!=? ORDER BY max_duration DESC LIMIT 1",
                 (group_id, today, user_id),
             )
-            max_group_duration = self.cursor.fetchone()[0]
-
-            if max_group_duration is None or duration > max_group_duration:
+            row = self.cursor.fetchone()
+            if row is None or duration > row[0]:
                 break_group_record = True
 
+        self.cursor.execute(
+            """
+            INSERT INTO mute_daily_stats (group_id, user_id, day, total_seconds, mute_count, max_duration)
+            VALUES (?, ?, ?, ?, 1, ?)
+            ON CONFLICT(group_id, user_id, day) DO UPDATE SET
+                total_seconds = total_seconds + excluded.total_seconds,
+                mute_count = mute_count + 1,
+                max_duration = MAX(max_duration, excluded.max_duration)
+            """,
+            (group_id, user_id, today, duration, duration),
+        )
+        self.conn.commit()
+
         return (is_new_record, break_personal_record, break_group_record, old_duration)
 
     def get_user_today_mute_duration(self, group_id, user_id):
         """
-        获取某群某用户今日禁言时长
+        获取某群某用户今日最长的一次禁言时长
 
         参数:
             group_id: 群号
@@ -174,7 +214,7 @@ class DataManager:
         today = datetime.datetime.now().strftime("%Y-%m-%d")
 
         self.cursor.execute(
-            "SELECT duration FROM mute_records WHERE group_id=? AND user_id=? AND date=?",
+            "SELECT max_duration FROM mute_daily_stats WHERE group_id=? AND user_id=? AND day=?",
             (group_id, user_id, today),
         )
         result = self.cursor.fetchone()
@@ -194,12 +234,10 @@ class DataManager:
         today = datetime.datetime.now().strftime("%Y-%m-%d")
 
         self.cursor.execute(
-            "SELECT user_id, MAX(duration) FROM mute_records WHERE group_id=? AND date=?",
+            "SELECT user_id, max_duration FROM mute_daily_stats WHERE group_id=? AND day=? ORDER BY max_duration DESC LIMIT 1",
             (group_id, today),
         )
-        result = self.cursor.fetchone()
-
-        return result if result and result[0] else None
+        return self.cursor.fetchone()
 
     def get_global_top_mute_user(self):
         """
@@ -209,11 +247,63 @@ class DataManager:
             tuple: (group_id, user_id, date, duration) 或 None
         """
         self.cursor.execute(
-            "SELECT group_id, user_id, date, MAX(duration) FROM mute_records"
+            "SELECT group_id, user_id, day, max_duration FROM mute_daily_stats ORDER BY max_duration DESC LIMIT 1"
         )
-        result = self.cursor.fetchone()
+        return self.cursor.fetchone()
+
+    def get_mute_history(self, group_id, start_day, end_day, user_id=None):
+        """
+        按天查询禁言统计，只读取汇总表中日期范围内的行
+
+        参数:
+            group_id: 群号
+            start_day: 开始日期 (格式: "YYYY-MM-DD"，包含)
+            end_day: 结束日期 (格式: "YYYY-MM-DD"，包含)
+            user_id: QQ号，不传时统计全群
 
-        return result if result and result[0] else None
+        返回:
+            list: [(day, total_seconds, mute_count, max_duration)]，按日期升序
+        """
+        sql = (
+            "SELECT day, SUM(total_seconds), SUM(mute_count), MAX(max_duration) "
+            "FROM mute_daily_stats WHERE group_id=? AND day BETWEEN ? AND ?"
+        )
+        params = [group_id, start_day, end_day]
+        if user_id is not None:
+            sql += " AND user_id=?"
+            params.append(user_id)
+        sql += " GROUP BY day ORDER BY day"
+        self.cursor.execute(sql, params)
+        return self.cursor.fetchall()
+
+    def get_mute_ranking(self, group_id, start_day, end_day, limit=10):
+        """
+        查询群内日期范围内累计禁言时长排行
+
+        参数:
+            group_id: 群号
+            start_day: 开始日期 (格式: "YYYY-MM-DD"，包含)
+            end_day: 结束日期 (格式: "YYYY-MM-DD"，包含)
+            limit: 返回人数
+
+        返回:
+            list: [(user_id, total_seconds, mute_count, max_duration)]，按累计时长降序
+        """
+        self.cursor.execute(
+            """
+            SELECT user_id, SUM(total_seconds) AS total, SUM(mute_count), MAX(max_duration)
+            FROM mute_daily_stats WHERE group_id=? AND day BETWEEN ? AND ?
+            GROUP BY user_id ORDER BY total DESC LIMIT ?
+            """,
+            (group_id, start_day, end_day, limit),
+        )
+        return self.cursor.fetchall()
+
+    def _ensure_scheduler_loaded(self):
+        """进程内首次打开数据库时把所有启用的宵禁配置加载到调度器"""
+        if curfew_scheduler.loaded:
+            return
+        curfew_scheduler.load(self.get_all_enabled_curfew_groups())
 
     def set_curfew_settings(self, group_id, start_time, end_time, is_enabled=True):
         """
@@ -237,6 +327,7 @@ class DataManager:
                 (group_id, start_time, end_time, int(is_enabled)),
             )
             self.conn.commit()
+            curfew_scheduler.update_group(group_id, start_time, end_time, is_enabled)
             return True
         except Exception as e:
             return False
@@ -283,6 +374,9 @@ class DataManager:
             (int(new_status), group_id),
         )
         self.conn.commit()
+        curfew_scheduler.update_group(
+            group_id, current_settings[0], current_settings[1], new_status
+        )
         return new_status
 
     def delete_curfew_settings(self, group_id):
@@ -300,6 +394,7 @@ class DataManager:
                 "DELETE FROM curfew_settings WHERE group_id=?", (group_id,)
             )
             self.conn.commit()
+            curfew_scheduler.update_group(group_id)
             return True
         except Exception as e:
             return False
@@ -341,64 +436,6 @@ class DataManager:
         )
         return self.cursor.fetchall()
 
-    def should_trigger_curfew_action(self, group_id, current_time_str):
-        """
-        检查是否应该触发宵禁动作（开始或结束）
-
-        参数:
-            group_id: 群号
-            current_time_str: 当前时间字符串 (格式: "HH:MM")
-
-        返回:
-            str: "start" 表示开始宵禁, "end" 表示结束宵禁, None 表示无需操作
-        """
-        settings = self.get_curfew_settings(group_id)
-        if not settings or not settings[2]:  # 如果没有设置或未启用
-            return None
-
-        start_time, end_time, is_enabled = settings
-
-        if current_time_str == start_time:
-            return "start"
-        elif current_time_str == end_time:
-            return "end"
-
-        return None
-
-    def get_last_curfew_trigger_time(self, group_id):
-        """
-        获取群最后一次宵禁触发时间
-
-        参数:
-            group_id: 群号
-
-        返回:
-            str: 最后触发时间 (格式: "YYYY-MM-DD HH:MM") 或 None
-        """
-        self.cursor.execute(
-            "SELECT last_trigger_time FROM curfew_trigger_log WHERE group_id=?",
-            (group_id,),
-        )
-        result = self.cursor.fetchone()
-        return result[0] if result else None
-
-    def update_curfew_trigger_time(self, group_id, trigger_time):
-        """
-        更新群宵禁触发时间记录
-
-        参数:
-            group_id: 群号
-            trigger_time: 触发时间 (格式: "YYYY-MM-DD HH:MM")
-        """
-        self.cursor.execute(
-            """
-            INSERT OR REPLACE INTO curfew_trigger_log (group_id, last_trigger_time)
-            VALUES (?, ?)
-            """,
-            (group_id, trigger_time),
-        )
-        self.conn.commit()
-
     def set_auto_approve_status(self, group_id, is_enabled):
         """
         设置群自动同意入群状态
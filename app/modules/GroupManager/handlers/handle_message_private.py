@@ -1,10 +1,10 @@
 from .. import MODULE_NAME, SWITCH_NAME
 from core.menu_manager import MENU_COMMAND
 import logger
+from core.event import as_event
 from core.switchs import is_private_switch_on, handle_module_private_switch
 from api.message import send_private_msg
 from utils.generate import generate_text_message, generate_reply_message
-from datetime import datetime
 from core.menu_manager import MenuManager
 from utils.auth import is_system_admin
 
@@ -15,17 +15,16 @@ class PrivateMessageHandler:
     def __init__(self, websocket, msg):
         self.websocket = websocket
         self.msg = msg
-        self.time = msg.get("time", "")
-        self.formatted_time = datetime.fromtimestamp(self.time).strftime(
-            "%Y-%m-%d %H:%M:%S"
-        )  # 格式化时间
-        self.sub_type = msg.get("sub_type", "")  # 子类型,friend/group
-        self.user_id = str(msg.get("user_id", ""))  # 发送者QQ号
-        self.message_id = str(msg.get("message_id", ""))  # 消息ID
-        self.message = msg.get("message", {})  # 消息段数组
-        self.raw_message = msg.get("raw_message", "")  # 原始消息
-        self.sender = msg.get("sender", {})  # 发送者信息
-        self.nickname = self.sender.get("nickname", "")  # 昵称
+        event = as_event(msg)
+        self.time = event.time
+        self.formatted_time = event.formatted_time  # 格式化时间
+        self.sub_type = event.sub_type  # 子类型,friend/group
+        self.user_id = event.user_id  # 发送者QQ号
+        self.message_id = event.message_id  # 消息ID
+        self.message = event.message  # 消息段数组
+        self.raw_message = event.raw_message  # 原始消息
+        self.sender = event.sender  # 发送者信息
+        self.nickname = event.nickname  # 昵称
 
     async def handle(self):
         """
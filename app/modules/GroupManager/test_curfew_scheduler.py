@@ -0,0 +1,127 @@
+"""
+宵禁调度器测试程序
+在 app 目录下运行：python -m modules.GroupManager.test_curfew_scheduler
+"""
+
+import asyncio
+from datetime import datetime
+from modules.GroupManager.handlers.curfew_scheduler import (
+    CurfewScheduler,
+    next_transition,
+    ACTION_START,
+    ACTION_END,
+)
+
+
+def test_next_transition_same_day():
+    """返回当天最近的开关时刻，已过去的时刻顺延到第二天"""
+    now = datetime(2024, 1, 1, 12, 0)
+    assert next_transition("23:00", "07:00", now) == (
+        datetime(2024, 1, 1, 23, 0),
+        ACTION_START,
+    )
+    assert next_transition("23:00", "07:00", datetime(2024, 1, 1, 23, 30)) == (
+        datetime(2024, 1, 2, 7, 0),
+        ACTION_END,
+    )
+    assert next_transition("08:00", "09:00", datetime(2024, 1, 1, 9, 30)) == (
+        datetime(2024, 1, 2, 8, 0),
+        ACTION_START,
+    )
+
+
+def test_next_transition_boundary():
+    """恰好在开关时刻时取下一个时刻，开始结束相同时没有计划"""
+    assert next_transition("23:00", "07:00", datetime(2024, 1, 1, 23, 0)) == (
+        datetime(2024, 1, 2, 7, 0),
+        ACTION_END,
+    )
+    assert next_transition("07:00", "07:00", datetime(2024, 1, 1, 12, 0)) is None
+
+
+def build_scheduler(fail_groups=()):
+    """执行动作时只做记录，fail_groups 中的群执行时抛出异常"""
+    scheduler = CurfewScheduler()
+    executed = []
+
+    async def fake_execute(group_id, action, settings):
+        executed.append((group_id, action))
+        if group_id in fail_groups:
+            raise ConnectionError("连接已断开")
+
+    scheduler._execute = fake_execute
+    return scheduler, executed
+
+
+def test_pop_due_skips_stale():
+    """配置更新或删除后，旧的堆元素按版本号作废，不会被执行"""
+    scheduler, _ = build_scheduler()
+    scheduler.load(
+        [
+            ("1001", "23:00", "07:00"),
+            ("1002", "23:00", "07:00"),
+            ("1003", "22:00", "06:00"),
+        ]
+    )
+    scheduler.update_group("1002", "22:00", "06:00", True)
+    scheduler.update_group("1003")
+    far_future = datetime(2100, 1, 1).timestamp()
+    due = scheduler._pop_due(far_future)
+    assert sorted(group_id for group_id, _, _ in due) == ["1001", "1002"]
+    assert not scheduler._heap
+
+
+def test_run_due_reschedules_after_failure():
+    """执行失败也会安排下一次开关，不影响同一批到期的其他群"""
+    scheduler, executed = build_scheduler(fail_groups={"1001"})
+    scheduler.load([("1001", "23:00", "07:00"), ("1002", "23:00", "07:00")])
+    scheduler._heap.clear()
+    now = datetime(2024, 1, 1, 23, 0)
+
+    async def run():
+        for group_id in ("1001", "1002"):
+            version = scheduler._versions[group_id]
+            await scheduler._run_due(group_id, ACTION_START, version, now)
+
+    asyncio.run(run())
+    assert executed == [("1001", ACTION_START), ("1002", ACTION_START)]
+    expected = datetime(2024, 1, 2, 7, 0).timestamp()
+    scheduled = sorted(
+        (group_id, ts, action) for ts, _, group_id, action, _ in scheduler._heap
+    )
+    assert scheduled == [
+        ("1001", expected, ACTION_END),
+        ("1002", expected, ACTION_END),
+    ]
+
+
+def test_run_due_stale_version():
+    """配置已变化的动作不执行也不重新入堆"""
+    scheduler, executed = build_scheduler()
+    scheduler.load([("1001", "23:00", "07:00")])
+    stale_version = scheduler._versions["1001"]
+    scheduler.update_group("1001", "22:00", "06:00", True)
+    scheduler._heap.clear()
+
+    now = datetime(2024, 1, 1, 23, 0)
+    asyncio.run(scheduler._run_due("1001", ACTION_START, stale_version, now))
+    assert executed == [] and scheduler._heap == []
+
+
+def main():
+    """宵禁调度器测试程序"""
+    tests = [
+        test_next_transition_same_day,
+        test_next_transition_boundary,
+        test_pop_due_skips_stale,
+        test_run_due_reschedules_after_failure,
+        test_run_due_stale_version,
+    ]
+    for test in tests:
+        test()
+        print(f"{test.__doc__} ✅")
+    print(f"全部 {len(tests)} 项测试通过 🎉")
+
+
+if __name__ == "__main__":
+    main()
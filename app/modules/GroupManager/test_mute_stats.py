@@ -0,0 +1,128 @@
+"""
+禁言统计测试程序
+在 app 目录下运行：python -m modules.GroupManager.test_mute_stats
+"""
+
+import datetime
+import os
+import sqlite3
+import tempfile
+from modules.GroupManager import MODULE_NAME
+from modules.GroupManager.handlers.curfew_scheduler import curfew_scheduler
+from modules.GroupManager.handlers.data_manager import DataManager
+
+
+def in_temp_dir(test):
+    """在临时目录中运行，数据库不写入真实数据目录"""
+
+    def wrapper():
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as work_dir:
+            os.chdir(work_dir)
+            try:
+                curfew_scheduler.loaded = False
+                test()
+            finally:
+                curfew_scheduler.loaded = False
+                os.chdir(cwd)
+
+    wrapper.__doc__ = test.__doc__
+    return wrapper
+
+
+def add_stats(dm, rows):
+    """直接写入其他日期的汇总行：(group_id, user_id, day, 累计秒数, 次数, 最长秒数)"""
+    dm.cursor.executemany(
+        "INSERT INTO mute_daily_stats VALUES (?, ?, ?, ?, ?, ?)",
+        rows,
+    )
+    dm.conn.commit()
+
+
+@in_temp_dir
+def test_update_mute_record_upsert():
+    """同一天多次禁言累加时长和次数，最长时长只在更长时更新"""
+    today = datetime.datetime.now().strftime("%Y-%m-%d")
+    with DataManager() as dm:
+        assert dm.update_mute_record("1001", "1", 60) == (True, False, True, 0)
+        assert dm.update_mute_record("1001", "1", 30) == (False, False, False, 60)
+        assert dm.update_mute_record("1001", "1", 120) == (False, True, True, 60)
+        # 其他成员未超过当日群内最长禁言，不算打破群记录
+        assert dm.update_mute_record("1001", "2", 100) == (True, False, False, 0)
+
+        assert dm.get_mute_history("1001", today, today, "1") == [
+            (today, 210, 3, 120)
+        ]
+        assert dm.get_mute_history("1001", today, today) == [(today, 310, 4, 120)]
+        assert dm.get_user_today_mute_duration("1001", "1") == 120
+        assert dm.get_group_today_top_mute_user("1001") == ("1", 120)
+
+
+@in_temp_dir
+def test_get_mute_ranking():
+    """按日期范围内的累计时长排行，范围外和其他群的记录不计入"""
+    with DataManager() as dm:
+        add_stats(
+            dm,
+            [
+                ("1001", "1", "2024-01-01", 600, 2, 500),
+                ("1001", "1", "2024-01-03", 100, 1, 100),
+                ("1001", "2", "2024-01-02", 650, 1, 650),
+                ("1001", "3", "2024-01-05", 9999, 1, 9999),
+                ("1002", "4", "2024-01-02", 9999, 1, 9999),
+            ],
+        )
+        assert dm.get_mute_ranking("1001", "2024-01-01", "2024-01-03") == [
+            ("1", 700, 3, 500),
+            ("2", 650, 1, 650),
+        ]
+        assert dm.get_mute_ranking("1001", "2024-01-01", "2024-01-05", limit=1) == [
+            ("3", 9999, 1, 9999)
+        ]
+        assert dm.get_global_top_mute_user()[3] == 9999
+
+
+@in_temp_dir
+def test_backfill_from_old_records():
+    """老库首次升级时用已有的每日最长禁言记录初始化汇总表"""
+    data_dir = os.path.join("data", MODULE_NAME)
+    os.makedirs(data_dir)
+    conn = sqlite3.connect(os.path.join(data_dir, "data.db"))
+    conn.execute(
+        "CREATE TABLE mute_records (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+        "group_id TEXT NOT NULL, user_id TEXT NOT NULL, date TEXT NOT NULL, "
+        "duration INTEGER NOT NULL, UNIQUE(group_id, user_id, date))"
+    )
+    conn.execute(
+        "INSERT INTO mute_records (group_id, user_id, date, duration) "
+        "VALUES ('1001', '1', '2024-01-01', 300)"
+    )
+    conn.commit()
+    conn.close()
+
+    with DataManager() as dm:
+        assert dm.get_mute_history("1001", "2024-01-01", "2024-01-01") == [
+            ("2024-01-01", 300, 1, 300)
+        ]
+    # 再次打开时不重复导入
+    with DataManager() as dm:
+        assert dm.get_mute_ranking("1001", "2024-01-01", "2024-01-01") == [
+            ("1", 300, 1, 300)
+        ]
+
+
+def main():
+    """禁言统计测试程序"""
+    tests = [
+        test_update_mute_record_upsert,
+        test_get_mute_ranking,
+        test_backfill_from_old_records,
+    ]
+    for test in tests:
+        test()
+        print(f"{test.__doc__} ✅")
+    print(f"全部 {len(tests)} 项测试通过 🎉")
+
+
+if __name__ == "__main__":
+    main()
@@ -26,6 +26,7 @@ CMD_GET_DEFAULT = "查询默认群昵称"
 CMD_SET_LOCK = "设置群昵称锁定"
 CMD_GET_LOCK = "查询群昵称锁定"
 CMD_DEL_LOCK = "删除群昵称锁定"
+CMD_AUDIT = "检查群昵称"
 
 
 COMMANDS = {
@@ -37,7 +38,11 @@ COMMANDS = {
     CMD_SET_LOCK: "设置群昵称锁定",
     CMD_GET_LOCK: "查询群昵称锁定",
     CMD_DEL_LOCK: "删除群昵称锁定",
+    CMD_AUDIT: "按群成员列表一次性检查全群群昵称并自动修正",
 }
 
 # 昵称提醒时间间隔（秒）
 NICKNAME_REMINDER_INTERVAL_SECONDS = 300
+
+# 群名片检测结论和提醒时间缓存的最大条目数，超出后淘汰最久未使用的条目
+NICKNAME_CACHE_MAX_ENTRIES = 50000
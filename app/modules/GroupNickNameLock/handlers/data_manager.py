@@ -135,3 +135,16 @@ class DataManager:
         )
         row = self.cursor.fetchone()
         return row[0] if row else None
+
+    def get_group_rules(self, group_id):
+        """
+        一次性读取群的昵称规则，用于加载内存缓存
+
+        Returns:
+            tuple: (regex, default_name, {user_id: lock_name})
+        """
+        return (
+            self.get_group_regex(group_id),
+            self.get_group_default_name(group_id),
+            dict(self.get_all_user_locks(group_id)),
+        )
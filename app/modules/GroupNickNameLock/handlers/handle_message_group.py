@@ -9,8 +9,10 @@ from .. import (
     CMD_SET_LOCK,
     CMD_GET_LOCK,
     CMD_DEL_LOCK,
+    CMD_AUDIT,
 )
 import logger
+from core.event import as_event
 from core.switchs import is_group_switch_on, handle_module_group_switch
 from api.message import send_group_msg
 from utils.generate import (
@@ -19,12 +21,36 @@ from utils.generate import (
     generate_at_message,
 )
 from api.group import set_group_card
-from datetime import datetime
+from core.moderation import moderation_executor, card_action
+from core.get_group_member_list import get_group_members
 from .data_manager import DataManager
+from .nickname_cache import nickname_cache, VERDICT_OK, VERDICT_LOCK
 import re
 from utils.auth import is_group_admin, is_system_admin
 from core.menu_manager import MenuManager
 
+# 管理命令（仅群主/管理员）
+ADMIN_COMMANDS = (
+    CMD_SET_REGEX,
+    CMD_GET_REGEX,
+    CMD_DEL_REGEX,
+    CMD_SET_DEFAULT,
+    CMD_GET_DEFAULT,
+    CMD_SET_LOCK,
+    CMD_GET_LOCK,
+    CMD_DEL_LOCK,
+    CMD_AUDIT,
+)
+
+# 会修改群规则的命令，执行后需要使昵称检测缓存失效
+RULE_CHANGE_COMMANDS = (
+    CMD_SET_REGEX,
+    CMD_DEL_REGEX,
+    CMD_SET_DEFAULT,
+    CMD_SET_LOCK,
+    CMD_DEL_LOCK,
+)
+
 
 class GroupMessageHandler:
     """群消息处理器"""
@@ -32,20 +58,19 @@ class GroupMessageHandler:
     def __init__(self, websocket, msg):
         self.websocket = websocket
         self.msg = msg
-        self.time = msg.get("time", "")
-        self.formatted_time = datetime.fromtimestamp(self.time).strftime(
-            "%Y-%m-%d %H:%M:%S"
-        )  # 格式化时间
-        self.sub_type = msg.get("sub_type", "")  # 子类型，只有normal
-        self.group_id = str(msg.get("group_id", ""))  # 群号
-        self.message_id = str(msg.get("message_id", ""))  # 消息ID
-        self.user_id = str(msg.get("user_id", ""))  # 发送者QQ号
-        self.message = msg.get("message", {})  # 消息段数组
-        self.raw_message = msg.get("raw_message", "")  # 原始消息
-        self.sender = msg.get("sender", {})  # 发送者信息
-        self.nickname = self.sender.get("nickname", "")  # 昵称
-        self.card = self.sender.get("card", "")  # 群名片
-        self.role = self.sender.get("role", "")  # 群身份
+        event = as_event(msg)
+        self.time = event.time
+        self.formatted_time = event.formatted_time  # 格式化时间
+        self.sub_type = event.sub_type  # 子类型，只有normal
+        self.group_id = event.group_id  # 群号
+        self.message_id = event.message_id  # 消息ID
+        self.user_id = event.user_id  # 发送者QQ号
+        self.message = event.message  # 消息段数组
+        self.raw_message = event.raw_message  # 原始消息
+        self.sender = event.sender  # 发送者信息
+        self.nickname = event.nickname  # 昵称
+        self.card = event.card  # 群名片
+        self.role = event.role  # 群身份
 
     async def handle(self):
         """
@@ -82,27 +107,23 @@ class GroupMessageHandler:
             if not is_group_switch_on(self.group_id, MODULE_NAME):
                 return
 
-            with DataManager() as dm:
-                # 权限判断函数
-                def is_admin():
-                    return is_group_admin(self.role)
+            # 普通消息只做昵称检测，走内存缓存，不访问数据库
+            if not self.raw_message.startswith(ADMIN_COMMANDS):
+                await self.check_nickname()
+                return
 
-                # 管理命令处理（仅群主/管理员）
-                if self.raw_message.startswith(
-                    (
-                        CMD_SET_REGEX,
-                        CMD_GET_REGEX,
-                        CMD_DEL_REGEX,
-                        CMD_SET_DEFAULT,
-                        CMD_GET_DEFAULT,
-                        CMD_SET_LOCK,
-                        CMD_GET_LOCK,
-                        CMD_DEL_LOCK,
-                    )
-                ):
-                    if not is_admin():
-                        return
+            # 管理命令处理（仅群主/管理员）
+            if not is_group_admin(self.role):
+                return
+
+            if self.raw_message.startswith(CMD_AUDIT):
+                await self.audit_group()
+                return
 
+            if self.raw_message.startswith(RULE_CHANGE_COMMANDS):
+                nickname_cache.invalidate_group(self.group_id)
+
+            with DataManager() as dm:
                 if self.raw_message.startswith(CMD_SET_REGEX):
                     regex = self.raw_message[len(CMD_SET_REGEX) :].strip()
                     # 只处理英文中括号的Unicode
@@ -237,69 +258,118 @@ class GroupMessageHandler:
                         )
                     return
 
-                # --- 核心昵称检测逻辑 ---
-                # 1. 检查用户锁定昵称（优先级高）
-                lock_name = dm.get_user_lock_name(self.group_id, self.user_id)
-                if lock_name:
-                    if self.card == lock_name:
-                        # 如果名字已经符合锁定名，直接返回，不进行后续检查
-                        return
-                    await set_group_card(
-                        self.websocket, self.group_id, self.user_id, lock_name
-                    )
-                    logger.info(
-                        f"[{MODULE_NAME}]用户{self.user_id}群名片不符锁定，已自动改为: {lock_name}"
-                    )
-                    return
+        except Exception as e:
+            logger.error(f"[{MODULE_NAME}]处理群消息失败: {e}")
 
-                # 2. 检查群正则
-                regex = dm.get_group_regex(self.group_id)
-                if regex:
-                    try:
-                        if not re.fullmatch(regex, self.card):
-                            # 检查提醒时间间隔
-                            from .. import NICKNAME_REMINDER_INTERVAL_SECONDS
-                            import time
+    async def check_nickname(self):
+        """检测发送者群名片，不符合锁定昵称或群正则时自动修改"""
+        verdict, target_card = nickname_cache.check(
+            self.group_id, self.user_id, self.card
+        )
+        if verdict == VERDICT_OK:
+            return
 
-                            last_remind = dm.get_last_nickname_reminder_at(
-                                self.group_id, self.user_id
-                            )
-                            now = time.time()
-                            if (
-                                last_remind is None
-                                or now - last_remind
-                                > NICKNAME_REMINDER_INTERVAL_SECONDS
-                            ):
-                                # 发送提醒
-                                await send_group_msg(
-                                    self.websocket,
-                                    self.group_id,
-                                    [
-                                        generate_at_message(self.user_id),
-                                        generate_text_message(
-                                            f"({self.user_id})您的群昵称不符合群规定，请及时修改为本群指定格式！"
-                                        ),
-                                    ],
-                                    note="del_msg=10",
-                                )
-                                # 更新提醒时间
-                                dm.set_last_nickname_reminder_at(
-                                    self.group_id, self.user_id, now
-                                )
-                            default_name = dm.get_group_default_name(self.group_id)
-                            if default_name:
-                                await set_group_card(
-                                    self.websocket,
-                                    self.group_id,
-                                    self.user_id,
-                                    default_name,
-                                )
-                                logger.info(
-                                    f"[{MODULE_NAME}]用户{self.user_id}群名片不符正则，已自动改为默认名: {default_name}"
-                                )
-                                return
-                    except Exception as e:
-                        logger.error(f"[{MODULE_NAME}]正则检测异常: {e}")
+        # 1. 不符合锁定昵称（优先级高）
+        if verdict == VERDICT_LOCK:
+            await set_group_card(
+                self.websocket, self.group_id, self.user_id, target_card
+            )
+            logger.info(
+                f"[{MODULE_NAME}]用户{self.user_id}群名片不符锁定，已自动改为: {target_card}"
+            )
+            return
 
-        except Exception as e:
-            logger.error(f"[{MODULE_NAME}]处理群消息失败: {e}")
+        # 2. 不符合群正则，按时间间隔提醒
+        if nickname_cache.should_remind(self.group_id, self.user_id):
+            await send_group_msg(
+                self.websocket,
+                self.group_id,
+                [
+                    generate_at_message(self.user_id),
+                    generate_text_message(
+                        f"({self.user_id})您的群昵称不符合群规定，请及时修改为本群指定格式！"
+                    ),
+                ],
+                note="del_msg=10",
+            )
+        if target_card:
+            await set_group_card(
+                self.websocket, self.group_id, self.user_id, target_card
+            )
+            logger.info(
+                f"[{MODULE_NAME}]用户{self.user_id}群名片不符正则，已自动改为默认名: {target_card}"
+            )
+
+    async def audit_group(self):
+        """
+        按本地缓存的群成员列表一次性检查全群群名片
+
+        群主和管理员不检查；不符合锁定昵称的改回锁定昵称，
+        不符合群正则且设置了默认名的改为默认名。
+        修改群名片交给群管执行器，经令牌桶限流发送并按响应确认结果。
+        """
+        members = get_group_members(self.group_id)
+        if not members:
+            await send_group_msg(
+                self.websocket,
+                self.group_id,
+                [
+                    generate_reply_message(self.message_id),
+                    generate_text_message("未获取到群成员列表，请稍后再试"),
+                ],
+                note="del_msg=10",
+            )
+            return
+
+        checked = regex_unfixed = 0
+        actions = []
+        # user_id -> 检测结论，用于按结论统计修改成功的人数
+        verdicts = {}
+        for member in members:
+            if member.get("role") in ("owner", "admin") or member.get("is_robot"):
+                continue
+            user_id = str(member.get("user_id", ""))
+            if not user_id:
+                continue
+            checked += 1
+            verdict, target_card = nickname_cache.check(
+                self.group_id, user_id, member.get("card", "")
+            )
+            if verdict == VERDICT_OK:
+                continue
+            if not target_card:
+                regex_unfixed += 1
+                continue
+            verdicts[user_id] = verdict
+            actions.append(card_action(self.group_id, user_id, target_card))
+
+        lock_fixed = regex_fixed = failed = 0
+        if actions:
+            summary = await moderation_executor.execute(self.websocket, actions)
+            for action in summary["succeeded_targets"]:
+                if verdicts[action["user_id"]] == VERDICT_LOCK:
+                    lock_fixed += 1
+                else:
+                    regex_fixed += 1
+            failed = len(summary["failed_targets"])
+
+        logger.info(
+            f"[{MODULE_NAME}]群{self.group_id}昵称检查完成，检查{checked}人，"
+            f"修正锁定{lock_fixed}人，改为默认名{regex_fixed}人，修改失败{failed}人"
+        )
+        await send_group_msg(
+            self.websocket,
+            self.group_id,
+            [
+                generate_reply_message(self.message_id),
+                generate_text_message(
+                    f"群昵称检查完成\n"
+                    f"检查成员：{checked}人（不含群主和管理员）\n"
+                    f"恢复锁定昵称：{lock_fixed}人\n"
+                    f"改为默认名：{regex_fixed}人\n"
+                    f"修改失败或未确认：{failed}人\n"
+                    f"不符合正则但未设置默认名：{regex_unfixed}人"
+                ),
+            ],
+            note="del_msg=60",
+        )
@@ -0,0 +1,124 @@
+import re
+import time
+from collections import OrderedDict
+import logger
+from .. import (
+    MODULE_NAME,
+    NICKNAME_REMINDER_INTERVAL_SECONDS,
+    NICKNAME_CACHE_MAX_ENTRIES,
+)
+from .data_manager import DataManager
+
+# 检测结论
+VERDICT_OK = "ok"  # 符合规则
+VERDICT_LOCK = "lock"  # 不符合锁定昵称
+VERDICT_REGEX = "regex"  # 不符合群正则
+
+
+class GroupRules:
+    """单个群的昵称规则，正则已预编译"""
+
+    def __init__(self, regex, default_name, locks):
+        self.regex_text = regex
+        self.default_name = default_name
+        self.locks = locks
+        self.regex = None
+        if regex:
+            try:
+                self.regex = re.compile(regex)
+            except re.error as e:
+                logger.error(f"[{MODULE_NAME}]群昵称正则编译失败: {regex}, {e}")
+
+
+class NicknameCache:
+    """
+    群昵称检测缓存
+
+    按群缓存预编译的正则、默认名和锁定昵称，并按 (群, 用户) 缓存最近一次
+    检测的群名片和结论。用户群名片不变时直接复用结论，不访问数据库、不执行正则；
+    群规则被修改时通过 invalidate_group 使该群缓存失效。
+    结论和提醒时间按最近使用顺序保存，超过 max_entries 时淘汰最久未使用的条目，
+    超过提醒间隔的提醒记录不再有用，也会被清除。
+    """
+
+    def __init__(self, max_entries=NICKNAME_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._rules = {}
+        # (group_id, user_id) -> (card, verdict)，按最近使用顺序排列
+        self._verdicts = OrderedDict()
+        # (group_id, user_id) -> 上次提醒时间戳，按提醒时间顺序排列
+        self._last_reminders = OrderedDict()
+
+    def get_rules(self, group_id):
+        """获取群规则，未缓存时从数据库加载"""
+        rules = self._rules.get(group_id)
+        if rules is None:
+            with DataManager() as dm:
+                rules = GroupRules(*dm.get_group_rules(group_id))
+            self._rules[group_id] = rules
+        return rules
+
+    def invalidate_group(self, group_id):
+        """群正则、默认名或锁定昵称变更后调用，清除该群的规则和结论缓存"""
+        self._rules.pop(group_id, None)
+        for key in [key for key in self._verdicts if key[0] == group_id]:
+            del self._verdicts[key]
+
+    def check(self, group_id, user_id, card):
+        """
+        检测用户群名片
+
+        Returns:
+            tuple: (结论, 应改成的群名片)，符合规则时为 (VERDICT_OK, None)
+        """
+        key = (group_id, user_id)
+        cached = self._verdicts.get(key)
+        rules = self.get_rules(group_id)
+        if cached is not None and cached[0] == card:
+            verdict = cached[1]
+            self._verdicts.move_to_end(key)
+        else:
+            verdict = self._evaluate(rules, user_id, card)
+            self._verdicts[key] = (card, verdict)
+            self._verdicts.move_to_end(key)
+            while len(self._verdicts) > self.max_entries:
+                self._verdicts.popitem(last=False)
+
+        if verdict == VERDICT_LOCK:
+            return verdict, rules.locks[user_id]
+        if verdict == VERDICT_REGEX:
+            return verdict, rules.default_name
+        return VERDICT_OK, None
+
+    @staticmethod
+    def _evaluate(rules, user_id, card):
+        # 1. 检查用户锁定昵称（优先级高）
+        lock_name = rules.locks.get(user_id)
+        if lock_name:
+            return VERDICT_OK if card == lock_name else VERDICT_LOCK
+        # 2. 检查群正则
+        if rules.regex is not None and not rules.regex.fullmatch(card):
+            return VERDICT_REGEX
+        return VERDICT_OK
+
+    def should_remind(self, group_id, user_id):
+        """检查提醒时间间隔，需要提醒时记录本次提醒时间"""
+        now = time.time()
+        key = (group_id, user_id)
+        last_remind = self._last_reminders.get(key)
+        if last_remind is not None and now - last_remind <= NICKNAME_REMINDER_INTERVAL_SECONDS:
+            return False
+        self._last_reminders[key] = now
+        self._last_reminders.move_to_end(key)
+        # 最早的记录已超过提醒间隔或超出容量时清除
+        while self._last_reminders and (
+            len(self._last_reminders) > self.max_entries
+            or now - next(iter(self._last_reminders.values()))
+            > NICKNAME_REMINDER_INTERVAL_SECONDS
+        ):
+            self._last_reminders.popitem(last=False)
+        return True
+
+
+# 全局群昵称检测缓存
+nickname_cache = NicknameCache()
@@ -0,0 +1,97 @@
+"""
+群昵称检测缓存测试程序
+在 app 目录下运行：python -m modules.GroupNickNameLock.test_nickname_cache
+"""
+
+import time
+from modules.GroupNickNameLock import NICKNAME_REMINDER_INTERVAL_SECONDS
+from modules.GroupNickNameLock.handlers.nickname_cache import (
+    NicknameCache,
+    GroupRules,
+    VERDICT_OK,
+    VERDICT_LOCK,
+    VERDICT_REGEX,
+)
+
+
+def build_cache(max_entries=100):
+    """群1001要求名片为“数字-名字”，用户2锁定为“锁定名”；直接放入规则，不访问数据库"""
+    cache = NicknameCache(max_entries=max_entries)
+    cache._rules["1001"] = GroupRules(r"\d+-.+", "默认名", {"2": "锁定名"})
+    return cache
+
+
+def test_check_verdicts():
+    """锁定昵称优先于群正则，不符合时给出应改成的群名片"""
+    cache = build_cache()
+    assert cache.check("1001", "1", "2024-张三") == (VERDICT_OK, None)
+    assert cache.check("1001", "1", "张三") == (VERDICT_REGEX, "默认名")
+    assert cache.check("1001", "2", "2024-李四") == (VERDICT_LOCK, "锁定名")
+    assert cache.check("1001", "2", "锁定名") == (VERDICT_OK, None)
+
+
+def test_verdict_reuse_and_invalidate():
+    """群名片不变时复用结论不再执行检测，群规则失效后重新检测"""
+    cache = build_cache()
+    evaluated = []
+
+    def counting_evaluate(rules, user_id, card):
+        evaluated.append(card)
+        return NicknameCache._evaluate(rules, user_id, card)
+
+    cache._evaluate = counting_evaluate
+    cache.check("1001", "1", "张三")
+    cache.check("1001", "1", "张三")
+    assert evaluated == ["张三"]
+    cache.check("1001", "1", "2024-张三")
+    assert evaluated == ["张三", "2024-张三"]
+
+    cache.invalidate_group("1001")
+    assert not cache._verdicts and "1001" not in cache._rules
+    cache._rules["1001"] = GroupRules(None, "", {})
+    assert cache.check("1001", "1", "张三") == (VERDICT_OK, None)
+    assert len(evaluated) == 3
+
+
+def test_verdict_lru_limit():
+    """结论数超过上限时淘汰最久未使用的条目"""
+    cache = build_cache(max_entries=2)
+    cache.check("1001", "1", "a")
+    cache.check("1001", "3", "b")
+    cache.check("1001", "1", "a")
+    cache.check("1001", "4", "c")
+    assert list(cache._verdicts) == [("1001", "1"), ("1001", "4")]
+
+
+def test_should_remind():
+    """提醒间隔内不重复提醒，过期的提醒记录被清除"""
+    cache = build_cache()
+    assert cache.should_remind("1001", "1")
+    assert not cache.should_remind("1001", "1")
+
+    expired_at = time.time() - NICKNAME_REMINDER_INTERVAL_SECONDS - 1
+    cache._last_reminders[("1001", "1")] = expired_at
+    cache._last_reminders.move_to_end(("1001", "1"), last=False)
+    cache._last_reminders[("1001", "9")] = expired_at
+    cache._last_reminders.move_to_end(("1001", "9"), last=False)
+    assert cache.should_remind("1001", "1")
+    assert ("1001", "9") not in cache._last_reminders
+    assert list(cache._last_reminders) == [("1001", "1")]
+
+
+def main():
+    """群昵称检测缓存测试程序"""
+    tests = [
+        test_check_verdicts,
+        test_verdict_reuse_and_invalidate,
+        test_verdict_lru_limit,
+        test_should_remind,
+    ]
+    for test in tests:
+        test()
+        print(f"{test.__doc__} ✅")
+    print(f"全部 {len(tests)} 项测试通过 🎉")
+
+
+if __name__ == "__main__":
+    main()
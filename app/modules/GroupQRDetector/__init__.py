@@ -14,14 +14,47 @@ MODULE_DESCRIPTION = "群二维码检测模块，支持检测群内图片或视
 DATA_DIR = os.path.join("data", MODULE_NAME)
 os.makedirs(DATA_DIR, exist_ok=True)
 
+# 二维码检测进程池大小，保留一个核心给事件循环和其他模块
+QR_PROCESS_POOL_SIZE = max(1, min(4, (os.cpu_count() or 2) - 1))
+
+# 检测结果缓存有效期，单位秒
+QR_CACHE_TTL = 7 * 24 * 60 * 60
+
+# 检测结果缓存最大条目数，超出后按最近命中时间淘汰
+QR_CACHE_MAX_ENTRIES = 20000
+
+# 进程内检测结果缓存条目数，命中时不再查询数据库
+QR_CACHE_MEMORY_ENTRIES = 1024
+
+# 缓存清理间隔，单位秒
+QR_CACHE_PRUNE_INTERVAL = 60 * 60
+
+# 图片下载大小上限，单位字节
+QR_MAX_IMAGE_BYTES = 10 * 1024 * 1024
+
+# 视频大小上限，单位字节，超过则不检测
+QR_MAX_VIDEO_BYTES = 200 * 1024 * 1024
+
+# 流式下载分块大小，单位字节
+QR_DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+# 下载超时时间，单位秒
+QR_DOWNLOAD_TIMEOUT = 30
+
+# 同时执行的检测任务数上限
+QR_MAX_IN_FLIGHT = QR_PROCESS_POOL_SIZE
+
+# 排队中的检测任务数上限，超出后丢弃新任务
+QR_MAX_QUEUED = 200
+
 
 # 模块的一些命令可以在这里定义，方便在其他地方调用，提高代码的复用率
 # ------------------------------------------------------------
 
-EXAMPLE_COMMAND = "示例命令"  # 示例命令
+QR_QUEUE_STATUS_COMMAND = "二维码队列"  # 查看检测队列状态命令
 
 COMMANDS = {
-    EXAMPLE_COMMAND: "示例命令，用法：示例命令",
+    QR_QUEUE_STATUS_COMMAND: f"查看二维码检测队列状态，仅系统管理员私聊可用，用法：{QR_QUEUE_STATUS_COMMAND}",
     # 可以继续添加其他命令
 }
 # ------------------------------------------------------------
@@ -5,15 +5,99 @@ import numpy as np
 import asyncio
 import platform
 import aiohttp
+import hashlib
+import time
+import urllib.parse
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from logger import logger
+from .. import (
+    QR_PROCESS_POOL_SIZE,
+    QR_CACHE_TTL,
+    QR_CACHE_MEMORY_ENTRIES,
+    QR_MAX_IMAGE_BYTES,
+    QR_MAX_VIDEO_BYTES,
+    QR_DOWNLOAD_CHUNK_SIZE,
+    QR_DOWNLOAD_TIMEOUT,
+)
+from ..handlers.data_manager import DataManager
+from .qr_stages import (
+    PYZBAR_AVAILABLE,
+    PYZBAR_ERROR,
+    QR_DETECT_STAGES,
+    run_detect_stage,
+    to_gray,
+)
+
+# 链接中随时间变化的参数，生成文件缓存键时忽略
+VOLATILE_URL_PARAMS = {"rkey", "client_ver", "client_type", "client_down_type"}
+
+# 二维码检测专用进程池，所有检测器实例共享，首次使用时创建
+_process_pool = None
+
+# 进程内检测结果缓存，cache_key -> 数据库中的检测结果，按最近命中顺序排列
+_memory_cache = OrderedDict()
+
+
+def _memory_get(cache_key):
+    """查询进程内缓存，过期时移除并返回None"""
+    verdict = _memory_cache.get(cache_key)
+    if verdict is None:
+        return None
+    if time.time() - verdict["created_at"] > QR_CACHE_TTL:
+        del _memory_cache[cache_key]
+        return None
+    _memory_cache.move_to_end(cache_key)
+    return verdict
+
+
+def _memory_set(cache_key, verdict):
+    """写入进程内缓存，超出容量时淘汰最久未命中的条目"""
+    _memory_cache[cache_key] = verdict
+    _memory_cache.move_to_end(cache_key)
+    while len(_memory_cache) > QR_CACHE_MEMORY_ENTRIES:
+        _memory_cache.popitem(last=False)
+
+
+def _get_mp_context():
+    """
+    获取进程池的启动方式
 
-try:
-    from pyzbar import pyzbar
+    进程池在其他线程（卡顿检测、分词线程、线程池）启动后才创建，fork 会复制整个父进程，
+    子进程可能继承被其他线程持有的锁而死锁，还会带上 jieba 等与检测无关的内存。
+    优先使用 forkserver：服务进程只预加载入口脚本（功能模块均为延迟导入，不会被带入）
+    和检测函数所在的 qr_stages（只依赖 cv2/numpy/pyzbar），子进程从这个干净的进程 fork；
+    不支持 forkserver 的平台使用 spawn。
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload(["__main__", run_detect_stage.__module__])
+        return context
+    return multiprocessing.get_context("spawn")
 
-    PYZBAR_AVAILABLE = True
-except ImportError as e:
-    PYZBAR_AVAILABLE = False
-    PYZBAR_ERROR = str(e)
+
+def _get_process_pool():
+    """获取二维码检测进程池，创建失败时返回None"""
+    global _process_pool
+    if _process_pool is None:
+        try:
+            _process_pool = ProcessPoolExecutor(
+                max_workers=QR_PROCESS_POOL_SIZE, mp_context=_get_mp_context()
+            )
+        except Exception as e:
+            logger.warning(f"创建二维码检测进程池失败，将使用线程池: {e}")
+            return None
+    return _process_pool
+
+
+def _reset_process_pool():
+    """丢弃已损坏的进程池，下次使用时重新创建"""
+    global _process_pool
+    pool, _process_pool = _process_pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
 
 
 class QRDetector:
@@ -98,182 +182,27 @@ class QRDetector:
             self.output_dir = os.getcwd()
             logger.info(f"使用当前目录作为输出目录：{self.output_dir}")
 
-    async def preprocess_image_for_qr(self, image):
-        """
-        对图像进行预处理以提高二维码检测率。
-
-        Args:
-            image: OpenCV图像对象
-
-        Returns:
-            list: 预处理后的图像列表
+    async def _run_in_pool(self, func, *args):
         """
-
-        def _process_image():
-            processed_images = []
-
-            # 1. 原始图像
-            processed_images.append(("original", image))
-
-            # 2. 转换为灰度图像
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-            processed_images.append(("gray", gray))
-
-            # 3. 直方图均衡化
-            equalized = cv2.equalizeHist(gray)
-            processed_images.append(("equalized", equalized))
-
-            # 4. 对比度限制的自适应直方图均衡化 (CLAHE)
-            clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
-            clahe_img = clahe.apply(gray)
-            processed_images.append(("clahe", clahe_img))
-
-            # 5. 高斯模糊后锐化
-            blurred = cv2.GaussianBlur(gray, (3, 3), 0)
-            sharpened = cv2.addWeighted(gray, 1.5, blurred, -0.5, 0)
-            processed_images.append(("sharpened", sharpened))
-
-            # 6. 自适应阈值处理
-            adaptive_thresh = cv2.adaptiveThreshold(
-                gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2
-            )
-            processed_images.append(("adaptive_thresh", adaptive_thresh))
-
-            # 7. Otsu阈值处理
-            _, otsu_thresh = cv2.threshold(
-                gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU
-            )
-            processed_images.append(("otsu_thresh", otsu_thresh))
-
-            # 8. 形态学操作
-            kernel = np.ones((2, 2), np.uint8)
-            morph = cv2.morphologyEx(gray, cv2.MORPH_CLOSE, kernel)
-            processed_images.append(("morphology", morph))
-
-            # 9. 不同尺寸的图像
-            height, width = gray.shape
-            # 放大图像
-            enlarged = cv2.resize(
-                gray, (width * 2, height * 2), interpolation=cv2.INTER_CUBIC
-            )
-            processed_images.append(("enlarged", enlarged))
-
-            # 缩小图像
-            if width > 400 and height > 400:
-                reduced = cv2.resize(
-                    gray, (width // 2, height // 2), interpolation=cv2.INTER_AREA
-                )
-                processed_images.append(("reduced", reduced))
-
-            # 10. 暗色模式处理：反转图像颜色
-            inverted = cv2.bitwise_not(gray)
-            processed_images.append(("inverted_for_dark_mode", inverted))
-
-            # 11. 暗色模式 + 对比度增强
-            inverted_clahe = clahe.apply(inverted)
-            processed_images.append(("inverted_clahe", inverted_clahe))
-
-            # 12. 暗色模式 + 自适应阈值
-            inverted_adaptive = cv2.adaptiveThreshold(
-                inverted, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2
-            )
-            processed_images.append(("inverted_adaptive", inverted_adaptive))
-
-            # 13. 暗色模式 + Otsu阈值
-            _, inverted_otsu = cv2.threshold(
-                inverted, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU
-            )
-            processed_images.append(("inverted_otsu", inverted_otsu))
-
-            return processed_images
-
-        return await asyncio.get_event_loop().run_in_executor(None, _process_image)
-
-    async def detect_qr_codes_pyzbar(self, image):
+        在二维码检测专用进程池中执行CPU密集任务，进程池不可用时回退到默认线程池。
         """
-        使用 pyzbar 检测二维码。
-
-        Args:
-            image: OpenCV图像对象
-
-        Returns:
-            list: 检测到的二维码信息列表
-        """
-        if not PYZBAR_AVAILABLE:
-            return []
-
-        def _detect():
-            qr_codes = pyzbar.decode(image)
-            results = []
-            for qr_code in qr_codes:
-                qr_data = qr_code.data.decode("utf-8")
-                qr_type = qr_code.type
-
-                points = qr_code.polygon
-                if len(points) == 4:
-                    pts = [(int(point.x), int(point.y)) for point in points]
-                else:
-                    x, y, w, h = qr_code.rect
-                    pts = [(x, y), (x + w, y), (x + w, y + h), (x, y + h)]
-
-                results.append(
-                    {
-                        "data": qr_data,
-                        "type": qr_type,
-                        "points": pts,
-                        "method": "pyzbar",
-                    }
-                )
-            return results
-
-        return await asyncio.get_event_loop().run_in_executor(None, _detect)
-
-    async def detect_qr_codes_opencv(self, image):
-        """
-        使用 OpenCV 检测二维码。
-
-        Args:
-            image: OpenCV图像对象
-
-        Returns:
-            list: 检测到的二维码信息列表
-        """
-        if not self.opencv_qr_available:
-            return []
-
-        def _detect():
-            results = []
-            if len(image.shape) == 3:
-                gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-            else:
-                gray = image
-
+        loop = asyncio.get_running_loop()
+        pool = _get_process_pool()
+        if pool is not None:
             try:
-                data, points, _ = self.qr_detector.detectAndDecode(gray)
-                if data:
-                    if points is not None and len(points) > 0:
-                        pts = [(int(point[0]), int(point[1])) for point in points[0]]
-                    else:
-                        pts = []
-
-                    results.append(
-                        {
-                            "data": data,
-                            "type": "QRCODE",
-                            "points": pts,
-                            "method": "opencv",
-                        }
-                    )
-            except Exception as e:
-                logger.error(f"OpenCV QR 检测出错: {e}")
-
-            return results
-
-        return await asyncio.get_event_loop().run_in_executor(None, _detect)
+                return await loop.run_in_executor(pool, func, *args)
+            except BrokenProcessPool as e:
+                logger.warning(f"二维码检测进程池已损坏，将重建: {e}")
+                _reset_process_pool()
+        return await loop.run_in_executor(None, func, *args)
 
     async def detect_qr_codes(self, image):
         """
-        检测图片中的二维码（增强版）。
+        分级检测图片中的二维码。
+
+        先在灰度图上直接解码，绝大多数清晰图片在这一步即可得出结果；
+        未命中时再把其余开销更大的预处理阶段并发提交到进程池，
+        任一阶段命中后立即取消尚未完成的阶段。
 
         Args:
             image: OpenCV图像对象
@@ -281,59 +210,146 @@ class QRDetector:
         Returns:
             list: 检测到的二维码信息列表
         """
-        all_results = []
-
-        # 获取预处理后的图像
-        processed_images = await self.preprocess_image_for_qr(image)
-
-        logger.info(f"正在使用 {len(processed_images)} 种预处理方法检测二维码...")
-
-        # 并发检测所有预处理后的图像
-        detection_tasks = []
-
-        for method_name, processed_img in processed_images:
-            # 使用 pyzbar 检测
-            if PYZBAR_AVAILABLE:
-                task = self._detect_with_method(processed_img, method_name, "pyzbar")
-                detection_tasks.append(task)
-
-            # 使用 OpenCV 检测
-            if self.opencv_qr_available:
-                task = self._detect_with_method(processed_img, method_name, "opencv")
-                detection_tasks.append(task)
+        use_pyzbar = PYZBAR_AVAILABLE
+        use_opencv = self.opencv_qr_available
+        if not use_pyzbar and not use_opencv:
+            return []
 
-        # 等待所有检测任务完成
-        if detection_tasks:
-            results_list = await asyncio.gather(*detection_tasks)
-            for results in results_list:
-                all_results.extend(results)
+        gray = to_gray(image)
+
+        # 第一阶段：直接解码灰度图
+        first_stage_name, first_variants = QR_DETECT_STAGES[0]
+        results = await self._run_in_pool(
+            run_detect_stage, gray, first_variants, use_pyzbar, use_opencv
+        )
+        if results:
+            return self._log_unique_results(results, first_stage_name)
+
+        # 后续阶段：按开销从低到高提交，先命中者胜出
+        pending = {}
+        for stage_name, variants in QR_DETECT_STAGES[1:]:
+            task = asyncio.ensure_future(
+                self._run_in_pool(
+                    run_detect_stage, gray, variants, use_pyzbar, use_opencv
+                )
+            )
+            pending[task] = stage_name
 
-        # 去重：基于二维码内容去重
+        try:
+            while pending:
+                done, _ = await asyncio.wait(
+                    pending.keys(), return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    stage_name = pending.pop(task)
+                    try:
+                        results = task.result()
+                    except Exception as e:
+                        logger.error(f"二维码检测阶段 {stage_name} 出错: {e}")
+                        continue
+                    if results:
+                        return self._log_unique_results(results, stage_name)
+        finally:
+            # 命中或出错时取消剩余阶段，未开始执行的任务不会再占用进程池
+            for task in pending:
+                task.cancel()
+
+        return []
+
+    def _log_unique_results(self, results, stage_name):
+        """基于二维码内容去重并记录日志"""
         unique_results = []
         seen_data = set()
 
-        for result in all_results:
+        for result in results:
             if result["data"] not in seen_data:
                 seen_data.add(result["data"])
                 unique_results.append(result)
                 logger.info(
-                    f"✅ 检测到二维码 (方法: {result['method']}, 预处理: {result['preprocess_method']})"
+                    f"✅ 检测到二维码 (方法: {result['method']}, 阶段: {stage_name}, 预处理: {result['preprocess_method']})"
                 )
                 logger.info(f"    内容: {result['data']}")
 
         return unique_results
 
-    async def _detect_with_method(self, image, method_name, detector_type):
-        """使用指定方法和预处理检测二维码的辅助函数"""
-        if detector_type == "pyzbar":
-            results = await self.detect_qr_codes_pyzbar(image)
-        else:
-            results = await self.detect_qr_codes_opencv(image)
+    def build_file_key(self, url, file_key=None):
+        """
+        生成与rkey无关的文件缓存键。
 
-        for result in results:
-            result["preprocess_method"] = method_name
+        优先使用 OneBot 消息中的 file 字段；没有时去掉链接中的 rkey 等
+        时效参数后取哈希，保证同一文件被多次转发时得到相同的键。
+        """
+        if file_key:
+            return f"file:{file_key}"
+        parsed = urllib.parse.urlsplit(url)
+        query = [
+            (key, value)
+            for key, value in urllib.parse.parse_qsl(parsed.query)
+            if key not in VOLATILE_URL_PARAMS
+        ]
+        stripped = f"{parsed.netloc}{parsed.path}?{urllib.parse.urlencode(sorted(query))}"
+        return f"url:{hashlib.sha1(stripped.encode('utf-8')).hexdigest()}"
+
+    @staticmethod
+    def _query_verdict(cache_key):
+        with DataManager() as dm:
+            return dm.get_verdict([cache_key], QR_CACHE_TTL)
+
+    @staticmethod
+    def _save_verdict(cache_key, media_type, has_qr_code, qr_data):
+        with DataManager() as dm:
+            dm.set_verdict([cache_key], media_type, has_qr_code, qr_data)
+
+    async def _lookup_cache(self, cache_key, media_type):
+        """
+        查询检测结果缓存，命中时返回与检测结果同结构的字典
 
-        return results
+        先查进程内缓存，未命中时在线程中查询数据库，不阻塞事件循环
+        """
+        verdict = _memory_get(cache_key)
+        if verdict is None:
+            try:
+                verdict = await asyncio.to_thread(self._query_verdict, cache_key)
+            except Exception as e:
+                logger.error(f"查询二维码检测缓存失败: {e}")
+                return None
+            if verdict is None:
+                return None
+            _memory_set(cache_key, verdict)
+
+        logger.info(f"命中二维码检测缓存: {cache_key}")
+        return {
+            "success": True,
+            "has_qr_code": verdict["has_qr_code"],
+            "qr_codes": [{"data": data} for data in verdict["qr_data"]],
+            "media_type": media_type,
+            "cached": True,
+        }
+
+    async def _store_cache(self, cache_key, result):
+        """缓存成功的检测结果"""
+        if not result.get("success"):
+            return
+        qr_data = [qr_code["data"] for qr_code in result["qr_codes"]]
+        _memory_set(
+            cache_key,
+            {
+                "media_type": result["media_type"],
+                "has_qr_code": result["has_qr_code"],
+                "qr_data": qr_data,
+                "created_at": int(time.time()),
+            },
+        )
+        try:
+            await asyncio.to_thread(
+                self._save_verdict,
+                cache_key,
+                result["media_type"],
+                result["has_qr_code"],
+                qr_data,
+            )
+        except Exception as e:
+            logger.error(f"写入二维码检测缓存失败: {e}")
 
     async def detect_image_from_url(self, image_url):
         """
@@ -348,41 +364,95 @@ class QRDetector:
         if not self._validate_url(image_url):
             return {"success": False, "error": "无效的图片URL"}
 
+        image_data, error = await self._download_to_buffer(
+            image_url, QR_MAX_IMAGE_BYTES
+        )
+        if error:
+            return {"success": False, "error": error}
+
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(image_url) as response:
-                    if response.status == 200:
-                        image_data = await response.read()
-                        # 将字节数据转换为numpy数组
-                        nparr = np.frombuffer(image_data, np.uint8)
-                        # 解码为OpenCV图像
-                        image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-
-                        if image is not None:
-                            qr_results = await self.detect_qr_codes(image)
-                            return {
-                                "success": True,
-                                "has_qr_code": len(qr_results) > 0,
-                                "qr_codes": qr_results,
-                                "media_type": "image",
-                            }
-                        else:
-                            return {"success": False, "error": "无法解码图片"}
-                    else:
-                        return {
-                            "success": False,
-                            "error": f"下载图片失败: {response.status}",
-                        }
+            # 直接在内存缓冲区上解码，不复制数据
+            nparr = np.frombuffer(memoryview(image_data), np.uint8)
+            image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
         except Exception as e:
             return {"success": False, "error": f"图片处理失败: {str(e)}"}
+        if image is None:
+            return {"success": False, "error": "无法解码图片"}
+
+        qr_results = await self.detect_qr_codes(image)
+        return {
+            "success": True,
+            "has_qr_code": len(qr_results) > 0,
+            "qr_codes": qr_results,
+            "media_type": "image",
+        }
+
+    async def _download_to_buffer(self, url, max_bytes):
+        """
+        流式下载到内存缓冲区，超过大小上限时立即中止。
+
+        Args:
+            url (str): 下载地址
+            max_bytes (int): 允许的最大字节数
+
+        Returns:
+            tuple: (bytearray或None, 错误信息或None)
+        """
+        timeout = aiohttp.ClientTimeout(total=QR_DOWNLOAD_TIMEOUT)
+        try:
+            async with aiohttp.ClientSession(timeout=timeout) as session:
+                async with session.get(url) as response:
+                    if response.status != 200:
+                        return None, f"下载失败: {response.status}"
+
+                    # 先根据Content-Length预检，超限的文件不下载
+                    if (
+                        response.content_length is not None
+                        and response.content_length > max_bytes
+                    ):
+                        return (
+                            None,
+                            f"文件过大: {response.content_length} 字节，上限 {max_bytes} 字节",
+                        )
+
+                    buffer = bytearray()
+                    async for chunk in response.content.iter_chunked(
+                        QR_DOWNLOAD_CHUNK_SIZE
+                    ):
+                        buffer.extend(chunk)
+                        if len(buffer) > max_bytes:
+                            return None, f"文件超过大小上限 {max_bytes} 字节，已中止下载"
+                    return buffer, None
+        except Exception as e:
+            return None, f"下载失败: {str(e)}"
 
-    async def detect_video_from_url(self, video_url, max_retries=3):
+    async def _get_remote_size(self, url):
+        """通过HEAD请求获取远程文件大小，获取失败时返回None"""
+        timeout = aiohttp.ClientTimeout(total=QR_DOWNLOAD_TIMEOUT)
+        try:
+            async with aiohttp.ClientSession(timeout=timeout) as session:
+                async with session.head(url, allow_redirects=True) as response:
+                    if response.status == 200:
+                        return response.content_length
+        except Exception as e:
+            logger.warning(f"获取远程文件大小失败: {e}")
+        return None
+
+    async def detect_video_from_url(
+        self, video_url, max_retries=3, file_key=None, file_size=None
+    ):
         """
         从视频URL检测二维码。
 
+        视频抽帧是随机的，帧哈希无法标识同一视频，因此只按文件键缓存。
+        视频只打开一次，通过定位直接读取抽样帧，由解码器按需发起范围请求，
+        不会下载整个文件。
+
         Args:
             video_url (str): 视频URL
-            max_retries (int): 最大重试次数
+            max_retries (int): 最大重试次数，即最多抽取的帧数
+            file_key (str, optional): OneBot消息中的file字段
+            file_size (int, optional): OneBot消息中的file_size字段
 
         Returns:
             dict: 检测结果
@@ -390,89 +460,105 @@ class QRDetector:
         if not self._validate_url(video_url):
             return {"success": False, "error": "无效的视频URL"}
 
-        # 获取视频信息
-        video_info = await self._get_video_info(video_url)
+        file_cache_key = self.build_file_key(video_url, file_key)
+        cached = await self._lookup_cache(file_cache_key, "video")
+        if cached:
+            return cached
+
+        # 大小预检，消息中未携带大小时再发HEAD请求
+        if file_size is None:
+            file_size = await self._get_remote_size(video_url)
+        if file_size is not None and file_size > QR_MAX_VIDEO_BYTES:
+            return {
+                "success": False,
+                "error": f"视频过大: {file_size} 字节，上限 {QR_MAX_VIDEO_BYTES} 字节",
+            }
+
+        loop = asyncio.get_running_loop()
+        video_info = await loop.run_in_executor(None, self._open_video, video_url)
         if not video_info["success"]:
             return video_info
 
-        # 尝试多次检测
-        for attempt in range(max_retries):
-            logger.info(f"🎯 第 {attempt + 1} 次尝试检测视频二维码...")
+        cap = video_info["cap"]
+        try:
+            frame_indices = self._sample_frame_indices(
+                video_info["total_frames"], max_retries
+            )
+            for attempt, frame_index in enumerate(frame_indices):
+                logger.info(f"🎯 第 {attempt + 1} 次尝试检测视频二维码...")
 
-            frame_result = await self._extract_single_frame(video_url, video_info)
-            if not frame_result["success"]:
-                continue
+                frame = await loop.run_in_executor(
+                    None, self._read_frame, cap, frame_index
+                )
+                if frame is None:
+                    logger.warning(f"无法读取帧 {frame_index}")
+                    continue
 
-            frame = frame_result["frame"]
-            qr_results = await self.detect_qr_codes(frame)
+                qr_results = await self.detect_qr_codes(frame)
 
-            if qr_results:
-                logger.info(
-                    f"✅ 第 {attempt + 1} 次尝试成功检测到 {len(qr_results)} 个二维码！"
-                )
-                return {
-                    "success": True,
-                    "has_qr_code": True,
-                    "qr_codes": qr_results,
-                    "media_type": "video",
-                    "attempt": attempt + 1,
-                    "frame_index": frame_result["frame_index"],
-                }
+                if qr_results:
+                    logger.info(
+                        f"✅ 第 {attempt + 1} 次尝试成功检测到 {len(qr_results)} 个二维码！"
+                    )
+                    result = {
+                        "success": True,
+                        "has_qr_code": True,
+                        "qr_codes": qr_results,
+                        "media_type": "video",
+                        "attempt": attempt + 1,
+                        "frame_index": frame_index,
+                    }
+                    await self._store_cache(file_cache_key, result)
+                    return result
+        finally:
+            await loop.run_in_executor(None, cap.release)
 
-        return {
+        result = {
             "success": True,
             "has_qr_code": False,
             "qr_codes": [],
             "media_type": "video",
             "message": f"经过 {max_retries} 次尝试，均未检测到二维码",
         }
+        await self._store_cache(file_cache_key, result)
+        return result
 
-    async def _get_video_info(self, video_url):
-        """获取视频基本信息"""
-
-        def _get_info():
-            cap = cv2.VideoCapture(video_url)
-            if not cap.isOpened():
-                return {"success": False, "error": "无法打开视频URL"}
+    def _open_video(self, video_url):
+        """打开视频并获取基本信息，成功时返回的字典中包含已打开的VideoCapture"""
+        cap = cv2.VideoCapture(video_url)
+        if not cap.isOpened():
+            return {"success": False, "error": "无法打开视频URL"}
 
-            total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-            fps = cap.get(cv2.CAP_PROP_FPS)
-            width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-            height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        if total_frames <= 0:
             cap.release()
+            return {"success": False, "error": "视频不包含任何帧"}
 
-            if total_frames == 0:
-                return {"success": False, "error": "视频不包含任何帧"}
-
-            return {
-                "success": True,
-                "total_frames": total_frames,
-                "video_info": {"fps": fps, "width": width, "height": height},
-            }
-
-        return await asyncio.get_event_loop().run_in_executor(None, _get_info)
-
-    async def _extract_single_frame(self, video_url, video_info):
-        """抽取单个随机帧"""
-
-        def _extract():
-            cap = cv2.VideoCapture(video_url)
-            if not cap.isOpened():
-                return {"success": False, "error": "无法打开视频URL"}
-
-            total_frames = video_info["total_frames"]
-            random_frame_index = random.randint(0, total_frames - 1)
-
-            cap.set(cv2.CAP_PROP_POS_FRAMES, random_frame_index)
-            ret, frame = cap.read()
-            cap.release()
-
-            if not ret:
-                return {"success": False, "error": f"无法读取帧 {random_frame_index}"}
-
-            return {"success": True, "frame": frame, "frame_index": random_frame_index}
+        return {
+            "success": True,
+            "cap": cap,
+            "total_frames": total_frames,
+            "video_info": {
+                "fps": cap.get(cv2.CAP_PROP_FPS),
+                "width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                "height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            },
+        }
 
-        return await asyncio.get_event_loop().run_in_executor(None, _extract)
+    def _sample_frame_indices(self, total_frames, count):
+        """将视频均分为count段，每段随机抽取一帧，保证抽样覆盖整个视频"""
+        count = max(1, min(count, total_frames))
+        segment = total_frames / count
+        return [
+            min(total_frames - 1, int(segment * i + random.random() * segment))
+            for i in range(count)
+        ]
+
+    def _read_frame(self, cap, frame_index):
+        """定位并读取指定帧，失败时返回None"""
+        cap.set(cv2.CAP_PROP_POS_FRAMES, frame_index)
+        ret, frame = cap.read()
+        return frame if ret else None
 
 
 async def main():
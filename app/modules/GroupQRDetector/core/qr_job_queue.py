@@ -0,0 +1,169 @@
+import asyncio
+import time
+from collections import OrderedDict, deque
+from logger import logger
+from .. import QR_MAX_IN_FLIGHT, QR_MAX_QUEUED
+
+
+class QRJobQueue:
+    """
+    二维码检测任务队列。
+
+    - 限制同时执行的检测任务数量，避免突发的大量图片/视频占满CPU
+    - 各群任务轮询出队，单个群刷屏不会拖慢其他群的检测
+    - 相同文件的任务在排队或执行期间只检测一次，结果共享给所有提交者
+    - 记录排队等待时间和处理时间
+    """
+
+    # 保留最近多少次任务的耗时用于计算分位数
+    SAMPLE_SIZE = 200
+
+    def __init__(self, max_in_flight, max_queued):
+        """
+        Args:
+            max_in_flight (int): 同时执行的最大任务数
+            max_queued (int): 排队中的最大任务数，超出后新任务直接拒绝
+        """
+        self.max_in_flight = max_in_flight
+        self.max_queued = max_queued
+        # group_id -> deque[job]，按轮询顺序排列
+        self._group_queues = OrderedDict()
+        # dedup_key -> Future，排队中和执行中的任务
+        self._pending = {}
+        self._queued = 0
+        self._in_flight = 0
+        self._ready = None
+        self._workers = []
+
+        self.submitted = 0
+        self.deduplicated = 0
+        self.rejected = 0
+        self.completed = 0
+        self.failed = 0
+        self.wait_times = deque(maxlen=self.SAMPLE_SIZE)
+        self.process_times = deque(maxlen=self.SAMPLE_SIZE)
+
+    def _ensure_workers(self):
+        """首次提交任务时在当前事件循环中启动工作协程"""
+        if self._ready is None:
+            self._ready = asyncio.Semaphore(0)
+        self._workers = [worker for worker in self._workers if not worker.done()]
+        while len(self._workers) < self.max_in_flight:
+            self._workers.append(asyncio.create_task(self._worker()))
+
+    async def submit(self, group_id, dedup_key, job_factory):
+        """
+        提交检测任务并等待结果
+
+        Args:
+            group_id (str): 群号，用于公平调度
+            dedup_key (str): 去重键，相同键的任务只执行一次
+            job_factory (callable): 无参函数，返回执行检测的协程
+
+        Returns:
+            dict: 检测结果，队列已满时返回失败结果
+        """
+        self.submitted += 1
+
+        existing = self._pending.get(dedup_key)
+        if existing is not None:
+            self.deduplicated += 1
+            logger.info(f"二维码检测任务已在队列中，共享结果: {dedup_key}")
+            return await asyncio.shield(existing)
+
+        if self._queued >= self.max_queued:
+            self.rejected += 1
+            logger.warning(f"二维码检测队列已满（{self._queued}），丢弃群 {group_id} 的任务")
+            return {"success": False, "error": "检测队列已满"}
+
+        self._ensure_workers()
+        future = asyncio.get_running_loop().create_future()
+        self._pending[dedup_key] = future
+        self._group_queues.setdefault(group_id, deque()).append(
+            (dedup_key, job_factory, future, time.monotonic())
+        )
+        self._queued += 1
+        self._ready.release()
+        return await asyncio.shield(future)
+
+    def _next_job(self):
+        """轮询各群队列取出下一个任务"""
+        group_id, queue = next(iter(self._group_queues.items()))
+        job = queue.popleft()
+        if queue:
+            self._group_queues.move_to_end(group_id)
+        else:
+            del self._group_queues[group_id]
+        self._queued -= 1
+        return job
+
+    async def _worker(self):
+        while True:
+            await self._ready.acquire()
+            dedup_key, job_factory, future, enqueued_at = self._next_job()
+
+            started_at = time.monotonic()
+            self.wait_times.append(started_at - enqueued_at)
+            self._in_flight += 1
+            # 任务被取消等 BaseException 也要通知提交者，否则提交者会一直等待
+            result = {"success": False, "error": "检测任务被中断"}
+            try:
+                result = await job_factory()
+                self.completed += 1
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"二维码检测任务执行失败: {e}")
+                result = {"success": False, "error": f"检测任务执行失败: {str(e)}"}
+            except BaseException:
+                self.failed += 1
+                raise
+            finally:
+                self._in_flight -= 1
+                self.process_times.append(time.monotonic() - started_at)
+                self._pending.pop(dedup_key, None)
+                if not future.done():
+                    future.set_result(result)
+
+    @staticmethod
+    def _percentile(samples, percent):
+        if not samples:
+            return 0.0
+        ordered = sorted(samples)
+        index = min(len(ordered) - 1, int(len(ordered) * percent / 100))
+        return ordered[index]
+
+    def get_metrics(self):
+        """获取队列统计信息"""
+        return {
+            "queued": self._queued,
+            "in_flight": self._in_flight,
+            "max_in_flight": self.max_in_flight,
+            "max_queued": self.max_queued,
+            "submitted": self.submitted,
+            "deduplicated": self.deduplicated,
+            "rejected": self.rejected,
+            "completed": self.completed,
+            "failed": self.failed,
+            "wait_p50": self._percentile(self.wait_times, 50),
+            "wait_p95": self._percentile(self.wait_times, 95),
+            "process_p50": self._percentile(self.process_times, 50),
+            "process_p95": self._percentile(self.process_times, 95),
+        }
+
+    def format_metrics(self):
+        """生成队列统计信息文本"""
+        metrics = self.get_metrics()
+        return (
+            f"二维码检测队列状态\n"
+            f"排队中：{metrics['queued']}/{metrics['max_queued']}\n"
+            f"执行中：{metrics['in_flight']}/{metrics['max_in_flight']}\n"
+            f"已提交：{metrics['submitted']}，去重：{metrics['deduplicated']}，"
+            f"拒绝：{metrics['rejected']}\n"
+            f"已完成：{metrics['completed']}，失败：{metrics['failed']}\n"
+            f"排队等待 p50/p95：{metrics['wait_p50']:.2f}s/{metrics['wait_p95']:.2f}s\n"
+            f"处理耗时 p50/p95：{metrics['process_p50']:.2f}s/{metrics['process_p95']:.2f}s"
+        )
+
+
+# 全局检测任务队列，所有群共享
+qr_job_queue = QRJobQueue(QR_MAX_IN_FLIGHT, QR_MAX_QUEUED)
@@ -0,0 +1,197 @@
+"""
+二维码检测的分级预处理与解码函数。
+
+本文件中的函数会被提交到独立的进程池中执行，因此只依赖 cv2/numpy/pyzbar，
+不引入 logger 等会在子进程中产生副作用的模块。
+"""
+
+import cv2
+import numpy as np
+
+try:
+    from pyzbar import pyzbar
+
+    PYZBAR_AVAILABLE = True
+    PYZBAR_ERROR = ""
+except ImportError as e:
+    PYZBAR_AVAILABLE = False
+    PYZBAR_ERROR = str(e)
+
+
+# 分级检测流水线，按开销从低到高排列
+# 格式: (阶段名, [该阶段依次尝试的预处理方法])
+QR_DETECT_STAGES = [
+    ("gray", ["gray"]),
+    ("enhanced", ["equalized", "clahe", "sharpened", "otsu_thresh"]),
+    ("binarized", ["adaptive_thresh", "morphology", "reduced"]),
+    (
+        "dark_mode",
+        [
+            "inverted_for_dark_mode",
+            "inverted_clahe",
+            "inverted_adaptive",
+            "inverted_otsu",
+        ],
+    ),
+    ("enlarged", ["enlarged"]),
+]
+
+# 每个进程各自持有一个 OpenCV 检测器，避免跨进程传递不可序列化对象
+_opencv_detector = None
+
+
+def _get_opencv_detector():
+    global _opencv_detector
+    if _opencv_detector is None:
+        _opencv_detector = cv2.QRCodeDetector()
+    return _opencv_detector
+
+
+def to_gray(image):
+    """将图像转换为灰度图，已是灰度图则原样返回"""
+    if len(image.shape) == 3:
+        return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    return image
+
+
+def _build_variant(name, gray, cache):
+    """
+    按名称生成预处理图像，中间结果保存在 cache 中供同一阶段复用。
+
+    Returns:
+        预处理后的图像，不适用时返回 None
+    """
+    if name == "gray":
+        return gray
+
+    if "clahe" not in cache:
+        cache["clahe"] = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
+    clahe = cache["clahe"]
+
+    if name.startswith("inverted") and "inverted" not in cache:
+        cache["inverted"] = cv2.bitwise_not(gray)
+
+    if name == "equalized":
+        return cv2.equalizeHist(gray)
+    if name == "clahe":
+        return clahe.apply(gray)
+    if name == "sharpened":
+        blurred = cv2.GaussianBlur(gray, (3, 3), 0)
+        return cv2.addWeighted(gray, 1.5, blurred, -0.5, 0)
+    if name == "adaptive_thresh":
+        return cv2.adaptiveThreshold(
+            gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2
+        )
+    if name == "otsu_thresh":
+        _, otsu = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        return otsu
+    if name == "morphology":
+        kernel = np.ones((2, 2), np.uint8)
+        return cv2.morphologyEx(gray, cv2.MORPH_CLOSE, kernel)
+    if name == "reduced":
+        height, width = gray.shape
+        if width > 400 and height > 400:
+            return cv2.resize(
+                gray, (width // 2, height // 2), interpolation=cv2.INTER_AREA
+            )
+        return None
+    if name == "enlarged":
+        height, width = gray.shape
+        return cv2.resize(
+            gray, (width * 2, height * 2), interpolation=cv2.INTER_CUBIC
+        )
+    if name == "inverted_for_dark_mode":
+        return cache["inverted"]
+    if name == "inverted_clahe":
+        return clahe.apply(cache["inverted"])
+    if name == "inverted_adaptive":
+        return cv2.adaptiveThreshold(
+            cache["inverted"],
+            255,
+            cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+            cv2.THRESH_BINARY,
+            11,
+            2,
+        )
+    if name == "inverted_otsu":
+        _, inverted_otsu = cv2.threshold(
+            cache["inverted"], 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU
+        )
+        return inverted_otsu
+    return None
+
+
+def decode_pyzbar(image):
+    """使用 pyzbar 解码二维码"""
+    if not PYZBAR_AVAILABLE:
+        return []
+
+    results = []
+    for qr_code in pyzbar.decode(image):
+        points = qr_code.polygon
+        if len(points) == 4:
+            pts = [(int(point.x), int(point.y)) for point in points]
+        else:
+            x, y, w, h = qr_code.rect
+            pts = [(x, y), (x + w, y), (x + w, y + h), (x, y + h)]
+
+        results.append(
+            {
+                "data": qr_code.data.decode("utf-8", errors="replace"),
+                "type": qr_code.type,
+                "points": pts,
+                "method": "pyzbar",
+            }
+        )
+    return results
+
+
+def decode_opencv(image):
+    """使用 OpenCV 解码二维码"""
+    try:
+        data, points, _ = _get_opencv_detector().detectAndDecode(image)
+    except Exception:
+        return []
+
+    if not data:
+        return []
+
+    if points is not None and len(points) > 0:
+        pts = [(int(point[0]), int(point[1])) for point in points[0]]
+    else:
+        pts = []
+    return [{"data": data, "type": "QRCODE", "points": pts, "method": "opencv"}]
+
+
+def run_detect_stage(gray, variant_names, use_pyzbar=True, use_opencv=True):
+    """
+    在单个阶段内依次尝试各预处理方法，命中即返回。
+
+    pyzbar 比 OpenCV 快得多，因此每种预处理先用 pyzbar 解码，
+    未命中时才交给 OpenCV。
+
+    Args:
+        gray: 灰度图像
+        variant_names (list): 本阶段的预处理方法名
+        use_pyzbar (bool): 是否使用 pyzbar
+        use_opencv (bool): 是否使用 OpenCV
+
+    Returns:
+        list: 检测到的二维码信息列表，未检测到时为空列表
+    """
+    cache = {}
+    for variant_name in variant_names:
+        variant = _build_variant(variant_name, gray, cache)
+        if variant is None:
+            continue
+
+        results = decode_pyzbar(variant) if use_pyzbar else []
+        if not results and use_opencv:
+            results = decode_opencv(variant)
+
+        if results:
+            for result in results:
+                result["preprocess_method"] = variant_name
+            return results
+    return []
+
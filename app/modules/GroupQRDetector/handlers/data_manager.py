@@ -1,5 +1,7 @@
 import sqlite3
 import os
+import json
+import time
 from .. import MODULE_NAME
 
 
@@ -13,8 +15,32 @@ class DataManager:
         self._create_table()
 
     def _create_table(self):
-        """建表函数，如果表不存在则创建"""
-        self.cursor.execute("""CREATE TABLE IF NOT EXISTS""")
+        """
+        建表函数，如果表不存在则创建
+        qr_cache 检测结果缓存表
+            cache_key: 缓存键，file:文件ID / url:去掉rkey的链接哈希
+            media_type: 媒体类型 image / video
+            has_qr_code: 是否包含二维码
+            qr_data: 检测到的二维码内容，JSON列表
+            created_at: 写入时间戳
+            last_hit_at: 最近命中时间戳，用于LRU淘汰
+        """
+        self.cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS qr_cache (
+                cache_key TEXT PRIMARY KEY,
+                media_type TEXT,
+                has_qr_code INTEGER,
+                qr_data TEXT,
+                created_at INTEGER,
+                last_hit_at INTEGER
+            )
+            """
+        )
+        self.cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_qr_cache_last_hit ON qr_cache (last_hit_at)"
+        )
+        self.conn.commit()
 
     def __enter__(self):
         return self
@@ -22,11 +48,81 @@ class DataManager:
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.conn.close()
 
-    # 其他函数，可直接使用,在with语句块中使用
-    def add_data(self, data):
-        self.cursor.execute("INSERT INTO data_table (data) VALUES (?)", (data,))
+    def get_verdict(self, cache_keys, ttl):
+        """
+        按顺序查找缓存键，返回第一个未过期的检测结果并刷新其命中时间
+
+        Args:
+            cache_keys (list): 候选缓存键
+            ttl (int): 缓存有效期，单位秒
+
+        Returns:
+            dict: {"media_type", "has_qr_code", "qr_data", "created_at"}，未命中返回None
+        """
+        now = int(time.time())
+        for cache_key in cache_keys:
+            if not cache_key:
+                continue
+            self.cursor.execute(
+                "SELECT media_type, has_qr_code, qr_data, created_at FROM qr_cache WHERE cache_key = ?",
+                (cache_key,),
+            )
+            row = self.cursor.fetchone()
+            if not row or now - row[3] > ttl:
+                continue
+            self.cursor.execute(
+                "UPDATE qr_cache SET last_hit_at = ? WHERE cache_key = ?",
+                (now, cache_key),
+            )
+            self.conn.commit()
+            return {
+                "media_type": row[0],
+                "has_qr_code": bool(row[1]),
+                "qr_data": json.loads(row[2] or "[]"),
+                "created_at": row[3],
+            }
+        return None
+
+    def set_verdict(self, cache_keys, media_type, has_qr_code, qr_data):
+        """
+        将同一份检测结果写入所有缓存键
+
+        Args:
+            cache_keys (list): 缓存键
+            media_type (str): 媒体类型
+            has_qr_code (bool): 是否包含二维码
+            qr_data (list): 二维码内容列表
+        """
+        now = int(time.time())
+        qr_data_json = json.dumps(qr_data, ensure_ascii=False)
+        self.cursor.executemany(
+            "REPLACE INTO qr_cache (cache_key, media_type, has_qr_code, qr_data, created_at, last_hit_at) VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (cache_key, media_type, int(has_qr_code), qr_data_json, now, now)
+                for cache_key in cache_keys
+                if cache_key
+            ],
+        )
         self.conn.commit()
 
-    def get_data(self):
-        self.cursor.execute("SELECT data FROM data_table")
-        return self.cursor.fetchall()
+    def prune(self, ttl, max_entries):
+        """
+        清理过期缓存，并按最近命中时间淘汰超出容量的部分
+
+        Returns:
+            int: 删除的行数
+        """
+        now = int(time.time())
+        self.cursor.execute("DELETE FROM qr_cache WHERE created_at < ?", (now - ttl,))
+        deleted = self.cursor.rowcount
+        self.cursor.execute(
+            """
+            DELETE FROM qr_cache WHERE cache_key IN (
+                SELECT cache_key FROM qr_cache ORDER BY last_hit_at DESC LIMIT -1 OFFSET ?
+            )
+            """,
+            (max_entries,),
+        )
+        deleted += self.cursor.rowcount
+        self.conn.commit()
+        return deleted
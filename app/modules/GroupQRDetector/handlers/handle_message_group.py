@@ -1,6 +1,7 @@
 from .. import MODULE_NAME, SWITCH_NAME
 from core.menu_manager import MENU_COMMAND
 import logger
+from core.event import as_event
 from core.switchs import is_group_switch_on, handle_module_group_switch
 from utils.auth import is_system_admin, is_group_admin
 from api.message import send_group_msg, delete_msg, send_private_msg
@@ -10,9 +11,9 @@ from utils.generate import (
     generate_reply_message,
     generate_at_message,
 )
-from datetime import datetime
 from core.menu_manager import MenuManager
 from ..core.qr_detector import QRDetector
+from ..core.qr_job_queue import qr_job_queue
 import re
 import html
 import urllib.parse
@@ -26,21 +27,22 @@ class GroupMessageHandler:
     def __init__(self, websocket, msg):
         self.websocket = websocket
         self.msg = msg
-        self.time = msg.get("time", "")
-        self.formatted_time = datetime.fromtimestamp(self.time).strftime(
-            "%Y-%m-%d %H:%M:%S"
-        )
-        self.sub_type = msg.get("sub_type", "")
-        self.group_id = str(msg.get("group_id", ""))
-        self.message_id = str(msg.get("message_id", ""))
-        self.user_id = str(msg.get("user_id", ""))
-        self.message = msg.get("message", {})
-        self.raw_message = msg.get("raw_message", "")
-        self.sender = msg.get("sender", {})
-        self.nickname = self.sender.get("nickname", "")
-        self.card = self.sender.get("card", "")
-        self.role = self.sender.get("role", "")
+        event = as_event(msg)
+        self.time = event.time
+        self.formatted_time = event.formatted_time
+        self.sub_type = event.sub_type
+        self.group_id = event.group_id
+        self.message_id = event.message_id
+        self.user_id = event.user_id
+        self.message = event.message
+        self.raw_message = event.raw_message
+        self.sender = event.sender
+        self.nickname = event.nickname
+        self.card = event.card
+        self.role = event.role
         self.url = ""
+        self.file_key = ""
+        self.file_size = None
         # 初始化二维码检测器
         self.qr_detector = QRDetector()
 
@@ -96,9 +98,15 @@ class GroupMessageHandler:
 
         logger.info(f"[{MODULE_NAME}]{media_type}链接: {url}")
 
-        # 根据媒体类型调用相应的检测方法
+        # 根据媒体类型调用相应的检测方法，经由队列限流、公平调度和去重
         if media_type == "video":
-            result = await self.qr_detector.detect_video_from_url(url)
+            result = await qr_job_queue.submit(
+                self.group_id,
+                self.qr_detector.build_file_key(url, self.file_key),
+                lambda: self.qr_detector.detect_video_from_url(
+                    url, file_key=self.file_key, file_size=self.file_size
+                ),
+            )
         else:
             return
 
@@ -120,6 +128,12 @@ class GroupMessageHandler:
             if match:
                 url = self._decode_url(match.group(1))
                 self.url = url
+                file_match = re.search(r"file=([^,\]]+)", self.raw_message)
+                if file_match:
+                    self.file_key = file_match.group(1)
+                size_match = re.search(r"file_size=(\d+)", self.raw_message)
+                if size_match:
+                    self.file_size = int(size_match.group(1))
                 return "video", url
 
         return None, None
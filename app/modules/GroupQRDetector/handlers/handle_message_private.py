@@ -1,13 +1,14 @@
-from .. import MODULE_NAME, SWITCH_NAME
+from .. import MODULE_NAME, SWITCH_NAME, QR_QUEUE_STATUS_COMMAND
 from core.menu_manager import MENU_COMMAND
 import logger
+from core.event import as_event
 from core.switchs import is_private_switch_on, handle_module_private_switch
 from api.message import send_private_msg
 from utils.generate import generate_text_message, generate_reply_message
-from datetime import datetime
 from .data_manager import DataManager
 from utils.auth import is_system_admin
 from core.menu_manager import MenuManager
+from ..core.qr_job_queue import qr_job_queue
 
 
 class PrivateMessageHandler:
@@ -16,17 +17,16 @@ class PrivateMessageHandler:
     def __init__(self, websocket, msg):
         self.websocket = websocket
         self.msg = msg
-        self.time = msg.get("time", "")
-        self.formatted_time = datetime.fromtimestamp(self.time).strftime(
-            "%Y-%m-%d %H:%M:%S"
-        )  # 格式化时间
-        self.sub_type = msg.get("sub_type", "")  # 子类型,friend/group
-        self.user_id = str(msg.get("user_id", ""))  # 发送者QQ号
-        self.message_id = str(msg.get("message_id", ""))  # 消息ID
-        self.message = msg.get("message", {})  # 消息段数组
-        self.raw_message = msg.get("raw_message", "")  # 原始消息
-        self.sender = msg.get("sender", {})  # 发送者信息
-        self.nickname = self.sender.get("nickname", "")  # 昵称
+        event = as_event(msg)
+        self.time = event.time
+        self.formatted_time = event.formatted_time  # 格式化时间
+        self.sub_type = event.sub_type  # 子类型,friend/group
+        self.user_id = event.user_id  # 发送者QQ号
+        self.message_id = event.message_id  # 消息ID
+        self.message = event.message  # 消息段数组
+        self.raw_message = event.raw_message  # 原始消息
+        self.sender = event.sender  # 发送者信息
+        self.nickname = event.nickname  # 昵称
 
     async def _handle_switch_command(self):
         """
@@ -63,6 +63,24 @@ class PrivateMessageHandler:
             return True
         return False
 
+    async def _handle_queue_status_command(self):
+        """
+        处理查看检测队列状态命令（仅系统管理员，无视开关状态）
+        """
+        if self.raw_message == QR_QUEUE_STATUS_COMMAND and is_system_admin(
+            self.user_id
+        ):
+            await send_private_msg(
+                self.websocket,
+                self.user_id,
+                [
+                    generate_reply_message(self.message_id),
+                    generate_text_message(qr_job_queue.format_metrics()),
+                ],
+            )
+            return True
+        return False
+
     async def handle(self):
         """
         处理私聊消息
@@ -76,6 +94,10 @@ class PrivateMessageHandler:
             if await self._handle_menu_command():
                 return
 
+            # 处理检测队列状态命令（无视开关状态）
+            if await self._handle_queue_status_command():
+                return
+
             # 如果没开启私聊开关，则不处理
             if not is_private_switch_on(MODULE_NAME):
                 return
@@ -1,6 +1,11 @@
-from .. import MODULE_NAME
+from .. import MODULE_NAME, QR_CACHE_TTL, QR_CACHE_MAX_ENTRIES, QR_CACHE_PRUNE_INTERVAL
 import logger
+import time
 from datetime import datetime
+from .data_manager import DataManager
+
+# 上次清理检测结果缓存的时间
+last_prune_time = 0
 
 
 class MetaEventHandler:
@@ -49,7 +54,14 @@ class MetaEventHandler:
         """
         处理心跳
         """
+        global last_prune_time
         try:
-            pass
+            current_time = int(time.time())
+            if current_time - last_prune_time >= QR_CACHE_PRUNE_INTERVAL:
+                last_prune_time = current_time
+                with DataManager() as dm:
+                    deleted = dm.prune(QR_CACHE_TTL, QR_CACHE_MAX_ENTRIES)
+                if deleted:
+                    logger.info(f"[{MODULE_NAME}]已清理 {deleted} 条二维码检测缓存")
         except Exception as e:
             logger.error(f"[{MODULE_NAME}]处理心跳失败: {e}")
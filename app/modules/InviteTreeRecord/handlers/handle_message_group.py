@@ -7,14 +7,14 @@ from .. import (
 )
 from core.menu_manager import MENU_COMMAND
 import logger
+from core.event import as_event
 from core.switchs import is_group_switch_on, handle_module_group_switch
 from api.message import send_group_msg, send_private_msg
 from utils.generate import generate_reply_message, generate_text_message
-from api.group import set_group_kick, set_group_ban_multiple
-from datetime import datetime
+from api.group import set_group_ban_multiple
+from core.moderation import moderation_executor, kick_action
 from .data_manager import InviteTreeRecordDataManager
 import re
-import asyncio
 from core.menu_manager import MenuManager
 from utils.auth import is_group_admin, is_system_admin
 from config import OWNER_ID
@@ -26,20 +26,19 @@ class GroupMessageHandler:
     def __init__(self, websocket, msg):
         self.websocket = websocket
         self.msg = msg
-        self.time = msg.get("time", "")
-        self.formatted_time = datetime.fromtimestamp(self.time).strftime(
-            "%Y-%m-%d %H:%M:%S"
-        )  # 格式化时间
-        self.sub_type = msg.get("sub_type", "")  # 子类型，只有normal
-        self.group_id = str(msg.get("group_id", ""))  # 群号
-        self.message_id = str(msg.get("message_id", ""))  # 消息ID
-        self.user_id = str(msg.get("user_id", ""))  # 发送者QQ号
-        self.message = msg.get("message", {})  # 消息段数组
-        self.raw_message = msg.get("raw_message", "")  # 原始消息
-        self.sender = msg.get("sender", {})  # 发送者信息
-        self.nickname = self.sender.get("nickname", "")  # 昵称
-        self.card = self.sender.get("card", "")  # 群名片
-        self.role = self.sender.get("role", "")  # 群身份
+        event = as_event(msg)
+        self.time = event.time
+        self.formatted_time = event.formatted_time  # 格式化时间
+        self.sub_type = event.sub_type  # 子类型，只有normal
+        self.group_id = event.group_id  # 群号
+        self.message_id = event.message_id  # 消息ID
+        self.user_id = event.user_id  # 发送者QQ号
+        self.message = event.message  # 消息段数组
+        self.raw_message = event.raw_message  # 原始消息
+        self.sender = event.sender  # 发送者信息
+        self.nickname = event.nickname  # 昵称
+        self.card = event.card  # 群名片
+        self.role = event.role  # 群身份
 
     def _check_admin_permission(self):
         """检查管理员权限"""
@@ -177,21 +176,15 @@ class GroupMessageHandler:
         return True
 
     async def _execute_kick_users(self, related_users, invite_tree_record):
-        """执行踢出用户操作"""
-        tasks = []
+        """执行踢出用户操作，由群管执行器合并为批量请求并限流"""
         for user_id in related_users:
-            # 创建踢出用户的协程任务
-            tasks.append(
-                asyncio.create_task(
-                    set_group_kick(self.websocket, self.group_id, user_id)
-                )
-            )
             # 删除该用户的所有相关邀请记录
             invite_tree_record.delete_all_invite_records_by_user_id(user_id)
-            await asyncio.sleep(0.05)  # 等待0.05秒，交出控制权
 
-        # 等待所有任务完成
-        await asyncio.gather(*tasks)
+        await moderation_executor.execute(
+            self.websocket,
+            [kick_action(self.group_id, user_id) for user_id in related_users],
+        )
 
     async def _send_kick_success_message(self, related_users):
         """发送踢出成功消息和日志"""
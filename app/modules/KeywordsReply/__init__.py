@@ -8,7 +8,7 @@ MODULE_NAME = "KeywordsReply"
 SWITCH_NAME = "kr"
 
 # 模块描述
-MODULE_DESCRIPTION = "关键词回复模块，完全匹配，只回复内容，不会回复其他多余文字，是 FAQ 系统的补充，不设置权限，任何人都可以添加关键词回复，但只有管理员可以删除关键词回复"
+MODULE_DESCRIPTION = "关键词回复模块，支持完全匹配、前缀匹配和包含匹配，只回复内容，不会回复其他多余文字，是 FAQ 系统的补充，任何人都可以添加完全匹配的关键词回复，前缀匹配和包含匹配的关键词只有管理员可以添加，只有管理员可以删除关键词回复"
 
 # 数据目录
 DATA_DIR = os.path.join("data", MODULE_NAME)
@@ -20,13 +20,20 @@ os.makedirs(DATA_DIR, exist_ok=True)
 
 
 ADD_COMMAND = "添加关键词"  # 添加关键词回复
+ADD_PREFIX_COMMAND = "添加前缀关键词"  # 添加前缀匹配的关键词回复
+ADD_CONTAINS_COMMAND = "添加包含关键词"  # 添加包含匹配的关键词回复
 DELETE_COMMAND = "删除关键词"  # 删除关键词回复
 LIST_COMMAND = "查看关键词"  # 查看关键词回复
 CLEAR_COMMAND = "清空关键词"  # 清空关键词回复
 
+# 前缀匹配、包含匹配关键词的最小长度，过短的关键词几乎每条消息都会命中
+MATCH_KEYWORD_MIN_LENGTH = 2
+
 
 COMMANDS = {
     ADD_COMMAND: "添加关键词回复，用法：添加关键词 关键词 回复内容",
+    ADD_PREFIX_COMMAND: "添加前缀匹配的关键词回复，消息以关键词开头即回复，仅管理员可用，用法：添加前缀关键词 关键词 回复内容",
+    ADD_CONTAINS_COMMAND: "添加包含匹配的关键词回复，消息中包含关键词即回复，仅管理员可用，用法：添加包含关键词 关键词 回复内容",
     DELETE_COMMAND: "删除关键词回复，用法：删除关键词 关键词",
     LIST_COMMAND: "查看关键词回复，用法：查看关键词",
     CLEAR_COMMAND: "清空关键词回复，用法：清空关键词",
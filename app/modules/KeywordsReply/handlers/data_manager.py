@@ -28,10 +28,19 @@ class DataManager:
                 reply TEXT NOT NULL,
                 adder_qq TEXT,
                 add_time TEXT,
+                match_type TEXT NOT NULL DEFAULT 'exact',
                 PRIMARY KEY (group_id, keyword)
             )
             """
         )
+        # 升级已有表结构（兼容没有 match_type 列的旧表）
+        self.cursor.execute("PRAGMA table_info(keywords_reply)")
+        columns = [column[1] for column in self.cursor.fetchall()]
+        if "match_type" not in columns:
+            self.cursor.execute(
+                "ALTER TABLE keywords_reply ADD COLUMN match_type TEXT NOT NULL DEFAULT 'exact'"
+            )
+            logger.info(f"[{MODULE_NAME}]已为关键词表添加 match_type 列")
         self.conn.commit()
 
     def __enter__(self):
@@ -46,7 +55,9 @@ class DataManager:
         """
         self.conn.close()
 
-    def add_keyword(self, group_id, keyword, reply, adder_qq, add_time):
+    def add_keyword(
+        self, group_id, keyword, reply, adder_qq, add_time, match_type="exact"
+    ):
         """
         添加或更新关键词及回复内容，若关键词已存在则覆盖。
 
@@ -56,10 +67,11 @@ class DataManager:
             reply (str): 回复内容
             adder_qq (str): 添加者QQ号
             add_time (str): 添加时间
+            match_type (str): 匹配方式，exact/prefix/contains
         """
         self.cursor.execute(
-            "REPLACE INTO keywords_reply (group_id, keyword, reply, adder_qq, add_time) VALUES (?, ?, ?, ?, ?)",
-            (group_id, keyword, reply, adder_qq, add_time),
+            "REPLACE INTO keywords_reply (group_id, keyword, reply, adder_qq, add_time, match_type) VALUES (?, ?, ?, ?, ?, ?)",
+            (group_id, keyword, reply, adder_qq, add_time, match_type),
         )
         self.conn.commit()
         logger.info(
@@ -139,3 +151,15 @@ class DataManager:
             f"[{MODULE_NAME}] 查询群号为「{group_id}」的所有关键词，共{len(keywords)}个。"
         )
         return keywords
+
+    def get_all_rules(self):
+        """
+        获取所有群的关键词规则，用于加载内存关键词表
+
+        返回:
+            list[tuple]: [(group_id, keyword, reply, match_type), ...]
+        """
+        self.cursor.execute(
+            "SELECT group_id, keyword, reply, match_type FROM keywords_reply"
+        )
+        return self.cursor.fetchall()
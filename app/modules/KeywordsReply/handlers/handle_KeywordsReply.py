@@ -1,9 +1,15 @@
 from .data_manager import DataManager
+from .keyword_index import (
+    keyword_index,
+    MATCH_EXACT,
+    MATCH_TYPE_NAMES,
+)
 import logger
 from .. import (
     MODULE_NAME,
     ADD_COMMAND,
     DELETE_COMMAND,
+    MATCH_KEYWORD_MIN_LENGTH,
 )
 from api.message import send_group_msg_with_cq, send_group_msg
 from utils.generate import generate_reply_message, generate_text_message
@@ -37,22 +43,44 @@ class HandleKeywordsReply:
             "%Y-%m-%d %H:%M:%S"
         )  # 格式化时间
 
-    async def handle_add_keyword(self):
+    async def handle_add_keyword(self, command=ADD_COMMAND, match_type=MATCH_EXACT):
         """
         处理添加关键词回复的命令
         解析消息内容，提取关键词和回复内容，写入数据库，并反馈操作结果
         用法：添加关键词 关键词 回复内容
+
+        :param command: 触发的添加命令
+        :param match_type: 匹配方式，exact/prefix/contains
         """
         try:
             # 第一部分是命令标记，第二部分是关键词，剩下的全是回复内容
-            content = self.raw_message.lstrip(f"{ADD_COMMAND}").strip()
+            content = self.raw_message[len(command) :].strip()
             parts = content.split(" ", 1)
             keyword = parts[0].strip()
             reply = parts[1].strip()
+            if match_type != MATCH_EXACT and len(keyword) < MATCH_KEYWORD_MIN_LENGTH:
+                await send_group_msg(
+                    self.websocket,
+                    self.group_id,
+                    [
+                        generate_reply_message(self.message_id),
+                        generate_text_message(
+                            f"❌ {MATCH_TYPE_NAMES[match_type]}的关键词至少需要 {MATCH_KEYWORD_MIN_LENGTH} 个字符"
+                        ),
+                    ],
+                    note="del_msg=15",
+                )
+                return
             with DataManager() as dm:
                 dm.add_keyword(
-                    self.group_id, keyword, reply, self.user_id, self.formatted_time
+                    self.group_id,
+                    keyword,
+                    reply,
+                    self.user_id,
+                    self.formatted_time,
+                    match_type,
                 )
+            keyword_index.set(self.group_id, keyword, reply, match_type)
             await send_group_msg(
                 self.websocket,
                 self.group_id,
@@ -60,6 +88,7 @@ class HandleKeywordsReply:
                     generate_reply_message(self.message_id),
                     generate_text_message(
                         f"✅ 添加关键词「{keyword}」成功！\n"
+                        f"匹配方式：{MATCH_TYPE_NAMES[match_type]}\n"
                         f"添加者：{self.user_id}\n"
                         f"添加时间：{self.formatted_time}\n"
                         f"💬 回复内容：{reply}"
@@ -77,12 +106,11 @@ class HandleKeywordsReply:
         先检查是否有这个关键词
         """
         try:
-            content = self.raw_message.lstrip(f"{DELETE_COMMAND}").strip()
+            content = self.raw_message[len(DELETE_COMMAND) :].strip()
             keyword = content.strip()
             with DataManager() as dm:
                 # 先检查关键词是否存在
-                reply = dm.get_reply(self.group_id, keyword)
-                if reply is None:
+                if keyword_index.get_rule(self.group_id, keyword) is None:
                     await send_group_msg(
                         self.websocket,
                         self.group_id,
@@ -96,6 +124,7 @@ class HandleKeywordsReply:
                     )
                     return
                 dm.delete_keyword(self.group_id, keyword)
+            keyword_index.remove(self.group_id, keyword)
             await send_group_msg(
                 self.websocket,
                 self.group_id,
@@ -134,7 +163,9 @@ class HandleKeywordsReply:
                             generate_reply_message(self.message_id),
                             generate_text_message(
                                 f"当前群共有{len(keywords)}个关键词回复：\n"
-                                + "\n".join(f"🔑 {keyword}" for keyword in keywords)
+                                + "\n".join(
+                                    self._format_keyword(keyword) for keyword in keywords
+                                )
                             ),
                         ],
                         note="del_msg=15",
@@ -142,6 +173,13 @@ class HandleKeywordsReply:
         except Exception as e:
             logger.error(f"[{MODULE_NAME}] 查看关键词失败: {e}")
 
+    def _format_keyword(self, keyword):
+        """生成关键词列表中的一行，非完全匹配的关键词标注匹配方式"""
+        rule = keyword_index.get_rule(self.group_id, keyword)
+        if rule is None or rule[1] == MATCH_EXACT:
+            return f"🔑 {keyword}"
+        return f"🔑 {keyword}（{MATCH_TYPE_NAMES[rule[1]]}）"
+
     async def handle_clear_keyword(self):
         """
         处理清空关键词回复的命令
@@ -150,6 +188,7 @@ class HandleKeywordsReply:
         try:
             with DataManager() as dm:
                 dm.clear_keywords(self.group_id)
+            keyword_index.clear(self.group_id)
             await send_group_msg(
                 self.websocket,
                 self.group_id,
@@ -168,14 +207,13 @@ class HandleKeywordsReply:
         根据关键词匹配回复内容，并发送给群聊
         """
         try:
-            with DataManager() as dm:
-                reply = dm.get_reply(self.group_id, self.raw_message)
-                if reply:
-                    reply = replace_rkey(reply)
-                    await send_group_msg_with_cq(
-                        self.websocket,
-                        self.group_id,
-                        reply,
-                    )
+            reply = keyword_index.match(self.group_id, self.raw_message)
+            if reply:
+                reply = replace_rkey(reply)
+                await send_group_msg_with_cq(
+                    self.websocket,
+                    self.group_id,
+                    reply,
+                )
         except Exception as e:
             logger.error(f"[{MODULE_NAME}] 关键词回复失败: {e}")
@@ -2,19 +2,22 @@ from .. import (
     MODULE_NAME,
     SWITCH_NAME,
     ADD_COMMAND,
+    ADD_PREFIX_COMMAND,
+    ADD_CONTAINS_COMMAND,
     DELETE_COMMAND,
     LIST_COMMAND,
     CLEAR_COMMAND,
 )
 from core.menu_manager import MENU_COMMAND
 import logger
+from core.event import as_event
 from core.switchs import is_group_switch_on, handle_module_group_switch
 from utils.auth import is_group_admin, is_system_admin
 from api.message import send_group_msg
 from utils.generate import generate_text_message, generate_reply_message
-from datetime import datetime
 from core.menu_manager import MenuManager
 from .handle_KeywordsReply import HandleKeywordsReply
+from .keyword_index import MATCH_PREFIX, MATCH_CONTAINS, MATCH_TYPE_NAMES
 
 
 class GroupMessageHandler:
@@ -23,20 +26,19 @@ class GroupMessageHandler:
     def __init__(self, websocket, msg):
         self.websocket = websocket
         self.msg = msg
-        self.time = msg.get("time", "")
-        self.formatted_time = datetime.fromtimestamp(self.time).strftime(
-            "%Y-%m-%d %H:%M:%S"
-        )  # 格式化时间
-        self.sub_type = msg.get("sub_type", "")  # 子类型，只有normal
-        self.group_id = str(msg.get("group_id", ""))  # 群号
-        self.message_id = str(msg.get("message_id", ""))  # 消息ID
-        self.user_id = str(msg.get("user_id", ""))  # 发送者QQ号
-        self.message = msg.get("message", {})  # 消息段数组
-        self.raw_message = msg.get("raw_message", "")  # 原始消息
-        self.sender = msg.get("sender", {})  # 发送者信息
-        self.nickname = self.sender.get("nickname", "")  # 昵称
-        self.card = self.sender.get("card", "")  # 群名片
-        self.role = self.sender.get("role", "")  # 群身份
+        event = as_event(msg)
+        self.time = event.time
+        self.formatted_time = event.formatted_time  # 格式化时间
+        self.sub_type = event.sub_type  # 子类型，只有normal
+        self.group_id = event.group_id  # 群号
+        self.message_id = event.message_id  # 消息ID
+        self.user_id = event.user_id  # 发送者QQ号
+        self.message = event.message  # 消息段数组
+        self.raw_message = event.raw_message  # 原始消息
+        self.sender = event.sender  # 发送者信息
+        self.nickname = event.nickname  # 昵称
+        self.card = event.card  # 群名片
+        self.role = event.role  # 群身份
 
     async def handle(self):
         """
@@ -80,6 +82,21 @@ class GroupMessageHandler:
             if self.raw_message.lower().startswith(ADD_COMMAND.lower()):
                 await handle_keywords_reply.handle_add_keyword()
                 return
+            # 前缀匹配、包含匹配会命中大量消息，仅管理员可添加
+            for command, match_type in (
+                (ADD_PREFIX_COMMAND, MATCH_PREFIX),
+                (ADD_CONTAINS_COMMAND, MATCH_CONTAINS),
+            ):
+                if self.raw_message.lower().startswith(command.lower()):
+                    if not is_group_admin(self.role) and not is_system_admin(
+                        self.user_id
+                    ):
+                        logger.error(
+                            f"[{MODULE_NAME}]{self.user_id}无权限添加{MATCH_TYPE_NAMES[match_type]}关键词"
+                        )
+                        return
+                    await handle_keywords_reply.handle_add_keyword(command, match_type)
+                    return
             if self.raw_message.lower().startswith(DELETE_COMMAND.lower()):
                 await handle_keywords_reply.handle_delete_keyword()
                 return
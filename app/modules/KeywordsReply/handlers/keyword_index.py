@@ -0,0 +1,216 @@
+from collections import deque
+import logger
+from .. import MODULE_NAME
+from .data_manager import DataManager
+
+# 匹配方式
+MATCH_EXACT = "exact"  # 完全匹配
+MATCH_PREFIX = "prefix"  # 前缀匹配
+MATCH_CONTAINS = "contains"  # 包含匹配
+
+MATCH_TYPE_NAMES = {
+    MATCH_EXACT: "完全匹配",
+    MATCH_PREFIX: "前缀匹配",
+    MATCH_CONTAINS: "包含匹配",
+}
+
+
+class AhoCorasick:
+    """
+    Aho-Corasick 多模式匹配自动机
+
+    一次扫描消息即可找出其中出现的所有关键词，耗时只与消息长度有关，
+    不随关键词数量增长。
+    """
+
+    def __init__(self, patterns):
+        # 每个节点: 子节点字典、失配指针、以该节点结尾的关键词
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+        for pattern in patterns:
+            self._add(pattern)
+        self._build()
+
+    def _add(self, pattern):
+        node = 0
+        for char in pattern:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][char] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            node = next_node
+        self._output[node].append(pattern)
+
+    def _build(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                self._output[child] = (
+                    self._output[child] + self._output[self._fail[child]]
+                )
+
+    def iter_matches(self, text):
+        """依次产出 text 中出现的关键词"""
+        node = 0
+        for char in text:
+            while node and char not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(char, 0)
+            yield from self._output[node]
+
+    def iter_prefix_matches(self, text):
+        """沿字典树从 text 开头向下走，依次产出是 text 前缀的关键词"""
+        node = 0
+        for depth, char in enumerate(text, 1):
+            node = self._goto[node].get(char)
+            if node is None:
+                return
+            # 输出中还包含失配链上的后缀关键词，只有长度等于深度的才是前缀
+            for pattern in self._output[node]:
+                if len(pattern) == depth:
+                    yield pattern
+
+
+class GroupKeywordTable:
+    """单个群的关键词表"""
+
+    def __init__(self):
+        # keyword -> (reply, match_type)
+        self.rules = {}
+        self._prefix_automaton = None
+        self._contains_automaton = None
+        # 前缀/包含关键词的首字集合，用于在运行自动机前快速排除绝大多数消息
+        self._prefix_first_chars = set()
+        self._contains_first_chars = set()
+        self._dirty = True
+
+    def set(self, keyword, reply, match_type):
+        self.rules[keyword] = (reply, match_type)
+        self._dirty = True
+
+    def remove(self, keyword):
+        if self.rules.pop(keyword, None) is not None:
+            self._dirty = True
+
+    def _rebuild(self):
+        prefix_patterns = [
+            keyword
+            for keyword, (_, match_type) in self.rules.items()
+            if match_type == MATCH_PREFIX
+        ]
+        contains_patterns = [
+            keyword
+            for keyword, (_, match_type) in self.rules.items()
+            if match_type == MATCH_CONTAINS
+        ]
+        self._prefix_automaton = (
+            AhoCorasick(prefix_patterns) if prefix_patterns else None
+        )
+        self._contains_automaton = (
+            AhoCorasick(contains_patterns) if contains_patterns else None
+        )
+        self._prefix_first_chars = {keyword[0] for keyword in prefix_patterns}
+        self._contains_first_chars = {keyword[0] for keyword in contains_patterns}
+        self._dirty = False
+
+    def match(self, message):
+        """
+        匹配消息，优先级：完全匹配 > 最长前缀匹配 > 最长包含匹配
+
+        Returns:
+            str or None: 回复内容
+        """
+        rule = self.rules.get(message)
+        if rule is not None and rule[1] == MATCH_EXACT:
+            return rule[0]
+
+        if self._dirty:
+            self._rebuild()
+
+        if self._prefix_automaton and message[0] in self._prefix_first_chars:
+            best = max(
+                self._prefix_automaton.iter_prefix_matches(message),
+                key=len,
+                default=None,
+            )
+            if best is not None:
+                return self.rules[best][0]
+
+        if self._contains_automaton and not self._contains_first_chars.isdisjoint(
+            message
+        ):
+            best = max(
+                self._contains_automaton.iter_matches(message), key=len, default=None
+            )
+            if best is not None:
+                return self.rules[best][0]
+        return None
+
+
+class KeywordIndex:
+    """
+    全部群的内存关键词表
+
+    首次使用时从数据库加载，此后添加、删除、清空关键词时同步更新，
+    每条群消息的匹配不再访问数据库。
+    """
+
+    def __init__(self):
+        self._groups = {}
+        self._loaded = False
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        with DataManager() as dm:
+            rules = dm.get_all_rules()
+        for group_id, keyword, reply, match_type in rules:
+            self._groups.setdefault(group_id, GroupKeywordTable()).set(
+                keyword, reply, match_type or MATCH_EXACT
+            )
+        self._loaded = True
+        logger.info(f"[{MODULE_NAME}]已加载 {len(rules)} 条关键词回复到内存")
+
+    def match(self, group_id, message):
+        """匹配消息，返回回复内容或None"""
+        self._ensure_loaded()
+        table = self._groups.get(group_id)
+        if table is None or not message:
+            return None
+        return table.match(message)
+
+    def get_rule(self, group_id, keyword):
+        """获取关键词规则，返回 (reply, match_type) 或None"""
+        self._ensure_loaded()
+        table = self._groups.get(group_id)
+        return table.rules.get(keyword) if table else None
+
+    def set(self, group_id, keyword, reply, match_type):
+        self._ensure_loaded()
+        self._groups.setdefault(group_id, GroupKeywordTable()).set(
+            keyword, reply, match_type
+        )
+
+    def remove(self, group_id, keyword):
+        self._ensure_loaded()
+        table = self._groups.get(group_id)
+        if table is not None:
+            table.remove(keyword)
+
+    def clear(self, group_id):
+        self._ensure_loaded()
+        self._groups.pop(group_id, None)
+
+
+# 全局关键词表
+keyword_index = KeywordIndex()
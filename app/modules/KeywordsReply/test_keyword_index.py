@@ -0,0 +1,84 @@
+"""
+关键词匹配测试程序
+在 app 目录下运行：python -m modules.KeywordsReply.test_keyword_index
+"""
+
+from modules.KeywordsReply.handlers.keyword_index import (
+    AhoCorasick,
+    GroupKeywordTable,
+    MATCH_EXACT,
+    MATCH_PREFIX,
+    MATCH_CONTAINS,
+)
+
+
+def naive_matches(patterns, text):
+    """逐个关键词暴力查找，作为自动机结果的对照"""
+    return sorted(
+        pattern
+        for pattern in patterns
+        for start in range(len(text))
+        if text.startswith(pattern, start)
+    )
+
+
+def test_iter_matches():
+    """一次扫描找出所有出现的关键词，包括重叠和互为后缀的关键词"""
+    patterns = ["he", "she", "his", "hers", "价格", "格式", "价格表"]
+    automaton = AhoCorasick(patterns)
+    for text in ["ushers", "his hershe", "请问价格表的格式", "无关内容", ""]:
+        assert sorted(automaton.iter_matches(text)) == naive_matches(patterns, text)
+
+
+def test_iter_prefix_matches():
+    """前缀匹配只产出从开头开始的关键词，不包括失配链上的后缀关键词"""
+    automaton = AhoCorasick(["签到", "签到排行", "到排"])
+    assert list(automaton.iter_prefix_matches("签到排行榜")) == ["签到", "签到排行"]
+    assert list(automaton.iter_prefix_matches("我要签到")) == []
+    assert list(automaton.iter_prefix_matches("签")) == []
+
+
+def test_group_table_priority():
+    """完全匹配优先，其次最长前缀匹配，最后最长包含匹配"""
+    table = GroupKeywordTable()
+    table.set("帮助", "完全匹配回复", MATCH_EXACT)
+    table.set("帮", "短前缀回复", MATCH_PREFIX)
+    table.set("帮助文档", "长前缀回复", MATCH_PREFIX)
+    table.set("文档", "包含回复", MATCH_CONTAINS)
+    table.set("使用文档", "长包含回复", MATCH_CONTAINS)
+
+    assert table.match("帮助") == "完全匹配回复"
+    assert table.match("帮助文档在哪") == "长前缀回复"
+    assert table.match("帮我一下") == "短前缀回复"
+    assert table.match("求一份使用文档") == "长包含回复"
+    assert table.match("文档呢") == "包含回复"
+    assert table.match("你好") is None
+
+
+def test_group_table_rebuild():
+    """添加、删除关键词后自动机重建，删除的关键词不再命中"""
+    table = GroupKeywordTable()
+    table.set("文档", "包含回复", MATCH_CONTAINS)
+    assert table.match("有文档吗") == "包含回复"
+    table.remove("文档")
+    assert table.match("有文档吗") is None
+    table.set("有", "前缀回复", MATCH_PREFIX)
+    assert table.match("有文档吗") == "前缀回复"
+
+
+def main():
+    """关键词匹配测试程序"""
+    tests = [
+        test_iter_matches,
+        test_iter_prefix_matches,
+        test_group_table_priority,
+        test_group_table_rebuild,
+    ]
+    for test in tests:
+        test()
+        print(f"{test.__doc__} ✅")
+    print(f"全部 {len(tests)} 项测试通过 🎉")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,16 +6,18 @@ from core.get_group_list import get_group_member_info_by_id
 from core.get_group_member_list import get_user_role_in_group
 from ..utils.data_manager import DataManager
 from api.message import send_group_msg, send_private_msg
-from api.group import set_group_kick, get_group_member_list
+from api.group import set_group_kick
+from core.member_feed import (
+    member_feed,
+    SnapshotExporter,
+    CHANGE_REFRESH,
+    CHANGE_MEMBERS,
+)
 from utils.generate import generate_text_message, generate_at_message
 import asyncio
-import shutil
 from pathlib import Path
 from config import OWNER_ID
 
-# 群成员路径
-from core.get_group_member_list import DATA_DIR as GROUP_MEMBER_LIST_DIR
-
 # 复制后路径
 # 获取当前文件所在目录的上五级目录，然后拼接目标路径
 # .../W1ndysBot/app/modules/QQJW/handlers/ -> .../
@@ -29,6 +31,28 @@ COPY_TO_DIR = (
 )
 
 
+def get_enable_group_ids():
+    """获取教务启用群号集合（字符串格式）"""
+    with DataManager() as data_manager:
+        group_list = (
+            data_manager.get_enable_group_list().get("data", {}) or {}
+        ).get("group_list", [])
+    return {str(group_id) for group_id in group_list}
+
+
+# 启用群成员进出时，由核心成员列表变更通知原子导出成员列表，
+# 不再请求后等待固定时间再复制文件
+member_exporter = SnapshotExporter(
+    member_feed,
+    COPY_TO_DIR,
+    group_filter=lambda group_id: is_group_switch_on(group_id, MODULE_NAME)
+    and group_id in get_enable_group_ids(),
+)
+member_feed.subscribe(
+    member_exporter.handle_change, (CHANGE_REFRESH, CHANGE_MEMBERS)
+)
+
+
 class GroupNoticeHandler:
     """
     群组通知处理器
@@ -49,7 +73,8 @@ class GroupNoticeHandler:
 
     async def _initialize_group_member_lists(self):
         """
-        初始化检查：如果目标目录中缺少启用群的成员列表文件，则从源目录复制。
+        初始化检查：目标目录中启用群的成员列表缺失或与核心数据不一致时补齐，
+        每个群在进程内只检查一次，之后由成员列表变更通知导出。
         """
         try:
             if not COPY_TO_DIR.exists():
@@ -64,26 +89,15 @@ class GroupNoticeHandler:
                     f"[{MODULE_NAME}]目标目录不存在，已创建目标目录：{COPY_TO_DIR}\n如果目标目录有修改，请及时修改对应代码同步。",
                 )
 
-            enable_groups = self._get_enable_groups_list()
-            for group_id in enable_groups:
-                source_path = Path(GROUP_MEMBER_LIST_DIR) / f"{group_id}.json"
-                dest_path = COPY_TO_DIR / f"{group_id}.json"
-
-                if not dest_path.exists():
-                    if source_path.exists():
-                        shutil.copyfile(source_path, dest_path)
-                        logger.info(
-                            f"[{MODULE_NAME}]初始化：已复制群成员列表文件 {group_id}.json 到 {COPY_TO_DIR}"
-                        )
-                        await send_private_msg(
-                            self.websocket,
-                            OWNER_ID,
-                            f"[{MODULE_NAME}]初始化：已复制群成员列表文件 {group_id}.json 到 {COPY_TO_DIR}",
-                        )
-                    else:
-                        logger.warning(
-                            f"[{MODULE_NAME}]初始化警告：源文件 {source_path} 不存在，无法复制。"
-                        )
+            for group_id in member_exporter.sync(self._get_enable_groups_list()):
+                logger.info(
+                    f"[{MODULE_NAME}]初始化：已导出群成员列表文件 {group_id}.json 到 {COPY_TO_DIR}"
+                )
+                await send_private_msg(
+                    self.websocket,
+                    OWNER_ID,
+                    f"[{MODULE_NAME}]初始化：已导出群成员列表文件 {group_id}.json 到 {COPY_TO_DIR}",
+                )
         except Exception as e:
             logger.error(f"[{MODULE_NAME}]初始化群成员列表文件失败: {e}")
 
@@ -115,33 +129,8 @@ class GroupNoticeHandler:
                 # 处理Easy-QFNUJW模块进入中转群的事件
                 await self.handle_group_increase_forward_group()
 
-            # 如果群号是启用群
-            elif self.group_id in self._get_enable_groups_list():
-                # 发送获取群成员列表的API
-                await get_group_member_list(self.websocket, self.group_id)
-                # 等待0.5秒，把群成员列表文件复制到指定目录
-                await asyncio.sleep(0.5)
-                source_path = Path(GROUP_MEMBER_LIST_DIR) / f"{self.group_id}.json"
-                dest_path = COPY_TO_DIR / f"{self.group_id}.json"
-                if source_path.exists():
-                    shutil.copyfile(source_path, dest_path)
-                    logger.info(
-                        f"[{MODULE_NAME}]已复制群成员列表文件：{self.group_id}.json 到 {COPY_TO_DIR} 目录"
-                    )
-                    await send_private_msg(
-                        self.websocket,
-                        OWNER_ID,
-                        f"[{MODULE_NAME}]已复制群成员列表文件：{self.group_id}.json 到 {COPY_TO_DIR} 目录",
-                    )
-                else:
-                    logger.warning(
-                        f"[{MODULE_NAME}]复制失败：源文件 {source_path} 不存在。"
-                    )
-                    await send_private_msg(
-                        self.websocket,
-                        OWNER_ID,
-                        f"[{MODULE_NAME}]复制失败：源文件 {source_path} 不存在。",
-                    )
+            # 启用群的成员列表由核心模块在进群通知后刷新，
+            # 内容变化时通过 member_exporter 原子导出，这里无需处理
         except Exception as e:
             logger.error(f"[{MODULE_NAME}]处理群聊成员增加通知失败: {e}")
             raise  # 增加错误抛出
@@ -15,6 +15,15 @@ DATA_DIR = os.path.join("data", MODULE_NAME)
 os.makedirs(DATA_DIR, exist_ok=True)
 DIFY_API_KEY_FILE = os.path.join(DATA_DIR, "dify_api_key.txt")
 
+# 增量分词写入间隔，单位秒
+TOKEN_FLUSH_INTERVAL = 10
+
+# 增量分词缓冲区达到该条数时立即写入
+TOKEN_BATCH_SIZE = 200
+
+# 后台预热时额外导入的重量级依赖，避免首次使用时才开始导入
+WARMUP_IMPORTS = ["wordcloud", "matplotlib.pyplot"]
+
 # 模块的一些命令可以在这里定义，方便在其他地方调用，提高代码的复用率
 # ------------------------------------------------------------
 GENERATE_WORD_CLOUD = "生成词云"
@@ -1,22 +1,76 @@
 import sqlite3
 from datetime import date, timedelta
 from collections import Counter
-import jieba  # 中文分词
 import re
 import time
 import os
 from .. import DATA_DIR
-from wordcloud import WordCloud
-import matplotlib.pyplot as plt
+from core.tokenizer import tokenizer
 import io
 import base64
 
+DEFAULT_DB_PATH = os.path.join(DATA_DIR, "qq_messages.db")
+
+# 词频统计表，所有群共用，按群号和日期存储预先聚合好的词频
+WORD_FREQ_TABLE = "word_freq"
+
+
+def clean_text(text):
+    """文本清洗"""
+    # 移除URL
+    text = re.sub(r"http[s]?://\S+", "", text)
+    # 移除CQ码
+    text = re.sub(r"\[CQ:.*\]", "", text)
+    return text.strip()
+
+
+def tokenize_message(text, group_id=None):
+    """对单条消息分词，过滤单字，传入群号时使用该群的自定义词典"""
+    return [w for w in tokenizer.cut(clean_text(text), group_id) if len(w) > 1]
+
+
+def init_word_freq_table(conn):
+    """创建词频统计表"""
+    conn.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS {WORD_FREQ_TABLE} (
+            group_id TEXT NOT NULL,
+            day TEXT NOT NULL,
+            word TEXT NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (group_id, day, word)
+        )
+    """
+    )
+
+
+def save_word_frequencies(word_counts, db_path=DEFAULT_DB_PATH):
+    """
+    将词频增量累加到词频统计表
+
+    Args:
+        word_counts (Counter): {(group_id, day, word): count}
+        db_path (str): 数据库路径
+    """
+    if not word_counts:
+        return
+    with sqlite3.connect(db_path) as conn:
+        init_word_freq_table(conn)
+        conn.executemany(
+            f"INSERT INTO {WORD_FREQ_TABLE} (group_id, day, word, count) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(group_id, day, word) DO UPDATE SET count = count + excluded.count",
+            [
+                (group_id, day, word, count)
+                for (group_id, day, word), count in word_counts.items()
+            ],
+        )
+
 
 class QQMessageAnalyzer:
     def __init__(
         self,
         group_id,
-        db_path=os.path.join(DATA_DIR, "qq_messages.db"),
+        db_path=DEFAULT_DB_PATH,
     ):
         self.db_path = db_path
         self.group_id = str(group_id)
@@ -49,20 +103,25 @@ class QQMessageAnalyzer:
                 ON {self.table_name}(date(message_time))
             """
             )
+            init_word_freq_table(conn)
 
     def _is_filtered(self, content):
         """判断消息是否需要被过滤"""
         return any(re.search(pattern, content) for pattern in self.filter_patterns)
 
     def add_message(self, content, sender_id=None, message_time=None):
-        """存储单条消息，新增正则过滤"""
+        """
+        存储单条消息，新增正则过滤
+        返回: 是否已存储，被过滤的消息返回False
+        """
         if self._is_filtered(content):
-            return  # 匹配过滤规则则不存储
+            return False  # 匹配过滤规则则不存储
         with sqlite3.connect(self.db_path) as conn:
             conn.execute(
                 f"INSERT INTO {self.table_name} (message_content, sender_id, message_time) VALUES (?, ?, ?)",
                 (content, sender_id, message_time),
             )
+        return True
 
     def _get_daily_messages(self, query_date=None):
         """获取某日所有消息(默认今天)"""
@@ -112,30 +171,34 @@ class QQMessageAnalyzer:
                 for row in cursor.fetchall()
             ]
 
-    def _clean_text(self, text):
-        """文本清洗"""
-        # 移除URL
-        text = re.sub(r"http[s]?://\S+", "", text)
-        # 移除CQ码
-        text = re.sub(r"\[CQ:.*\]", "", text)
-        return text.strip()
+    def _resolve_date(self, query_date=None):
+        """将查询日期统一转换为YYYY-MM-DD字符串"""
+        if query_date is None:
+            return date.today().isoformat()
+        if isinstance(query_date, str):
+            return query_date
+        return query_date.isoformat()
 
     def generate_daily_report(self, query_date=None):
         """
         生成每日报告
+        词频由消息到达时增量分词聚合，这里直接读取预先统计好的结果；
+        没有统计数据的日期（如升级前的历史消息）会回退到全量分词并回填
         返回: (词云数据, top10词汇)
         """
-        messages = self._get_daily_messages(query_date)
-        if not messages:
-            return {}, []
+        target_date = self._resolve_date(query_date)
 
-        # 中文分词和词频统计
-        word_counter = Counter()
-        for msg in messages:
-            cleaned = self._clean_text(msg)
-            words = jieba.lcut(cleaned)  # 使用结巴分词
-            # 直接统计所有词的出现次数，包括重复出现的词
-            word_counter.update([w for w in words if len(w) > 1])  # 过滤单字
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.execute(
+                f"SELECT word, count FROM {WORD_FREQ_TABLE} WHERE group_id = ? AND day = ?",
+                (self.group_id, target_date),
+            )
+            word_counter = Counter(dict(cursor.fetchall()))
+
+        if not word_counter:
+            word_counter = self._rebuild_daily_word_freq(target_date)
+            if not word_counter:
+                return {}, []
 
         # 获取前10高频词
         top10 = word_counter.most_common(10)
@@ -145,6 +208,30 @@ class QQMessageAnalyzer:
 
         return wordcloud_data, top10
 
+    def _rebuild_daily_word_freq(self, target_date):
+        """
+        对某日的原始消息全量分词，并将历史日期的结果写入词频统计表
+        当天的消息仍在增量聚合中，回填会导致重复计数，因此只计算不保存
+        """
+        messages = self._get_daily_messages(target_date)
+        word_counter = Counter()
+        for msg in messages:
+            word_counter.update(tokenize_message(msg, self.group_id))
+
+        if target_date >= date.today().isoformat():
+            return word_counter
+
+        save_word_frequencies(
+            Counter(
+                {
+                    (self.group_id, target_date, word): count
+                    for word, count in word_counter.items()
+                }
+            ),
+            self.db_path,
+        )
+        return word_counter
+
     def cleanup_old_data(self, days_to_keep=30):
         """清理旧数据(保留最近N天)"""
         cutoff_date = (date.today() - timedelta(days=days_to_keep)).isoformat()
@@ -153,21 +240,31 @@ class QQMessageAnalyzer:
                 f"DELETE FROM {self.table_name} WHERE date(message_time) < ?",
                 (cutoff_date,),
             )
+            conn.execute(
+                f"DELETE FROM {WORD_FREQ_TABLE} WHERE group_id = ? AND day < ?",
+                (self.group_id, cutoff_date),
+            )
             # 不要在这里执行 VACUUM
 
         # 用新的连接单独执行 VACUUM
         with sqlite3.connect(self.db_path) as conn:
             conn.execute("VACUUM")
 
-    def generate_wordcloud_image_base64(self, query_date=None):
+    def generate_wordcloud_image_base64(self, query_date=None, wordcloud_data=None):
         """
         生成词云图片并以base64编码返回
         :param query_date: 指定日期，默认今天
+        :param wordcloud_data: 已生成的词云数据，传入时不再重新生成每日报告
         :return: base64字符串
         """
-        wordcloud_data, _ = self.generate_daily_report(query_date)
+        if wordcloud_data is None:
+            wordcloud_data, _ = self.generate_daily_report(query_date)
         if not wordcloud_data:
             return None
+        # wordcloud/matplotlib 导入较慢，只在生成图片时导入
+        from wordcloud import WordCloud
+        import matplotlib.pyplot as plt
+
         wc = WordCloud(
             font_path=self.get_font_path(),
             width=800,
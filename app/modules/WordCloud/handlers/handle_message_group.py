@@ -1,3 +1,4 @@
+import asyncio
 import re
 from .. import (
     MODULE_NAME,
@@ -8,15 +9,18 @@ from .. import (
 )
 from core.menu_manager import MENU_COMMAND
 import logger
+from core.event import as_event
 from core.switchs import is_group_switch_on, handle_module_group_switch
+from core.tokenizer import tokenizer
 from api.message import send_group_msg, send_group_msg_with_cq
 from utils.generate import (
     generate_text_message,
     generate_image_message,
     generate_reply_message,
 )
-from datetime import datetime, date, timedelta
+from datetime import date, timedelta
 from .WordCloud import QQMessageAnalyzer
+from .token_aggregator import token_aggregator
 from .LLM import DifyClient
 from core.menu_manager import MenuManager
 from utils.auth import is_group_admin, is_system_admin
@@ -28,20 +32,19 @@ class GroupMessageHandler:
     def __init__(self, websocket, msg):
         self.websocket = websocket
         self.msg = msg
-        self.time = msg.get("time", "")
-        self.formatted_time = datetime.fromtimestamp(self.time).strftime(
-            "%Y-%m-%d %H:%M:%S"
-        )  # 格式化时间
-        self.sub_type = msg.get("sub_type", "")  # 子类型，只有normal
-        self.group_id = str(msg.get("group_id", ""))  # 群号
-        self.message_id = str(msg.get("message_id", ""))  # 消息ID
-        self.user_id = str(msg.get("user_id", ""))  # 发送者QQ号
-        self.message = msg.get("message", {})  # 消息段数组
-        self.raw_message = msg.get("raw_message", "")  # 原始消息
-        self.sender = msg.get("sender", {})  # 发送者信息
-        self.nickname = self.sender.get("nickname", "")  # 昵称
-        self.card = self.sender.get("card", "")  # 群名片
-        self.role = self.sender.get("role", "")  # 群身份
+        event = as_event(msg)
+        self.time = event.time
+        self.formatted_time = event.formatted_time  # 格式化时间
+        self.sub_type = event.sub_type  # 子类型，只有normal
+        self.group_id = event.group_id  # 群号
+        self.message_id = event.message_id  # 消息ID
+        self.user_id = event.user_id  # 发送者QQ号
+        self.message = event.message  # 消息段数组
+        self.raw_message = event.raw_message  # 原始消息
+        self.sender = event.sender  # 发送者信息
+        self.nickname = event.nickname  # 昵称
+        self.card = event.card  # 群名片
+        self.role = event.role  # 群身份
 
     async def handle(self):
         """
@@ -82,9 +85,16 @@ class GroupMessageHandler:
 
             # 如果消息是词云命令，则生成词云
             if self.raw_message.lower() == GENERATE_WORD_CLOUD.lower():
-                # 生成今日词云图片和top10词汇
-                img_base64 = analyzer.generate_wordcloud_image_base64()
-                wordcloud_data, top10_words = analyzer.generate_daily_report()
+                # 先写入尚未聚合的消息，保证今日词频完整
+                await token_aggregator.flush()
+                # 今日词频只统计一次：在分词线程中生成报告（可能需要全量分词），
+                # 再在后台线程中用同一份词频绘制词云，均不阻塞事件循环
+                wordcloud_data, top10_words = await tokenizer.run(
+                    analyzer.generate_daily_report
+                )
+                img_base64 = await asyncio.to_thread(
+                    analyzer.generate_wordcloud_image_base64, None, wordcloud_data
+                )
                 # 检查 img_base64 是否为 None
                 if img_base64 is None:
                     await send_group_msg(
@@ -123,7 +133,12 @@ class GroupMessageHandler:
                 await self._handle_chat_summary(analyzer, query_date=yesterday)
                 return
 
-            analyzer.add_message(self.raw_message, self.user_id, self.formatted_time)
+            if analyzer.add_message(
+                self.raw_message, self.user_id, self.formatted_time
+            ):
+                token_aggregator.add(
+                    self.group_id, self.formatted_time[:10], self.raw_message
+                )
             logger.info(
                 f"[{MODULE_NAME}]群{self.group_id}的{self.nickname}({self.user_id})有新消息存储"
             )
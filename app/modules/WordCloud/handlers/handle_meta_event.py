@@ -5,6 +5,7 @@ from core.switchs import get_all_enabled_groups
 from api.message import send_group_msg, send_group_msg_with_cq
 from utils.generate import generate_image_message, generate_text_message
 from .WordCloud import QQMessageAnalyzer
+from .token_aggregator import token_aggregator
 from .LLM import DifyClient
 import asyncio  # 添加这个导入
 
@@ -70,6 +71,9 @@ class MetaEventHandler:
                 yesterday = now - timedelta(days=1)
                 yesterday_str = yesterday.strftime("%Y-%m-%d")
 
+                # 先写入尚未聚合的昨日消息
+                await token_aggregator.flush()
+
                 # 获取所有开启的群聊开关
                 group_switches = get_all_enabled_groups(MODULE_NAME)
                 logger.info(f"[{MODULE_NAME}]所有开启的群聊开关: {group_switches}")
@@ -120,11 +124,13 @@ class MetaEventHandler:
                 yesterday_messages = analyzer.get_daily_messages_with_details(
                     yesterday_str
                 )
-                # 生成词云和top10词汇
-                img_base64 = analyzer.generate_wordcloud_image_base64(yesterday_str)
+                # 生成top10词汇，并用同一份词频绘制词云
                 wordcloud_data, top10_words = analyzer.generate_daily_report(
                     yesterday_str
                 )
+                img_base64 = analyzer.generate_wordcloud_image_base64(
+                    yesterday_str, wordcloud_data
+                )
                 return yesterday_messages, img_base64, top10_words
 
             # 使用 asyncio.to_thread 在新线程中执行
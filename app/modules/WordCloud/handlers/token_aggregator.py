@@ -0,0 +1,77 @@
+import asyncio
+from collections import Counter
+import logger
+from core.tokenizer import tokenizer
+from .. import MODULE_NAME, TOKEN_FLUSH_INTERVAL, TOKEN_BATCH_SIZE
+from .WordCloud import tokenize_message, save_word_frequencies
+
+
+class TokenAggregator:
+    """
+    增量分词聚合器
+
+    消息到达时只放入内存缓冲区，由后台任务定时或攒够一批后在线程中统一分词，
+    并将词频累加到按群、按日的词频统计表中，零点生成词云时直接读取统计结果。
+    """
+
+    def __init__(self, flush_interval, batch_size):
+        """
+        Args:
+            flush_interval (int): 定时写入间隔，单位秒
+            batch_size (int): 缓冲区达到该条数时立即写入
+        """
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._buffer = []
+        self._lock = None
+        self._timer_task = None
+        self._flush_task = None
+
+    def add(self, group_id, day, content):
+        """
+        添加一条待分词的消息
+
+        Args:
+            group_id (str): 群号
+            day (str): 消息日期，YYYY-MM-DD
+            content (str): 消息内容
+        """
+        self._buffer.append((group_id, day, content))
+        if self._timer_task is None or self._timer_task.done():
+            self._timer_task = asyncio.create_task(self._flush_periodically())
+        # 同一时间只保留一个立即写入任务，写入期间到达的消息由它或定时任务处理
+        if len(self._buffer) >= self.batch_size and (
+            self._flush_task is None or self._flush_task.done()
+        ):
+            self._flush_task = asyncio.create_task(self.flush())
+
+    async def _flush_periodically(self):
+        while self._buffer:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    async def flush(self):
+        """立即将缓冲区中的消息分词并写入数据库"""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            batch, self._buffer = self._buffer, []
+            if not batch:
+                return
+            try:
+                # 在共用的分词线程中执行，避免与其他模块的分词并发争抢CPU
+                await tokenizer.run(self._process_batch, batch)
+            except Exception as e:
+                logger.error(f"[{MODULE_NAME}]增量分词写入失败，丢弃{len(batch)}条消息: {e}")
+
+    @staticmethod
+    def _process_batch(batch):
+        word_counts = Counter()
+        for group_id, day, content in batch:
+            for word in tokenize_message(content, group_id):
+                word_counts[(group_id, day, word)] += 1
+        save_word_frequencies(word_counts)
+
+
+# 全局增量分词聚合器
+token_aggregator = TokenAggregator(TOKEN_FLUSH_INTERVAL, TOKEN_BATCH_SIZE)
@@ -0,0 +1,133 @@
+"""
+JSON编解码
+
+优先使用 orjson，其次 msgspec，都未安装时回退到标准库 json。
+可通过 use_codec 手动切换实现。大体积的响应帧（如群成员列表、合并转发、
+群历史消息）在线程池中解码，避免阻塞事件循环。
+"""
+
+import asyncio
+import json
+import re
+
+# 体积超过该值且 echo 命中下列前缀的帧在线程池中解码，单位：字符
+LARGE_FRAME_SIZE = 256 * 1024
+
+# 通常体积较大的响应，按 echo 前缀识别
+LARGE_FRAME_ECHO_PREFIXES = (
+    "get_group_member_list",
+    "get_group_list",
+    "get_friend_list",
+    "get_forward_msg",
+    "get_group_msg_history",
+    "get_friend_msg_history",
+)
+
+# 从原始帧中提取 echo，无需完整解析
+ECHO_PATTERN = re.compile(r'"echo"\s*:\s*"([^"]*)"')
+
+
+def _stdlib_dumps(obj):
+    return json.dumps(obj)
+
+
+def _build_orjson():
+    import orjson
+
+    def dumps(obj):
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+        except TypeError:
+            # orjson 不支持的类型交给标准库处理
+            return _stdlib_dumps(obj)
+
+    return dumps, orjson.loads
+
+
+def _build_msgspec():
+    import msgspec
+
+    encoder = msgspec.json.Encoder()
+    decoder = msgspec.json.Decoder()
+
+    def dumps(obj):
+        try:
+            return encoder.encode(obj).decode("utf-8")
+        except (TypeError, msgspec.EncodeError):
+            return _stdlib_dumps(obj)
+
+    return dumps, decoder.decode
+
+
+def _build_stdlib():
+    return _stdlib_dumps, json.loads
+
+
+# 可用的编解码实现，按优先级排列
+CODEC_BUILDERS = {
+    "orjson": _build_orjson,
+    "msgspec": _build_msgspec,
+    "json": _build_stdlib,
+}
+
+CODEC_NAME = "json"
+_dumps = _stdlib_dumps
+_loads = json.loads
+
+
+def use_codec(name):
+    """
+    切换编解码实现
+
+    参数:
+        name: str "orjson"、"msgspec"、"json" 或 "auto"（按优先级选择第一个可用的）
+    返回:
+        str 实际使用的实现名称
+    """
+    global CODEC_NAME, _dumps, _loads
+    names = list(CODEC_BUILDERS) if name == "auto" else [name, "json"]
+    for codec_name in names:
+        try:
+            _dumps, _loads = CODEC_BUILDERS[codec_name]()
+            CODEC_NAME = codec_name
+            return codec_name
+        except (ImportError, KeyError):
+            continue
+    return CODEC_NAME
+
+
+def dumps(obj):
+    """编码为JSON字符串，用于发送websocket文本帧"""
+    return _dumps(obj)
+
+
+def loads(data):
+    """解码JSON字符串或字节"""
+    return _loads(data)
+
+
+def is_large_frame(data):
+    """判断是否为需要在线程池中解码的大体积响应帧"""
+    if len(data) < LARGE_FRAME_SIZE:
+        return False
+    if isinstance(data, (bytes, bytearray)):
+        data = data.decode("utf-8", errors="ignore")
+    match = ECHO_PATTERN.search(data)
+    return bool(match) and match.group(1).startswith(LARGE_FRAME_ECHO_PREFIXES)
+
+
+async def decode_frame(data):
+    """
+    解码websocket帧，大体积响应帧在线程池中解码
+
+    参数:
+        data: str 或 bytes 原始帧
+    返回:
+        dict 解码后的消息
+    """
+    if is_large_frame(data):
+        return await asyncio.to_thread(_loads, data)
+    return _loads(data)
+
+
+use_codec("auto")
@@ -0,0 +1,61 @@
+"""
+限流工具
+"""
+
+import asyncio
+import time
+
+
+class TokenBucket:
+    """
+    令牌桶限流器
+
+    令牌按固定速率补充，桶满时最多可连续放行 capacity 个请求，
+    之后按 rate 个/秒的速度放行。等待中的调用按先后顺序获得令牌。
+    """
+
+    def __init__(self, rate, capacity):
+        """
+        参数:
+            rate: float 每秒补充的令牌数
+            capacity: int 桶容量，即允许的最大突发请求数
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self._lock = None
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated_at) * self.rate
+        )
+        self.updated_at = now
+
+    def try_acquire(self, tokens=1):
+        """
+        尝试立即取出令牌
+        返回:
+            bool 令牌足够时取出并返回True，否则返回False
+        """
+        self._refill()
+        if self.tokens >= tokens:
+            self.tokens -= tokens
+            return True
+        return False
+
+    def wait_time(self, tokens=1):
+        """距离可取出令牌还需等待的秒数"""
+        self._refill()
+        if self.tokens >= tokens:
+            return 0.0
+        return (tokens - self.tokens) / self.rate
+
+    async def acquire(self, tokens=1):
+        """等待并取出令牌"""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            while not self.try_acquire(tokens):
+                await asyncio.sleep(self.wait_time(tokens))
@@ -0,0 +1,64 @@
+"""
+令牌桶限流测试程序
+在 app 目录下运行：python -m utils.test_rate_limit
+"""
+
+import asyncio
+import time
+from utils.rate_limit import TokenBucket
+
+
+def test_burst_then_refill():
+    """桶满时最多连续放行capacity个请求，之后按速率补充"""
+    bucket = TokenBucket(rate=10, capacity=3)
+    assert [bucket.try_acquire() for _ in range(4)] == [True, True, True, False]
+    assert 0 < bucket.wait_time() <= 0.1
+    time.sleep(0.12)
+    assert bucket.try_acquire()
+    assert not bucket.try_acquire()
+
+
+def test_capacity_limit():
+    """长时间空闲后令牌数不超过桶容量"""
+    bucket = TokenBucket(rate=1000, capacity=2)
+    time.sleep(0.05)
+    assert bucket.wait_time() == 0.0
+    assert [bucket.try_acquire() for _ in range(3)] == [True, True, False]
+
+
+def test_acquire_waits_in_order():
+    """acquire 在令牌不足时等待，等待中的调用按先后顺序获得令牌"""
+
+    async def run():
+        bucket = TokenBucket(rate=20, capacity=1)
+        order = []
+
+        async def worker(index):
+            await bucket.acquire()
+            order.append(index)
+
+        started_at = time.monotonic()
+        await asyncio.gather(*(worker(index) for index in range(4)))
+        return order, time.monotonic() - started_at
+
+    order, elapsed = asyncio.run(run())
+    assert order == [0, 1, 2, 3]
+    # 第一个请求使用桶中的令牌，其余三个各等待约 1/20 秒
+    assert elapsed >= 0.14
+
+
+def main():
+    """令牌桶限流测试程序"""
+    tests = [
+        test_burst_then_refill,
+        test_capacity_limit,
+        test_acquire_waits_in_order,
+    ]
+    for test in tests:
+        test()
+        print(f"{test.__doc__} ✅")
+    print(f"全部 {len(tests)} 项测试通过 🎉")
+
+
+if __name__ == "__main__":
+    main()